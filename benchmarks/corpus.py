@@ -0,0 +1,137 @@
+"""Deterministic synthetic corpora for the benchmarks.
+
+URLs mimic what a capture of a large site sees: a few origins (one with a
+non-default port and one spelled with mixed case), versioned assets,
+extensionless API paths, directory indexes, query strings,
+percent-encoded and non-ASCII segments, over-long names and Windows
+reserved names. The same seed always yields the same corpus, so results
+from different runs are comparable.
+"""
+
+import random
+from collections.abc import Iterator
+
+from webgrab.models import Resource
+
+BASE_URL = "https://example.com/"
+
+HOSTS = (
+    "example.com",
+    "example.com",
+    "example.com",
+    "cdn.example.com",
+    "static.example-cdn.net:8443",
+    "www.Example.COM",
+)
+
+SEGMENTS = (
+    "assets", "static", "js", "css", "img", "images", "fonts", "media", "api",
+    "v1", "v2", "blog", "2024", "posts", "users", "en-US", "docs", "vendor",
+    "caf%C3%A9", "日本語", "a b", "con", "aux.js", "x" * 150,
+)
+
+# File extension, Content-Type, and the leading bytes of a typical body
+ASSETS = (
+    (".js", "application/javascript", b"(function(){'use strict';"),
+    (".css", "text/css", b"body{margin:0}"),
+    (".png", "image/png", b"\x89PNG\r\n\x1a\n"),
+    (".jpg", "image/jpeg", b"\xff\xd8\xff\xe0"),
+    (".woff2", "font/woff2", b"wOF2\x00\x01\x00\x00"),
+    (".svg", "image/svg+xml", b"<svg xmlns='http://www.w3.org/2000/svg'>"),
+    (".html", "text/html; charset=utf-8", b"<!doctype html><html>"),
+    ("", "application/json", b'{"items": ['),
+    ("", "application/octet-stream", b"GIF89a\x01\x00"),
+)
+
+# Body sizes in bytes, weighted toward the small files that dominate pages
+BODY_SIZES = (512, 2048, 2048, 8192, 8192, 32768, 131072)
+
+
+def iter_urls(count: int, seed: int = 0) -> Iterator[str]:
+    """Yield synthetic resource URLs.
+
+    Args:
+        count: Number of URLs.
+        seed: Random seed.
+
+    Yields:
+        Absolute URLs.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        host = rng.choice(HOSTS)
+        scheme = "http" if i % 37 == 0 else "https"
+        directory = "".join("/" + rng.choice(SEGMENTS) for _ in range(rng.randrange(0, 5)))
+        prefix = f"{scheme}://{host}{directory}"
+        ext = rng.choice(ASSETS)[0]
+        kind = i % 10
+        if kind == 0:
+            yield f"{prefix}/"
+        elif kind == 1:
+            yield f"{prefix}/item{i}"
+        elif kind == 2:
+            yield f"{prefix}/app.{i:08x}{ext}?v={i % 13}&utm_source=x"
+        else:
+            yield f"{prefix}/file{i % 5000}{ext}"
+
+
+def make_urls(count: int, seed: int = 0) -> list[str]:
+    """Build a list of synthetic resource URLs.
+
+    Args:
+        count: Number of URLs.
+        seed: Random seed.
+
+    Returns:
+        Absolute URLs.
+    """
+    return list(iter_urls(count, seed))
+
+
+def make_path_components(count: int, seed: int = 0) -> list[str]:
+    """Build raw path components as they appear in URLs.
+
+    Args:
+        count: Number of components.
+        seed: Random seed.
+
+    Returns:
+        Unsanitized components, some invalid on Windows or too long.
+    """
+    rng = random.Random(seed)
+    extras = ("", "", "", ".js", ".min.css", ":1", "?", "*", "<tag>", ".")
+    return [rng.choice(SEGMENTS) + rng.choice(extras) for _ in range(count)]
+
+
+def make_resources(count: int, seed: int = 0) -> list[Resource]:
+    """Build captured resources with realistic types and body sizes.
+
+    Bodies are shared between resources of the same type and size, so a
+    large corpus costs little memory.
+
+    Args:
+        count: Number of resources.
+        seed: Random seed.
+
+    Returns:
+        Resources whose URLs come from ``iter_urls``.
+    """
+    rng = random.Random(seed)
+    bodies = {
+        (head, size): head + b"\x00" * (size - len(head))
+        for _, _, head in ASSETS
+        for size in BODY_SIZES
+    }
+    resources = []
+    for url in iter_urls(count, seed):
+        _, content_type, head = rng.choice(ASSETS)
+        resources.append(
+            Resource(
+                url=url,
+                content_type=content_type,
+                body=bodies[head, rng.choice(BODY_SIZES)],
+                headers={"content-type": content_type},
+                status_code=200,
+            )
+        )
+    return resources
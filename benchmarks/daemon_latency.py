@@ -0,0 +1,79 @@
+"""Compare cold-browser and warm-daemon capture latency.
+
+Usage:
+    webgrab daemon &                      # start a warm daemon
+    python benchmarks/daemon_latency.py https://example.com --runs 5
+
+Each run captures the same URL into a throwaway directory, first by
+launching a fresh browser (what ``webgrab --no-daemon`` does) and then
+through the running daemon. Requires ``playwright install chromium``.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from webgrab.capture.engine import capture_page_resources
+from webgrab.config import create_capture_config, create_save_config
+from webgrab.daemon.client import capture_via_daemon, ping_daemon
+from webgrab.daemon.protocol import default_socket_path
+from webgrab.storage.saver import ResourceSaver
+
+
+async def cold_capture(url: str, output_dir: Path) -> float:
+    """Capture with a freshly launched browser and return elapsed seconds."""
+    start = time.perf_counter()
+    resources, _ = await capture_page_resources(create_capture_config(url))
+    with ResourceSaver(create_save_config(output_dir, url)) as saver:
+        saver.save_resources(resources)
+    return time.perf_counter() - start
+
+
+async def warm_capture(url: str, output_dir: Path, socket_path: Path) -> float:
+    """Capture through the daemon and return elapsed seconds."""
+    start = time.perf_counter()
+    await capture_via_daemon(
+        socket_path, create_capture_config(url), create_save_config(output_dir, url)
+    )
+    return time.perf_counter() - start
+
+
+def summarize(label: str, samples: list[float]) -> None:
+    """Print min/median/max for a list of latencies."""
+    print(
+        f"{label:<6} min {min(samples):7.3f}s  "
+        f"median {statistics.median(samples):7.3f}s  max {max(samples):7.3f}s"
+    )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--socket", type=Path, default=default_socket_path())
+    args = parser.parse_args()
+
+    if not await ping_daemon(args.socket):
+        print(f"No daemon listening on {args.socket}; start one with 'webgrab daemon'")
+        return 1
+
+    cold: list[float] = []
+    warm: list[float] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(args.runs):
+            cold.append(await cold_capture(args.url, Path(tmp) / f"cold{run}"))
+            warm.append(await warm_capture(args.url, Path(tmp) / f"warm{run}", args.socket))
+
+    summarize("cold", cold)
+    summarize("warm", warm)
+    saved = statistics.median(cold) - statistics.median(warm)
+    print(f"warm daemon saves {saved:.3f}s per capture (median)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,305 @@
+"""Microbenchmarks for the URL, MIME, sanitizer and storage hot paths.
+
+Usage:
+    python benchmarks/hotpaths.py run --size 100000 -o baseline.json
+    python benchmarks/hotpaths.py run --size 100000 -o current.json
+    python benchmarks/hotpaths.py compare baseline.json current.json
+
+``run`` times each case over a synthetic corpus (see ``corpus.py``) and
+writes machine-readable results; ``--size`` takes 10k to 1M items.
+``compare`` prints the change per case and exits with status 1 if any case
+got slower than ``--threshold`` (10% by default). Everything runs offline;
+the save case writes into a temporary directory.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from corpus import BASE_URL, make_path_components, make_resources, make_urls
+
+from webgrab import __version__
+from webgrab.capture.rules import RuleFilter, parse_rules
+from webgrab.filesystem.sanitizer import sanitize_path_component
+from webgrab.mime.detector import infer_extension
+from webgrab.models import SaveConfig
+from webgrab.storage.deduplicator import PathDeduplicator
+from webgrab.storage.path_resolver import url_to_local_path
+from webgrab.storage.saver import ResourceSaver
+from webgrab.url.classifier import UrlClassifier, parse_cached, url_origin
+from webgrab.url.parser import is_same_origin
+
+RESULTS_VERSION = 1
+
+# Files written per repeat of the save case; writing a million files per
+# repeat would dominate the whole run
+DEFAULT_SAVE_LIMIT = 10_000
+
+
+@dataclass
+class Case:
+    """One benchmark: ``setup`` builds fresh state, ``run`` is timed."""
+
+    name: str
+    ops: int
+    setup: Callable[[], Any]
+    run: Callable[[Any], None]
+    teardown: Callable[[Any], None] = lambda state: None
+
+
+def clear_caches() -> None:
+    """Drop memoized URL parses so every repeat starts cold."""
+    parse_cached.cache_clear()
+    url_origin.cache_clear()
+
+
+def build_cases(size: int, save_limit: int) -> list[Case]:
+    """Build every benchmark case over corpora of ``size`` items.
+
+    Args:
+        size: Number of URLs and components per case.
+        save_limit: Number of resources written by the save case.
+
+    Returns:
+        Cases in run order.
+    """
+    urls = make_urls(size)
+    components = make_path_components(size)
+    output_dir = Path("/nonexistent/webgrab-bench")
+    paths = [url_to_local_path(url, output_dir) for url in urls]
+    sniff_resources = make_resources(min(size, 100_000))
+    rule_filter = RuleFilter(
+        parse_rules(
+            [f"||ads{i}.example-{i % 97}.com^" for i in range(5_000)]
+            + [f"/banner-{i}/*.gif" for i in range(5_000)]
+        )
+    )
+    save_resources = make_resources(min(size, save_limit), seed=1)
+
+    def none() -> None:
+        clear_caches()
+
+    def run_sanitize(_: None) -> None:
+        for component in components:
+            sanitize_path_component(component)
+
+    def run_local_path(mode: str) -> Callable[[None], None]:
+        def run(_: None) -> None:
+            for url in urls:
+                url_to_local_path(url, output_dir, mode)
+
+        return run
+
+    def run_infer(_: None) -> None:
+        for path in paths:
+            infer_extension(str(path), "text/html")
+
+    def run_infer_sniffed(_: None) -> None:
+        for resource in sniff_resources:
+            infer_extension("/a/b/item", resource.content_type, resource.body)
+
+    def run_same_origin(_: None) -> None:
+        for url in urls:
+            is_same_origin(url, BASE_URL)
+
+    def run_classifier(_: None) -> None:
+        classifier = UrlClassifier(BASE_URL)
+        for url in urls:
+            classifier.is_same_origin(url)
+
+    def setup_rules() -> None:
+        clear_caches()
+        rule_filter._decide.cache_clear()
+
+    def run_rules(_: None) -> None:
+        for url in urls:
+            rule_filter.should_request(url, "image")
+
+    def run_dedup(deduplicator: PathDeduplicator) -> None:
+        for path in paths:
+            deduplicator.get_unique_path(path)
+
+    def setup_dedup() -> PathDeduplicator:
+        clear_caches()
+        return PathDeduplicator()
+
+    def setup_save() -> tuple[ResourceSaver, Path]:
+        clear_caches()
+        directory = Path(tempfile.mkdtemp(prefix="webgrab-bench-"))
+        return ResourceSaver(SaveConfig(directory, BASE_URL, include_external=True)), directory
+
+    def run_save(state: tuple[ResourceSaver, Path]) -> None:
+        result = state[0].save_resources(save_resources)
+        if result.failed_saves:
+            raise RuntimeError(f"save failed: {result.failed_saves[0]}")
+
+    def teardown_save(state: tuple[ResourceSaver, Path]) -> None:
+        state[0].close()
+        shutil.rmtree(state[1], ignore_errors=True)
+
+    return [
+        Case("sanitize_path_component", len(components), none, run_sanitize),
+        Case("url_to_local_path", len(urls), none, run_local_path("ignore")),
+        Case("url_to_local_path[hash]", len(urls), none, run_local_path("hash")),
+        Case("infer_extension", len(paths), none, run_infer),
+        Case("infer_extension[sniff]", len(sniff_resources), none, run_infer_sniffed),
+        Case("is_same_origin", len(urls), none, run_same_origin),
+        Case("UrlClassifier.is_same_origin", len(urls), none, run_classifier),
+        Case("RuleFilter.should_request[10k rules]", len(urls), setup_rules, run_rules),
+        Case("PathDeduplicator.get_unique_path", len(paths), setup_dedup, run_dedup),
+        Case(
+            "ResourceSaver.save_resources",
+            len(save_resources),
+            setup_save,
+            run_save,
+            teardown_save,
+        ),
+    ]
+
+
+def time_case(case: Case, repeats: int) -> dict[str, Any]:
+    """Time a case several times.
+
+    Args:
+        case: Case to run.
+        repeats: Number of timed runs.
+
+    Returns:
+        Result record with per-operation timings in nanoseconds.
+    """
+    samples = []
+    for _ in range(repeats):
+        state = case.setup()
+        try:
+            start = time.perf_counter_ns()
+            case.run(state)
+            samples.append((time.perf_counter_ns() - start) / case.ops)
+        finally:
+            case.teardown(state)
+    # The fastest repeat is the headline figure, as with timeit: slower
+    # repeats measure interference from the rest of the machine
+    return {
+        "ops": case.ops,
+        "repeats": repeats,
+        "ns_per_op": min(samples),
+        "median_ns_per_op": statistics.median(samples),
+        "max_ns_per_op": max(samples),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the suite and write the results."""
+    cases = build_cases(args.size, args.save_limit)
+    if args.only:
+        cases = [case for case in cases if any(part in case.name for part in args.only)]
+    results: dict[str, Any] = {}
+    for case in cases:
+        results[case.name] = record = time_case(case, args.repeats)
+        print(f"{case.name:<38} {record['ns_per_op']:>12.0f} ns/op  ({case.ops} ops)")
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "webgrab": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "size": args.size,
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"wrote {args.output}")
+    return 0
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[tuple[str, float | None, float | None, str]]:
+    """Compare two result files case by case.
+
+    Args:
+        baseline: Saved baseline report.
+        current: New report.
+        threshold: Relative slowdown that counts as a regression.
+
+    Returns:
+        ``(case, baseline ns/op, current ns/op, verdict)`` rows, where the
+        verdict is ``ok``, ``faster``, ``REGRESSION``, ``new`` or ``missing``.
+    """
+    rows = []
+    old, new = baseline["results"], current["results"]
+    for name in sorted(old.keys() | new.keys()):
+        if name not in new:
+            rows.append((name, old[name]["ns_per_op"], None, "missing"))
+            continue
+        if name not in old:
+            rows.append((name, None, new[name]["ns_per_op"], "new"))
+            continue
+        before, after = old[name]["ns_per_op"], new[name]["ns_per_op"]
+        if after > before * (1 + threshold):
+            verdict = "REGRESSION"
+        elif after < before * (1 - threshold):
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, before, after, verdict))
+    return rows
+
+
+def _ns(value: float | None) -> str:
+    """Format a timing for the comparison table."""
+    return "-" if value is None else f"{value:.0f}ns"
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Print a comparison and fail on regressions."""
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    if baseline.get("size") != current.get("size"):
+        print(f"note: corpus sizes differ ({baseline.get('size')} vs {current.get('size')})")
+
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"{'case':<38} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, before, after, verdict in rows:
+        change = f"{(after / before - 1) * 100:+7.1f}%" if before and after else ""
+        print(f"{name:<38} {_ns(before):>12} {_ns(after):>12} {change:>8}  {verdict}")
+    regressions = [row[0] for row in rows if row[3] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite")
+    run_parser.add_argument("--size", type=int, default=10_000, help="Corpus size (10k to 1M)")
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--save-limit", type=int, default=DEFAULT_SAVE_LIMIT)
+    run_parser.add_argument("--only", nargs="+", help="Run cases whose name contains any of these")
+    run_parser.add_argument("-o", "--output", type=Path, help="Write results as JSON")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare results with a baseline")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
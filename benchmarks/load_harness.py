@@ -0,0 +1,419 @@
+"""End-to-end capture throughput against a local synthetic site.
+
+Usage:
+    python benchmarks/load_harness.py --pages 50 --resources 40
+    python benchmarks/load_harness.py --engine http --latency-ms 20 \\
+        --redirect-rate 0.1 --error-rate 0.05 -o load.json
+
+A throwaway HTTP server (``ThreadingHTTPServer`` in a child process, so it
+does not compete with the capture for the GIL) generates pages that each
+reference ``--resources`` scripts, stylesheets, images and fonts. Body
+sizes follow a log-normal distribution around ``--median-size``; every
+response is delayed by ``--latency-ms`` plus up to ``--jitter-ms``, and a
+share of subresources answers with a redirect or an error. The site is
+derived from ``--seed``, so two runs serve exactly the same bytes.
+
+Each page goes through ``capture_page_resources`` and a
+``ResourceSaver``, and the run reports pages/s, resources/s, MB/s, peak
+RSS of this process and where the time went: the engine's phases and
+per-resource work from ``CaptureStats.metrics``, plus the save. The
+browser's own processes are not included in the RSS figure. The browser
+engine requires ``playwright install chromium``.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from webgrab import __version__
+from webgrab.capture.engine import capture_page_resources
+from webgrab.config import create_capture_config, create_save_config
+from webgrab.models import CaptureStats
+from webgrab.storage.saver import ResourceSaver
+
+RESULTS_VERSION = 1
+
+# Extension, Content-Type, the tag that loads it, and the leading bytes
+ASSET_KINDS = (
+    (".js", "application/javascript", '<script src="{}"></script>', b"(function(){"),
+    (".css", "text/css", '<link rel="stylesheet" href="{}">', b"body{margin:0}"),
+    (".png", "image/png", '<img src="{}" alt="">', b"\x89PNG\r\n\x1a\n"),
+    (".jpg", "image/jpeg", '<img src="{}" alt="">', b"\xff\xd8\xff\xe0"),
+    (
+        ".woff2",
+        "font/woff2",
+        '<link rel="preload" as="font" href="{}" crossorigin>',
+        b"wOF2\x00\x01\x00\x00",
+    ),
+)
+
+@dataclass
+class SiteSpec:
+    """Shape of the synthetic site."""
+
+    pages: int = 20
+    resources: int = 30
+    median_size: int = 16 * 1024
+    size_sigma: float = 1.2
+    max_size: int = 4 * 1024 * 1024
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    redirect_rate: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class SiteResponse:
+    """What the server sends for one path."""
+
+    status: int
+    content_type: str = ""
+    head: bytes = b""
+    size: int = 0
+    location: str = ""
+    delay: float = 0.0
+
+
+class SyntheticSite:
+    """Deterministic pages and subresources generated from a ``SiteSpec``."""
+
+    def __init__(self, spec: SiteSpec) -> None:
+        """Initialize the site.
+
+        Args:
+            spec: Site shape.
+        """
+        self.spec = spec
+
+    def page_path(self, page: int) -> str:
+        """Path of a page."""
+        return f"/p/{page}.html"
+
+    def _asset(self, page: int, index: int) -> tuple[str, tuple[str, str, str, bytes]]:
+        """Path and kind of one subresource of a page."""
+        kind = ASSET_KINDS[(page + index) % len(ASSET_KINDS)]
+        return f"/r/{page}/{index}{kind[0]}", kind
+
+    def _rng(self, path: str) -> random.Random:
+        """Random source for a path, stable across runs and processes."""
+        return random.Random(f"{self.spec.seed}:{path}")
+
+    def _delay(self, rng: random.Random) -> float:
+        """Response delay in seconds."""
+        return (self.spec.latency_ms + rng.random() * self.spec.jitter_ms) / 1000
+
+    def _size(self, rng: random.Random) -> int:
+        """Body size drawn from the log-normal distribution."""
+        size = rng.lognormvariate(math.log(self.spec.median_size), self.spec.size_sigma)
+        return max(64, min(int(size), self.spec.max_size))
+
+    def page_html(self, page: int) -> bytes:
+        """HTML of a page, referencing all its subresources."""
+        tags = [
+            kind[2].format(path)
+            for path, kind in (self._asset(page, i) for i in range(self.spec.resources))
+        ]
+        return (
+            "<!doctype html><html><head><meta charset=\"utf-8\">"
+            f"<title>Page {page}</title></head><body>\n"
+            + "\n".join(tags)
+            + "\n</body></html>\n"
+        ).encode()
+
+    def respond(self, path: str) -> SiteResponse:
+        """Decide the response for a path.
+
+        Args:
+            path: Request path without the query string.
+
+        Returns:
+            Response description; bodies are ``head`` padded to ``size``.
+        """
+        rng = self._rng(path)
+        delay = self._delay(rng)
+        parts = path.strip("/").split("/")
+        if parts[0] == "p" and len(parts) == 2 and parts[1].endswith(".html"):
+            page = int(parts[1][: -len(".html")])
+            html = self.page_html(page)
+            return SiteResponse(200, "text/html; charset=utf-8", html, len(html), delay=delay)
+        if parts[0] in ("r", "o") and len(parts) == 3:
+            ext = "." + parts[2].rpartition(".")[2]
+            kind = next((k for k in ASSET_KINDS if k[0] == ext), None)
+            if kind is not None:
+                # Redirect targets always answer, so a redirect never errors
+                if parts[0] == "r":
+                    roll = rng.random()
+                    if roll < self.spec.error_rate:
+                        status = 500 if rng.random() < 0.5 else 404
+                        return SiteResponse(status, "text/plain", b"error", 5, delay=delay)
+                    if roll < self.spec.error_rate + self.spec.redirect_rate:
+                        location = "/o/" + "/".join(parts[1:])
+                        return SiteResponse(302, location=location, delay=delay)
+                return SiteResponse(200, kind[1], kind[3], self._size(rng), delay=delay)
+        return SiteResponse(404, "text/plain", b"not found", 9, delay=delay)
+
+
+def make_handler(site: SyntheticSite) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler class serving a synthetic site."""
+    padding = memoryview(random.Random(site.spec.seed).randbytes(site.spec.max_size))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            reply = site.respond(self.path.partition("?")[0])
+            if reply.delay:
+                time.sleep(reply.delay)
+            self.send_response(reply.status)
+            if reply.location:
+                self.send_header("Location", reply.location)
+            if reply.content_type:
+                self.send_header("Content-Type", reply.content_type)
+            self.send_header("Content-Length", str(reply.size))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(reply.head[: reply.size])
+            if reply.size > len(reply.head):
+                self.wfile.write(padding[: reply.size - len(reply.head)])
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def serve(spec: SiteSpec, ports: Any) -> None:
+    """Serve a synthetic site forever; runs in the child process."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(SyntheticSite(spec)))
+    server.daemon_threads = True
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(spec: SiteSpec) -> tuple[multiprocessing.Process, str]:
+    """Start the site server in a child process.
+
+    Args:
+        spec: Site shape.
+
+    Returns:
+        The server process and the site's base URL.
+    """
+    ports: Any = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(spec, ports), daemon=True)
+    process.start()
+    port = ports.get(timeout=10)
+    return process, f"http://127.0.0.1:{port}"
+
+
+@dataclass
+class Totals:
+    """Counters accumulated over the run."""
+
+    pages: int = 0
+    failed_pages: int = 0
+    saved_files: int = 0
+    stats: CaptureStats = field(default_factory=CaptureStats)
+
+
+async def capture_page(
+    url: str,
+    base_url: str,
+    output_dir: Path,
+    args: argparse.Namespace,
+    totals: Totals,
+) -> None:
+    """Capture and save one page, adding its counters and phases to ``totals``."""
+    config = create_capture_config(
+        url,
+        timeout=args.timeout * 1000,
+        body_fetch_concurrency=args.body_concurrency,
+        wait_strategy=args.wait_strategy,
+        idle_ms=args.idle_ms,
+        engine=args.engine,
+    )
+    try:
+        resources, stats = await capture_page_resources(config)
+    except Exception as e:
+        totals.failed_pages += 1
+        print(f"  {url}: {e}", file=sys.stderr)
+        return
+    with (
+        ResourceSaver(create_save_config(output_dir, base_url)) as saver,
+        stats.metrics.phase("save"),
+    ):
+        result = await asyncio.to_thread(saver.save_resources, resources)
+
+    totals.pages += 1
+    totals.saved_files += result.saved_count
+    totals.stats.merge(stats)
+
+
+async def run_pages(
+    base_url: str, spec: SiteSpec, output_dir: Path, args: argparse.Namespace
+) -> tuple[Totals, float]:
+    """Capture every page, ``--concurrency`` at a time.
+
+    Returns:
+        Totals and the wall-clock duration in seconds.
+    """
+    site = SyntheticSite(spec)
+    totals = Totals()
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def one(page: int) -> None:
+        async with slots:
+            await capture_page(
+                base_url + site.page_path(page), base_url + "/", output_dir, args, totals
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(page) for page in range(spec.pages)))
+    return totals, time.perf_counter() - start
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def build_report(
+    spec: SiteSpec, args: argparse.Namespace, totals: Totals, elapsed: float
+) -> dict[str, Any]:
+    """Assemble the machine-readable result of a run."""
+    stats = totals.stats
+    phases = stats.metrics.phases
+    phase_total = sum(phases.values()) or 1.0
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "webgrab": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": args.engine,
+        "concurrency": args.concurrency,
+        "site": asdict(spec),
+        "elapsed_seconds": elapsed,
+        "pages": totals.pages,
+        "failed_pages": totals.failed_pages,
+        "resources": stats.successful_captures,
+        "failed_resources": stats.failed_captures,
+        "skipped_resources": stats.skipped_urls,
+        "saved_files": totals.saved_files,
+        "bytes": stats.total_bytes,
+        "pages_per_second": totals.pages / elapsed,
+        "resources_per_second": stats.successful_captures / elapsed,
+        "mb_per_second": stats.total_bytes / elapsed / 1e6,
+        "peak_rss_bytes": peak_rss_bytes(),
+        # Summed over pages, so with concurrency these exceed elapsed time
+        "phases": {
+            phase: {"seconds": seconds, "share": seconds / phase_total}
+            for phase, seconds in sorted(phases.items(), key=lambda item: -item[1])
+        },
+        # Summed over resources, which overlap within a page
+        "resource_seconds": stats.metrics.resource_seconds(),
+    }
+
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print a run's results."""
+    print(
+        f"{report['pages']} pages ({report['failed_pages']} failed), "
+        f"{report['resources']} resources ({report['failed_resources']} failed, "
+        f"{report['skipped_resources']} skipped), {report['bytes'] / 1e6:.1f} MB "
+        f"in {report['elapsed_seconds']:.2f}s"
+    )
+    print(f"  pages/s      {report['pages_per_second']:>10.2f}")
+    print(f"  resources/s  {report['resources_per_second']:>10.1f}")
+    print(f"  MB/s         {report['mb_per_second']:>10.2f}")
+    print(f"  peak RSS     {report['peak_rss_bytes'] / 2**20:>10.1f} MiB")
+    print("  phases (summed over pages):")
+    for phase, record in report["phases"].items():
+        print(f"    {phase:<12} {record['seconds']:>9.2f}s {record['share']:>6.1%}")
+    print("  per-resource work (summed over resources):")
+    for work, seconds in report["resource_seconds"].items():
+        print(f"    {work:<12} {seconds:>9.2f}s")
+
+
+def positive_rate(text: str) -> float:
+    """Parse a probability argument."""
+    value = float(text)
+    if not 0.0 <= value <= 1.0:
+        raise argparse.ArgumentTypeError("must be between 0 and 1")
+    return value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", choices=["browser", "http"], default="browser")
+    parser.add_argument("--pages", type=int, default=SiteSpec.pages)
+    parser.add_argument("--resources", type=int, default=SiteSpec.resources)
+    parser.add_argument("--median-size", type=int, default=SiteSpec.median_size)
+    parser.add_argument("--size-sigma", type=float, default=SiteSpec.size_sigma)
+    parser.add_argument("--max-size", type=int, default=SiteSpec.max_size)
+    parser.add_argument("--latency-ms", type=float, default=SiteSpec.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=SiteSpec.jitter_ms)
+    parser.add_argument("--redirect-rate", type=positive_rate, default=SiteSpec.redirect_rate)
+    parser.add_argument("--error-rate", type=positive_rate, default=SiteSpec.error_rate)
+    parser.add_argument("--seed", type=int, default=SiteSpec.seed)
+    parser.add_argument("--concurrency", type=int, default=1, help="Pages captured at once")
+    parser.add_argument("--body-concurrency", type=int, default=8)
+    parser.add_argument(
+        "--wait-strategy", choices=["networkidle", "adaptive"], default="networkidle"
+    )
+    parser.add_argument("--idle-ms", type=int, default=500)
+    parser.add_argument("--timeout", type=int, default=60, help="Page timeout in seconds")
+    parser.add_argument("--output-dir", type=Path, help="Keep saved files here")
+    parser.add_argument("-o", "--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+    if args.redirect_rate + args.error_rate > 1:
+        parser.error("--redirect-rate and --error-rate add up to more than 1")
+
+    spec = SiteSpec(
+        pages=args.pages,
+        resources=args.resources,
+        median_size=args.median_size,
+        size_sigma=args.size_sigma,
+        max_size=args.max_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        redirect_rate=args.redirect_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    server, base_url = start_server(spec)
+    output_dir = args.output_dir or Path(tempfile.mkdtemp(prefix="webgrab-load-"))
+    try:
+        totals, elapsed = asyncio.run(run_pages(base_url, spec, output_dir, args))
+    finally:
+        server.terminate()
+        if args.output_dir is None:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    report = build_report(spec, args, totals, elapsed)
+    print_report(report)
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"wrote {args.output}")
+    return 1 if totals.failed_pages else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
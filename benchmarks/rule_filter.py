@@ -0,0 +1,81 @@
+"""Show that rule matching cost stays flat as the rule set grows.
+
+Usage:
+    python benchmarks/rule_filter.py --urls 20000
+
+Synthetic EasyList-style lists of increasing size (half host rules, half
+URL patterns) are compiled, then the same URLs are checked against each.
+The baseline is a linear scan of the same patterns, which is what a list
+of per-rule filter objects amounts to.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from webgrab.capture.rules import RuleFilter, parse_rules, pattern_regex
+
+WORDS = ["ad", "banner", "track", "pixel", "promo", "sponsor", "beacon", "stats", "cdn", "img"]
+
+
+def make_rules(count: int, rng: random.Random) -> list[str]:
+    """Build ``count`` host and URL-pattern rules."""
+    rules = []
+    for i in range(count):
+        word = rng.choice(WORDS)
+        if i % 2:
+            rules.append(f"||{word}{i}.example-{i % 97}.com^")
+        else:
+            rules.append(f"/{word}-{i}/*.{rng.choice(['js', 'gif', 'png'])}")
+    return rules
+
+
+def make_urls(count: int, rng: random.Random) -> list[str]:
+    """Build URLs, a few of which hit a rule."""
+    urls = []
+    for i in range(count):
+        word = rng.choice(WORDS)
+        host = f"{word}{rng.randrange(100000)}.example-{rng.randrange(97)}.com"
+        urls.append(f"https://{host}/{word}-{rng.randrange(100000)}/asset{i}.js?v={i}")
+    return urls
+
+
+def time_per_url(check, urls: list[str]) -> float:
+    """Return the mean cost of one check, in microseconds."""
+    start = time.perf_counter()
+    for url in urls:
+        check(url)
+    return (time.perf_counter() - start) / len(urls) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--urls", type=int, default=20_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    urls = make_urls(args.urls, rng)
+    print(f"{'rules':>8} {'compile':>10} {'compiled':>12} {'linear scan':>14}")
+    for size in args.sizes:
+        lines = make_rules(size, rng)
+        start = time.perf_counter()
+        rule_filter = RuleFilter(parse_rules(lines))
+        compile_s = time.perf_counter() - start
+        compiled = time_per_url(lambda url: rule_filter.should_request(url, "script"), urls)
+
+        # Linear scan over a sample, extrapolated; it gets slow quickly
+        regexes = [
+            re.compile(re.escape(line[2:-1])) if line.startswith("||") else pattern_regex(line)
+            for line in lines
+        ]
+        sample = urls[: max(1, min(len(urls), 2_000_000 // size))]
+        linear = time_per_url(lambda url: any(r.search(url) for r in regexes), sample)
+        print(f"{size:>8} {compile_s:>9.2f}s {compiled:>10.1f}us {linear:>12.1f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Compare per-call URL parsing with the cached URL classifier.
+
+Usage:
+    python benchmarks/url_classifier.py --urls 100000
+
+Every URL passes through the stages that classify a captured resource:
+the request filter, the response filters and the saver's origin check.
+The baseline re-parses the URL and the base URL at each stage, as the
+pipeline did before ``UrlClassifier``. The URL to path mapping that follows
+is timed on its own for scale.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from webgrab.storage.path_resolver import url_to_local_path
+from webgrab.url.classifier import UrlClassifier, is_skipped, parse_cached, url_origin
+
+BASE_URL = "https://example.com/"
+
+HOSTS = ["example.com", "cdn.example.com", "fonts.gstatic.com", "example.com:443"]
+
+
+def make_urls(count: int, seed: int = 0) -> list[str]:
+    """Build a synthetic mix of same-origin, external and data URLs."""
+    rng = random.Random(seed)
+    urls = []
+    for i in range(count):
+        if i % 50 == 0:
+            urls.append(f"data:image/png;base64,{i:08x}")
+            continue
+        host = rng.choice(HOSTS)
+        depth = "/".join(f"d{rng.randrange(20)}" for _ in range(rng.randrange(1, 4)))
+        urls.append(f"https://{host}/{depth}/asset{i}.{rng.choice(['js', 'css', 'png'])}?v={i % 7}")
+    return urls
+
+
+def legacy_pipeline(urls: list[str]) -> int:
+    """Classify each URL with a fresh parse of both URLs at every stage."""
+
+    def skip(url: str) -> bool:
+        prefixes = ("data:", "blob:", "about:", "javascript:", "chrome:", "chrome-extension:")
+        return url.startswith(prefixes)
+
+    def same_origin(url: str) -> bool:
+        return urlparse(url).netloc == urlparse(BASE_URL).netloc
+
+    kept = 0
+    for url in urls:
+        # Request filter, response filters, then the saver's own check
+        if same_origin(url) and not skip(url) and same_origin(url) and same_origin(url):
+            kept += 1
+    return kept
+
+
+def classifier_pipeline(urls: list[str]) -> int:
+    """Classify each URL through one classifier and the origin cache."""
+    classifier = UrlClassifier(BASE_URL)
+    kept = 0
+    for url in urls:
+        if (
+            classifier.is_same_origin(url)
+            and not is_skipped(url)
+            and classifier.is_same_origin(url)
+            and classifier.is_same_origin(url)
+        ):
+            kept += 1
+    return kept
+
+
+def resolve_paths(urls: list[str], output_dir: Path) -> None:
+    """Map every URL to its local path, as the saver does."""
+    for url in urls:
+        url_to_local_path(url, output_dir)
+
+
+def best_of(runs: int, func, *args) -> float:
+    """Return the fastest of several timed calls, in seconds."""
+    timings = []
+    for _ in range(runs):
+        parse_cached.cache_clear()
+        url_origin.cache_clear()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--urls", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    urls = make_urls(args.urls)
+    legacy = best_of(args.runs, legacy_pipeline, urls)
+    cached = best_of(args.runs, classifier_pipeline, urls)
+    resolver = best_of(args.runs, resolve_paths, urls, Path("/tmp/webgrab-bench"))
+
+    kept = classifier_pipeline(urls)
+    print(f"{len(urls)} URLs, {kept} same-origin (per-call parsing kept {legacy_pipeline(urls)})")
+    print(f"per-call parsing  {legacy * 1000:8.1f} ms")
+    print(f"url classifier    {cached * 1000:8.1f} ms  ({legacy / cached:.1f}x)")
+    print(f"path resolution   {resolver * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Resource bodies that spill to disk above a size threshold."""
+
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import weakref
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import cache
+from pathlib import Path
+from typing import BinaryIO
+
+
+def _remove_file(path: str) -> None:
+    """Delete a file if it still exists.
+
+    Args:
+        path: File to delete.
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+@cache
+def default_file_mode() -> int:
+    """Permissions a file created with ``open`` gets under the process umask.
+
+    ``tempfile.mkstemp`` creates owner-only files; a temporary file moved
+    into the output tree is given this mode instead. The umask is read
+    once, from ``/proc`` where available, since setting it to read it back
+    briefly affects every thread.
+
+    Returns:
+        ``0o666`` with the umask bits cleared.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class SpilledBody:
+    """A response body kept in a temporary file instead of memory.
+
+    The temporary file is deleted when the body is garbage collected,
+    unless it has been moved into place with ``persist``.
+    """
+
+    def __init__(self, path: Path, size: int) -> None:
+        """Wrap an existing temporary file.
+
+        Args:
+            path: Temporary file holding the body.
+            size: Body size in bytes.
+        """
+        self.path = path
+        self.size = size
+        self._finalizer = weakref.finalize(self, _remove_file, str(path))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, directory: Path | None = None) -> "SpilledBody":
+        """Write bytes to a new temporary file.
+
+        Args:
+            data: Body content.
+            directory: Directory for the temporary file; the system temp
+                directory if None.
+
+        Returns:
+            SpilledBody backed by the new file.
+        """
+        fd, name = tempfile.mkstemp(prefix="webgrab-", suffix=".body", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return cls(Path(name), len(data))
+
+    def __len__(self) -> int:
+        """Size of the body in bytes."""
+        return self.size
+
+    def __repr__(self) -> str:
+        """Short representation that does not read the file."""
+        return f"SpilledBody(path={str(self.path)!r}, size={self.size})"
+
+    def open(self) -> BinaryIO:
+        """Open the body for reading.
+
+        Returns:
+            Binary file handle positioned at the start.
+        """
+        return open(self.path, "rb")
+
+    @contextmanager
+    def view(self) -> Iterator[memoryview]:
+        """Map the body into memory without reading it.
+
+        Yields:
+            Read-only memoryview, valid until the context exits.
+        """
+        if self.size == 0:
+            yield memoryview(b"")
+            return
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+    def read_bytes(self) -> bytes:
+        """Read the whole body into memory.
+
+        Returns:
+            Body content.
+        """
+        return self.path.read_bytes()
+
+    def persist(self, destination: Path) -> None:
+        """Move the body file to its final location.
+
+        Uses a rename when possible and falls back to a copy across
+        filesystems. The file gets the permissions of a newly created one
+        rather than the owner-only mode of a temporary file. Afterwards the
+        body refers to ``destination``, which is no longer deleted on
+        garbage collection.
+
+        Args:
+            destination: Final file path; replaced if it exists.
+        """
+        os.chmod(self.path, default_file_mode())
+        try:
+            os.replace(self.path, destination)
+        except OSError:
+            shutil.copyfile(self.path, destination)
+            _remove_file(str(self.path))
+        self._finalizer.detach()
+        self.path = destination
+
+    def discard(self) -> None:
+        """Delete the temporary file now instead of at garbage collection."""
+        self._finalizer()
+
+
+Body = bytes | SpilledBody
+
+
+def spill_if_large(data: bytes, threshold: int | None, directory: Path | None = None) -> Body:
+    """Move a body to a temporary file if it exceeds a size threshold.
+
+    Args:
+        data: Body content.
+        threshold: Size in bytes above which to spill; None never spills.
+        directory: Directory for temporary files.
+
+    Returns:
+        ``data`` unchanged, or a SpilledBody.
+    """
+    if threshold is None or len(data) <= threshold:
+        return data
+    return SpilledBody.from_bytes(data, directory)
+
+
+def open_body(body: Body) -> BinaryIO:
+    """Open any body as a binary file handle.
+
+    Args:
+        body: In-memory or spilled body.
+
+    Returns:
+        Binary file handle positioned at the start.
+    """
+    if isinstance(body, SpilledBody):
+        return body.open()
+    return io.BytesIO(body)
+
+
+def body_head(body: Body, size: int) -> bytes:
+    """Read the start of any body.
+
+    Only ``size`` bytes are copied or read, however large the body is.
+
+    Args:
+        body: In-memory or spilled body.
+        size: Maximum number of bytes to return.
+
+    Returns:
+        The first ``size`` bytes of the body.
+    """
+    if isinstance(body, SpilledBody):
+        with body.open() as f:
+            return f.read(size)
+    return body[:size]
+
+
+@contextmanager
+def body_view(body: Body) -> Iterator[memoryview]:
+    """View any body as a memoryview without copying it.
+
+    Args:
+        body: In-memory or spilled body.
+
+    Yields:
+        Read-only memoryview of the body.
+    """
+    if isinstance(body, SpilledBody):
+        with body.view() as view:
+            yield view
+    else:
+        yield memoryview(body)
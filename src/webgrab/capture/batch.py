@@ -0,0 +1,166 @@
+"""Batch capture of many pages over one shared browser."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from ..config import create_capture_config, create_save_config
+from ..models import BatchConfig, BatchResult, CaptureConfig
+from ..storage.path_resolver import url_to_directory_name
+from .browser import BrowserPool
+from .engine import CaptureEngine
+from .filters import ResourceFilter
+
+
+class BatchCaptureEngine:
+    """Captures many URLs concurrently over a single browser.
+
+    One browser is launched for the whole batch and ``concurrency`` contexts
+    are shared between pages. Each page's resources are streamed to disk
+    by its own ``ResourceSaver`` in a per-page subdirectory of the output
+    directory.
+    """
+
+    def __init__(
+        self,
+        config: BatchConfig,
+        resource_filter: ResourceFilter | None = None,
+        on_status: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize batch capture engine.
+
+        Args:
+            config: Batch configuration.
+            resource_filter: Optional custom resource filter for every page.
+            on_status: Optional callback for status updates.
+        """
+        self.config = config
+        self.filter = resource_filter
+        self.on_status = on_status
+        self._dir_names: dict[str, int] = {}
+        self._completed = 0
+
+    def _update_status(self, message: str) -> None:
+        """Send status update if callback is set.
+
+        Args:
+            message: Status message.
+        """
+        if self.on_status:
+            self.on_status(message)
+
+    def _capture_config(self, url: str) -> CaptureConfig:
+        """Build the capture configuration for one page.
+
+        Args:
+            url: Page URL.
+
+        Returns:
+            CaptureConfig instance.
+        """
+        return create_capture_config(
+            url,
+            wait_time=self.config.wait_time,
+            timeout=self.config.timeout,
+            headless=self.config.headless,
+            include_external=self.config.include_external,
+            wait_strategy=self.config.wait_strategy,
+        )
+
+    def _page_dir(self, url: str) -> Path:
+        """Pick a unique output subdirectory for a page.
+
+        Args:
+            url: Page URL.
+
+        Returns:
+            Directory under the batch output directory.
+        """
+        name = url_to_directory_name(url)
+        count = self._dir_names.get(name, 0)
+        self._dir_names[name] = count + 1
+        if count:
+            name = f"{name}_{count}"
+        return self.config.output_dir / name
+
+    async def _capture_page(
+        self, pool: BrowserPool, url: str, result: BatchResult
+    ) -> None:
+        """Capture one page and save its resources.
+
+        Args:
+            pool: Shared browser pool.
+            url: Page URL.
+            result: Batch result to record the outcome in.
+        """
+        page_dir = self._page_dir(url)
+        try:
+            save_config = create_save_config(
+                page_dir,
+                url,
+                include_external=self.config.include_external,
+                blob_store=self.config.blob_store,
+                format=self.config.format,
+                compress=self.config.compress,
+                compression=self.config.compression,
+                create_manifest=self.config.create_manifest,
+                incremental=self.config.incremental,
+                query_mode=self.config.query_mode,
+                rewrite_links=self.config.rewrite_links,
+            )
+            async with pool.acquire() as context:
+                engine = CaptureEngine(
+                    self._capture_config(url), self.filter, context=context
+                )
+                stats, save_result = await engine.capture_to_disk(save_config)
+        except Exception as e:  # noqa: BLE001 - one failed page must not end the batch
+            result.failed_pages.append((url, e))
+        else:
+            result.stats.merge(stats)
+            result.save_result.merge(save_result)
+            result.page_dirs[url] = page_dir
+        finally:
+            self._completed += 1
+            self._update_status(
+                f"Captured {self._completed}/{len(self.config.urls)} pages..."
+            )
+
+    async def capture_all(self) -> BatchResult:
+        """Capture every configured URL.
+
+        Returns:
+            Combined result for the batch.
+        """
+        start_time = time.time()
+        result = BatchResult()
+        self._completed = 0
+
+        self._update_status("Launching browser...")
+        pool_config = self._capture_config(self.config.urls[0])
+        async with BrowserPool(pool_config, self.config.concurrency) as pool:
+            await asyncio.gather(
+                *(self._capture_page(pool, url, result) for url in self.config.urls)
+            )
+
+        result.stats.duration_seconds = time.time() - start_time
+        return result
+
+
+async def capture_many(
+    config: BatchConfig,
+    resource_filter: ResourceFilter | None = None,
+    on_status: Callable[[str], None] | None = None,
+) -> BatchResult:
+    """Convenience function to capture many pages over one browser.
+
+    Args:
+        config: Batch configuration.
+        resource_filter: Optional custom resource filter.
+        on_status: Optional callback for status updates.
+
+    Returns:
+        Combined result for the batch.
+    """
+    engine = BatchCaptureEngine(config, resource_filter, on_status)
+    return await engine.capture_all()
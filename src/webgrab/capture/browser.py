@@ -1,44 +1,79 @@
 """Low-level Playwright browser operations."""
 
 import asyncio
-from typing import Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, Literal
 
-from playwright.async_api import Browser, BrowserContext, Page, Response, async_playwright
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Response,
+    Route,
+    async_playwright,
+)
 
 from ..errors import BrowserError, NavigationError
 from ..models import CaptureConfig
+from .settle import NetworkSettler
+
+
+def _context_options(config: CaptureConfig) -> dict[str, Any]:
+    """Build browser context options from a capture configuration.
+
+    Args:
+        config: Capture configuration.
+
+    Returns:
+        Keyword arguments for ``Browser.new_context``.
+    """
+    return {
+        "accept_downloads": True,
+        "bypass_csp": config.bypass_csp,
+        "user_agent": config.user_agent,
+        "viewport": {
+            "width": config.viewport_width,
+            "height": config.viewport_height,
+        },
+    }
 
 
 class BrowserManager:
-    """Manages Playwright browser lifecycle."""
+    """Manages Playwright browser lifecycle.
+
+    When given an existing context (e.g. from a ``BrowserPool``), only a
+    page is opened and closed; the context and browser are left to their
+    owner.
+    """
 
-    def __init__(self, config: CaptureConfig) -> None:
+    def __init__(
+        self, config: CaptureConfig, context: BrowserContext | None = None
+    ) -> None:
         """Initialize browser manager.
 
         Args:
             config: Capture configuration.
+            context: Optional shared browser context to open a page in.
         """
         self.config = config
         self.browser: Browser | None = None
-        self.context: BrowserContext | None = None
+        self.context: BrowserContext | None = context
         self.page: Page | None = None
+        self._owns_context = context is None
 
     async def __aenter__(self) -> "BrowserManager":
         """Launch browser and create context."""
         try:
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=self.config.headless
-            )
-            self.context = await self.browser.new_context(
-                accept_downloads=True,
-                bypass_csp=self.config.bypass_csp,
-                user_agent=self.config.user_agent,
-                viewport={
-                    "width": self.config.viewport_width,
-                    "height": self.config.viewport_height,
-                },
-            )
+            if self._owns_context:
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(
+                    headless=self.config.headless
+                )
+                self.context = await self.browser.new_context(
+                    **_context_options(self.config)
+                )
+            assert self.context is not None
             self.page = await self.context.new_page()
             return self
         except Exception as e:
@@ -53,6 +88,8 @@ class BrowserManager:
         """Close browser and clean up resources."""
         if self.page:
             await self.page.close()
+        if not self._owns_context:
+            return
         if self.context:
             await self.context.close()
         if self.browser:
@@ -79,13 +116,43 @@ class BrowserManager:
         if on_response:
             self.page.on("response", on_response)
 
+        # The adaptive strategy does its own settling after the DOM is ready
+        wait_until: Literal["domcontentloaded", "networkidle"] = (
+            "domcontentloaded" if self.config.wait_strategy == "adaptive" else "networkidle"
+        )
         try:
-            await self.page.goto(
-                url, wait_until="networkidle", timeout=self.config.timeout
-            )
+            await self.page.goto(url, wait_until=wait_until, timeout=self.config.timeout)
         except Exception as e:
             raise NavigationError(f"Failed to navigate to {url}: {e}") from e
 
+    async def route_requests(
+        self, handler: Callable[[Route], Awaitable[None]]
+    ) -> None:
+        """Intercept every request made by the page.
+
+        Args:
+            handler: Coroutine deciding whether to continue or abort a route.
+
+        Raises:
+            BrowserError: If the browser is not initialized.
+        """
+        if not self.page:
+            raise BrowserError("Browser not initialized")
+        await self.page.route("**/*", handler)
+
+    def watch_network(self, settler: NetworkSettler) -> None:
+        """Feed the page's request events to a network settler.
+
+        Args:
+            settler: Settler tracking in-flight requests.
+
+        Raises:
+            BrowserError: If the browser is not initialized.
+        """
+        if not self.page:
+            raise BrowserError("Browser not initialized")
+        settler.attach(self.page)
+
     async def wait_for_content(self, wait_time: int) -> None:
         """Wait for additional dynamic content.
 
@@ -94,3 +161,109 @@ class BrowserManager:
         """
         if wait_time > 0:
             await asyncio.sleep(wait_time)
+
+
+class BrowserPool:
+    """Shares one browser and a fixed pool of contexts across captures.
+
+    Launching Chromium dominates the cost of a single capture, so batch
+    and crawl modes launch it once and hand out pre-created contexts.
+    Each capture still gets a fresh page.
+
+    An isolated pool instead opens a new context for every borrower and
+    closes it afterwards, so no cookies or storage outlive a capture. The
+    browser itself stays warm; ``size`` then bounds the contexts open at
+    once.
+    """
+
+    def __init__(self, config: CaptureConfig, size: int, isolated: bool = False) -> None:
+        """Initialize the browser pool.
+
+        Args:
+            config: Capture configuration used for launch and context options.
+            size: Number of contexts to create.
+            isolated: Whether to give each borrower a new context.
+        """
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.config = config
+        self.size = size
+        self.isolated = isolated
+        self.browser: Browser | None = None
+        self.contexts: list[BrowserContext] = []
+        self._available: asyncio.Queue[BrowserContext] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+
+    async def __aenter__(self) -> "BrowserPool":
+        """Launch the browser and create the context pool."""
+        try:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.config.headless
+            )
+            for _ in range(0 if self.isolated else self.size):
+                context = await self.browser.new_context(
+                    **_context_options(self.config)
+                )
+                self.contexts.append(context)
+                self._available.put_nowait(context)
+            return self
+        except Exception as e:
+            await self.cleanup()
+            raise BrowserError(f"Failed to launch browser: {e}") from e
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Clean up browser resources."""
+        await self.cleanup()
+
+    async def cleanup(self) -> None:
+        """Close all contexts and the browser."""
+        for context in self.contexts:
+            await context.close()
+        self.contexts.clear()
+        if self.browser:
+            await self.browser.close()
+        if hasattr(self, "playwright"):
+            await self.playwright.stop()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[BrowserContext]:
+        """Borrow a context from the pool, waiting if all are in use.
+
+        Yields:
+            A browser context, returned to the pool with its cookies
+            cleared on exit, or closed on exit if the pool is isolated.
+        """
+        if self.isolated:
+            async with self._fresh_context() as context:
+                yield context
+            return
+
+        context = await self._available.get()
+        try:
+            yield context
+        finally:
+            try:
+                # Don't leak one site's session into the next capture
+                await context.clear_cookies()
+            finally:
+                self._available.put_nowait(context)
+
+    @asynccontextmanager
+    async def _fresh_context(self) -> AsyncIterator[BrowserContext]:
+        """Open a context on the warm browser for one borrower.
+
+        Yields:
+            A new browser context, closed on exit.
+
+        Raises:
+            BrowserError: If the pool has not been entered.
+        """
+        async with self._slots:
+            if not self.browser:
+                raise BrowserError("Browser not initialized")
+            context = await self.browser.new_context(**_context_options(self.config))
+            try:
+                yield context
+            finally:
+                await context.close()
@@ -0,0 +1,292 @@
+"""Same-origin site crawling over one shared browser."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from pathlib import PurePosixPath
+from urllib.parse import urldefrag
+
+from ..config import create_capture_config, create_save_config
+from ..mime.detector import CONTENT_TYPE_MAP
+from ..models import CaptureConfig, CrawlConfig, CrawlResult, Resource
+from ..storage.saver import create_saver
+from ..url.classifier import UrlClassifier, parse_cached
+from ..url.extractor import decode_document, extract_links
+from .browser import BrowserPool
+from .engine import CaptureEngine
+from .filters import ResourceFilter
+
+# Links ending in these extensions are assets or downloads, not pages
+NON_PAGE_EXTENSIONS = frozenset(CONTENT_TYPE_MAP.values()) - {".html", ".htm"}
+
+
+class CrawlFrontier:
+    """Deduplicated set of same-origin pages still to visit."""
+
+    def __init__(self, start_url: str, max_depth: int, max_pages: int) -> None:
+        """Initialize the frontier.
+
+        Args:
+            start_url: URL the crawl starts from; defines the origin.
+            max_depth: Maximum link depth from the start page.
+            max_pages: Maximum number of pages ever admitted.
+        """
+        self.start_url = start_url
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.classifier = UrlClassifier(start_url)
+        self._seen: set[str] = set()
+
+    @property
+    def admitted(self) -> int:
+        """Number of pages admitted so far."""
+        return len(self._seen)
+
+    def admit(self, url: str, depth: int) -> str | None:
+        """Decide whether a link should be crawled.
+
+        Args:
+            url: Absolute link URL.
+            depth: Depth the page would be visited at.
+
+        Returns:
+            Normalized URL to visit, or None if it is out of scope, a
+            duplicate, or over the depth or page limit.
+        """
+        url = urldefrag(url).url
+        if depth > self.max_depth or len(self._seen) >= self.max_pages:
+            return None
+        if url in self._seen or not self._in_scope(url):
+            return None
+        self._seen.add(url)
+        return url
+
+    def _in_scope(self, url: str) -> bool:
+        """Check whether a URL is a same-origin page.
+
+        Args:
+            url: Absolute URL without fragment.
+
+        Returns:
+            True if the URL should be visited.
+        """
+        if self.classifier.should_skip(url) or not self.classifier.is_same_origin(url):
+            return False
+        suffix = PurePosixPath(parse_cached(url).path).suffix.lower()
+        return suffix not in NON_PAGE_EXTENSIONS
+
+
+class SiteCrawler:
+    """Crawls a site breadth-first from a start page.
+
+    Pages are visited concurrently over ``concurrency`` contexts of a single
+    browser. Links found in every captured HTML document feed a
+    deduplicated same-origin frontier. All pages save into one output tree
+    through a shared saver, and assets shared between pages are
+    saved only the first time they are seen.
+    """
+
+    def __init__(
+        self,
+        config: CrawlConfig,
+        resource_filter: ResourceFilter | None = None,
+        on_status: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize the crawler.
+
+        Args:
+            config: Crawl configuration.
+            resource_filter: Optional custom resource filter for every page.
+            on_status: Optional callback for status updates.
+        """
+        self.config = config
+        self.filter = resource_filter
+        self.on_status = on_status
+        self.frontier = CrawlFrontier(
+            config.start_url, config.max_depth, config.max_pages
+        )
+        self.saver = create_saver(
+            create_save_config(
+                config.output_dir,
+                config.start_url,
+                include_external=config.include_external,
+                blob_store=config.blob_store,
+                format=config.format,
+                compress=config.compress,
+                compression=config.compression,
+                create_manifest=config.create_manifest,
+                incremental=config.incremental,
+                query_mode=config.query_mode,
+                rewrite_links=config.rewrite_links,
+            )
+        )
+        self._saved_urls: set[str] = set()
+        self._revalidation = self.saver.revalidation_headers()
+
+    def _update_status(self, message: str) -> None:
+        """Send status update if callback is set.
+
+        Args:
+            message: Status message.
+        """
+        if self.on_status:
+            self.on_status(message)
+
+    def _capture_config(self, url: str) -> CaptureConfig:
+        """Build the capture configuration for one page.
+
+        Args:
+            url: Page URL.
+
+        Returns:
+            CaptureConfig instance.
+        """
+        return create_capture_config(
+            url,
+            wait_time=self.config.wait_time,
+            timeout=self.config.timeout,
+            headless=self.config.headless,
+            include_external=self.config.include_external,
+            wait_strategy=self.config.wait_strategy,
+        )
+
+    async def _record(self, resource: Resource, result: CrawlResult) -> None:
+        """Save a resource unless an earlier page already saved it.
+
+        Waits while the saver has too many writes queued.
+
+        Args:
+            resource: Captured resource.
+            result: Crawl result to record the outcome in.
+        """
+        if resource.url in self._saved_urls:
+            result.duplicate_resources += 1
+            return
+        self._saved_urls.add(resource.url)
+        self.saver.record_resource(resource, result.save_result)
+        await self.saver.wait_for_capacity()
+
+    async def _crawl_page(
+        self,
+        pool: BrowserPool,
+        url: str,
+        depth: int,
+        queue: "asyncio.Queue[tuple[str, int]]",
+        result: CrawlResult,
+    ) -> None:
+        """Capture one page, save its resources and queue its links.
+
+        Args:
+            pool: Shared browser pool.
+            url: Page URL.
+            depth: Link depth of the page.
+            queue: Work queue to add newly discovered pages to.
+            result: Crawl result to record the outcome in.
+        """
+        links: list[str] = []
+
+        async def on_resource(resource: Resource) -> None:
+            # Read links first; a WARC saver discards spilled bodies
+            if depth < self.config.max_depth and "html" in resource.content_type:
+                with resource.open_body() as f:
+                    html = decode_document(f.read(), resource.content_type)
+                links.extend(extract_links(html, resource.url))
+            await self._record(resource, result)
+
+        try:
+            async with pool.acquire() as context:
+                engine = CaptureEngine(
+                    self._capture_config(url), self.filter, context=context
+                )
+                engine.revalidation = self._revalidation
+                stats = await engine.stream_resources(on_resource)
+        except Exception as e:  # noqa: BLE001 - one failed page must not end the crawl
+            result.failed_pages.append((url, e))
+            return
+
+        result.stats.merge(stats)
+        result.pages.append(url)
+        for link in links:
+            admitted = self.frontier.admit(link, depth + 1)
+            if admitted is not None:
+                queue.put_nowait((admitted, depth + 1))
+        self._update_status(
+            f"Crawled {len(result.pages) + len(result.failed_pages)}"
+            f"/{self.frontier.admitted} pages..."
+        )
+
+    async def _worker(
+        self,
+        pool: BrowserPool,
+        queue: "asyncio.Queue[tuple[str, int]]",
+        result: CrawlResult,
+    ) -> None:
+        """Visit queued pages until cancelled.
+
+        Args:
+            pool: Shared browser pool.
+            queue: Work queue of ``(url, depth)`` pairs.
+            result: Crawl result to record outcomes in.
+        """
+        while True:
+            url, depth = await queue.get()
+            try:
+                await self._crawl_page(pool, url, depth, queue, result)
+            finally:
+                queue.task_done()
+
+    async def crawl(self) -> CrawlResult:
+        """Crawl the site from the configured start page.
+
+        Returns:
+            Combined result for every visited page.
+        """
+        start_time = time.time()
+        result = CrawlResult()
+        queue: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+
+        try:
+            start_url = self.frontier.admit(self.config.start_url, 0)
+            if start_url is None:
+                return result
+            queue.put_nowait((start_url, 0))
+
+            self._update_status("Launching browser...")
+            pool_config = self._capture_config(self.config.start_url)
+            async with BrowserPool(pool_config, self.config.concurrency) as pool:
+                workers = [
+                    asyncio.create_task(self._worker(pool, queue, result))
+                    for _ in range(self.config.concurrency)
+                ]
+                try:
+                    await queue.join()
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            # The saver was opened in __init__, so close it however the crawl
+            # ends, including when the browser fails to launch
+            await asyncio.to_thread(self.saver.close, result.save_result)
+
+        result.stats.duration_seconds = time.time() - start_time
+        return result
+
+
+async def crawl_site(
+    config: CrawlConfig,
+    resource_filter: ResourceFilter | None = None,
+    on_status: Callable[[str], None] | None = None,
+) -> CrawlResult:
+    """Convenience function to crawl a site over one browser.
+
+    Args:
+        config: Crawl configuration.
+        resource_filter: Optional custom resource filter.
+        on_status: Optional callback for status updates.
+
+    Returns:
+        Combined result for the crawl.
+    """
+    crawler = SiteCrawler(config, resource_filter, on_status)
+    return await crawler.crawl()
@@ -4,12 +4,30 @@ import asyncio
 import time
 from typing import Callable
 
-from playwright.async_api import Response
+from playwright.async_api import BrowserContext, Route
+from playwright.async_api import Error as PlaywrightError
 
-from ..models import CaptureConfig, CaptureStats, Resource
+from ..models import (
+    CaptureConfig,
+    CaptureStats,
+    Resource,
+    ResourceCallback,
+    SaveConfig,
+    SaveResult,
+)
+from ..storage.saver import create_saver
 from .browser import BrowserManager
-from .filters import DefaultFilter, ResourceFilter
+from .filters import (
+    LEAF_RESOURCE_TYPES,
+    RequestFilter,
+    ResourceFilter,
+    can_block_requests,
+    create_default_filter,
+)
+from .http_engine import HttpCaptureEngine
+from .intake import ResponseIntake
 from .processor import ResourceProcessor
+from .settle import NetworkSettler
 
 
 class CaptureEngine:
@@ -20,6 +38,7 @@ class CaptureEngine:
         config: CaptureConfig,
         resource_filter: ResourceFilter | None = None,
         on_status: Callable[[str], None] | None = None,
+        context: BrowserContext | None = None,
     ) -> None:
         """Initialize capture engine.
 
@@ -27,12 +46,24 @@ class CaptureEngine:
             config: Capture configuration.
             resource_filter: Optional custom resource filter.
             on_status: Optional callback for status updates.
+            context: Optional shared browser context; a browser is launched
+                for this capture when omitted.
         """
         self.config = config
-        self.filter = resource_filter or DefaultFilter()
+        self.context = context
+        self.filter = resource_filter or create_default_filter(config)
         self.on_status = on_status
-        self.response_queue: asyncio.Queue[Response | None] = asyncio.Queue()
-        self.processor = ResourceProcessor(self.filter, on_status)
+        self.intake = ResponseIntake(config.response_queue_size, config.response_overflow)
+        self.processor = ResourceProcessor(
+            self.filter,
+            on_status,
+            concurrency=config.body_fetch_concurrency,
+            ordered=config.body_fetch_ordered,
+            spill_threshold=config.spill_threshold,
+            spill_dir=config.spill_dir,
+        )
+        # Conditional request headers by URL, sent for leaf resources
+        self.revalidation: dict[str, dict[str, str]] = {}
 
     def _update_status(self, message: str) -> None:
         """Send status update if callback is set.
@@ -49,42 +80,208 @@ class CaptureEngine:
         Returns:
             Tuple of (resources list, capture statistics).
         """
-        start_time = time.time()
         resources: list[Resource] = []
+        stats = await self.stream_resources(resources.append)
+        return resources, stats
 
-        self._update_status("Launching browser...")
+    async def stream_resources(self, on_resource: ResourceCallback) -> CaptureStats:
+        """Capture resources, handing each one off as soon as it is fetched.
 
-        async with BrowserManager(self.config) as browser:
+        Responses are processed while the page is still loading, and the
+        engine keeps no reference to a resource once ``on_resource``
+        returns, so memory use is bounded by the bodies in flight rather
+        than the total size of the page.
 
-            def on_response(response: Response) -> None:
-                """Callback for browser responses."""
-                # Put response in queue for processing
-                asyncio.create_task(self.response_queue.put(response))
+        Args:
+            on_resource: Callback receiving each captured resource; an
+                awaitable it returns is awaited before the next hand-off.
 
-            self._update_status(f"Navigating to {self.config.url}...")
-            await browser.navigate(self.config.url, on_response)
+        Returns:
+            Capture statistics.
+        """
+        start_time = time.time()
+        metrics = self.processor.stats.metrics
 
-            # Wait for additional content if configured
-            if self.config.wait_time > 0:
-                self._update_status(
-                    f"Waiting {self.config.wait_time}s for additional content..."
-                )
-                await browser.wait_for_content(self.config.wait_time)
+        if self.context is None:
+            self._update_status("Launching browser...")
+
+        launch_start = time.perf_counter()
+        async with BrowserManager(self.config, self.context) as browser:
+            metrics.add_phase("launch", time.perf_counter() - launch_start)
+            consumer = asyncio.create_task(self._consume_responses(on_resource))
+            try:
+                if can_block_requests(self.filter) or self.revalidation:
+                    await browser.route_requests(self._route_request)
+
+                settler = self._create_settler()
+                if settler is not None:
+                    browser.watch_network(settler)
+
+                self._update_status(f"Navigating to {self.config.url}...")
+                with metrics.phase("navigate"):
+                    await browser.navigate(self.config.url, self.intake.on_response)
 
-            # Signal end of responses
-            await self.response_queue.put(None)
+                # Wait for additional content if configured
+                with metrics.phase("settle"):
+                    if settler is not None:
+                        await self._settle(settler)
+                    elif self.config.wait_time > 0:
+                        self._update_status(
+                            f"Waiting {self.config.wait_time}s for additional content..."
+                        )
+                        await browser.wait_for_content(self.config.wait_time)
+
+                # Signal end of responses once every accepted one is queued
+                with metrics.phase("drain"):
+                    await self.intake.close()
+            except BaseException:
+                consumer.cancel()
+                raise
 
-            # Process all responses
             self._update_status("Processing captured resources...")
-            async for resource in self.processor.process_responses_stream(
-                self.response_queue
-            ):
-                resources.append(resource)
+            with metrics.phase("drain"):
+                await consumer
 
         # Update statistics
+        self.processor.stats.dropped_responses = self.intake.dropped
+        self.processor.stats.late_responses = self.intake.late
         self.processor.stats.duration_seconds = time.time() - start_time
 
-        return resources, self.processor.stats
+        return self.processor.stats
+
+    def _create_settler(self) -> NetworkSettler | None:
+        """Create a network settler if the adaptive strategy is configured.
+
+        Returns:
+            NetworkSettler or None for the networkidle strategy.
+        """
+        if self.config.wait_strategy != "adaptive":
+            return None
+        long_lived_ms = self.config.long_lived_ms if self.config.ignore_long_lived else None
+        return NetworkSettler(self.config.idle_ms, long_lived_ms)
+
+    async def _settle(self, settler: NetworkSettler) -> None:
+        """Wait for the network to go quiet.
+
+        ``wait_time``, when set, caps the wait instead of being slept in full;
+        otherwise ``settle_timeout`` is the hard deadline.
+
+        Args:
+            settler: Settler attached before navigation.
+        """
+        if self.config.wait_time > 0:
+            deadline = float(self.config.wait_time)
+        else:
+            deadline = self.config.settle_timeout / 1000
+        self._update_status("Waiting for network to settle...")
+        if not await settler.wait(deadline):
+            self._update_status(
+                f"Network still busy after {deadline:g}s, continuing"
+            )
+
+    async def capture_to_disk(
+        self, save_config: SaveConfig
+    ) -> tuple[CaptureStats, SaveResult]:
+        """Capture resources and write each to disk as it arrives.
+
+        Args:
+            save_config: Save configuration.
+
+        Returns:
+            Tuple of (capture statistics, save result).
+        """
+        saver = create_saver(save_config)
+        self.revalidation = saver.revalidation_headers()
+        result = SaveResult()
+
+        async def on_resource(resource: Resource) -> None:
+            saver.record_resource(resource, result)
+            await saver.wait_for_capacity()
+
+        try:
+            stats = await self.stream_resources(on_resource)
+        finally:
+            # Waits for queued writes, so keep it off the loop
+            await asyncio.to_thread(saver.close, result)
+        return stats, result
+
+    async def _route_request(self, route: Route) -> None:
+        """Abort requests the filter rejects before any bytes are sent.
+
+        The main-frame navigation is always allowed so a filter can never
+        block the page itself. Leaf resources saved by a previous run are
+        sent with their validators, so unchanged ones come back as ``304 Not
+        Modified`` without a body; documents, scripts and stylesheets are
+        always fetched in full because the page needs them to load.
+
+        Args:
+            route: Intercepted Playwright route.
+        """
+        request = route.request
+        try:
+            is_main_navigation = (
+                request.is_navigation_request() and request.frame.parent_frame is None
+            )
+        except PlaywrightError:
+            # Service worker requests have no frame
+            is_main_navigation = False
+
+        try:
+            allowed = True
+            if not is_main_navigation and isinstance(self.filter, RequestFilter):
+                filter_start = time.perf_counter()
+                allowed = self.filter.should_request(request.url, request.resource_type)
+                self.processor.stats.metrics.filter_seconds += (
+                    time.perf_counter() - filter_start
+                )
+            if not allowed:
+                self.processor.stats.blocked_requests += 1
+                await route.abort("blockedbyclient")
+                return
+
+            conditional = None
+            if request.resource_type in LEAF_RESOURCE_TYPES:
+                conditional = self.revalidation.get(request.url)
+            if conditional:
+                await route.continue_(headers={**request.headers, **conditional})
+            else:
+                await route.continue_()
+        except PlaywrightError:
+            # The page was closed while the request was pending
+            pass
+
+    async def _consume_responses(self, on_resource: ResourceCallback) -> None:
+        """Process queued responses and pass each resource on.
+
+        Args:
+            on_resource: Callback receiving each captured resource.
+        """
+        async for resource in self.processor.process_responses_stream(
+            self.intake.queue
+        ):
+            pending = on_resource(resource)
+            if pending is not None:
+                await pending
+
+
+def create_engine(
+    config: CaptureConfig,
+    resource_filter: ResourceFilter | None = None,
+    on_status: Callable[[str], None] | None = None,
+) -> CaptureEngine | HttpCaptureEngine:
+    """Create the capture engine selected by ``config.engine``.
+
+    Args:
+        config: Capture configuration.
+        resource_filter: Optional custom resource filter.
+        on_status: Optional callback for status updates.
+
+    Returns:
+        Browser-backed CaptureEngine or browserless HttpCaptureEngine.
+    """
+    if config.engine == "http":
+        return HttpCaptureEngine(config, resource_filter, on_status)
+    return CaptureEngine(config, resource_filter, on_status)
 
 
 async def capture_page_resources(
@@ -102,5 +299,26 @@ async def capture_page_resources(
     Returns:
         Tuple of (resources list, capture statistics).
     """
-    engine = CaptureEngine(config, resource_filter, on_status)
+    engine = create_engine(config, resource_filter, on_status)
     return await engine.capture_resources()
+
+
+async def capture_page_to_disk(
+    config: CaptureConfig,
+    save_config: SaveConfig,
+    resource_filter: ResourceFilter | None = None,
+    on_status: Callable[[str], None] | None = None,
+) -> tuple[CaptureStats, SaveResult]:
+    """Convenience function to capture a page straight to disk.
+
+    Args:
+        config: Capture configuration.
+        save_config: Save configuration.
+        resource_filter: Optional custom resource filter.
+        on_status: Optional callback for status updates.
+
+    Returns:
+        Tuple of (capture statistics, save result).
+    """
+    engine = create_engine(config, resource_filter, on_status)
+    return await engine.capture_to_disk(save_config)
@@ -1,8 +1,14 @@
 """Resource filtering logic."""
 
-from typing import Protocol
+from typing import Protocol, runtime_checkable
 
-from ..url.parser import should_skip_url
+from ..models import CaptureConfig
+from ..url.classifier import UrlClassifier, is_skipped, parse_cached
+from .rules import load_rule_filter
+
+# Resource types that never trigger further loads, so blocking them cannot
+# hide other resources from the capture
+LEAF_RESOURCE_TYPES = frozenset({"image", "media", "font"})
 
 
 class ResourceFilter(Protocol):
@@ -22,6 +28,49 @@ class ResourceFilter(Protocol):
         ...
 
 
+@runtime_checkable
+class RequestFilter(Protocol):
+    """Protocol for filters that can reject a request before it is sent.
+
+    Filters implementing this are consulted from request interception, so a
+    rejected request is aborted before any bytes are transferred.
+    """
+
+    def should_request(self, url: str, resource_type: str) -> bool:
+        """Check if a request should be allowed to proceed.
+
+        Args:
+            url: Request URL.
+            resource_type: Playwright resource type (document, image, ...).
+
+        Returns:
+            True if the request should be sent.
+        """
+        ...
+
+
+@runtime_checkable
+class BodyFilter(Protocol):
+    """Protocol for filters that judge a resource once its body is fetched.
+
+    Consulted after the body has been downloaded, so it can only decide
+    whether the resource is kept, not save the transfer.
+    """
+
+    def should_keep(self, url: str, content_type: str, size: int) -> bool:
+        """Check if a fetched resource should be kept.
+
+        Args:
+            url: Resource URL.
+            content_type: Content-Type header.
+            size: Body size in bytes.
+
+        Returns:
+            True if the resource should be kept.
+        """
+        ...
+
+
 class DefaultFilter:
     """Default resource filter."""
 
@@ -41,10 +90,7 @@ class DefaultFilter:
             return False
 
         # Skip data URLs, blob URLs, etc.
-        if should_skip_url(url):
-            return False
-
-        return True
+        return not is_skipped(url)
 
 
 class CompositeFilter:
@@ -70,3 +116,214 @@ class CompositeFilter:
             True if all filters approve capture.
         """
         return all(f.should_capture(url, content_type, status_code) for f in self.filters)
+
+    def should_request(self, url: str, resource_type: str) -> bool:
+        """Check if a request should be allowed to proceed.
+
+        Args:
+            url: Request URL.
+            resource_type: Playwright resource type.
+
+        Returns:
+            True if every request-level filter allows the request.
+        """
+        return all(
+            f.should_request(url, resource_type)
+            for f in self.filters
+            if isinstance(f, RequestFilter)
+        )
+
+    def should_keep(self, url: str, content_type: str, size: int) -> bool:
+        """Check if a fetched resource should be kept.
+
+        Args:
+            url: Resource URL.
+            content_type: Content-Type header.
+            size: Body size in bytes.
+
+        Returns:
+            True if every body-level filter keeps the resource.
+        """
+        return all(
+            f.should_keep(url, content_type, size)
+            for f in self.filters
+            if isinstance(f, BodyFilter)
+        )
+
+
+class ExternalFilter:
+    """Filter that keeps only resources from the page's own origin.
+
+    At request level only leaf resource types (images, media, fonts) are
+    blocked by default: blocking third-party scripts or stylesheets could
+    stop the page from loading same-origin resources we want to capture.
+    """
+
+    def __init__(
+        self, base_url: str, block_types: frozenset[str] = LEAF_RESOURCE_TYPES
+    ) -> None:
+        """Initialize external filter.
+
+        Args:
+            base_url: URL whose origin counts as internal.
+            block_types: Resource types whose external requests are aborted.
+        """
+        self.base_url = base_url
+        self.block_types = block_types
+        self.classifier = UrlClassifier(base_url)
+
+    def should_capture(self, url: str, content_type: str, status_code: int) -> bool:
+        """Check if a resource should be captured.
+
+        Args:
+            url: Resource URL.
+            content_type: Content-Type header.
+            status_code: HTTP status code.
+
+        Returns:
+            True if the resource is same-origin.
+        """
+        return self.classifier.is_same_origin(url)
+
+    def should_request(self, url: str, resource_type: str) -> bool:
+        """Check if a request should be allowed to proceed.
+
+        Args:
+            url: Request URL.
+            resource_type: Playwright resource type.
+
+        Returns:
+            False for external requests of a blocked type.
+        """
+        return resource_type not in self.block_types or self.classifier.is_same_origin(url)
+
+
+class ResourceTypeFilter:
+    """Filter that blocks requests by Playwright resource type."""
+
+    def __init__(self, blocked_types: set[str]) -> None:
+        """Initialize resource type filter.
+
+        Args:
+            blocked_types: Resource types to block (e.g. media, font).
+        """
+        self.blocked_types = frozenset(blocked_types)
+
+    def should_capture(self, url: str, content_type: str, status_code: int) -> bool:
+        """Check if a resource should be captured.
+
+        Args:
+            url: Resource URL.
+            content_type: Content-Type header.
+            status_code: HTTP status code.
+
+        Returns:
+            Always True; blocking happens at request level.
+        """
+        return True
+
+    def should_request(self, url: str, resource_type: str) -> bool:
+        """Check if a request should be allowed to proceed.
+
+        Args:
+            url: Request URL.
+            resource_type: Playwright resource type.
+
+        Returns:
+            False if the resource type is blocked.
+        """
+        return resource_type not in self.blocked_types
+
+
+class HostFilter:
+    """Filter that blocks hosts and their subdomains (e.g. analytics)."""
+
+    def __init__(self, blocked_hosts: set[str]) -> None:
+        """Initialize host filter.
+
+        Args:
+            blocked_hosts: Host names to block, including subdomains.
+        """
+        self.blocked_hosts = frozenset(host.lower().strip(".") for host in blocked_hosts)
+
+    def _is_blocked(self, url: str) -> bool:
+        """Check if a URL's host or one of its parent domains is blocked.
+
+        Args:
+            url: URL to check.
+
+        Returns:
+            True if the host is blocked.
+        """
+        host = parse_cached(url).hostname or ""
+        labels = host.split(".")
+        return any(".".join(labels[i:]) in self.blocked_hosts for i in range(len(labels)))
+
+    def should_capture(self, url: str, content_type: str, status_code: int) -> bool:
+        """Check if a resource should be captured.
+
+        Args:
+            url: Resource URL.
+            content_type: Content-Type header.
+            status_code: HTTP status code.
+
+        Returns:
+            False if the host is blocked.
+        """
+        return not self._is_blocked(url)
+
+    def should_request(self, url: str, resource_type: str) -> bool:
+        """Check if a request should be allowed to proceed.
+
+        Args:
+            url: Request URL.
+            resource_type: Playwright resource type.
+
+        Returns:
+            False if the host is blocked.
+        """
+        return not self._is_blocked(url)
+
+
+def can_block_requests(resource_filter: ResourceFilter) -> bool:
+    """Check whether a filter has any request-level rules.
+
+    Request interception has a cost, so it is only installed when a filter
+    could actually abort something.
+
+    Args:
+        resource_filter: Filter to inspect.
+
+    Returns:
+        True if the filter implements ``should_request`` meaningfully.
+    """
+    if isinstance(resource_filter, CompositeFilter):
+        return any(can_block_requests(f) for f in resource_filter.filters)
+    return isinstance(resource_filter, RequestFilter)
+
+
+def create_default_filter(config: CaptureConfig) -> ResourceFilter:
+    """Build the filter implied by a capture configuration.
+
+    Args:
+        config: Capture configuration.
+
+    Returns:
+        DefaultFilter, combined with external, type, host and rule filters
+        as configured.
+
+    Raises:
+        ConfigurationError: If a rule file cannot be read or is malformed.
+    """
+    filters: list[ResourceFilter] = [DefaultFilter()]
+    if not config.include_external:
+        filters.append(ExternalFilter(config.url))
+    if config.blocked_resource_types:
+        filters.append(ResourceTypeFilter(set(config.blocked_resource_types)))
+    if config.blocked_hosts:
+        filters.append(HostFilter(set(config.blocked_hosts)))
+    if config.rule_files:
+        filters.append(load_rule_filter(config.rule_files))
+    if len(filters) == 1:
+        return filters[0]
+    return CompositeFilter(filters)
@@ -0,0 +1,384 @@
+"""Browserless capture over plain HTTP for server-rendered pages."""
+
+import asyncio
+import importlib.util
+import time
+from collections.abc import Callable
+
+import httpx
+
+from ..body import Body, spill_if_large
+from ..errors import NavigationError
+from ..models import (
+    CaptureConfig,
+    CaptureStats,
+    Resource,
+    ResourceCallback,
+    ResourceTiming,
+    SaveConfig,
+    SaveResult,
+)
+from ..storage.saver import create_saver
+from ..url.extractor import decode_document, extract_css_urls, extract_subresources
+from .filters import (
+    LEAF_RESOURCE_TYPES,
+    BodyFilter,
+    RequestFilter,
+    ResourceFilter,
+    can_block_requests,
+    create_default_filter,
+)
+
+
+def http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed for HTTP/2 is installed.
+
+    Returns:
+        True if httpx can negotiate HTTP/2.
+    """
+    return importlib.util.find_spec("h2") is not None
+
+
+class HttpCaptureEngine:
+    """Captures a page without a browser.
+
+    The document is fetched with a pooled ``httpx.AsyncClient`` and the
+    subresources referenced by its HTML and CSS (``src``, ``href``,
+    ``srcset``, ``url()``, ``@import``) are fetched concurrently, up to
+    ``body_fetch_concurrency`` at a time. Nothing is executed, so resources
+    loaded by JavaScript are not captured; ``wait_time`` and the settle
+    strategy have no effect.
+    """
+
+    def __init__(
+        self,
+        config: CaptureConfig,
+        resource_filter: ResourceFilter | None = None,
+        on_status: Callable[[str], None] | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        """Initialize HTTP capture engine.
+
+        Args:
+            config: Capture configuration.
+            resource_filter: Optional custom resource filter.
+            on_status: Optional callback for status updates.
+            client: Optional shared HTTP client; one is created for this
+                capture when omitted.
+        """
+        self.config = config
+        self.client = client
+        self.filter = resource_filter or create_default_filter(config)
+        self.on_status = on_status
+        self.stats = CaptureStats()
+        self._seen: set[str] = set()
+        # Conditional request headers by URL, sent for leaf resources
+        self.revalidation: dict[str, dict[str, str]] = {}
+
+    def _update_status(self, message: str) -> None:
+        """Send status update if callback is set.
+
+        Args:
+            message: Status message.
+        """
+        if self.on_status:
+            self.on_status(message)
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create a pooled client sized for the fetch concurrency.
+
+        Returns:
+            New AsyncClient; the caller closes it.
+        """
+        headers = {}
+        if self.config.user_agent:
+            headers["User-Agent"] = self.config.user_agent
+        concurrency = self.config.body_fetch_concurrency
+        return httpx.AsyncClient(
+            http2=http2_available(),
+            follow_redirects=True,
+            timeout=self.config.timeout / 1000,
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+        )
+
+    async def capture_resources(self) -> tuple[list[Resource], CaptureStats]:
+        """Capture all resources from the configured URL.
+
+        Returns:
+            Tuple of (resources list, capture statistics).
+        """
+        resources: list[Resource] = []
+        stats = await self.stream_resources(resources.append)
+        return resources, stats
+
+    async def stream_resources(self, on_resource: ResourceCallback) -> CaptureStats:
+        """Capture resources, handing each one off as soon as it is fetched.
+
+        Args:
+            on_resource: Callback receiving each captured resource; an
+                awaitable it returns is awaited before that fetch finishes.
+
+        Returns:
+            Capture statistics.
+
+        Raises:
+            NavigationError: If the document itself cannot be fetched.
+        """
+        start_time = time.time()
+        metrics = self.stats.metrics
+        client = self.client or self._create_client()
+        try:
+            self._update_status(f"Fetching {self.config.url}...")
+            self._seen.add(self.config.url)
+            with metrics.phase("navigate"):
+                try:
+                    response, timing = await self._get(client, self.config.url)
+                except (httpx.HTTPError, httpx.InvalidURL) as e:
+                    raise NavigationError(
+                        f"Failed to navigate to {self.config.url}: {e}"
+                    ) from e
+                discovered = await self._process(response, timing, on_resource)
+            with metrics.phase("subresources"):
+                await self._fetch_all(client, discovered, on_resource)
+        finally:
+            if self.client is None:
+                await client.aclose()
+
+        self.stats.duration_seconds = time.time() - start_time
+        return self.stats
+
+    async def _fetch_all(
+        self,
+        client: httpx.AsyncClient,
+        discovered: list[tuple[str, str]],
+        on_resource: ResourceCallback,
+    ) -> None:
+        """Fetch subresources concurrently, following HTML and CSS references.
+
+        Args:
+            client: HTTP client.
+            discovered: ``(url, resource_type)`` pairs found so far.
+            on_resource: Callback receiving each captured resource.
+        """
+        slots = asyncio.Semaphore(self.config.body_fetch_concurrency)
+        pending: set[asyncio.Task[list[tuple[str, str]]]] = set()
+
+        def schedule(found: list[tuple[str, str]]) -> None:
+            for url, resource_type in found:
+                if url in self._seen:
+                    continue
+                self._seen.add(url)
+                if not self._allowed(url, resource_type):
+                    continue
+                pending.add(
+                    asyncio.create_task(
+                        self._fetch(client, slots, url, resource_type, on_resource)
+                    )
+                )
+
+        schedule(discovered)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    pending.discard(task)
+                    schedule(task.result())
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def _allowed(self, url: str, resource_type: str) -> bool:
+        """Apply request-level filtering before a subresource is fetched.
+
+        Args:
+            url: Subresource URL.
+            resource_type: Type inferred from where the URL was referenced.
+
+        Returns:
+            True if the request should be sent.
+        """
+        if not url.startswith(("http://", "https://")):
+            return False
+        if can_block_requests(self.filter):
+            assert isinstance(self.filter, RequestFilter)
+            filter_start = time.perf_counter()
+            allowed = self.filter.should_request(url, resource_type)
+            self.stats.metrics.filter_seconds += time.perf_counter() - filter_start
+            if not allowed:
+                self.stats.blocked_requests += 1
+                return False
+        return True
+
+    async def _get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str] | None = None,
+    ) -> tuple[httpx.Response, ResourceTiming]:
+        """Fetch a URL, timing the response headers and body separately.
+
+        Args:
+            client: HTTP client.
+            url: URL to fetch; redirects are followed.
+            headers: Optional extra request headers.
+
+        Returns:
+            Response with its body read, and its timing so far.
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+            httpx.InvalidURL: If the URL cannot be requested.
+        """
+        timing = ResourceTiming(url, request_start=time.time())
+        async with client.stream("GET", url, headers=headers) as response:
+            timing.response_at = time.time()
+            await response.aread()
+        timing.body_at = time.time()
+        return response, timing
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        slots: asyncio.Semaphore,
+        url: str,
+        resource_type: str,
+        on_resource: ResourceCallback,
+    ) -> list[tuple[str, str]]:
+        """Fetch one subresource.
+
+        Leaf resources saved by a previous run are requested conditionally;
+        HTML and CSS are always fetched in full so their references can be
+        followed.
+
+        Args:
+            client: HTTP client.
+            slots: Semaphore bounding concurrent fetches.
+            url: Subresource URL.
+            resource_type: Type inferred from where the URL was referenced.
+            on_resource: Callback receiving the captured resource.
+
+        Returns:
+            Further ``(url, resource_type)`` references found in the body.
+        """
+        headers = None
+        if resource_type in LEAF_RESOURCE_TYPES:
+            headers = self.revalidation.get(url)
+        async with slots:
+            try:
+                response, timing = await self._get(client, url, headers)
+            # InvalidURL is not an HTTPError; a URL httpx rejects only fails
+            # this subresource
+            except (httpx.HTTPError, httpx.InvalidURL) as e:
+                self.stats.total_requests += 1
+                self.stats.failed_captures += 1
+                self._update_status(f"Failed to capture {url}: {e}")
+                return []
+            return await self._process(response, timing, on_resource)
+
+    async def _process(
+        self,
+        response: httpx.Response,
+        timing: ResourceTiming,
+        on_resource: ResourceCallback,
+    ) -> list[tuple[str, str]]:
+        """Turn a response into a Resource and find what it references.
+
+        Args:
+            response: HTTP response with its body read.
+            timing: Timing of the fetch.
+            on_resource: Callback receiving the captured resource.
+
+        Returns:
+            ``(url, resource_type)`` references found in HTML or CSS bodies.
+        """
+        self.stats.total_requests += 1
+        metrics = self.stats.metrics
+        final_url = str(response.url)
+        self._seen.add(final_url)
+        content_type = response.headers.get("content-type", "")
+
+        filter_start = time.perf_counter()
+        captured = self.filter.should_capture(
+            final_url, content_type, response.status_code
+        )
+        metrics.filter_seconds += time.perf_counter() - filter_start
+        if not captured:
+            self.stats.skipped_urls += 1
+            return []
+
+        content = response.content
+        if response.status_code == 304:
+            self.stats.not_modified += 1
+        found: list[tuple[str, str]] = []
+        if "html" in content_type:
+            found = extract_subresources(
+                decode_document(content, content_type), final_url
+            )
+        elif "css" in content_type:
+            found = extract_css_urls(decode_document(content, content_type), final_url)
+        # References are still followed when a body is not kept
+        if isinstance(self.filter, BodyFilter):
+            filter_start = time.perf_counter()
+            kept = self.filter.should_keep(final_url, content_type, len(content))
+            metrics.filter_seconds += time.perf_counter() - filter_start
+            if not kept:
+                self.stats.skipped_urls += 1
+                return found
+
+        body: Body = content
+        threshold = self.config.spill_threshold
+        if threshold is not None and len(content) > threshold:
+            body = await asyncio.to_thread(
+                spill_if_large, content, threshold, self.config.spill_dir
+            )
+        timing.url = final_url
+        timing.size = len(body)
+        metrics.record(timing)
+        self.stats.successful_captures += 1
+        self.stats.total_bytes += len(body)
+        pending = on_resource(
+            Resource(
+                url=final_url,
+                content_type=content_type,
+                body=body,
+                headers=dict(response.headers),
+                status_code=response.status_code,
+                timing=timing,
+            )
+        )
+        if pending is not None:
+            await pending
+        return found
+
+    async def capture_to_disk(
+        self, save_config: SaveConfig
+    ) -> tuple[CaptureStats, SaveResult]:
+        """Capture resources and write each to disk as it arrives.
+
+        Args:
+            save_config: Save configuration.
+
+        Returns:
+            Tuple of (capture statistics, save result).
+        """
+        saver = create_saver(save_config)
+        self.revalidation = saver.revalidation_headers()
+        result = SaveResult()
+
+        async def on_resource(resource: Resource) -> None:
+            saver.record_resource(resource, result)
+            await saver.wait_for_capacity()
+
+        try:
+            stats = await self.stream_resources(on_resource)
+        finally:
+            # Waits for queued writes, so keep it off the loop
+            await asyncio.to_thread(saver.close, result)
+        return stats, result
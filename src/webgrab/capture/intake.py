@@ -0,0 +1,80 @@
+"""Backpressured intake of browser responses."""
+
+import asyncio
+
+from playwright.async_api import Response
+
+OVERFLOW_POLICIES = ("wait", "drop")
+
+
+class ResponseIntake:
+    """Feeds browser responses into a bounded queue without losing any.
+
+    Playwright delivers responses to a synchronous callback, so a full queue
+    cannot block the browser. With the ``wait`` policy, responses that do not
+    fit are parked in tracked tasks that complete as the consumer catches up;
+    with ``drop`` they are discarded and counted in ``dropped``. ``close``
+    waits for every parked response before queueing the end-of-stream
+    sentinel, so each response seen before shutdown is either processed or
+    dropped; responses arriving after it are counted in ``late``.
+    """
+
+    def __init__(self, maxsize: int = 0, overflow: str = "wait") -> None:
+        """Initialize the intake.
+
+        Args:
+            maxsize: Maximum queued responses; 0 means unbounded.
+            overflow: What to do when the queue is full: ``wait`` or ``drop``.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        self.queue: asyncio.Queue[Response | None] = asyncio.Queue(maxsize)
+        self.overflow = overflow
+        self.dropped = 0
+        self.late = 0
+        self._pending: set[asyncio.Task[None]] = set()
+        self._closed = False
+
+    @property
+    def pending_count(self) -> int:
+        """Number of responses waiting for room in the queue."""
+        return len(self._pending)
+
+    def on_response(self, response: Response) -> None:
+        """Accept a response from the browser.
+
+        Args:
+            response: Playwright Response object.
+        """
+        if self._closed:
+            self.late += 1
+            return
+
+        # Parked responses go first so arrival order is kept
+        if not self._pending:
+            try:
+                self.queue.put_nowait(response)
+                return
+            except asyncio.QueueFull:
+                pass
+
+        if self.overflow == "drop":
+            self.dropped += 1
+            return
+
+        task = asyncio.create_task(self.queue.put(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def close(self) -> None:
+        """Stop accepting responses and signal end of stream.
+
+        Waits until every parked response is queued, which requires the
+        consumer to keep draining the queue.
+        """
+        self._closed = True
+        while self._pending:
+            await asyncio.gather(*self._pending)
+        await self.queue.put(None)
@@ -1,12 +1,41 @@
 """Resource processing with streaming architecture."""
 
 import asyncio
+import time
+from pathlib import Path
 from typing import AsyncIterator, Callable
 
 from playwright.async_api import Response
 
-from ..models import CaptureStats, Resource
-from .filters import DefaultFilter, ResourceFilter
+from ..body import Body, spill_if_large
+from ..models import CaptureStats, Resource, ResourceTiming
+from .filters import BodyFilter, DefaultFilter, ResourceFilter
+
+
+def request_timing(response: Response) -> ResourceTiming:
+    """Start a resource timing from the browser's own request timing.
+
+    Args:
+        response: Playwright Response object.
+
+    Returns:
+        Timing with the request start and response time filled in where
+        the browser reported them.
+    """
+    timing = ResourceTiming(response.url)
+    try:
+        browser_timing = response.request.timing
+        start_ms = browser_timing["startTime"]
+        response_ms = browser_timing["responseStart"]
+    except (AttributeError, KeyError, TypeError):
+        return timing
+    if not isinstance(start_ms, (int, float)) or start_ms <= 0:
+        return timing
+    timing.request_start = start_ms / 1000
+    # responseStart is relative to startTime, and -1 when unavailable
+    if isinstance(response_ms, (int, float)) and response_ms >= 0:
+        timing.response_at = (start_ms + response_ms) / 1000
+    return timing
 
 
 class ResourceProcessor:
@@ -16,15 +45,32 @@ class ResourceProcessor:
         self,
         resource_filter: ResourceFilter | None = None,
         on_progress: Callable[[str], None] | None = None,
+        concurrency: int = 1,
+        ordered: bool = False,
+        spill_threshold: int | None = None,
+        spill_dir: Path | None = None,
     ) -> None:
         """Initialize the processor.
 
         Args:
             resource_filter: Filter to determine which resources to capture.
             on_progress: Optional callback for progress updates.
+            concurrency: Maximum number of bodies fetched or waiting to be
+                consumed at once.
+            ordered: Yield resources in response order instead of the
+                order their bodies finish downloading.
+            spill_threshold: Body size in bytes above which bodies are moved
+                to a temporary file; None keeps every body in memory.
+            spill_dir: Directory for spilled bodies.
         """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
         self.filter = resource_filter or DefaultFilter()
         self.on_progress = on_progress
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
         self.stats = CaptureStats()
 
     async def process_response(self, response: Response) -> Resource | None:
@@ -37,18 +83,45 @@ class ResourceProcessor:
             Resource object or None if filtered out or failed.
         """
         self.stats.total_requests += 1
+        metrics = self.stats.metrics
         url = response.url
         status = response.status
         content_type = response.headers.get("content-type", "")
 
         # Apply filter
-        if not self.filter.should_capture(url, content_type, status):
+        filter_start = time.perf_counter()
+        captured = self.filter.should_capture(url, content_type, status)
+        metrics.filter_seconds += time.perf_counter() - filter_start
+        if not captured:
             self.stats.skipped_urls += 1
             return None
 
-        # Fetch body
+        # Fetch body; a revalidated resource has none
         try:
-            body = await response.body()
+            timing = request_timing(response)
+            if status == 304:
+                self.stats.not_modified += 1
+                body: Body = b""
+            else:
+                body = await response.body()
+                if isinstance(self.filter, BodyFilter):
+                    filter_start = time.perf_counter()
+                    kept = self.filter.should_keep(url, content_type, len(body))
+                    metrics.filter_seconds += time.perf_counter() - filter_start
+                    if not kept:
+                        self.stats.skipped_urls += 1
+                        return None
+            if (
+                isinstance(body, bytes)
+                and self.spill_threshold is not None
+                and len(body) > self.spill_threshold
+            ):
+                body = await asyncio.to_thread(
+                    spill_if_large, body, self.spill_threshold, self.spill_dir
+                )
+            timing.body_at = time.time()
+            timing.size = len(body)
+            metrics.record(timing)
             self.stats.successful_captures += 1
             self.stats.total_bytes += len(body)
 
@@ -61,6 +134,7 @@ class ResourceProcessor:
                 body=body,
                 headers=headers,
                 status_code=status,
+                timing=timing,
             )
         except Exception as e:
             self.stats.failed_captures += 1
@@ -73,18 +147,67 @@ class ResourceProcessor:
     ) -> AsyncIterator[Resource]:
         """Process responses from a queue as a stream.
 
+        Up to ``concurrency`` bodies are fetched in parallel. A slot is only
+        freed once its resource has been consumed, so the number of bodies
+        held in memory never exceeds the concurrency limit.
+
         Args:
             response_queue: Queue of responses to process. None signals end.
 
         Yields:
             Resource objects as they are processed.
         """
-        while True:
-            response = await response_queue.get()
-            if response is None:
-                # Sentinel value indicating end of stream
-                break
-
-            resource = await self.process_response(response)
-            if resource is not None:
-                yield resource
+        if self.concurrency == 1:
+            while True:
+                response = await response_queue.get()
+                if response is None:
+                    # Sentinel value indicating end of stream
+                    break
+
+                resource = await self.process_response(response)
+                if resource is not None:
+                    yield resource
+            return
+
+        slots = asyncio.Semaphore(self.concurrency)
+        # Finished fetch tasks (arrival order) or started ones (request order)
+        results: asyncio.Queue[asyncio.Task[Resource | None] | None] = asyncio.Queue()
+        pending: set[asyncio.Task[Resource | None]] = set()
+
+        async def feed() -> None:
+            while True:
+                response = await response_queue.get()
+                if response is None:
+                    break
+                await slots.acquire()
+                task = asyncio.create_task(self.process_response(response))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                if self.ordered:
+                    results.put_nowait(task)
+                else:
+                    task.add_done_callback(results.put_nowait)
+            if pending:
+                # Done callbacks run in registration order, so every result
+                # is queued before the end-of-stream marker below
+                await asyncio.wait(set(pending))
+            results.put_nowait(None)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while True:
+                task = await results.get()
+                if task is None:
+                    break
+                try:
+                    resource = await task
+                    if resource is not None:
+                        yield resource
+                finally:
+                    # Freed only once the consumer is done with the body
+                    slots.release()
+            await feeder
+        finally:
+            feeder.cancel()
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,492 @@
+"""Rule-based resource filtering compiled for large blocklists.
+
+Rules are read one per line, in a small language compatible with the
+common subset of EasyList::
+
+    ! comment (``#`` works too)
+    ||ads.example.com^      block a host and its subdomains
+    host:tracker.example    same, spelled out
+    /banner/*.gif           block URLs containing the pattern
+    |https://cdn.example/x  ``|`` anchors at the start or end of the URL
+    @@||cdn.example.com^    exception: never block matching URLs
+    type:image/gif          block a content type
+    type:video/*            block every subtype of a major type
+    size:>10M               block bodies larger than 10 MiB (K, M, G)
+    size:<64                block bodies smaller than 64 bytes
+
+In URL patterns ``*`` matches anything and ``^`` matches a separator
+(anything but a letter, digit, ``_``, ``-``, ``.`` or ``%``, or the end of
+the URL); matching ignores case. EasyList rules with ``$`` options and
+element-hiding rules (``##``) are not supported and are skipped.
+
+Rules compile into structures whose lookup cost does not grow with the
+number of rules: a trie of reversed host labels, an Aho-Corasick automaton
+over a literal taken from each URL pattern (only patterns whose literal
+occurs are checked with their regex), and content-type sets.
+"""
+
+import os
+import re
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from ..errors import ConfigurationError
+from ..url.classifier import url_origin
+
+# Patterns whose longest literal is shorter than this are checked for
+# every URL instead of going through the automaton
+MIN_LITERAL = 3
+
+# URL decisions remembered per filter; a URL is checked at request and
+# again at response time
+DECISION_CACHE_SIZE = 4096
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+SIZE_RULE_PATTERN = re.compile(r"size:([<>])\s*(\d+)\s*([KMG]?)(?:I?B)?", re.IGNORECASE)
+
+# A plain host rule: ||host^ with nothing after the separator
+HOST_RULE_PATTERN = re.compile(r"\|\|([a-z0-9.-]+)\^?")
+
+SEPARATOR = r"(?:[^\w.%-]|$)"
+
+HOST_ANCHOR = r"^[a-z][a-z0-9+.-]*://(?:[^/?#]*[.@])?"
+
+
+@dataclass
+class RuleSet:
+    """Parsed rules, before compilation."""
+
+    block_hosts: list[str] = field(default_factory=list)
+    allow_hosts: list[str] = field(default_factory=list)
+    block_patterns: list[str] = field(default_factory=list)
+    allow_patterns: list[str] = field(default_factory=list)
+    block_types: list[str] = field(default_factory=list)
+    max_size: int | None = None
+    min_size: int | None = None
+    ignored: int = 0
+
+    @property
+    def rule_count(self) -> int:
+        """Number of rules that will be enforced."""
+        return (
+            len(self.block_hosts)
+            + len(self.allow_hosts)
+            + len(self.block_patterns)
+            + len(self.allow_patterns)
+            + len(self.block_types)
+            + (self.max_size is not None)
+            + (self.min_size is not None)
+        )
+
+    def limit_size(self, direction: str, limit: int) -> None:
+        """Tighten a size limit.
+
+        Args:
+            direction: ``>`` to block larger bodies, ``<`` to block smaller.
+            limit: Size in bytes.
+        """
+        if direction == ">":
+            self.max_size = limit if self.max_size is None else min(self.max_size, limit)
+        else:
+            self.min_size = limit if self.min_size is None else max(self.min_size, limit)
+
+    def merge(self, other: "RuleSet") -> None:
+        """Add another rule set's rules to this one.
+
+        Args:
+            other: Rules to add.
+        """
+        self.block_hosts += other.block_hosts
+        self.allow_hosts += other.allow_hosts
+        self.block_patterns += other.block_patterns
+        self.allow_patterns += other.allow_patterns
+        self.block_types += other.block_types
+        if other.max_size is not None:
+            self.limit_size(">", other.max_size)
+        if other.min_size is not None:
+            self.limit_size("<", other.min_size)
+        self.ignored += other.ignored
+
+
+def parse_rules(lines: Iterable[str], source: str = "<rules>") -> RuleSet:
+    """Parse rule lines.
+
+    Args:
+        lines: Rule lines; blank lines and comments are skipped.
+        source: Name used in error messages.
+
+    Returns:
+        RuleSet holding every supported rule.
+
+    Raises:
+        ConfigurationError: If a ``type:`` or ``size:`` rule is malformed.
+    """
+    rules = RuleSet()
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line or line.startswith(("!", "#", "[")):
+            continue
+        lowered = line.lower()
+        if lowered.startswith("size:"):
+            match = SIZE_RULE_PATTERN.fullmatch(line)
+            if match is None:
+                raise ConfigurationError(f"{source}:{number}: invalid size rule '{line}'")
+            rules.limit_size(
+                match.group(1), int(match.group(2)) * SIZE_UNITS[match.group(3).upper()]
+            )
+            continue
+        if lowered.startswith("type:"):
+            content_type = lowered[5:].strip()
+            if content_type.count("/") != 1 or content_type.startswith("/"):
+                raise ConfigurationError(f"{source}:{number}: invalid type rule '{line}'")
+            rules.block_types.append(content_type)
+            continue
+        if "##" in line or "#@#" in line or "#?#" in line or "$" in line:
+            rules.ignored += 1
+            continue
+
+        allow = lowered.startswith("@@")
+        if allow:
+            lowered = lowered[2:]
+        if lowered.startswith("host:"):
+            host = lowered[5:].strip().strip(".")
+        else:
+            match = HOST_RULE_PATTERN.fullmatch(lowered)
+            host = match.group(1).strip(".") if match else ""
+        if host:
+            (rules.allow_hosts if allow else rules.block_hosts).append(host)
+        elif lowered.strip("*|^"):
+            (rules.allow_patterns if allow else rules.block_patterns).append(lowered)
+        else:
+            rules.ignored += 1
+    return rules
+
+
+def load_rules(paths: Iterable[Path]) -> RuleSet:
+    """Read and merge rule files.
+
+    Args:
+        paths: Rule files, read in order.
+
+    Returns:
+        Combined RuleSet.
+
+    Raises:
+        ConfigurationError: If a file cannot be read or holds a malformed rule.
+    """
+    merged = RuleSet()
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                rules = parse_rules(f, str(path))
+        except OSError as e:
+            raise ConfigurationError(f"Cannot read rule file {path}: {e}") from e
+        merged.merge(rules)
+    return merged
+
+
+class DomainTrie:
+    """Hosts stored as reversed labels, matching subdomains too.
+
+    ``ads.example.com`` is stored as ``com -> example -> ads``; a lookup
+    walks the queried host's labels from the top-level domain down and
+    stops at the first stored host, so its cost depends on the number of
+    labels, not the number of hosts.
+    """
+
+    # Marks a node that ends a stored host; labels are never empty
+    _END = ""
+
+    def __init__(self, hosts: Iterable[str] = ()) -> None:
+        """Initialize the trie.
+
+        Args:
+            hosts: Host names to store.
+        """
+        self._root: dict = {}
+        for host in hosts:
+            self.add(host)
+
+    def add(self, host: str) -> None:
+        """Store a host.
+
+        Args:
+            host: Host name; its subdomains match as well.
+        """
+        node = self._root
+        for label in reversed(host.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node[self._END] = True
+
+    def matches(self, host: str) -> bool:
+        """Check whether a host or one of its parent domains is stored.
+
+        Args:
+            host: Lowercase host name.
+
+        Returns:
+            True if the host is covered by a stored host.
+        """
+        node = self._root
+        for label in reversed(host.split(".")):
+            child = node.get(label)
+            if child is None:
+                return False
+            if self._END in child:
+                return True
+            node = child
+        return False
+
+
+def pattern_regex(pattern: str) -> re.Pattern[str]:
+    """Compile a URL pattern into a regular expression.
+
+    Args:
+        pattern: Lowercase pattern without an ``@@`` prefix.
+
+    Returns:
+        Compiled regex to search lowercase URLs with.
+    """
+    prefix = suffix = ""
+    if pattern.startswith("||"):
+        prefix, pattern = HOST_ANCHOR, pattern[2:]
+    elif pattern.startswith("|"):
+        prefix, pattern = "^", pattern[1:]
+    if pattern.endswith("|"):
+        suffix, pattern = "$", pattern[:-1]
+    body = "".join(
+        ".*" if char == "*" else SEPARATOR if char == "^" else re.escape(char)
+        for char in pattern
+    )
+    return re.compile(prefix + body + suffix)
+
+
+def pattern_literal(pattern: str) -> str:
+    """Pick the longest literal run of a URL pattern.
+
+    Args:
+        pattern: Lowercase pattern.
+
+    Returns:
+        Text every matching URL must contain.
+    """
+    return max(re.split(r"[*^|]", pattern), key=len)
+
+
+class PatternMatcher:
+    """Matches URLs against many patterns in one pass.
+
+    An Aho-Corasick automaton over the patterns' literals finds, in a single
+    scan of the URL, the few patterns that could match; only those are
+    verified with their regex.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """Build the automaton.
+
+        Args:
+            patterns: Lowercase URL patterns.
+        """
+        self._regexes: list[re.Pattern[str]] = []
+        self._always: list[int] = []
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[list[int]] = [[]]
+        for pattern in dict.fromkeys(patterns):
+            index = len(self._regexes)
+            self._regexes.append(pattern_regex(pattern))
+            literal = pattern_literal(pattern)
+            if len(literal) < MIN_LITERAL:
+                self._always.append(index)
+                continue
+            state = 0
+            for char in literal:
+                following = goto[state].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto[state][char] = following
+                    goto.append({})
+                    outputs.append([])
+                state = following
+            outputs[state].append(index)
+
+        # Failure links, breadth first; outputs of the failure state are
+        # merged in so a match never needs to follow the chain
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in goto[state].items():
+                queue.append(following)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[following] = goto[fallback].get(char, 0)
+                outputs[following] = outputs[following] + outputs[fail[following]]
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(found) for found in outputs]
+
+    def __len__(self) -> int:
+        return len(self._regexes)
+
+    def matches(self, url: str) -> bool:
+        """Check whether any pattern matches a URL.
+
+        Args:
+            url: Lowercase URL.
+
+        Returns:
+            True if a pattern matches.
+        """
+        regexes = self._regexes
+        for index in self._always:
+            if regexes[index].search(url):
+                return True
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        checked: set[int] = set()
+        state = 0
+        for char in url:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in outputs[state]:
+                if index not in checked:
+                    checked.add(index)
+                    if regexes[index].search(url):
+                        return True
+        return False
+
+
+class RuleFilter:
+    """Resource filter enforcing a compiled rule set.
+
+    Host and URL rules are applied at request level, so blocked requests
+    are aborted before any bytes are transferred; content-type rules apply
+    to responses and size rules to fetched bodies. Exception (``@@``) rules
+    exempt matching URLs from every block rule.
+    """
+
+    def __init__(self, rules: RuleSet) -> None:
+        """Compile the rules.
+
+        Args:
+            rules: Parsed rules.
+        """
+        self.rules = rules
+        self._block_hosts = DomainTrie(rules.block_hosts)
+        self._allow_hosts = DomainTrie(rules.allow_hosts)
+        self._block_patterns = PatternMatcher(rules.block_patterns)
+        self._allow_patterns = PatternMatcher(rules.allow_patterns)
+        self._exact_types = frozenset(t for t in rules.block_types if not t.endswith("/*"))
+        self._major_types = frozenset(t[:-2] for t in rules.block_types if t.endswith("/*"))
+        self.max_size = rules.max_size
+        self.min_size = rules.min_size
+        self._decide = lru_cache(maxsize=DECISION_CACHE_SIZE)(self._decide_url)
+
+    def _decide_url(self, url: str) -> tuple[bool, bool]:
+        """Classify a URL against the host and pattern rules.
+
+        Args:
+            url: Resource URL.
+
+        Returns:
+            ``(blocked, allowed)``: whether a block rule matches, and
+            whether an exception rule matches.
+        """
+        host = url_origin(url).host
+        lowered = url.lower()
+        allowed = self._allow_hosts.matches(host) or (
+            len(self._allow_patterns) > 0 and self._allow_patterns.matches(lowered)
+        )
+        blocked = self._block_hosts.matches(host) or (
+            len(self._block_patterns) > 0 and self._block_patterns.matches(lowered)
+        )
+        return blocked, allowed
+
+    def should_request(self, url: str, resource_type: str) -> bool:
+        """Check if a request should be allowed to proceed.
+
+        Args:
+            url: Request URL.
+            resource_type: Playwright resource type.
+
+        Returns:
+            False if a host or URL rule blocks the request.
+        """
+        blocked, allowed = self._decide(url)
+        return allowed or not blocked
+
+    def should_capture(self, url: str, content_type: str, status_code: int) -> bool:
+        """Check if a resource should be captured.
+
+        Args:
+            url: Resource URL.
+            content_type: Content-Type header.
+            status_code: HTTP status code.
+
+        Returns:
+            False if a host, URL or content-type rule blocks the resource.
+        """
+        blocked, allowed = self._decide(url)
+        if allowed:
+            return True
+        if blocked:
+            return False
+        if not self._exact_types and not self._major_types:
+            return True
+        mime = content_type.split(";")[0].strip().lower()
+        return mime not in self._exact_types and mime.split("/")[0] not in self._major_types
+
+    def should_keep(self, url: str, content_type: str, size: int) -> bool:
+        """Check if a fetched body should be kept.
+
+        Args:
+            url: Resource URL.
+            content_type: Content-Type header.
+            size: Body size in bytes.
+
+        Returns:
+            False if a size rule rejects the body.
+        """
+        if self.max_size is None and self.min_size is None:
+            return True
+        if (self.max_size is not None and size > self.max_size) or (
+            self.min_size is not None and size < self.min_size
+        ):
+            return self._decide(url)[1]
+        return True
+
+
+def load_rule_filter(paths: Iterable[Path]) -> RuleFilter:
+    """Load and compile rule files, reusing earlier compilations.
+
+    Compiling a large list takes a while, so the result is cached for as
+    long as the files are unchanged; batch and crawl pages share it.
+
+    Args:
+        paths: Rule files.
+
+    Returns:
+        Compiled RuleFilter.
+
+    Raises:
+        ConfigurationError: If a file cannot be read or holds a malformed rule.
+    """
+    key = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise ConfigurationError(f"Cannot read rule file {path}: {e}") from e
+        key.append((os.fspath(path), stat.st_mtime_ns, stat.st_size))
+    return _compile_rule_files(tuple(key))
+
+
+@lru_cache(maxsize=8)
+def _compile_rule_files(key: tuple[tuple[str, int, int], ...]) -> RuleFilter:
+    """Compile rule files identified by path, mtime and size."""
+    return RuleFilter(load_rules(Path(path) for path, _, _ in key))
@@ -0,0 +1,129 @@
+"""Adaptive network-quiescence detection."""
+
+import asyncio
+import time
+from typing import Any
+
+# Connections that stay open by design and should never hold up settling
+STREAMING_RESOURCE_TYPES = frozenset({"websocket", "eventsource"})
+
+
+class NetworkSettler:
+    """Decides when a page's network activity has settled.
+
+    Tracks in-flight requests through the page's request, requestfinished
+    and requestfailed events. The page counts as settled once nothing is in
+    flight and no request has started or finished for ``idle_ms``.
+    Streaming connections are never counted, and with ``long_lived_ms`` set,
+    requests open longer than that (long-polling, slow beacons) stop
+    counting as in flight.
+    """
+
+    def __init__(self, idle_ms: int = 500, long_lived_ms: int | None = 5000) -> None:
+        """Initialize the settler.
+
+        Args:
+            idle_ms: Quiet period that counts as settled, in milliseconds.
+            long_lived_ms: Age after which an open request is ignored, in
+                milliseconds; None to wait for every request.
+        """
+        if idle_ms <= 0:
+            raise ValueError("idle_ms must be positive")
+        self.idle = idle_ms / 1000
+        self.long_lived = long_lived_ms / 1000 if long_lived_ms else None
+        self._in_flight: dict[Any, float] = {}
+        self._last_activity = time.monotonic()
+        self._activity = asyncio.Event()
+
+    def _touch(self) -> None:
+        """Record network activity and wake any waiter."""
+        self._last_activity = time.monotonic()
+        self._activity.set()
+
+    def on_request(self, request: Any) -> None:
+        """Handle a request starting.
+
+        Args:
+            request: Playwright Request object.
+        """
+        if request.resource_type in STREAMING_RESOURCE_TYPES:
+            return
+        self._in_flight[request] = time.monotonic()
+        self._touch()
+
+    def on_request_done(self, request: Any) -> None:
+        """Handle a request finishing or failing.
+
+        Args:
+            request: Playwright Request object.
+        """
+        if self._in_flight.pop(request, None) is not None:
+            self._touch()
+
+    def attach(self, page: Any) -> None:
+        """Subscribe to a page's request events.
+
+        Args:
+            page: Playwright Page to observe.
+        """
+        page.on("request", self.on_request)
+        page.on("requestfinished", self.on_request_done)
+        page.on("requestfailed", self.on_request_done)
+
+    def active_count(self, now: float | None = None) -> int:
+        """Count requests that still hold up settling.
+
+        Args:
+            now: Current monotonic time; defaults to now.
+
+        Returns:
+            Number of in-flight requests younger than the long-lived cutoff.
+        """
+        if self.long_lived is None:
+            return len(self._in_flight)
+        now = time.monotonic() if now is None else now
+        return sum(1 for start in self._in_flight.values() if now - start < self.long_lived)
+
+    def _next_check(self, now: float) -> float:
+        """Seconds until the settled state could next change without events.
+
+        Args:
+            now: Current monotonic time.
+
+        Returns:
+            Delay before re-checking, or 0 if the page has settled.
+        """
+        young = [
+            start
+            for start in self._in_flight.values()
+            if self.long_lived is None or now - start < self.long_lived
+        ]
+        if young:
+            if self.long_lived is None:
+                return float("inf")
+            # Re-check when the oldest counted request becomes long-lived
+            return min(young) + self.long_lived - now
+        return max(0.0, self._last_activity + self.idle - now)
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until the network settles or the deadline passes.
+
+        Args:
+            timeout: Hard deadline in seconds.
+
+        Returns:
+            True if the network settled, False if the deadline was hit.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            delay = self._next_check(now)
+            if delay == 0:
+                return True
+            if now >= deadline:
+                return False
+            self._activity.clear()
+            try:
+                await asyncio.wait_for(self._activity.wait(), min(delay, deadline - now))
+            except asyncio.TimeoutError:
+                pass
@@ -1,6 +1,7 @@
 """CLI entry point for webgrab."""
 
 import asyncio
+import sys
 from pathlib import Path
 from typing import Optional
 
@@ -8,10 +9,24 @@ import typer
 from rich.console import Console
 
 from . import __version__
-from .capture.engine import capture_page_resources
-from .config import create_capture_config, create_save_config
+from .capture.batch import capture_many
+from .capture.crawl import crawl_site
+from .capture.engine import capture_page_to_disk
+from .capture.rules import load_rule_filter
+from .config import (
+    create_batch_config,
+    create_capture_config,
+    create_crawl_config,
+    create_save_config,
+)
+from .daemon.client import capture_via_daemon, ping_daemon, stop_daemon
+from .daemon.protocol import DEFAULT_TIMEOUT, default_socket_path
+from .daemon.server import CaptureDaemon
 from .errors import BrowserError, ConfigurationError, NavigationError, WebGrabError
-from .storage.saver import ResourceSaver
+from .metrics import write_prometheus_textfile, write_stats_json
+from .models import CaptureStats, SaveResult
+from .storage.compression import check_codec
+from .storage.path_resolver import QUERY_MODES
 from .url.parser import parse_url
 
 app = typer.Typer(
@@ -49,6 +64,103 @@ def capture(
         "--include-external", "-e",
         help="Include external resources (CDN assets, third-party scripts).",
     ),
+    settle: str = typer.Option(
+        "networkidle",
+        "--settle",
+        help="How to decide the page has loaded: 'networkidle' or 'adaptive'.",
+    ),
+    idle_ms: int = typer.Option(
+        500,
+        "--idle-ms",
+        min=1,
+        help="Quiet period that ends adaptive settling, in milliseconds.",
+    ),
+    block_type: list[str] | None = typer.Option(
+        None,
+        "--block-type",
+        help="Abort requests of this resource type (image, media, font, ...). Repeatable.",
+    ),
+    block_host: list[str] | None = typer.Option(
+        None,
+        "--block-host",
+        help="Abort requests to this host and its subdomains. Repeatable.",
+    ),
+    rules: list[Path] | None = typer.Option(
+        None,
+        "--rules",
+        help="Filter rule file (hosts, URL patterns, content types, sizes; EasyList subset). Repeatable.",
+    ),
+    store: Path | None = typer.Option(
+        None,
+        "--store",
+        help="Content-addressed blob store; saved files become hardlinks to shared blobs.",
+    ),
+    output_format: str = typer.Option(
+        "files",
+        "--format",
+        help="'files' writes a URL-shaped tree; 'warc' writes .warc.gz files with a CDX index.",
+    ),
+    compress: str | None = typer.Option(
+        None,
+        "--compress",
+        help="Compress text-like files with 'gzip' or 'zstd'; adds a .gz/.zst suffix.",
+    ),
+    manifest: bool = typer.Option(
+        False,
+        "--manifest",
+        help="Write manifest.jsonl with one line per saved resource.",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Revalidate resources saved by the previous run and leave unchanged files untouched.",
+    ),
+    query_mode: str = typer.Option(
+        "ignore",
+        "--query-mode",
+        help="'ignore' drops query strings from file names; 'hash' adds a short stable hash of them.",
+    ),
+    rewrite_links: bool = typer.Option(
+        False,
+        "--rewrite-links",
+        help="Point saved HTML and CSS at the local copies so the mirror works offline.",
+    ),
+    keep_existing: bool = typer.Option(
+        False,
+        "--keep-existing",
+        help="Never overwrite files already in the output directory; add a numeric suffix instead.",
+    ),
+    engine: str = typer.Option(
+        "browser",
+        "--engine",
+        help="'browser' renders with Chromium; 'http' fetches static pages without a browser.",
+    ),
+    stats_json: Path | None = typer.Option(
+        None,
+        "--stats-json",
+        help="Write per-resource timings, phase durations and histograms to this JSON file.",
+    ),
+    metrics_textfile: Path | None = typer.Option(
+        None,
+        "--metrics-textfile",
+        help="Write Prometheus metrics to this file for the node_exporter textfile collector.",
+    ),
+    use_daemon: bool = typer.Option(
+        True,
+        "--daemon/--no-daemon",
+        help="Use a running 'webgrab daemon' if available.",
+    ),
+    socket: Path | None = typer.Option(
+        None,
+        "--socket",
+        help="Daemon socket path. Defaults to $WEBGRAB_SOCKET or a per-user runtime path.",
+    ),
+    daemon_timeout: float = typer.Option(
+        DEFAULT_TIMEOUT,
+        "--daemon-timeout",
+        min=0.1,
+        help="Seconds to wait for the daemon to finish a capture.",
+    ),
     version: bool = typer.Option(
         False,
         "--version", "-v",
@@ -66,6 +178,30 @@ def capture(
         console.print(f"[red]Error: {e}[/red]")
         raise typer.Exit(1)
 
+    _validate_save_options(
+        settle, output_format, incremental, rewrite_links, compress, query_mode
+    )
+
+    if incremental and keep_existing:
+        console.print("[red]Error: --incremental and --keep-existing cannot be combined[/red]")
+        raise typer.Exit(1)
+
+    if engine not in ("browser", "http"):
+        console.print(f"[red]Error: --engine must be 'browser' or 'http', not '{engine}'[/red]")
+        raise typer.Exit(1)
+
+    if rules:
+        try:
+            rule_set = load_rule_filter(rules).rules
+        except ConfigurationError as e:
+            console.print(f"[red]Error: {e}[/red]")
+            raise typer.Exit(1)
+        console.print(
+            f"[dim]Loaded {rule_set.rule_count} filter rules"
+            + (f" ({rule_set.ignored} unsupported skipped)" if rule_set.ignored else "")
+            + "[/dim]"
+        )
+
     # Set default output directory
     if output is None:
         output = Path("./webgrab_output")
@@ -80,18 +216,51 @@ def capture(
         console.print("[dim]Including external resources[/dim]")
 
     # Create configurations
-    capture_config = create_capture_config(full_url, wait_time=wait)
-    save_config = create_save_config(output, full_url, include_external=include_external)
+    capture_config = create_capture_config(
+        full_url,
+        wait_time=wait,
+        include_external=include_external,
+        blocked_resource_types=block_type,
+        blocked_hosts=block_host,
+        rule_files=rules,
+        wait_strategy=settle,
+        idle_ms=idle_ms,
+        engine=engine,
+    )
+    save_config = create_save_config(
+        output,
+        full_url,
+        include_external=include_external,
+        blob_store=store,
+        format=output_format,
+        compress=compress is not None,
+        compression=compress or "gzip",
+        create_manifest=manifest,
+        incremental=incremental,
+        query_mode=query_mode,
+        rewrite_links=rewrite_links,
+        keep_existing=keep_existing,
+    )
+
+    socket_path = socket or default_socket_path()
+    warm = use_daemon and engine == "browser" and asyncio.run(ping_daemon(socket_path))
 
-    # Capture resources
+    # Capture and save resources
     try:
         with console.status("[bold blue]Loading page and capturing resources...") as status:
             def on_status(msg: str) -> None:
                 status.update(f"[bold blue]{msg}")
 
-            resources, stats = asyncio.run(
-                capture_page_resources(capture_config, on_status=on_status)
-            )
+            if warm:
+                stats, result = asyncio.run(
+                    capture_via_daemon(
+                        socket_path, capture_config, save_config, on_status, daemon_timeout
+                    )
+                )
+            else:
+                stats, result = asyncio.run(
+                    capture_page_to_disk(capture_config, save_config, on_status=on_status)
+                )
     except BrowserError as e:
         console.print(f"[red]Browser Error: {e}[/red]")
         console.print("[dim]Hint: Make sure you've run 'playwright install chromium'[/dim]")
@@ -106,17 +275,31 @@ def capture(
         console.print("\n[yellow]Cancelled by user[/yellow]")
         raise typer.Exit(130)
 
-    console.print(f"[green]OK[/green] Captured {len(resources)} resources")
+    if engine == "http":
+        browser_kind = "http"
+    else:
+        browser_kind = "warm daemon" if warm else "cold browser"
+    console.print(
+        f"[green]OK[/green] Captured {stats.successful_captures} resources "
+        f"in {stats.duration_seconds:.2f}s ({browser_kind})"
+    )
     if stats.skipped_urls > 0:
         console.print(f"[dim]Skipped {stats.skipped_urls} URLs (filtered)[/dim]")
+    if stats.blocked_requests > 0:
+        console.print(f"[dim]Blocked {stats.blocked_requests} requests before download[/dim]")
+    if stats.dropped_responses > 0:
+        console.print(f"[yellow]Dropped {stats.dropped_responses} responses (queue full)[/yellow]")
+    if stats.late_responses > 0:
+        console.print(
+            f"[dim]Ignored {stats.late_responses} responses that arrived after capture[/dim]"
+        )
 
-    # Save resources
-    if resources:
-        with console.status("[bold blue]Saving resources to disk..."):
-            saver = ResourceSaver(save_config)
-            result = saver.save_resources(resources)
-
+    if stats.successful_captures > 0:
         console.print(f"[green]OK[/green] Saved {result.saved_count} resources")
+        if incremental:
+            _print_incremental(result)
+        if rewrite_links:
+            console.print(f"[dim]Rewrote links in {result.rewritten_count} files[/dim]")
         if result.skipped_count > 0:
             console.print(f"[dim]Skipped {result.skipped_count} external resources (use --include-external to include)[/dim]")
         if result.total_failures > 0:
@@ -124,11 +307,531 @@ def capture(
     else:
         console.print("[yellow]No resources captured[/yellow]")
 
+    _export_stats(stats, result, stats_json, metrics_textfile)
+    console.print(f"\n[bold green]Done![/bold green] Resources saved to: {output.absolute()}")
+
+
+@app.command()
+def daemon(
+    socket: Path | None = typer.Option(
+        None,
+        "--socket", "-s",
+        help="Unix socket path. Defaults to $WEBGRAB_SOCKET or a per-user runtime path.",
+    ),
+    contexts: int = typer.Option(
+        2,
+        "--contexts", "-c",
+        min=1,
+        help="Number of captures to serve at once.",
+    ),
+    stop: bool = typer.Option(
+        False,
+        "--stop",
+        help="Stop a running daemon and exit.",
+    ),
+) -> None:
+    """Keep a warm browser running so captures skip the Chromium launch."""
+    socket_path = socket or default_socket_path()
+
+    if stop:
+        try:
+            asyncio.run(stop_daemon(socket_path))
+        except WebGrabError as e:
+            console.print(f"[red]Error: {e}[/red]")
+            raise typer.Exit(1)
+        console.print(f"[green]OK[/green] Stopped daemon on {socket_path}")
+        return
+
+    capture_daemon = CaptureDaemon(
+        socket_path,
+        contexts=contexts,
+        on_status=lambda msg: console.print(f"[dim]{msg}[/dim]"),
+    )
+    try:
+        asyncio.run(capture_daemon.serve())
+    except BrowserError as e:
+        console.print(f"[red]Browser Error: {e}[/red]")
+        console.print("[dim]Hint: Make sure you've run 'playwright install chromium'[/dim]")
+        raise typer.Exit(1)
+    except WebGrabError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    console.print("[bold green]Daemon stopped[/bold green]")
+
+
+def _read_url_list(path: Path) -> list[str]:
+    """Read URLs from a file, one per line.
+
+    Blank lines and lines starting with ``#`` are ignored, and repeated
+    URLs are only kept once.
+
+    Args:
+        path: File containing URLs.
+
+    Returns:
+        Validated, normalized URLs in file order.
+
+    Raises:
+        ConfigurationError: If the file cannot be read or a line is invalid.
+    """
+    try:
+        lines = path.read_text().splitlines()
+    except OSError as e:
+        raise ConfigurationError(f"Cannot read URL list {path}: {e}") from e
+
+    urls: dict[str, None] = {}
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            urls[parse_url(line).geturl()] = None
+        except ConfigurationError as e:
+            raise ConfigurationError(f"{path}:{line_number}: {e}") from e
+    return list(urls)
+
+
+@app.command("capture-many")
+def capture_many_command(
+    urls_file: Path = typer.Argument(
+        ...,
+        help="File with one URL per line (blank lines and # comments ignored).",
+    ),
+    output: Path | None = typer.Option(
+        None,
+        "--output", "-o",
+        help="Output directory; each page gets its own subdirectory. Defaults to ./webgrab_output",
+    ),
+    concurrency: int = typer.Option(
+        4,
+        "--concurrency", "-c",
+        min=1,
+        help="Number of pages to capture at the same time.",
+    ),
+    wait: int = typer.Option(
+        0,
+        "--wait", "-w",
+        help="Additional seconds to wait after each page load for JS content.",
+    ),
+    include_external: bool = typer.Option(
+        False,
+        "--include-external", "-e",
+        help="Include external resources (CDN assets, third-party scripts).",
+    ),
+    settle: str = typer.Option(
+        "networkidle",
+        "--settle",
+        help="How to decide the page has loaded: 'networkidle' or 'adaptive'.",
+    ),
+    store: Path | None = typer.Option(
+        None,
+        "--store",
+        help="Content-addressed blob store; saved files become hardlinks to shared blobs.",
+    ),
+    output_format: str = typer.Option(
+        "files",
+        "--format",
+        help="'files' writes a URL-shaped tree; 'warc' writes .warc.gz files with a CDX index.",
+    ),
+    compress: str | None = typer.Option(
+        None,
+        "--compress",
+        help="Compress text-like files with 'gzip' or 'zstd'; adds a .gz/.zst suffix.",
+    ),
+    manifest: bool = typer.Option(
+        False,
+        "--manifest",
+        help="Write manifest.jsonl with one line per saved resource.",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Revalidate resources saved by the previous run and leave unchanged files untouched.",
+    ),
+    query_mode: str = typer.Option(
+        "ignore",
+        "--query-mode",
+        help="'ignore' drops query strings from file names; 'hash' adds a short stable hash of them.",
+    ),
+    rewrite_links: bool = typer.Option(
+        False,
+        "--rewrite-links",
+        help="Point saved HTML and CSS at the local copies so the mirror works offline.",
+    ),
+    stats_json: Path | None = typer.Option(
+        None,
+        "--stats-json",
+        help="Write per-resource timings, phase durations and histograms to this JSON file.",
+    ),
+    metrics_textfile: Path | None = typer.Option(
+        None,
+        "--metrics-textfile",
+        help="Write Prometheus metrics to this file for the node_exporter textfile collector.",
+    ),
+) -> None:
+    """Capture many pages over one shared browser."""
+    try:
+        urls = _read_url_list(urls_file)
+    except ConfigurationError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+    if not urls:
+        console.print(f"[yellow]No URLs found in {urls_file}[/yellow]")
+        raise typer.Exit(1)
+
+    _validate_save_options(
+        settle, output_format, incremental, rewrite_links, compress, query_mode
+    )
+
+    if output is None:
+        output = Path("./webgrab_output")
+    output.mkdir(parents=True, exist_ok=True)
+
+    console.print(f"[bold]Capturing {len(urls)} pages[/bold] ({concurrency} at a time)")
+    console.print(f"[bold]Output directory:[/bold] {output.absolute()}")
+
+    batch_config = create_batch_config(
+        urls,
+        output,
+        concurrency=concurrency,
+        wait_time=wait,
+        include_external=include_external,
+        wait_strategy=settle,
+        blob_store=store,
+        format=output_format,
+        compress=compress is not None,
+        compression=compress or "gzip",
+        create_manifest=manifest,
+        incremental=incremental,
+        query_mode=query_mode,
+        rewrite_links=rewrite_links,
+    )
+
+    try:
+        with console.status("[bold blue]Launching browser...") as status:
+            def on_status(msg: str) -> None:
+                status.update(f"[bold blue]{msg}")
+
+            result = asyncio.run(capture_many(batch_config, on_status=on_status))
+    except BrowserError as e:
+        console.print(f"[red]Browser Error: {e}[/red]")
+        console.print("[dim]Hint: Make sure you've run 'playwright install chromium'[/dim]")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Cancelled by user[/yellow]")
+        raise typer.Exit(130)
+
+    stats = result.stats
+    console.print(
+        f"[green]OK[/green] Captured {result.page_count}/{len(urls)} pages "
+        f"in {stats.duration_seconds:.1f}s"
+    )
+    console.print(
+        f"[green]OK[/green] Saved {result.save_result.saved_count} resources "
+        f"({stats.total_bytes} bytes)"
+    )
+    if incremental:
+        _print_incremental(result.save_result)
+    if rewrite_links:
+        console.print(f"[dim]Rewrote links in {result.save_result.rewritten_count} files[/dim]")
+    for url, error in result.failed_pages:
+        console.print(f"[yellow]Failed: {url}: {error}[/yellow]")
+    if result.save_result.total_failures > 0:
+        console.print(
+            f"[yellow]Warning: {result.save_result.total_failures} resources failed to save[/yellow]"
+        )
+
+    _export_stats(stats, result.save_result, stats_json, metrics_textfile)
     console.print(f"\n[bold green]Done![/bold green] Resources saved to: {output.absolute()}")
+    if result.failed_count > 0:
+        raise typer.Exit(1)
+
+
+@app.command()
+def crawl(
+    url: str = typer.Argument(..., help="URL of the page to start crawling from."),
+    output: Path | None = typer.Option(
+        None,
+        "--output", "-o",
+        help="Output directory for every crawled page. Defaults to ./webgrab_output",
+    ),
+    depth: int = typer.Option(
+        2,
+        "--depth", "-d",
+        min=0,
+        help="Maximum number of links to follow from the start page.",
+    ),
+    max_pages: int = typer.Option(
+        100,
+        "--max-pages", "-n",
+        min=1,
+        help="Maximum number of pages to visit.",
+    ),
+    concurrency: int = typer.Option(
+        4,
+        "--concurrency", "-c",
+        min=1,
+        help="Number of pages to capture at the same time.",
+    ),
+    wait: int = typer.Option(
+        0,
+        "--wait", "-w",
+        help="Additional seconds to wait after each page load for JS content.",
+    ),
+    include_external: bool = typer.Option(
+        False,
+        "--include-external", "-e",
+        help="Include external resources (CDN assets, third-party scripts).",
+    ),
+    settle: str = typer.Option(
+        "networkidle",
+        "--settle",
+        help="How to decide the page has loaded: 'networkidle' or 'adaptive'.",
+    ),
+    store: Path | None = typer.Option(
+        None,
+        "--store",
+        help="Content-addressed blob store; saved files become hardlinks to shared blobs.",
+    ),
+    output_format: str = typer.Option(
+        "files",
+        "--format",
+        help="'files' writes a URL-shaped tree; 'warc' writes .warc.gz files with a CDX index.",
+    ),
+    compress: str | None = typer.Option(
+        None,
+        "--compress",
+        help="Compress text-like files with 'gzip' or 'zstd'; adds a .gz/.zst suffix.",
+    ),
+    manifest: bool = typer.Option(
+        False,
+        "--manifest",
+        help="Write manifest.jsonl with one line per saved resource.",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Revalidate resources saved by the previous run and leave unchanged files untouched.",
+    ),
+    query_mode: str = typer.Option(
+        "ignore",
+        "--query-mode",
+        help="'ignore' drops query strings from file names; 'hash' adds a short stable hash of them.",
+    ),
+    rewrite_links: bool = typer.Option(
+        False,
+        "--rewrite-links",
+        help="Point saved HTML and CSS at the local copies so the mirror works offline.",
+    ),
+    stats_json: Path | None = typer.Option(
+        None,
+        "--stats-json",
+        help="Write per-resource timings, phase durations and histograms to this JSON file.",
+    ),
+    metrics_textfile: Path | None = typer.Option(
+        None,
+        "--metrics-textfile",
+        help="Write Prometheus metrics to this file for the node_exporter textfile collector.",
+    ),
+) -> None:
+    """Crawl same-origin pages from a start URL and save their resources."""
+    try:
+        full_url = parse_url(url).geturl()
+    except ConfigurationError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+    _validate_save_options(
+        settle, output_format, incremental, rewrite_links, compress, query_mode
+    )
+
+    if output is None:
+        output = Path("./webgrab_output")
+    output.mkdir(parents=True, exist_ok=True)
+
+    console.print(f"[bold]Crawling:[/bold] {full_url} (depth {depth}, up to {max_pages} pages)")
+    console.print(f"[bold]Output directory:[/bold] {output.absolute()}")
+
+    crawl_config = create_crawl_config(
+        full_url,
+        output,
+        max_depth=depth,
+        max_pages=max_pages,
+        concurrency=concurrency,
+        wait_time=wait,
+        include_external=include_external,
+        wait_strategy=settle,
+        blob_store=store,
+        format=output_format,
+        compress=compress is not None,
+        compression=compress or "gzip",
+        create_manifest=manifest,
+        incremental=incremental,
+        query_mode=query_mode,
+        rewrite_links=rewrite_links,
+    )
+
+    try:
+        with console.status("[bold blue]Launching browser...") as status:
+            def on_status(msg: str) -> None:
+                status.update(f"[bold blue]{msg}")
+
+            result = asyncio.run(crawl_site(crawl_config, on_status=on_status))
+    except BrowserError as e:
+        console.print(f"[red]Browser Error: {e}[/red]")
+        console.print("[dim]Hint: Make sure you've run 'playwright install chromium'[/dim]")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Cancelled by user[/yellow]")
+        raise typer.Exit(130)
+
+    stats = result.stats
+    console.print(
+        f"[green]OK[/green] Crawled {result.page_count} pages "
+        f"in {stats.duration_seconds:.1f}s"
+    )
+    console.print(
+        f"[green]OK[/green] Saved {result.save_result.saved_count} resources "
+        f"({stats.total_bytes} bytes)"
+    )
+    if incremental:
+        _print_incremental(result.save_result)
+    if rewrite_links:
+        console.print(f"[dim]Rewrote links in {result.save_result.rewritten_count} files[/dim]")
+    if result.duplicate_resources > 0:
+        console.print(f"[dim]Skipped {result.duplicate_resources} resources shared between pages[/dim]")
+    for page_url, error in result.failed_pages:
+        console.print(f"[yellow]Failed: {page_url}: {error}[/yellow]")
+    if result.save_result.total_failures > 0:
+        console.print(
+            f"[yellow]Warning: {result.save_result.total_failures} resources failed to save[/yellow]"
+        )
+
+    _export_stats(stats, result.save_result, stats_json, metrics_textfile)
+    console.print(f"\n[bold green]Done![/bold green] Resources saved to: {output.absolute()}")
+    if result.page_count == 0:
+        raise typer.Exit(1)
+
+
+def _validate_save_options(
+    settle: str,
+    output_format: str,
+    incremental: bool,
+    rewrite_links: bool,
+    compress: str | None,
+    query_mode: str,
+) -> None:
+    """Reject invalid or conflicting options shared by the capture commands.
+
+    Args:
+        settle: Value of ``--settle``.
+        output_format: Value of ``--format``.
+        incremental: Whether ``--incremental`` was given.
+        rewrite_links: Whether ``--rewrite-links`` was given.
+        compress: Value of ``--compress``, or None.
+        query_mode: Value of ``--query-mode``.
+
+    Raises:
+        typer.Exit: If an option is invalid, after printing the error.
+    """
+    if settle not in ("networkidle", "adaptive"):
+        console.print(f"[red]Error: --settle must be 'networkidle' or 'adaptive', not '{settle}'[/red]")
+        raise typer.Exit(1)
+
+    if output_format not in ("files", "warc"):
+        console.print(f"[red]Error: --format must be 'files' or 'warc', not '{output_format}'[/red]")
+        raise typer.Exit(1)
+
+    if incremental and output_format != "files":
+        console.print("[red]Error: --incremental only works with --format files[/red]")
+        raise typer.Exit(1)
+
+    if rewrite_links and output_format != "files":
+        console.print("[red]Error: --rewrite-links only works with --format files[/red]")
+        raise typer.Exit(1)
+
+    if rewrite_links and compress is not None:
+        console.print("[red]Error: --rewrite-links and --compress cannot be combined[/red]")
+        raise typer.Exit(1)
+
+    if query_mode not in QUERY_MODES:
+        console.print(f"[red]Error: --query-mode must be 'ignore' or 'hash', not '{query_mode}'[/red]")
+        raise typer.Exit(1)
+
+    if compress is not None:
+        try:
+            check_codec(compress)
+        except ConfigurationError as e:
+            console.print(f"[red]Error: {e}[/red]")
+            raise typer.Exit(1)
+
+
+def _print_incremental(result: SaveResult) -> None:
+    """Print how an incremental run compared with the previous one.
+
+    Args:
+        result: Save result of the run.
+    """
+    console.print(
+        f"[dim]{result.added_count} added, {result.changed_count} changed, "
+        f"{result.unchanged_count} unchanged[/dim]"
+    )
+
+
+def _export_stats(
+    stats: CaptureStats,
+    save_result: SaveResult,
+    stats_json: Path | None,
+    metrics_textfile: Path | None,
+) -> None:
+    """Write the stats exports requested on the command line.
+
+    Args:
+        stats: Capture statistics.
+        save_result: Result of saving the captured resources.
+        stats_json: Path for the JSON report, if requested.
+        metrics_textfile: Path for the Prometheus textfile, if requested.
+
+    Raises:
+        typer.Exit: If an export cannot be written.
+    """
+    try:
+        if stats_json is not None:
+            write_stats_json(stats_json, stats, save_result)
+            console.print(f"[dim]Wrote stats to {stats_json}[/dim]")
+        if metrics_textfile is not None:
+            write_prometheus_textfile(metrics_textfile, stats, save_result)
+            console.print(f"[dim]Wrote metrics to {metrics_textfile}[/dim]")
+    except WebGrabError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+
+def _with_default_command(args: list[str]) -> list[str]:
+    """Route bare ``webgrab <url>`` invocations to the capture command.
+
+    Args:
+        args: Command-line arguments without the program name.
+
+    Returns:
+        Arguments with ``capture`` inserted when no command was given.
+    """
+    commands: set[str] = set()
+    for command in app.registered_commands:
+        if command.name:
+            commands.add(command.name)
+        elif command.callback is not None:
+            # Typer names the command after its callback, dashing underscores
+            commands.add(command.callback.__name__.replace("_", "-"))
+    if args and args[0] not in commands and args[0] not in ("--help", "-h"):
+        return ["capture", *args]
+    return args
 
 
 def main() -> None:
     """Entry point for the CLI."""
+    sys.argv[1:] = _with_default_command(sys.argv[1:])
     app()
 
 
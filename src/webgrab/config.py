@@ -2,7 +2,7 @@
 
 from pathlib import Path
 
-from .models import CaptureConfig, SaveConfig
+from .models import BatchConfig, CaptureConfig, CrawlConfig, SaveConfig
 
 
 def create_capture_config(
@@ -10,6 +10,15 @@ def create_capture_config(
     wait_time: int = 0,
     timeout: int = 60000,
     headless: bool = True,
+    body_fetch_concurrency: int = 8,
+    include_external: bool = False,
+    blocked_resource_types: list[str] | None = None,
+    blocked_hosts: list[str] | None = None,
+    rule_files: list[Path] | None = None,
+    wait_strategy: str = "networkidle",
+    idle_ms: int = 500,
+    spill_threshold: int | None = 16 * 1024 * 1024,
+    engine: str = "browser",
 ) -> CaptureConfig:
     """Create a capture configuration with defaults.
 
@@ -18,6 +27,16 @@ def create_capture_config(
         wait_time: Additional wait time in seconds.
         timeout: Navigation timeout in milliseconds.
         headless: Whether to run browser in headless mode.
+        body_fetch_concurrency: Maximum response bodies fetched at once.
+        include_external: Whether to capture external resources.
+        blocked_resource_types: Resource types to abort at request level.
+        blocked_hosts: Hosts (and subdomains) to abort at request level.
+        rule_files: Filter rule files compiled into a ``RuleFilter``.
+        wait_strategy: ``networkidle`` or ``adaptive`` settling.
+        idle_ms: Quiet period that ends adaptive settling, in milliseconds.
+        spill_threshold: Body size in bytes above which bodies are kept in
+            a temporary file instead of memory; None disables spilling.
+        engine: ``browser`` (Chromium) or ``http`` (browserless fetch).
 
     Returns:
         CaptureConfig instance.
@@ -27,6 +46,15 @@ def create_capture_config(
         wait_time=wait_time,
         timeout=timeout,
         headless=headless,
+        body_fetch_concurrency=body_fetch_concurrency,
+        include_external=include_external,
+        blocked_resource_types=list(blocked_resource_types or []),
+        blocked_hosts=list(blocked_hosts or []),
+        rule_files=[Path(path) for path in rule_files or []],
+        wait_strategy=wait_strategy,
+        idle_ms=idle_ms,
+        spill_threshold=spill_threshold,
+        engine=engine,
     )
 
 
@@ -34,6 +62,17 @@ def create_save_config(
     output_dir: Path,
     base_url: str,
     include_external: bool = False,
+    blob_store: Path | None = None,
+    write_workers: int = 8,
+    atomic_writes: bool = False,
+    format: str = "files",
+    compress: bool = False,
+    compression: str = "gzip",
+    create_manifest: bool = False,
+    incremental: bool = False,
+    query_mode: str = "ignore",
+    rewrite_links: bool = False,
+    keep_existing: bool = False,
 ) -> SaveConfig:
     """Create a save configuration with defaults.
 
@@ -41,6 +80,21 @@ def create_save_config(
         output_dir: Output directory path.
         base_url: Base URL for origin checks.
         include_external: Whether to include external resources.
+        blob_store: Content-addressed store directory; output files become
+            links to its blobs when set.
+        write_workers: Threads writing files in ``save_resources``.
+        atomic_writes: Write via a temporary file and rename.
+        format: ``files`` for a URL-shaped tree or ``warc`` for WARC files.
+        compress: Whether to compress text-like bodies when saving files.
+        compression: ``gzip`` or ``zstd`` (needs the ``zstandard`` package).
+        create_manifest: Whether to write ``manifest.jsonl`` while saving.
+        incremental: Whether to skip resources unchanged since the last run.
+        query_mode: ``ignore`` or ``hash`` to add a hash of the query string
+            to file names.
+        rewrite_links: Whether to point saved HTML and CSS at the local
+            copies of the resources they reference.
+        keep_existing: Never overwrite files already in ``output_dir``;
+            new files with the same name get a numeric suffix.
 
     Returns:
         SaveConfig instance.
@@ -49,4 +103,135 @@ def create_save_config(
         output_dir=output_dir,
         base_url=base_url,
         include_external=include_external,
+        blob_store=blob_store,
+        write_workers=write_workers,
+        atomic_writes=atomic_writes,
+        format=format,
+        compress=compress,
+        compression=compression,
+        create_manifest=create_manifest,
+        incremental=incremental,
+        query_mode=query_mode,
+        rewrite_links=rewrite_links,
+        keep_existing=keep_existing,
+    )
+
+
+def create_batch_config(
+    urls: list[str],
+    output_dir: Path,
+    concurrency: int = 4,
+    wait_time: int = 0,
+    include_external: bool = False,
+    wait_strategy: str = "networkidle",
+    blob_store: Path | None = None,
+    format: str = "files",
+    compress: bool = False,
+    compression: str = "gzip",
+    create_manifest: bool = False,
+    incremental: bool = False,
+    query_mode: str = "ignore",
+    rewrite_links: bool = False,
+) -> BatchConfig:
+    """Create a batch capture configuration with defaults.
+
+    Args:
+        urls: URLs to capture.
+        output_dir: Output directory path; each page gets a subdirectory.
+        concurrency: Number of pages captured at the same time.
+        wait_time: Additional wait time in seconds per page.
+        include_external: Whether to include external resources.
+        wait_strategy: ``networkidle`` or ``adaptive`` settling per page.
+        blob_store: Content-addressed store directory shared by all pages.
+        format: ``files`` for a URL-shaped tree or ``warc`` for WARC files.
+        compress: Whether to compress text-like bodies when saving files.
+        compression: ``gzip`` or ``zstd``.
+        create_manifest: Whether to write ``manifest.jsonl`` while saving.
+        incremental: Whether to skip resources unchanged since the last run.
+        query_mode: ``ignore`` or ``hash`` to add a hash of the query string
+            to file names.
+        rewrite_links: Whether to point saved HTML and CSS at the local
+            copies of the resources they reference.
+
+    Returns:
+        BatchConfig instance.
+    """
+    return BatchConfig(
+        urls=urls,
+        output_dir=output_dir,
+        concurrency=concurrency,
+        wait_time=wait_time,
+        include_external=include_external,
+        wait_strategy=wait_strategy,
+        blob_store=blob_store,
+        format=format,
+        compress=compress,
+        compression=compression,
+        create_manifest=create_manifest,
+        incremental=incremental,
+        query_mode=query_mode,
+        rewrite_links=rewrite_links,
+    )
+
+
+def create_crawl_config(
+    start_url: str,
+    output_dir: Path,
+    max_depth: int = 2,
+    max_pages: int = 100,
+    concurrency: int = 4,
+    wait_time: int = 0,
+    include_external: bool = False,
+    wait_strategy: str = "networkidle",
+    blob_store: Path | None = None,
+    format: str = "files",
+    compress: bool = False,
+    compression: str = "gzip",
+    create_manifest: bool = False,
+    incremental: bool = False,
+    query_mode: str = "ignore",
+    rewrite_links: bool = False,
+) -> CrawlConfig:
+    """Create a site crawl configuration with defaults.
+
+    Args:
+        start_url: Page the crawl starts from.
+        output_dir: Output directory shared by every crawled page.
+        max_depth: Maximum link depth from the start page.
+        max_pages: Maximum number of pages to visit.
+        concurrency: Number of pages captured at the same time.
+        wait_time: Additional wait time in seconds per page.
+        include_external: Whether to include external resources.
+        wait_strategy: ``networkidle`` or ``adaptive`` settling per page.
+        blob_store: Content-addressed store directory shared by all pages.
+        format: ``files`` for a URL-shaped tree or ``warc`` for WARC files.
+        compress: Whether to compress text-like bodies when saving files.
+        compression: ``gzip`` or ``zstd``.
+        create_manifest: Whether to write ``manifest.jsonl`` while saving.
+        incremental: Whether to skip resources unchanged since the last run.
+        query_mode: ``ignore`` or ``hash`` to add a hash of the query string
+            to file names.
+        rewrite_links: Whether to point saved HTML and CSS at the local
+            copies of the resources they reference.
+
+    Returns:
+        CrawlConfig instance.
+    """
+    return CrawlConfig(
+        start_url=start_url,
+        output_dir=output_dir,
+        max_depth=max_depth,
+        max_pages=max_pages,
+        concurrency=concurrency,
+        wait_time=wait_time,
+        include_external=include_external,
+        wait_strategy=wait_strategy,
+        blob_store=blob_store,
+        format=format,
+        compress=compress,
+        compression=compression,
+        create_manifest=create_manifest,
+        incremental=incremental,
+        query_mode=query_mode,
+        rewrite_links=rewrite_links,
     )
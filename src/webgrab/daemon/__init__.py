@@ -0,0 +1 @@
+"""Warm-browser capture daemon for webgrab."""
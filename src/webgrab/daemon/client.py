@@ -0,0 +1,188 @@
+"""Client side of the capture daemon protocol."""
+
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from ..errors import DaemonError, WebGrabError
+from ..models import CaptureConfig, CaptureStats, SaveConfig, SaveResult
+from .protocol import (
+    DEFAULT_TIMEOUT,
+    ERROR_TYPES,
+    PING_TIMEOUT,
+    decode_message,
+    encode_message,
+    save_result_from_dict,
+    stats_from_dict,
+    unix_sockets_supported,
+)
+
+
+async def _request(
+    socket_path: Path,
+    message: dict[str, Any],
+    on_status: Callable[[str], None] | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> dict[str, Any]:
+    """Send one request to the daemon and wait for its reply.
+
+    Args:
+        socket_path: Daemon socket path.
+        message: Request message.
+        on_status: Optional callback for status lines sent by the daemon.
+        timeout: Seconds to wait for the final reply.
+
+    Returns:
+        Final reply message.
+
+    Raises:
+        DaemonError: If the daemon cannot be reached, hangs up early or
+            does not reply in time.
+    """
+    if not unix_sockets_supported():
+        raise DaemonError("The capture daemon requires Unix domain sockets")
+
+    try:
+        return await asyncio.wait_for(
+            _exchange(socket_path, message, on_status), timeout
+        )
+    except asyncio.TimeoutError as e:
+        raise DaemonError(
+            f"Daemon at {socket_path} did not reply within {timeout:g}s"
+        ) from e
+
+
+async def _exchange(
+    socket_path: Path,
+    message: dict[str, Any],
+    on_status: Callable[[str], None] | None,
+) -> dict[str, Any]:
+    """Connect to the daemon, send a request and read until the reply."""
+    try:
+        reader, writer = await asyncio.open_unix_connection(str(socket_path))
+    except OSError as e:
+        raise DaemonError(f"Cannot connect to daemon at {socket_path}: {e}") from e
+
+    try:
+        writer.write(encode_message(message))
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise DaemonError("Daemon closed the connection without a reply")
+            reply = decode_message(line)
+            if "status" in reply:
+                if on_status:
+                    on_status(reply["status"])
+                continue
+            return reply
+    finally:
+        writer.close()
+
+
+def _raise_for_reply(reply: dict[str, Any]) -> None:
+    """Re-raise an error reply with its original exception type.
+
+    Args:
+        reply: Reply message.
+
+    Raises:
+        WebGrabError: If the reply reports a failure.
+    """
+    if not reply.get("ok"):
+        error_type = ERROR_TYPES.get(reply.get("kind", ""), WebGrabError)
+        raise error_type(reply.get("error", "Unknown daemon error"))
+
+
+async def ping_daemon(socket_path: Path) -> bool:
+    """Check whether a daemon is listening.
+
+    Args:
+        socket_path: Daemon socket path.
+
+    Returns:
+        True if a daemon answered the ping.
+    """
+    if not unix_sockets_supported() or not socket_path.exists():
+        return False
+    try:
+        reply = await _request(socket_path, {"command": "ping"}, timeout=PING_TIMEOUT)
+    except WebGrabError:
+        return False
+    return bool(reply.get("ok"))
+
+
+async def stop_daemon(socket_path: Path) -> None:
+    """Ask a running daemon to shut down.
+
+    Args:
+        socket_path: Daemon socket path.
+
+    Raises:
+        DaemonError: If no daemon is listening.
+    """
+    _raise_for_reply(
+        await _request(socket_path, {"command": "shutdown"}, timeout=PING_TIMEOUT)
+    )
+
+
+async def capture_via_daemon(
+    socket_path: Path,
+    capture_config: CaptureConfig,
+    save_config: SaveConfig,
+    on_status: Callable[[str], None] | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> tuple[CaptureStats, SaveResult]:
+    """Capture and save a page using a running daemon's warm browser.
+
+    Args:
+        socket_path: Daemon socket path.
+        capture_config: Capture configuration.
+        save_config: Save configuration; the output directory is resolved
+            to an absolute path since the daemon has its own working
+            directory.
+        on_status: Optional callback for status updates.
+        timeout: Seconds to wait for the daemon to finish the capture.
+
+    Returns:
+        Tuple of (capture statistics, save result).
+
+    Raises:
+        DaemonError: If the daemon cannot be reached or does not reply
+            in time.
+        NavigationError: If the page fails to load.
+        WebGrabError: For other capture failures reported by the daemon.
+    """
+    reply = await _request(
+        socket_path,
+        {
+            "command": "capture",
+            "url": capture_config.url,
+            "wait_time": capture_config.wait_time,
+            "output_dir": str(Path(save_config.output_dir).absolute()),
+            "include_external": save_config.include_external,
+            "format": save_config.format,
+            "compress": save_config.compress,
+            "compression": save_config.compression,
+            "create_manifest": save_config.create_manifest,
+            "incremental": save_config.incremental,
+            "keep_existing": save_config.keep_existing,
+            "query_mode": save_config.query_mode,
+            "rewrite_links": save_config.rewrite_links,
+            "blob_store": (
+                str(Path(save_config.blob_store).absolute())
+                if save_config.blob_store
+                else None
+            ),
+            "blocked_resource_types": capture_config.blocked_resource_types,
+            "blocked_hosts": capture_config.blocked_hosts,
+            "rule_files": [str(Path(path).absolute()) for path in capture_config.rule_files],
+            "wait_strategy": capture_config.wait_strategy,
+            "idle_ms": capture_config.idle_ms,
+        },
+        on_status,
+        timeout,
+    )
+    _raise_for_reply(reply)
+    return stats_from_dict(reply["stats"]), save_result_from_dict(reply["save_result"])
@@ -0,0 +1,157 @@
+"""Wire protocol shared by the capture daemon and its clients.
+
+Messages are single-line JSON objects. A client sends one request and
+reads zero or more ``{"status": ...}`` lines followed by one final reply
+with an ``ok`` field.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from ..errors import BrowserError, NavigationError, WebGrabError
+from ..metrics import metrics_from_dict, metrics_to_dict
+from ..models import CaptureStats, SaveResult
+
+SOCKET_ENV_VAR = "WEBGRAB_SOCKET"
+
+# Seconds a client waits for a capture reply, and for a ping
+DEFAULT_TIMEOUT = 300.0
+PING_TIMEOUT = 5.0
+
+# Error kinds that are re-raised with their original type on the client side
+ERROR_TYPES: dict[str, type[WebGrabError]] = {
+    "BrowserError": BrowserError,
+    "NavigationError": NavigationError,
+}
+
+
+def unix_sockets_supported() -> bool:
+    """Check whether the platform supports the daemon's Unix socket.
+
+    Returns:
+        True if Unix domain sockets are available.
+    """
+    return sys.platform != "win32" and hasattr(os, "getuid")
+
+
+def default_socket_path() -> Path:
+    """Get the socket path used when none is given explicitly.
+
+    Returns:
+        ``$WEBGRAB_SOCKET`` if set, otherwise a per-user path in
+        ``$XDG_RUNTIME_DIR`` or the temp directory.
+    """
+    if os.environ.get(SOCKET_ENV_VAR):
+        return Path(os.environ[SOCKET_ENV_VAR])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "webgrab.sock"
+    user_suffix = f"-{os.getuid()}" if hasattr(os, "getuid") else ""
+    return Path(tempfile.gettempdir()) / f"webgrab{user_suffix}.sock"
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    """Encode a message as one JSON line.
+
+    Args:
+        message: Message to encode.
+
+    Returns:
+        UTF-8 encoded line including the trailing newline.
+    """
+    return json.dumps(message).encode() + b"\n"
+
+
+def decode_message(line: bytes) -> dict[str, Any]:
+    """Decode one JSON line.
+
+    Args:
+        line: Raw line read from the socket.
+
+    Returns:
+        Decoded message.
+
+    Raises:
+        WebGrabError: If the line is not a JSON object.
+    """
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise WebGrabError(f"Malformed daemon message: {e}") from e
+    if not isinstance(message, dict):
+        raise WebGrabError("Malformed daemon message: expected an object")
+    return message
+
+
+def stats_to_dict(stats: CaptureStats) -> dict[str, Any]:
+    """Serialize capture statistics.
+
+    Args:
+        stats: Capture statistics.
+
+    Returns:
+        JSON-compatible dict.
+    """
+    data = dict(vars(stats))
+    data["metrics"] = metrics_to_dict(stats.metrics)
+    return data
+
+
+def stats_from_dict(data: dict[str, Any]) -> CaptureStats:
+    """Deserialize capture statistics.
+
+    Args:
+        data: Dict produced by ``stats_to_dict``.
+
+    Returns:
+        CaptureStats instance.
+    """
+    fields = dict(data)
+    metrics = fields.pop("metrics", None)
+    stats = CaptureStats(**fields)
+    if metrics is not None:
+        stats.metrics = metrics_from_dict(metrics)
+    return stats
+
+
+def save_result_to_dict(result: SaveResult) -> dict[str, Any]:
+    """Serialize a save result.
+
+    Args:
+        result: Save result.
+
+    Returns:
+        JSON-compatible dict; failures are reduced to their messages.
+    """
+    return {
+        "saved_paths": [str(path) for path in result.saved_paths],
+        "skipped_count": result.skipped_count,
+        "failed_saves": [[url, str(error)] for url, error in result.failed_saves],
+        "added_count": result.added_count,
+        "changed_count": result.changed_count,
+        "unchanged_count": result.unchanged_count,
+        "rewritten_count": result.rewritten_count,
+    }
+
+
+def save_result_from_dict(data: dict[str, Any]) -> SaveResult:
+    """Deserialize a save result.
+
+    Args:
+        data: Dict produced by ``save_result_to_dict``.
+
+    Returns:
+        SaveResult instance.
+    """
+    return SaveResult(
+        saved_paths=[Path(path) for path in data["saved_paths"]],
+        skipped_count=data["skipped_count"],
+        failed_saves=[(url, WebGrabError(message)) for url, message in data["failed_saves"]],
+        added_count=data.get("added_count", 0),
+        changed_count=data.get("changed_count", 0),
+        unchanged_count=data.get("unchanged_count", 0),
+        rewritten_count=data.get("rewritten_count", 0),
+    )
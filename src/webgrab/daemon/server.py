@@ -0,0 +1,235 @@
+"""Capture daemon that keeps a warm browser behind a Unix socket."""
+
+import asyncio
+import contextlib
+import signal
+import socket
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from ..capture.browser import BrowserPool
+from ..capture.engine import CaptureEngine
+from ..config import create_capture_config, create_save_config
+from ..errors import DaemonError, WebGrabError
+from ..models import CaptureConfig
+from .protocol import (
+    ERROR_TYPES,
+    decode_message,
+    encode_message,
+    save_result_to_dict,
+    stats_to_dict,
+    unix_sockets_supported,
+)
+
+
+class CaptureDaemon:
+    """Serves capture requests from one warm browser.
+
+    The browser is launched once when the daemon starts, so each request
+    only pays for opening a context and a page and navigating. Requests
+    come from unrelated callers, so each gets its own context and no
+    cookies or storage carry over between them. Captured resources are
+    saved by the daemon itself; only statistics travel over the socket.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        contexts: int = 2,
+        headless: bool = True,
+        on_status: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize the daemon.
+
+        Args:
+            socket_path: Unix socket path to listen on.
+            contexts: Number of captures to serve at once.
+            headless: Whether to run the browser in headless mode.
+            on_status: Optional callback for log messages.
+        """
+        self.socket_path = socket_path
+        self.contexts = contexts
+        self.headless = headless
+        self.on_status = on_status
+        self.pool: BrowserPool | None = None
+        self._stop_event = asyncio.Event()
+
+    def _update_status(self, message: str) -> None:
+        """Send status update if callback is set.
+
+        Args:
+            message: Status message.
+        """
+        if self.on_status:
+            self.on_status(message)
+
+    def _claim_socket_path(self) -> None:
+        """Remove a stale socket file, refusing to replace a live daemon.
+
+        Raises:
+            DaemonError: If another daemon is already listening.
+        """
+        if not self.socket_path.exists():
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()
+                return
+        raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+
+    def stop(self) -> None:
+        """Ask the daemon to shut down."""
+        self._stop_event.set()
+
+    async def serve(self) -> None:
+        """Launch the browser and serve requests until stopped.
+
+        Raises:
+            DaemonError: If the platform lacks Unix sockets or the socket
+                path is taken.
+            BrowserError: If the browser cannot be launched.
+        """
+        if not unix_sockets_supported():
+            raise DaemonError("The capture daemon requires Unix domain sockets")
+
+        self._claim_socket_path()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        pool_config = CaptureConfig(url="about:blank", headless=self.headless)
+        try:
+            async with BrowserPool(pool_config, self.contexts, isolated=True) as pool:
+                self.pool = pool
+                server = await asyncio.start_unix_server(
+                    self._handle_client, path=str(self.socket_path)
+                )
+                self._update_status(
+                    f"Listening on {self.socket_path}, serving {self.contexts} captures at once"
+                )
+                async with server:
+                    await self._stop_event.wait()
+        finally:
+            self.pool = None
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            with contextlib.suppress(FileNotFoundError):
+                self.socket_path.unlink()
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Handle one client connection.
+
+        Args:
+            reader: Stream to read the request from.
+            writer: Stream to write status lines and the reply to.
+        """
+
+        def send(message: dict[str, Any]) -> None:
+            writer.write(encode_message(message))
+
+        try:
+            request = decode_message(await reader.readline())
+            reply = await self._dispatch(request, lambda msg: send({"status": msg}))
+        except WebGrabError as e:
+            reply = {"ok": False, "error": str(e), "kind": type(e).__name__}
+        except Exception as e:  # noqa: BLE001 - reply rather than drop the client
+            reply = {"ok": False, "error": f"Internal daemon error: {e}", "kind": "WebGrabError"}
+
+        try:
+            send(reply)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _dispatch(
+        self, request: dict[str, Any], on_status: Callable[[str], None]
+    ) -> dict[str, Any]:
+        """Route a request to its handler.
+
+        Args:
+            request: Decoded request.
+            on_status: Callback forwarding status lines to the client.
+
+        Returns:
+            Reply message.
+
+        Raises:
+            DaemonError: If the command is unknown.
+        """
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True, "contexts": self.contexts}
+        if command == "shutdown":
+            self.stop()
+            return {"ok": True}
+        if command == "capture":
+            return await self._capture(request, on_status)
+        raise DaemonError(f"Unknown daemon command: {command!r}")
+
+    async def _capture(
+        self, request: dict[str, Any], on_status: Callable[[str], None]
+    ) -> dict[str, Any]:
+        """Capture a page in a fresh context and save its resources.
+
+        Args:
+            request: Capture request with ``url``, ``output_dir``,
+                ``wait_time`` and ``include_external``.
+            on_status: Callback forwarding status lines to the client.
+
+        Returns:
+            Reply with serialized statistics and save result.
+        """
+        assert self.pool is not None
+        capture_config = create_capture_config(
+            request["url"],
+            wait_time=request.get("wait_time", 0),
+            include_external=request.get("include_external", False),
+            blocked_resource_types=request.get("blocked_resource_types"),
+            blocked_hosts=request.get("blocked_hosts"),
+            rule_files=request.get("rule_files"),
+            wait_strategy=request.get("wait_strategy", "networkidle"),
+            idle_ms=request.get("idle_ms", 500),
+        )
+        save_config = create_save_config(
+            Path(request["output_dir"]),
+            capture_config.url,
+            include_external=request.get("include_external", False),
+            blob_store=Path(request["blob_store"]) if request.get("blob_store") else None,
+            format=request.get("format", "files"),
+            compress=request.get("compress", False),
+            compression=request.get("compression", "gzip"),
+            create_manifest=request.get("create_manifest", False),
+            incremental=request.get("incremental", False),
+            keep_existing=request.get("keep_existing", False),
+            query_mode=request.get("query_mode", "ignore"),
+            rewrite_links=request.get("rewrite_links", False),
+        )
+
+        try:
+            async with self.pool.acquire() as context:
+                engine = CaptureEngine(capture_config, on_status=on_status, context=context)
+                stats, result = await engine.capture_to_disk(save_config)
+        except WebGrabError as e:
+            kind = type(e).__name__ if type(e).__name__ in ERROR_TYPES else "WebGrabError"
+            return {"ok": False, "error": str(e), "kind": kind}
+
+        self._update_status(
+            f"Captured {request['url']}: {result.saved_count} resources "
+            f"in {stats.duration_seconds:.2f}s"
+        )
+        return {
+            "ok": True,
+            "stats": stats_to_dict(stats),
+            "save_result": save_result_to_dict(result),
+        }
@@ -41,6 +41,12 @@ class ResourceError(CaptureError):
         super().__init__(f"Resource error for {url}: {message}")
 
 
+class DaemonError(WebGrabError):
+    """Exception raised when talking to the capture daemon fails."""
+
+    pass
+
+
 class StorageError(WebGrabError):
     """Base exception for storage-related errors."""
 
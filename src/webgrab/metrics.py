@@ -0,0 +1,282 @@
+"""Export capture statistics as a JSON report or a Prometheus textfile."""
+
+import json
+import math
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from .models import CaptureMetrics, CaptureStats, Histogram, ResourceTiming, SaveResult
+from .storage.writer import write_file
+
+REPORT_VERSION = 1
+
+METRIC_PREFIX = "webgrab"
+
+# CaptureStats counters exported as gauges, with their help text
+CAPTURE_COUNTERS = {
+    "total_requests": "Responses seen",
+    "successful_captures": "Resources captured",
+    "failed_captures": "Resources whose body could not be fetched",
+    "skipped_urls": "Responses dropped by filters",
+    "blocked_requests": "Requests aborted before download",
+    "dropped_responses": "Responses dropped because the queue was full",
+    "late_responses": "Responses that arrived after capture finished",
+    "not_modified": "Resources answered with 304 Not Modified",
+    "total_bytes": "Bytes captured",
+}
+
+
+def histogram_to_dict(histogram: Histogram) -> dict[str, Any]:
+    """Serialize a histogram.
+
+    Args:
+        histogram: Histogram to serialize.
+
+    Returns:
+        JSON-compatible dict.
+    """
+    return {
+        "bounds": list(histogram.bounds),
+        "counts": list(histogram.counts),
+        "total": histogram.total,
+    }
+
+
+def metrics_to_dict(metrics: CaptureMetrics) -> dict[str, Any]:
+    """Serialize capture metrics.
+
+    Args:
+        metrics: Capture metrics.
+
+    Returns:
+        JSON-compatible dict; ``metrics_from_dict`` restores it.
+    """
+    return {
+        "phases": dict(metrics.phases),
+        "filter_seconds": metrics.filter_seconds,
+        "timings": [asdict(timing) for timing in metrics.timings],
+        "size_histogram": histogram_to_dict(metrics.size_histogram),
+        "latency_histogram": histogram_to_dict(metrics.latency_histogram),
+    }
+
+
+def metrics_from_dict(data: dict[str, Any]) -> CaptureMetrics:
+    """Deserialize capture metrics.
+
+    Args:
+        data: Dict produced by ``metrics_to_dict``.
+
+    Returns:
+        CaptureMetrics instance.
+    """
+    return CaptureMetrics(
+        phases=dict(data["phases"]),
+        filter_seconds=data["filter_seconds"],
+        timings=[ResourceTiming(**timing) for timing in data["timings"]],
+        size_histogram=Histogram(**data["size_histogram"]),
+        latency_histogram=Histogram(**data["latency_histogram"]),
+    )
+
+
+def _buckets(histogram: Histogram) -> list[list[Any]]:
+    """Cumulative buckets with the last bound written as ``+Inf``."""
+    return [
+        ["+Inf" if math.isinf(bound) else bound, count]
+        for bound, count in histogram.cumulative()
+    ]
+
+
+def stats_report(
+    stats: CaptureStats, save_result: SaveResult | None = None
+) -> dict[str, Any]:
+    """Build the structured report written by ``--stats-json``.
+
+    Args:
+        stats: Capture statistics.
+        save_result: Optional result of saving the captured resources.
+
+    Returns:
+        JSON-compatible dict with counters, phase durations, histograms and
+        one entry per captured resource.
+    """
+    metrics = stats.metrics
+    report: dict[str, Any] = {
+        "version": REPORT_VERSION,
+        "generated_at": time.time(),
+        "duration_seconds": stats.duration_seconds,
+        "counters": {name: getattr(stats, name) for name in CAPTURE_COUNTERS},
+    }
+    if save_result is not None:
+        report["save"] = {
+            "saved": save_result.saved_count,
+            "skipped": save_result.skipped_count,
+            "failed": save_result.total_failures,
+            "rewritten": save_result.rewritten_count,
+        }
+    report["phases"] = dict(metrics.phases)
+    report["resource_seconds"] = metrics.resource_seconds()
+    report["histograms"] = {
+        name: {
+            "buckets": _buckets(histogram),
+            "sum": histogram.total,
+            "count": histogram.count,
+        }
+        for name, histogram in (
+            ("size_bytes", metrics.size_histogram),
+            ("latency_seconds", metrics.latency_histogram),
+        )
+    }
+    report["resources"] = [
+        {**asdict(timing), "latency": timing.latency} for timing in metrics.timings
+    ]
+    return report
+
+
+def write_stats_json(
+    path: Path, stats: CaptureStats, save_result: SaveResult | None = None
+) -> None:
+    """Write the JSON report of a capture.
+
+    Args:
+        path: Report path.
+        stats: Capture statistics.
+        save_result: Optional result of saving the captured resources.
+
+    Raises:
+        FileWriteError: If writing fails.
+    """
+    text = json.dumps(stats_report(stats, save_result), indent=2) + "\n"
+    write_file(path, text.encode("utf-8"))
+
+
+def _value(value: float) -> str:
+    """Format a sample value in the Prometheus text format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _Exposition:
+    """Builds a Prometheus text exposition one metric family at a time."""
+
+    def __init__(self) -> None:
+        """Initialize an empty exposition."""
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> str:
+        """Start a metric family and return its full name."""
+        full_name = f"{METRIC_PREFIX}_{name}"
+        self.lines.append(f"# HELP {full_name} {help_text}")
+        self.lines.append(f"# TYPE {full_name} {kind}")
+        return full_name
+
+    def sample(
+        self, name: str, value: float, labels: dict[str, str] | None = None
+    ) -> None:
+        """Add one sample."""
+        if labels:
+            label_text = ",".join(
+                f'{key}="{_escape(label)}"' for key, label in labels.items()
+            )
+            name = f"{name}{{{label_text}}}"
+        self.lines.append(f"{name} {_value(value)}")
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram) -> None:
+        """Add a histogram family with cumulative buckets."""
+        full_name = self.family(name, "histogram", help_text)
+        for bound, count in histogram.cumulative():
+            self.sample(f"{full_name}_bucket", count, {"le": _value(bound)})
+        self.sample(f"{full_name}_sum", histogram.total)
+        self.sample(f"{full_name}_count", histogram.count)
+
+
+def _escape(label: str) -> str:
+    """Escape a label value."""
+    return label.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text(
+    stats: CaptureStats, save_result: SaveResult | None = None
+) -> str:
+    """Render a capture as Prometheus text exposition.
+
+    Values describe the last capture, so counters are exported as gauges;
+    the file is meant for the node_exporter textfile collector, which
+    replaces every sample each time the file is rewritten.
+
+    Args:
+        stats: Capture statistics.
+        save_result: Optional result of saving the captured resources.
+
+    Returns:
+        Exposition text ending with a newline.
+    """
+    metrics = stats.metrics
+    out = _Exposition()
+    name = out.family(
+        "capture_last_run_timestamp_seconds", "gauge", "When the last capture finished"
+    )
+    out.sample(name, time.time())
+    name = out.family(
+        "capture_duration_seconds", "gauge", "Wall-clock duration of the last capture"
+    )
+    out.sample(name, stats.duration_seconds)
+    for field_name, help_text in CAPTURE_COUNTERS.items():
+        name = out.family(f"capture_{field_name}", "gauge", help_text)
+        out.sample(name, getattr(stats, field_name))
+
+    if save_result is not None:
+        for field_name, help_text, value in (
+            ("saved", "Resources saved", save_result.saved_count),
+            ("skipped", "External resources not saved", save_result.skipped_count),
+            ("failed", "Resources that failed to save", save_result.total_failures),
+        ):
+            name = out.family(f"save_{field_name}", "gauge", help_text)
+            out.sample(name, value)
+
+    name = out.family(
+        "capture_phase_seconds", "gauge", "Wall-clock time spent in each capture phase"
+    )
+    for phase, seconds in sorted(metrics.phases.items()):
+        out.sample(name, seconds, {"phase": phase})
+    name = out.family(
+        "capture_resource_work_seconds",
+        "gauge",
+        "Per-resource work summed over all resources",
+    )
+    for work, seconds in metrics.resource_seconds().items():
+        out.sample(name, seconds, {"work": work})
+
+    out.histogram(
+        "resource_size_bytes", "Size of captured resources", metrics.size_histogram
+    )
+    out.histogram(
+        "resource_latency_seconds",
+        "Time from request start to full body",
+        metrics.latency_histogram,
+    )
+    return "\n".join(out.lines) + "\n"
+
+
+def write_prometheus_textfile(
+    path: Path, stats: CaptureStats, save_result: SaveResult | None = None
+) -> None:
+    """Write a capture's metrics for the node_exporter textfile collector.
+
+    The file is replaced atomically, so the collector never reads a
+    partial exposition.
+
+    Args:
+        path: Target path; the collector only reads files ending in
+            ``.prom``.
+        stats: Capture statistics.
+        save_result: Optional result of saving the captured resources.
+
+    Raises:
+        FileWriteError: If writing fails.
+    """
+    write_file(path, prometheus_text(stats, save_result).encode("utf-8"), atomic=True)
@@ -1,7 +1,10 @@
 """MIME type detection and file extension mapping."""
 
+import re
 from pathlib import Path
 
+from ..body import Body, body_head
+
 # MIME type to file extension mapping
 CONTENT_TYPE_MAP: dict[str, str] = {
     # Text
@@ -48,13 +51,180 @@ CONTENT_TYPE_MAP: dict[str, str] = {
     "video/ogg": ".ogv",
 }
 
+# Bytes read from the start of a body when sniffing its type
+SNIFF_LENGTH = 512
+
+# A MIME type and the (offset, bytes) parts that must all match
+Signature = tuple[str, tuple[tuple[int, bytes], ...]]
+
+# Binary signatures; more specific entries come first
+MAGIC_SIGNATURES: tuple[Signature, ...] = (
+    ("image/png", ((0, b"\x89PNG\r\n\x1a\n"),)),
+    ("image/jpeg", ((0, b"\xff\xd8\xff"),)),
+    ("image/gif", ((0, b"GIF87a"),)),
+    ("image/gif", ((0, b"GIF89a"),)),
+    ("image/webp", ((0, b"RIFF"), (8, b"WEBP"))),
+    ("image/avif", ((4, b"ftypavif"),)),
+    ("image/avif", ((4, b"ftypavis"),)),
+    ("image/x-icon", ((0, b"\x00\x00\x01\x00"),)),
+    ("font/woff2", ((0, b"wOF2"),)),
+    ("font/woff", ((0, b"wOFF"),)),
+    ("font/otf", ((0, b"OTTO"),)),
+    ("font/ttf", ((0, b"\x00\x01\x00\x00"),)),
+    ("application/wasm", ((0, b"\x00asm"),)),
+    ("application/pdf", ((0, b"%PDF-"),)),
+    ("application/zip", ((0, b"PK\x03\x04"),)),
+    ("application/gzip", ((0, b"\x1f\x8b\x08"),)),
+    ("audio/wav", ((0, b"RIFF"), (8, b"WAVE"))),
+    ("audio/ogg", ((0, b"OggS"),)),
+    ("audio/mpeg", ((0, b"ID3"),)),
+    ("audio/mpeg", ((0, b"\xff\xfb"),)),
+    ("video/webm", ((0, b"\x1a\x45\xdf\xa3"),)),
+    ("video/mp4", ((4, b"ftyp"),)),
+)
+
+
+def _index_signatures(
+    signatures: tuple[Signature, ...],
+) -> tuple[dict[int, list[Signature]], list[Signature]]:
+    """Group signatures that start at offset 0 by their first byte."""
+    by_first_byte: dict[int, list[Signature]] = {}
+    elsewhere: list[Signature] = []
+    for mime, parts in signatures:
+        if parts[0][0] == 0:
+            by_first_byte.setdefault(parts[0][1][0], []).append((mime, parts))
+        else:
+            elsewhere.append((mime, parts))
+    return by_first_byte, elsewhere
+
+
+# Only signatures that can match the body's first byte are tried
+_SIGNATURES_BY_FIRST_BYTE, _OFFSET_SIGNATURES = _index_signatures(MAGIC_SIGNATURES)
+
+# Header values that say nothing about the body, so a sniffed type is used
+GENERIC_TYPES = frozenset(
+    {
+        "",
+        "application/octet-stream",
+        "binary/octet-stream",
+        "application/unknown",
+        "application/x-download",
+        "text/plain",
+    }
+)
+
+# Tags that open an HTML document, followed by a space or ">"
+HTML_START = re.compile(
+    rb"<(?:!doctype\s+html|html|head|body|script|iframe|title|style|div|p|br|a|b|h1|table|font)"
+    rb"[\s>]|<!--",
+    re.IGNORECASE,
+)
+
+JSON_START = re.compile(rb"\{\s*(?:\"|\})|\[\s*(?:[\"{\[\]\d-]|true|false|null)")
+
+# Leading bytes ignored before text signatures: BOM and whitespace
+TEXT_PADDING = b"\xef\xbb\xbf \t\r\n\x0c"
+
+
+# Extensions of text-like formats that compress well; images, fonts, media
+# and archives in CONTENT_TYPE_MAP are already compressed
+COMPRESSIBLE_EXTENSIONS = frozenset(
+    {".html", ".css", ".js", ".txt", ".xml", ".json", ".webmanifest", ".svg"}
+)
+
+
+def sniff_binary(head: bytes) -> str | None:
+    """Match the start of a body against the binary signature table.
+
+    Args:
+        head: First bytes of the body.
+
+    Returns:
+        MIME type of the first matching signature, or None.
+    """
+    if not head:
+        return None
+    for candidates in (_SIGNATURES_BY_FIRST_BYTE.get(head[0], ()), _OFFSET_SIGNATURES):
+        for mime, parts in candidates:
+            for offset, magic in parts:
+                if not head.startswith(magic, offset):
+                    break
+            else:
+                return mime
+    return None
+
+
+def sniff_text(head: bytes) -> str | None:
+    """Recognize HTML, SVG, XML and JSON from the start of a body.
+
+    Args:
+        head: First bytes of the body.
+
+    Returns:
+        MIME type, or None if the text is not recognized.
+    """
+    text = head.lstrip(TEXT_PADDING)
+    if text.startswith(b"<?xml"):
+        return "image/svg+xml" if b"<svg" in text else "application/xml"
+    if text[:4].lower() == b"<svg":
+        return "image/svg+xml"
+    if HTML_START.match(text):
+        return "text/html"
+    if JSON_START.match(text):
+        return "application/json"
+    return None
+
 
-def infer_extension(path: str, content_type: str) -> str:
+def sniff_content_type(body: Body) -> str | None:
+    """Detect a body's type from its first ``SNIFF_LENGTH`` bytes.
+
+    Images, fonts, WASM, archives, PDF and media are recognized by their
+    magic bytes; HTML, SVG, XML and JSON by how the text starts. JavaScript
+    and CSS have no signature and are never detected.
+
+    Args:
+        body: In-memory or spilled body; only its start is read.
+
+    Returns:
+        Detected MIME type, or None.
+    """
+    head = body_head(body, SNIFF_LENGTH)
+    return sniff_binary(head) or sniff_text(head)
+
+
+def effective_content_type(content_type: str, body: Body) -> str:
+    """Choose between the Content-Type header and the sniffed type.
+
+    A sniffed type is used when the header is missing or generic
+    (``application/octet-stream``, ``text/plain``, ...), and a binary
+    signature also wins over a text-like header, e.g. a PNG served as
+    ``text/html``. Otherwise the header is trusted.
+
+    Args:
+        content_type: Content-Type header value.
+        body: Resource body.
+
+    Returns:
+        The header value, or the sniffed MIME type.
+    """
+    mime = content_type.split(";")[0].strip().lower()
+    if mime in GENERIC_TYPES:
+        return sniff_content_type(body) or content_type
+    if is_compressible(mime):
+        sniffed = sniff_binary(body_head(body, SNIFF_LENGTH))
+        if sniffed is not None:
+            return sniffed
+    return content_type
+
+
+def infer_extension(path: str, content_type: str, body: Body | None = None) -> str:
     """Add file extension based on content-type if path lacks one.
 
     Args:
         path: URL path that may lack an extension.
         content_type: Content-Type header value.
+        body: Resource body; when given, its type is sniffed if the header
+            is missing or inconsistent.
 
     Returns:
         Path with extension added if needed.
@@ -65,6 +235,9 @@ def infer_extension(path: str, content_type: str) -> str:
     if "." in filename:
         return path
 
+    if body is not None:
+        content_type = effective_content_type(content_type, body)
+
     # Parse content-type (ignore charset, boundary, etc.)
     mime = content_type.split(";")[0].strip().lower()
     ext = CONTENT_TYPE_MAP.get(mime, "")
@@ -83,3 +256,18 @@ def get_extension_for_mime(mime_type: str) -> str:
     """
     mime = mime_type.split(";")[0].strip().lower()
     return CONTENT_TYPE_MAP.get(mime, "")
+
+
+def is_compressible(content_type: str) -> bool:
+    """Check whether a body of this type is worth compressing on save.
+
+    Args:
+        content_type: Content-Type header value.
+
+    Returns:
+        True for text-like types (HTML, CSS, JS, JSON, XML, SVG, ...).
+    """
+    mime = content_type.split(";")[0].strip().lower()
+    if CONTENT_TYPE_MAP.get(mime) in COMPRESSIBLE_EXTENSIONS:
+        return True
+    return mime.startswith("text/") or mime.endswith(("+json", "+xml"))
@@ -1,8 +1,60 @@
 """Domain models for webgrab."""
 
+import time
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
+
+from .body import Body, body_view, open_body
+
+# Upper bounds of the resource size histogram, in bytes
+SIZE_BUCKETS = (
+    1024.0,
+    4096.0,
+    16384.0,
+    65536.0,
+    262144.0,
+    1048576.0,
+    4194304.0,
+    16777216.0,
+)
+
+# Upper bounds of the resource latency histogram, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class ResourceTiming:
+    """When each step of capturing one resource happened.
+
+    Timestamps are seconds since the epoch, and None when the step did not
+    happen or the engine cannot observe it.
+    """
+
+    url: str
+    size: int = 0
+    request_start: float | None = None
+    response_at: float | None = None
+    body_at: float | None = None
+    written_at: float | None = None
+    write_seconds: float = 0.0
+
+    @property
+    def latency(self) -> float | None:
+        """Seconds from sending the request to having the whole body."""
+        if self.request_start is None or self.body_at is None:
+            return None
+        return self.body_at - self.request_start
+
+    @property
+    def fetch_seconds(self) -> float | None:
+        """Seconds spent downloading the body after the response headers."""
+        if self.response_at is None or self.body_at is None:
+            return None
+        return self.body_at - self.response_at
 
 
 @dataclass(frozen=True)
@@ -11,15 +63,40 @@ class Resource:
 
     url: str
     content_type: str
-    body: bytes
+    body: Body
     headers: dict[str, str]
     status_code: int
+    # Shared with the capture's metrics, so savers can record the write
+    timing: ResourceTiming | None = field(default=None, compare=False, repr=False)
 
     @property
     def size(self) -> int:
         """Size of the resource body in bytes."""
         return len(self.body)
 
+    def open_body(self) -> BinaryIO:
+        """Open the body as a binary file handle.
+
+        Returns:
+            Handle reading from memory or from the spilled file.
+        """
+        return open_body(self.body)
+
+    @contextmanager
+    def view_body(self) -> Iterator[memoryview]:
+        """View the body without copying it.
+
+        Yields:
+            Read-only memoryview of the body.
+        """
+        with body_view(self.body) as view:
+            yield view
+
+
+# Receives each captured resource; an awaitable it returns is awaited before
+# the capture hands off more, so a slow consumer can apply backpressure
+ResourceCallback = Callable[[Resource], Awaitable[None] | None]
+
 
 @dataclass
 class CaptureConfig:
@@ -34,6 +111,21 @@ class CaptureConfig:
     bypass_csp: bool = True
     viewport_width: int = 1920
     viewport_height: int = 1080
+    body_fetch_concurrency: int = 8
+    body_fetch_ordered: bool = False
+    response_queue_size: int = 0
+    response_overflow: str = "wait"
+    blocked_resource_types: list[str] = field(default_factory=list)
+    blocked_hosts: list[str] = field(default_factory=list)
+    rule_files: list[Path] = field(default_factory=list)
+    wait_strategy: str = "networkidle"
+    idle_ms: int = 500
+    settle_timeout: int = 15000
+    long_lived_ms: int = 5000
+    ignore_long_lived: bool = True
+    spill_threshold: int | None = 16 * 1024 * 1024
+    spill_dir: Path | None = None
+    engine: str = "browser"
 
     def __post_init__(self) -> None:
         """Validate configuration."""
@@ -41,6 +133,22 @@ class CaptureConfig:
             raise ValueError("wait_time must be non-negative")
         if self.timeout <= 0:
             raise ValueError("timeout must be positive")
+        if self.body_fetch_concurrency <= 0:
+            raise ValueError("body_fetch_concurrency must be positive")
+        if self.response_queue_size < 0:
+            raise ValueError("response_queue_size must be non-negative")
+        if self.response_overflow not in ("wait", "drop"):
+            raise ValueError("response_overflow must be 'wait' or 'drop'")
+        if self.wait_strategy not in ("networkidle", "adaptive"):
+            raise ValueError("wait_strategy must be 'networkidle' or 'adaptive'")
+        if self.idle_ms <= 0:
+            raise ValueError("idle_ms must be positive")
+        if self.settle_timeout <= 0:
+            raise ValueError("settle_timeout must be positive")
+        if self.spill_threshold is not None and self.spill_threshold < 0:
+            raise ValueError("spill_threshold must be non-negative")
+        if self.engine not in ("browser", "http"):
+            raise ValueError("engine must be 'browser' or 'http'")
 
 
 @dataclass
@@ -53,11 +161,185 @@ class SaveConfig:
     compress: bool = False
     overwrite: bool = False
     create_manifest: bool = False
+    blob_store: Path | None = None
+    write_workers: int = 8
+    atomic_writes: bool = False
+    format: str = "files"
+    warc_max_size: int = 1024 * 1024 * 1024
+    compression: str = "gzip"
+    compression_level: int | None = None
+    incremental: bool = False
+    keep_existing: bool = False
+    query_mode: str = "ignore"
+    rewrite_links: bool = False
 
     def __post_init__(self) -> None:
         """Validate configuration."""
         if not self.output_dir:
             raise ValueError("output_dir is required")
+        if self.write_workers <= 0:
+            raise ValueError("write_workers must be positive")
+        if self.format not in ("files", "warc"):
+            raise ValueError("format must be 'files' or 'warc'")
+        if self.warc_max_size <= 0:
+            raise ValueError("warc_max_size must be positive")
+        if self.compression not in ("gzip", "zstd"):
+            raise ValueError("compression must be 'gzip' or 'zstd'")
+        if self.incremental and self.format != "files":
+            raise ValueError("incremental requires format 'files'")
+        if self.incremental and self.keep_existing:
+            raise ValueError("incremental and keep_existing cannot be combined")
+        if self.query_mode not in ("ignore", "hash"):
+            raise ValueError("query_mode must be 'ignore' or 'hash'")
+        if self.rewrite_links and self.format != "files":
+            raise ValueError("rewrite_links requires format 'files'")
+        # Compressed documents cannot be rewritten in place
+        if self.rewrite_links and self.compress:
+            raise ValueError("rewrite_links and compress cannot be combined")
+
+
+@dataclass
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    bounds: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Validate bounds and size the buckets."""
+        self.bounds = tuple(self.bounds)
+        if list(self.bounds) != sorted(set(self.bounds)):
+            raise ValueError("bounds must be strictly increasing")
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+        elif len(self.counts) != len(self.bounds) + 1:
+            raise ValueError("counts must have one entry per bound plus one")
+
+    @property
+    def count(self) -> int:
+        """Number of observations."""
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        """Record one observation.
+
+        Args:
+            value: Observed value; the last bucket counts values above every
+                bound.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Observations at or below each bound.
+
+        Returns:
+            ``(bound, count)`` pairs ending with ``(inf, total count)``.
+        """
+        pairs = []
+        running = 0
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def merge(self, other: "Histogram") -> None:
+        """Add another histogram's observations to this one.
+
+        Args:
+            other: Histogram with the same bounds.
+
+        Raises:
+            ValueError: If the bounds differ.
+        """
+        if other.bounds != self.bounds:
+            raise ValueError("cannot merge histograms with different bounds")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+
+@dataclass
+class CaptureMetrics:
+    """Per-resource timings and per-phase durations of a capture.
+
+    ``phases`` holds wall-clock time of the engine's sequential stages:
+    ``launch``, ``navigate``, ``settle`` and ``drain`` for the browser
+    engine, ``navigate`` and ``subresources`` for the HTTP engine. Work done
+    per resource overlaps, so it is summed separately (see
+    ``resource_seconds``).
+    """
+
+    phases: dict[str, float] = field(default_factory=dict)
+    filter_seconds: float = 0.0
+    timings: list[ResourceTiming] = field(default_factory=list)
+    size_histogram: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS))
+    latency_histogram: Histogram = field(
+        default_factory=lambda: Histogram(LATENCY_BUCKETS)
+    )
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        """Add time to a phase.
+
+        Args:
+            name: Phase name.
+            seconds: Elapsed seconds.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a phase.
+
+        Args:
+            name: Phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def record(self, timing: ResourceTiming) -> None:
+        """Record a captured resource once its body has been fetched.
+
+        Args:
+            timing: Timing of the resource; its write is filled in later.
+        """
+        self.timings.append(timing)
+        self.size_histogram.observe(timing.size)
+        latency = timing.latency
+        if latency is not None:
+            self.latency_histogram.observe(latency)
+
+    def resource_seconds(self) -> dict[str, float]:
+        """Time spent on per-resource work, summed over resources.
+
+        Returns:
+            Seconds spent in ``fetch`` (body download), ``filter`` and
+            ``write``.
+        """
+        return {
+            "fetch": sum(t.fetch_seconds or 0.0 for t in self.timings),
+            "filter": self.filter_seconds,
+            "write": sum(t.write_seconds for t in self.timings),
+        }
+
+    def merge(self, other: "CaptureMetrics") -> None:
+        """Add another capture's metrics to this one.
+
+        Phase durations are summed, so a merged batch reports the time each
+        phase took across all its pages.
+
+        Args:
+            other: Metrics to merge in.
+        """
+        for name, seconds in other.phases.items():
+            self.add_phase(name, seconds)
+        self.filter_seconds += other.filter_seconds
+        self.timings.extend(other.timings)
+        self.size_histogram.merge(other.size_histogram)
+        self.latency_histogram.merge(other.latency_histogram)
 
 
 @dataclass
@@ -68,8 +350,13 @@ class CaptureStats:
     successful_captures: int = 0
     failed_captures: int = 0
     skipped_urls: int = 0
+    blocked_requests: int = 0
+    dropped_responses: int = 0
+    late_responses: int = 0
+    not_modified: int = 0
     total_bytes: int = 0
     duration_seconds: float = 0.0
+    metrics: CaptureMetrics = field(default_factory=CaptureMetrics)
 
     @property
     def success_rate(self) -> float:
@@ -78,6 +365,26 @@ class CaptureStats:
             return 0.0
         return (self.successful_captures / self.total_requests) * 100
 
+    def merge(self, other: "CaptureStats") -> None:
+        """Add another capture's counters to this one.
+
+        Durations are not summed, since merged captures usually overlap
+        in time; callers set ``duration_seconds`` to the wall-clock time.
+
+        Args:
+            other: Statistics to merge in.
+        """
+        self.total_requests += other.total_requests
+        self.successful_captures += other.successful_captures
+        self.failed_captures += other.failed_captures
+        self.skipped_urls += other.skipped_urls
+        self.blocked_requests += other.blocked_requests
+        self.dropped_responses += other.dropped_responses
+        self.late_responses += other.late_responses
+        self.not_modified += other.not_modified
+        self.total_bytes += other.total_bytes
+        self.metrics.merge(other.metrics)
+
 
 @dataclass
 class SaveResult:
@@ -86,6 +393,10 @@ class SaveResult:
     saved_paths: list[Path] = field(default_factory=list)
     skipped_count: int = 0
     failed_saves: list[tuple[str, Exception]] = field(default_factory=list)
+    added_count: int = 0
+    changed_count: int = 0
+    unchanged_count: int = 0
+    rewritten_count: int = 0
 
     @property
     def saved_count(self) -> int:
@@ -96,3 +407,126 @@ class SaveResult:
     def total_failures(self) -> int:
         """Total number of failed saves."""
         return len(self.failed_saves)
+
+    def merge(self, other: "SaveResult") -> None:
+        """Add another save result to this one.
+
+        Args:
+            other: Save result to merge in.
+        """
+        self.saved_paths.extend(other.saved_paths)
+        self.skipped_count += other.skipped_count
+        self.failed_saves.extend(other.failed_saves)
+        self.added_count += other.added_count
+        self.changed_count += other.changed_count
+        self.unchanged_count += other.unchanged_count
+        self.rewritten_count += other.rewritten_count
+
+
+@dataclass
+class BatchConfig:
+    """Configuration for capturing many pages over one shared browser."""
+
+    urls: list[str]
+    output_dir: Path
+    concurrency: int = 4
+    wait_time: int = 0
+    timeout: int = 60000
+    include_external: bool = False
+    headless: bool = True
+    wait_strategy: str = "networkidle"
+    blob_store: Path | None = None
+    format: str = "files"
+    compress: bool = False
+    compression: str = "gzip"
+    create_manifest: bool = False
+    incremental: bool = False
+    query_mode: str = "ignore"
+    rewrite_links: bool = False
+
+    def __post_init__(self) -> None:
+        """Validate configuration."""
+        if not self.urls:
+            raise ValueError("urls must not be empty")
+        if self.concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        if self.wait_time < 0:
+            raise ValueError("wait_time must be non-negative")
+        if self.timeout <= 0:
+            raise ValueError("timeout must be positive")
+
+
+@dataclass
+class BatchResult:
+    """Combined result of a batch capture."""
+
+    stats: CaptureStats = field(default_factory=CaptureStats)
+    save_result: SaveResult = field(default_factory=SaveResult)
+    page_dirs: dict[str, Path] = field(default_factory=dict)
+    failed_pages: list[tuple[str, Exception]] = field(default_factory=list)
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages captured successfully."""
+        return len(self.page_dirs)
+
+    @property
+    def failed_count(self) -> int:
+        """Number of pages that could not be captured."""
+        return len(self.failed_pages)
+
+
+@dataclass
+class CrawlConfig:
+    """Configuration for crawling a site from a start page."""
+
+    start_url: str
+    output_dir: Path
+    max_depth: int = 2
+    max_pages: int = 100
+    concurrency: int = 4
+    wait_time: int = 0
+    timeout: int = 60000
+    include_external: bool = False
+    headless: bool = True
+    wait_strategy: str = "networkidle"
+    blob_store: Path | None = None
+    format: str = "files"
+    compress: bool = False
+    compression: str = "gzip"
+    create_manifest: bool = False
+    incremental: bool = False
+    query_mode: str = "ignore"
+    rewrite_links: bool = False
+
+    def __post_init__(self) -> None:
+        """Validate configuration."""
+        if self.max_depth < 0:
+            raise ValueError("max_depth must be non-negative")
+        if self.max_pages <= 0:
+            raise ValueError("max_pages must be positive")
+        if self.concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        if self.wait_time < 0:
+            raise ValueError("wait_time must be non-negative")
+
+
+@dataclass
+class CrawlResult:
+    """Combined result of a site crawl."""
+
+    stats: CaptureStats = field(default_factory=CaptureStats)
+    save_result: SaveResult = field(default_factory=SaveResult)
+    pages: list[str] = field(default_factory=list)
+    failed_pages: list[tuple[str, Exception]] = field(default_factory=list)
+    duplicate_resources: int = 0
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages captured successfully."""
+        return len(self.pages)
+
+    @property
+    def failed_count(self) -> int:
+        """Number of pages that could not be captured."""
+        return len(self.failed_pages)
@@ -0,0 +1,228 @@
+"""Content-addressed storage of resource bodies."""
+
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from ..body import Body, SpilledBody, body_view
+from ..errors import FileWriteError
+
+# ioctl request number of FICLONE on Linux (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+# Errors meaning a link method is unsupported here rather than a real failure
+UNSUPPORTED_LINK_ERRORS = frozenset(
+    {errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY}
+)
+
+LINK_METHODS = ("hardlink", "reflink", "copy")
+
+# Read size when hashing a file already on disk
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def body_digest(body: Body) -> str:
+    """Compute the SHA-256 digest of a body without copying it.
+
+    Args:
+        body: In-memory or spilled body.
+
+    Returns:
+        Hex digest.
+    """
+    with body_view(body) as view:
+        return hashlib.sha256(view).hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """Compute the SHA-256 digest of a file in fixed-size chunks.
+
+    Args:
+        path: File to hash.
+
+    Returns:
+        Hex digest.
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _reflink(source: Path, dest: Path) -> None:
+    """Clone a file's extents with FICLONE (Btrfs, XFS, ...).
+
+    Args:
+        source: Existing file.
+        dest: New file to create sharing the source's data.
+
+    Raises:
+        OSError: If cloning is unsupported on this platform or filesystem.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOTSUP, "reflinks are only supported on Linux")
+    import fcntl
+
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            dest.unlink()
+            raise
+
+
+class BlobStore:
+    """Stores each distinct body once under its SHA-256 digest.
+
+    Blobs live in ``<root>/<d[:2]>/<d[2:4]>/<digest>`` and are read-only.
+    Output files are hardlinks to the blob, falling back to a reflink and
+    then to a plain copy when the store and the output tree are on
+    different filesystems. Capturing the same bytes again, under any URL
+    or in a later run, costs a hash and a link instead of a write.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Store directory; created on first write.
+        """
+        self.root = Path(root)
+        self.blobs_written = 0
+        self.blobs_reused = 0
+        self._unsupported: set[str] = set()
+        # Counters are updated from writer threads
+        self._lock = threading.Lock()
+        # Held while a blob is written so threads storing the same body
+        # share one blob instead of replacing each other's
+        self._writing: dict[str, threading.Lock] = {}
+
+    def blob_path(self, digest: str) -> Path:
+        """Return the sharded path of a blob.
+
+        Args:
+            digest: SHA-256 hex digest.
+
+        Returns:
+            Path of the blob inside the store.
+        """
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def put(self, body: Body) -> Path:
+        """Store a body unless an identical one is already stored.
+
+        Args:
+            body: Body to store; a spilled body is moved into the store.
+
+        Returns:
+            Path of the blob.
+
+        Raises:
+            FileWriteError: If the blob cannot be written.
+        """
+        digest = body_digest(body)
+        with self._lock:
+            writing = self._writing.setdefault(digest, threading.Lock())
+        with writing:
+            try:
+                return self._put(self.blob_path(digest), body)
+            finally:
+                with self._lock:
+                    self._writing.pop(digest, None)
+
+    def _put(self, blob: Path, body: Body) -> Path:
+        """Write a blob unless it exists; the caller holds its digest lock."""
+        if blob.exists():
+            with self._lock:
+                self.blobs_reused += 1
+            if isinstance(body, SpilledBody):
+                body.discard()
+            return blob
+
+        try:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(body, SpilledBody):
+                body.persist(blob)
+            else:
+                # Write under a temporary name so concurrent captures sharing
+                # the store never see a partial blob
+                fd, tmp = tempfile.mkstemp(dir=blob.parent, prefix=".tmp-")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(body)
+                    os.replace(tmp, blob)
+                except BaseException:
+                    Path(tmp).unlink(missing_ok=True)
+                    raise
+            blob.chmod(0o444)
+        except OSError as e:
+            raise FileWriteError(str(blob), str(e), e) from e
+
+        with self._lock:
+            self.blobs_written += 1
+        return blob
+
+    def link(self, blob: Path, dest: Path, create_parents: bool = True) -> str:
+        """Materialize a blob at an output path.
+
+        Args:
+            blob: Blob path returned by ``put``.
+            dest: Output path; an existing file there is replaced.
+            create_parents: Whether to create the parent directory.
+
+        Returns:
+            Method used: ``hardlink``, ``reflink`` or ``copy``.
+
+        Raises:
+            FileWriteError: If no method succeeds.
+        """
+        try:
+            if create_parents:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+            if dest.exists() or dest.is_symlink():
+                dest.unlink()
+            for method in LINK_METHODS:
+                if method in self._unsupported:
+                    continue
+                try:
+                    if method == "hardlink":
+                        os.link(blob, dest)
+                    elif method == "reflink":
+                        _reflink(blob, dest)
+                    else:
+                        shutil.copyfile(blob, dest)
+                    return method
+                except OSError as e:
+                    if method == "copy":
+                        raise
+                    if e.errno == errno.EMLINK:
+                        # This blob hit the filesystem's link limit; others may not
+                        continue
+                    if e.errno not in UNSUPPORTED_LINK_ERRORS:
+                        raise
+                    self._unsupported.add(method)
+        except OSError as e:
+            raise FileWriteError(str(dest), str(e), e) from e
+        raise FileWriteError(str(dest), "no link method available")
+
+    def store(self, body: Body, dest: Path, create_parents: bool = True) -> Path:
+        """Store a body and link it into the output tree.
+
+        Args:
+            body: Body to store.
+            dest: Output path.
+            create_parents: Whether to create the parent directory of ``dest``.
+
+        Returns:
+            Path of the blob.
+        """
+        blob = self.put(body)
+        self.link(blob, dest, create_parents)
+        return blob
@@ -0,0 +1,60 @@
+"""Body compression for saved resources."""
+
+import gzip
+
+from ..body import Body, body_view
+from ..errors import ConfigurationError
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# File suffix recording the encoding of a compressed file
+CODEC_SUFFIXES: dict[str, str] = {"gzip": ".gz", "zstd": ".zst"}
+
+# Default levels trade a little ratio for much faster archiving
+DEFAULT_LEVELS: dict[str, int] = {"gzip": 6, "zstd": 3}
+
+
+def check_codec(codec: str) -> None:
+    """Check that a compression codec is known and available.
+
+    Args:
+        codec: ``gzip`` or ``zstd``.
+
+    Raises:
+        ConfigurationError: If the codec is unknown or its package is missing.
+    """
+    if codec not in CODEC_SUFFIXES:
+        raise ConfigurationError(f"Unknown compression codec: {codec!r}")
+    if codec == "zstd" and zstandard is None:
+        raise ConfigurationError(
+            "zstd compression needs the 'zstandard' package: pip install webgrab[zstd]"
+        )
+
+
+def compress_body(body: Body, codec: str, level: int | None = None) -> bytes:
+    """Compress a body.
+
+    Output is deterministic (gzip headers carry no timestamp), so identical
+    bodies still deduplicate in a blob store.
+
+    Args:
+        body: In-memory or spilled body.
+        codec: ``gzip`` or ``zstd``.
+        level: Compression level; the codec default when omitted.
+
+    Returns:
+        Compressed bytes.
+
+    Raises:
+        ConfigurationError: If the codec is unavailable.
+    """
+    check_codec(codec)
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+    with body_view(body) as view:
+        if codec == "zstd":
+            return zstandard.ZstdCompressor(level=level).compress(view)
+        return gzip.compress(view, compresslevel=level, mtime=0)
@@ -1,14 +1,27 @@
 """Path deduplication for avoiding filename conflicts."""
 
+import os
 from pathlib import Path
 
 
 class PathDeduplicator:
-    """Manages path deduplication with numeric suffixes."""
+    """Manages path deduplication with numeric suffixes.
+
+    The next free suffix is remembered per ``(parent, stem, extension)``, so
+    the hundredth ``index.html`` in a directory costs one lookup instead of
+    probing ``index_1.html`` to ``index_99.html``. Paths are kept as strings
+    to keep the index small at million-file scale.
+    """
 
     def __init__(self) -> None:
         """Initialize the deduplicator."""
-        self.used_paths: set[Path] = set()
+        self._used: set[str] = set()
+        self._next_suffix: dict[tuple[str, str, str], int] = {}
+
+    @property
+    def used_paths(self) -> set[Path]:
+        """Every path handed out or seeded so far."""
+        return {Path(path) for path in self._used}
 
     def get_unique_path(self, path: Path) -> Path:
         """Get a unique path by adding numeric suffix if needed.
@@ -19,21 +32,27 @@ class PathDeduplicator:
         Returns:
             Path that doesn't conflict with already-used paths.
         """
-        if path not in self.used_paths:
-            self.used_paths.add(path)
+        key = os.fspath(path)
+        if key not in self._used:
+            self._used.add(key)
             return path
 
+        parent = path.parent
         stem = path.stem
         ext = path.suffix
-        parent = path.parent
-        counter = 1
+        slot = (os.fspath(parent), stem, ext)
+        counter = self._next_suffix.get(slot, 1)
 
+        # Counters only move forward, so each taken name is skipped at most once
         while True:
             new_path = parent / f"{stem}_{counter}{ext}"
-            if new_path not in self.used_paths:
-                self.used_paths.add(new_path)
-                return new_path
             counter += 1
+            key = os.fspath(new_path)
+            if key not in self._used:
+                break
+        self._next_suffix[slot] = counter
+        self._used.add(key)
+        return new_path
 
     def is_used(self, path: Path) -> bool:
         """Check if a path has been used.
@@ -44,4 +63,32 @@ class PathDeduplicator:
         Returns:
             True if path has been used.
         """
-        return path in self.used_paths
+        return os.fspath(path) in self._used
+
+    def seed_from_disk(self, root: Path) -> int:
+        """Mark every file already under a directory as used.
+
+        The tree is walked once with ``os.scandir``, without following
+        symlinks, so files from earlier runs are never handed out again.
+
+        Args:
+            root: Directory to scan; a missing directory is ignored.
+
+        Returns:
+            Number of files found.
+        """
+        found = 0
+        pending = [os.fspath(Path(root))]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        self._used.add(entry.path)
+                        found += 1
+        return found
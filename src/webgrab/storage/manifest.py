@@ -0,0 +1,112 @@
+"""Streaming JSON Lines manifest of saved resources."""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..models import Resource
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# Large enough that a capture flushes a handful of times, not per line
+BUFFER_SIZE = 256 * 1024
+
+
+def manifest_entry(
+    resource: Resource,
+    path: str,
+    sha256: str,
+    size: int,
+    encoding: str = "identity",
+    write_seconds: float | None = None,
+    **extra: Any,
+) -> dict[str, Any]:
+    """Build the manifest entry for a saved resource.
+
+    Args:
+        resource: The saved resource.
+        path: Where it was saved, relative to the output directory.
+        sha256: Hex digest of the bytes as stored.
+        size: Number of bytes stored.
+        encoding: ``identity``, ``gzip`` or ``zstd``.
+        write_seconds: Time spent writing, if measured.
+        **extra: Additional fields, such as WARC record offsets.
+
+    Returns:
+        JSON-serializable entry.
+    """
+    return {
+        "url": resource.url,
+        "path": path,
+        "status": resource.status_code,
+        "content_type": resource.content_type,
+        "size": resource.size,
+        "stored_size": size,
+        "encoding": encoding,
+        "sha256": sha256,
+        "headers": resource.headers,
+        "saved_at": time.time(),
+        "write_seconds": write_seconds,
+        **extra,
+    }
+
+
+class ManifestWriter:
+    """Appends one JSON line per saved resource.
+
+    Lines go through a large write buffer and are never held as a list, so
+    memory stays flat however many resources are saved. Writes are
+    serialized with a lock because savers write from worker threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open the manifest, replacing any previous one at ``path``.
+
+        Args:
+            path: Manifest file path.
+        """
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Kept open across writes; closed by close(), which the owning saver
+        # calls from its own close() or when its with block exits
+        self._file = open(path, "w", encoding="utf-8", buffering=BUFFER_SIZE)  # noqa: SIM115
+
+    def write(self, entry: dict[str, Any]) -> None:
+        """Append an entry.
+
+        Args:
+            entry: JSON-serializable entry, usually from ``manifest_entry``.
+        """
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
+    def flush(self) -> None:
+        """Write buffered lines to disk."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        """Flush buffered lines and close the file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def read_manifest(path: Path) -> list[dict[str, Any]]:
+    """Read every entry of a manifest.
+
+    Args:
+        path: Manifest file path.
+
+    Returns:
+        Entries in the order they were written.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -1,22 +1,46 @@
 """URL to filesystem path resolution."""
 
+import hashlib
+import posixpath
 from pathlib import Path
-from urllib.parse import unquote, urlparse
+from urllib.parse import parse_qsl, unquote, urlencode, urlparse
 
-from ..filesystem.sanitizer import sanitize_path_component
+from ..filesystem.sanitizer import MAX_PATH_COMPONENT, sanitize_path_component
+from ..url.classifier import parse_cached
 
+QUERY_MODES = ("ignore", "hash")
 
-def url_to_local_path(url: str, output_dir: Path) -> Path:
+QUERY_HASH_LENGTH = 8
+
+
+def query_hash(query: str) -> str:
+    """Hash a query string independently of parameter order and encoding.
+
+    Args:
+        query: Raw query string without the leading ``?``.
+
+    Returns:
+        First ``QUERY_HASH_LENGTH`` hex digits of the SHA-256 of the
+        normalized query.
+    """
+    normalized = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:QUERY_HASH_LENGTH]
+
+
+def url_to_local_path(url: str, output_dir: Path, query_mode: str = "ignore") -> Path:
     """Convert a URL to a local file path preserving directory structure.
 
     Args:
         url: Full URL of the resource.
         output_dir: Base output directory.
+        query_mode: ``ignore`` drops the query string; ``hash`` adds a short
+            hash of it to the file name, e.g. ``app_1f0c3a9e.js``, so URLs
+            differing only in their query map to distinct, stable paths.
 
     Returns:
         Local path where the resource should be saved.
     """
-    parsed = urlparse(url)
+    parsed = parse_cached(url)
 
     # Get host (strip port for directory name)
     host = parsed.netloc.split(":")[0]
@@ -36,8 +60,31 @@ def url_to_local_path(url: str, output_dir: Path) -> Path:
     # Split into components and sanitize each
     path_parts = url_path.strip("/").split("/")
     sanitized_parts = [sanitize_path_component(part) for part in path_parts]
+    if query_mode == "hash" and parsed.query:
+        stem, ext = posixpath.splitext(sanitized_parts[-1])
+        suffix = f"_{query_hash(parsed.query)}"
+        stem = stem[: MAX_PATH_COMPONENT - len(suffix) - len(ext)]
+        sanitized_parts[-1] = f"{stem}{suffix}{ext}"
 
     # Build full local path
     local_path = output_dir / host / Path(*sanitized_parts)
 
     return local_path
+
+
+def url_to_directory_name(url: str) -> str:
+    """Convert a page URL to a single flat directory name.
+
+    Used to give each page of a batch capture its own subdirectory,
+    e.g. ``https://example.com/blog/post`` becomes ``example.com_blog_post``.
+
+    Args:
+        url: Full URL of the page.
+
+    Returns:
+        Sanitized directory name.
+    """
+    parsed = urlparse(url)
+    host = parsed.netloc.split(":")[0]
+    path_parts = [part for part in unquote(parsed.path).split("/") if part]
+    return sanitize_path_component("_".join([host, *path_parts]))
@@ -0,0 +1,523 @@
+"""Rewriting of saved HTML and CSS so the mirror links to its local copies."""
+
+import html
+import os
+import re
+import tempfile
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from urllib.parse import quote, urldefrag, urljoin, urlsplit
+
+from ..body import default_file_mode
+from ..url.extractor import (
+    CSS_IMPORT_PATTERN,
+    CSS_URL_PATTERN,
+    document_charset,
+    srcset_url_spans,
+)
+from ..url.parser import should_skip_url
+
+# Characters decoded per read; a document is never held in memory whole
+CHUNK_SIZE = 256 * 1024
+
+# Longest tag, comment or CSS token held back waiting for its end; anything
+# longer is passed through unchanged
+MAX_TOKEN = 1024 * 1024
+
+# Attributes holding a single URL, on any element
+URL_ATTRIBUTES = frozenset({"href", "src", "poster", "data", "background"})
+
+# Attributes holding a comma-separated list of image candidates
+SRCSET_ATTRIBUTES = frozenset({"srcset", "imagesrcset"})
+
+# Elements whose content is text rather than markup
+RAW_TEXT_ELEMENTS = frozenset({"script", "style", "textarea", "title"})
+
+TAG_PATTERN = re.compile(r"""<([a-zA-Z][^\s/>]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""")
+ATTRIBUTE_PATTERN = re.compile(
+    r"""([^\s"'>/=]+)(\s*=\s*)(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))"""
+)
+CSS_TOKEN_PATTERN = re.compile(f"{CSS_IMPORT_PATTERN.pattern}|{CSS_URL_PATTERN.pattern}")
+
+# Longest prefix of a CSS token that could end a chunk ("@import")
+CSS_LOOKBEHIND = len("@import")
+
+REWRITABLE_TYPES = ("html", "css")
+
+
+class LinkMapper:
+    """Maps URLs referenced by one document to paths relative to it.
+
+    URLs that were saved become relative paths to the saved file. Other
+    relative URLs are made absolute, so they still resolve against the
+    original site when the mirror is opened from disk.
+    """
+
+    def __init__(
+        self, url_map: Mapping[str, Path], document_url: str, document_path: Path
+    ) -> None:
+        """Initialize the mapper.
+
+        Args:
+            url_map: Saved path of every captured URL.
+            document_url: URL the document was captured from.
+            document_path: Path the document was saved at.
+        """
+        self.url_map = url_map
+        self.base_url = document_url
+        self.directory = document_path.parent
+        self.changed = False
+
+    def map(self, raw: str, escaped: bool = False) -> str:
+        """Rewrite one URL reference.
+
+        Args:
+            raw: Reference as written in the document.
+            escaped: Whether ``raw`` is an HTML attribute value, which is
+                unescaped before resolving and escaped again afterwards.
+
+        Returns:
+            Replacement text; ``raw`` itself when nothing changes or the
+            reference is malformed.
+        """
+        value = (html.unescape(raw) if escaped else raw).strip()
+        if not value or value.startswith("#") or should_skip_url(value):
+            return raw
+        try:
+            url, fragment = urldefrag(urljoin(self.base_url, value))
+        except ValueError:
+            return raw
+        target = self.url_map.get(url)
+        if target is not None:
+            relative = os.path.relpath(target, self.directory).replace(os.sep, "/")
+            replacement = quote(relative, safe="/")
+        elif url != value and urlsplit(url).scheme in ("http", "https"):
+            replacement = url
+        else:
+            return raw
+        if fragment:
+            replacement += f"#{fragment}"
+        if escaped:
+            replacement = html.escape(replacement)
+        if replacement != raw:
+            self.changed = True
+        return replacement
+
+    def map_srcset(self, srcset: str) -> str:
+        """Rewrite every candidate URL of a ``srcset`` attribute.
+
+        Args:
+            srcset: Attribute value as written in the document.
+
+        Returns:
+            Value with each URL rewritten; descriptors and separators are
+            kept as written.
+        """
+        out = []
+        pos = 0
+        for start, end in srcset_url_spans(srcset):
+            out.append(srcset[pos:start])
+            out.append(self.map(srcset[start:end], escaped=True))
+            pos = end
+        out.append(srcset[pos:])
+        return "".join(out)
+
+    def map_css(self, css: str) -> str:
+        """Rewrite ``url()`` and ``@import`` references in CSS text.
+
+        Args:
+            css: Complete stylesheet or ``style`` attribute text.
+
+        Returns:
+            Rewritten CSS.
+        """
+        return CSS_TOKEN_PATTERN.sub(self._map_css_token, css)
+
+    def _map_css_token(self, match: re.Match[str]) -> str:
+        """Rewrite the URL inside one matched CSS token."""
+        for group in range(1, (match.re.groups or 0) + 1):
+            if match.group(group) is not None:
+                offset = match.start()
+                start, end = match.span(group)
+                text = match.group(0)
+                return (
+                    text[: start - offset]
+                    + self.map(match.group(group))
+                    + text[end - offset :]
+                )
+        return match.group(0)
+
+
+class CssStreamRewriter:
+    """Rewrites a stylesheet fed in chunks of any size."""
+
+    def __init__(self, mapper: LinkMapper) -> None:
+        """Initialize the rewriter.
+
+        Args:
+            mapper: Mapper for the document being rewritten.
+        """
+        self.mapper = mapper
+        self._carry = ""
+
+    def feed(self, data: str) -> str:
+        """Rewrite the next chunk.
+
+        A token cut off at the end of the chunk is held back until the
+        next one.
+
+        Args:
+            data: Next chunk of the stylesheet.
+
+        Returns:
+            Rewritten text that is safe to write out.
+        """
+        buffer = self._carry + data
+        out = []
+        pos = 0
+        for match in CSS_TOKEN_PATTERN.finditer(buffer):
+            out.append(buffer[pos : match.start()])
+            out.append(self.mapper._map_css_token(match))
+            pos = match.end()
+
+        keep = max(pos, len(buffer) - CSS_LOOKBEHIND)
+        for marker in ("url(", "@import"):
+            start = buffer.rfind(marker, pos)
+            if start != -1 and len(buffer) - start <= MAX_TOKEN:
+                keep = min(keep, start)
+        out.append(buffer[pos:keep])
+        self._carry = buffer[keep:]
+        return "".join(out)
+
+    def close(self) -> str:
+        """Rewrite whatever was held back.
+
+        Returns:
+            Remaining rewritten text.
+        """
+        rest, self._carry = self._carry, ""
+        return self.mapper.map_css(rest)
+
+
+class HtmlStreamRewriter:
+    """Rewrites an HTML document fed in chunks of any size.
+
+    A small tokenizer finds tags, comments and raw-text elements; URL
+    attributes, ``srcset``, ``style`` attributes and ``<style>`` blocks are
+    rewritten in place and everything else is copied through verbatim. Only
+    an unfinished tag or comment is ever held back between chunks.
+    ``<base href>`` is honoured for resolving URLs and then removed, since
+    the rewritten references are relative to the saved file.
+    """
+
+    def __init__(self, mapper: LinkMapper) -> None:
+        """Initialize the rewriter.
+
+        Args:
+            mapper: Mapper for the document being rewritten.
+        """
+        self.mapper = mapper
+        self._carry = ""
+        self._raw_element: str | None = None
+        self._css: CssStreamRewriter | None = None
+
+    def feed(self, data: str) -> str:
+        """Rewrite the next chunk.
+
+        Args:
+            data: Next chunk of the document.
+
+        Returns:
+            Rewritten text that is safe to write out.
+        """
+        return self._scan(self._carry + data, final=False)
+
+    def close(self) -> str:
+        """Rewrite whatever was held back.
+
+        Returns:
+            Remaining rewritten text.
+        """
+        out = self._scan(self._carry, final=True)
+        if self._css is not None:
+            out += self._css.close()
+            self._css = None
+        return out
+
+    def _scan(self, buffer: str, final: bool) -> str:
+        """Rewrite as much of ``buffer`` as can be decided now.
+
+        Args:
+            buffer: Held-back text followed by the new chunk.
+            final: Whether no more input follows.
+
+        Returns:
+            Rewritten text; the undecided rest is kept in ``_carry``.
+        """
+        out: list[str] = []
+        pos = 0
+        end = len(buffer)
+        self._carry = ""
+        while pos < end:
+            if self._raw_element is not None:
+                pos = self._scan_raw_text(buffer, pos, final, out)
+                if self._raw_element is not None:
+                    break
+                continue
+
+            start = buffer.find("<", pos)
+            if start == -1:
+                out.append(buffer[pos:])
+                pos = end
+                break
+            out.append(buffer[pos:start])
+            pos = start
+
+            # "<!" or "<!-" at the end of a chunk may still open a comment
+            if (
+                end - pos < 4
+                and "<!--".startswith(buffer[pos:])
+                and not self._hold(buffer, pos, final)
+            ):
+                break
+
+            if buffer.startswith("<!--", pos):
+                close = buffer.find("-->", pos + 4)
+                if close != -1:
+                    out.append(buffer[pos : close + 3])
+                    pos = close + 3
+                    continue
+                if self._hold(buffer, pos, final):
+                    out.append(buffer[pos:])
+                break
+
+            next_char = buffer[pos + 1 : pos + 2]
+            if next_char and not next_char.isalpha():
+                # End tags, doctypes and stray "<" carry no URLs
+                out.append("<")
+                pos += 1
+                continue
+
+            match = TAG_PATTERN.match(buffer, pos) if next_char else None
+            if match is None:
+                if not self._hold(buffer, pos, final):
+                    break
+                out.append("<")
+                pos += 1
+                continue
+            out.append(self._rewrite_tag(match))
+            pos = match.end()
+
+        return "".join(out)
+
+    def _hold(self, buffer: str, pos: int, final: bool) -> bool:
+        """Hold an unfinished token back, unless it can never finish.
+
+        Args:
+            buffer: Text being scanned.
+            pos: Start of the unfinished token.
+            final: Whether no more input follows.
+
+        Returns:
+            True if the token must be passed through as plain text instead.
+        """
+        if final or len(buffer) - pos > MAX_TOKEN:
+            return True
+        self._carry = buffer[pos:]
+        return False
+
+    def _scan_raw_text(self, buffer: str, pos: int, final: bool, out: list[str]) -> int:
+        """Copy the content of a raw-text element up to its end tag.
+
+        Args:
+            buffer: Text being scanned.
+            pos: Position inside the element content.
+            final: Whether no more input follows.
+            out: Output to append to.
+
+        Returns:
+            Position after the consumed text.
+        """
+        assert self._raw_element is not None
+        end_tag = re.compile(rf"</{self._raw_element}[\s>/]", re.IGNORECASE)
+        match = end_tag.search(buffer, pos)
+        if match is None:
+            # Keep enough to recognize an end tag split across chunks
+            keep = len(buffer) if final else max(pos, len(buffer) - len(self._raw_element) - 3)
+            self._emit_raw(buffer[pos:keep], out)
+            self._carry = buffer[keep:]
+            if final:
+                self._finish_raw(out)
+            return len(buffer)
+        self._emit_raw(buffer[pos : match.start()], out)
+        self._finish_raw(out)
+        return match.start()
+
+    def _emit_raw(self, text: str, out: list[str]) -> None:
+        """Write raw-text content, rewriting it when it is CSS."""
+        if self._css is not None:
+            out.append(self._css.feed(text))
+        else:
+            out.append(text)
+
+    def _finish_raw(self, out: list[str]) -> None:
+        """Leave the current raw-text element."""
+        if self._css is not None:
+            out.append(self._css.close())
+            self._css = None
+        self._raw_element = None
+
+    def _rewrite_tag(self, match: re.Match[str]) -> str:
+        """Rewrite the URL-bearing attributes of one start tag."""
+        name = match.group(1).lower()
+        attributes = match.group(2)
+        if name == "base":
+            href = _attribute(attributes, "href")
+            if href:
+                try:
+                    base_url = urljoin(self.mapper.base_url, html.unescape(href).strip())
+                except ValueError:
+                    # A malformed <base> is ignored, as browsers do
+                    return match.group(0)
+                self.mapper.base_url = base_url
+                self.mapper.changed = True
+                return ""
+        if name in RAW_TEXT_ELEMENTS:
+            self._raw_element = name
+            if name == "style":
+                self._css = CssStreamRewriter(self.mapper)
+        rewritten = ATTRIBUTE_PATTERN.sub(self._rewrite_attribute, attributes)
+        return f"<{match.group(1)}{rewritten}>"
+
+    def _rewrite_attribute(self, match: re.Match[str]) -> str:
+        """Rewrite one attribute if it holds URLs."""
+        name = match.group(1).lower()
+        rewrite: Callable[[str], str]
+        if name in URL_ATTRIBUTES:
+            rewrite = partial(self.mapper.map, escaped=True)
+        elif name in SRCSET_ATTRIBUTES:
+            rewrite = self.mapper.map_srcset
+        elif name == "style":
+            rewrite = self.mapper.map_css
+        else:
+            return match.group(0)
+        for group, quote_char in ((3, '"'), (4, "'"), (5, "")):
+            value = match.group(group)
+            if value is not None:
+                return f"{match.group(1)}{match.group(2)}{quote_char}{rewrite(value)}{quote_char}"
+        return match.group(0)
+
+
+def _attribute(attributes: str, name: str) -> str | None:
+    """Find an attribute value in the attribute text of a tag."""
+    for match in ATTRIBUTE_PATTERN.finditer(attributes):
+        if match.group(1).lower() == name:
+            return next(g for g in match.groups()[2:] if g is not None)
+    return None
+
+
+def is_rewritable(content_type: str) -> bool:
+    """Check whether a saved resource can contain links to rewrite.
+
+    Args:
+        content_type: Content-Type header value.
+
+    Returns:
+        True for HTML and CSS.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    return any(kind in media_type for kind in REWRITABLE_TYPES)
+
+
+class LinkRewriter:
+    """Rewrites saved documents to link to the files saved beside them."""
+
+    def __init__(self, url_map: Mapping[str, Path], workers: int = 8) -> None:
+        """Initialize the rewriter.
+
+        Args:
+            url_map: Saved path of every captured URL.
+            workers: Files rewritten at the same time.
+        """
+        self.url_map = url_map
+        self.workers = workers
+
+    def rewrite_file(self, path: Path, url: str, content_type: str) -> bool:
+        """Rewrite one saved HTML or CSS file in a single streaming pass.
+
+        The result goes to a temporary file that replaces the original, so
+        a blob-store hardlink is never modified. A file without links to
+        change is left untouched.
+
+        Args:
+            path: Saved file.
+            url: URL the file was captured from.
+            content_type: Content-Type it was served with.
+
+        Returns:
+            True if the file was rewritten.
+
+        Raises:
+            OSError: If the file cannot be read or replaced.
+        """
+        mapper = LinkMapper(self.url_map, url, path)
+        media_type = content_type.split(";")[0].strip().lower()
+        stream: HtmlStreamRewriter | CssStreamRewriter = (
+            CssStreamRewriter(mapper) if "css" in media_type else HtmlStreamRewriter(mapper)
+        )
+        encoding = document_charset(content_type)
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with open(
+                path, encoding=encoding, errors="surrogateescape", newline=""
+            ) as source, os.fdopen(
+                fd, "w", encoding=encoding, errors="surrogateescape", newline=""
+            ) as target:
+                while chunk := source.read(CHUNK_SIZE):
+                    target.write(stream.feed(chunk))
+                target.write(stream.close())
+            if not mapper.changed:
+                os.unlink(tmp)
+                return False
+            os.chmod(tmp, default_file_mode())
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return True
+
+    def rewrite_files(
+        self, documents: list[tuple[Path, str, str]]
+    ) -> tuple[int, list[tuple[str, Exception]]]:
+        """Rewrite many files in parallel.
+
+        Args:
+            documents: ``(path, url, content_type)`` of each saved document.
+
+        Returns:
+            Number of files rewritten and ``(url, error)`` for each failure.
+        """
+        def rewrite(document: tuple[Path, str, str]) -> bool | Exception:
+            try:
+                return self.rewrite_file(*document)
+            except OSError as e:
+                return e
+
+        workers = min(self.workers, len(documents)) or 1
+        if workers == 1:
+            outcomes = list(map(rewrite, documents))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(rewrite, documents))
+
+        rewritten = 0
+        failures: list[tuple[str, Exception]] = []
+        for (_, url, _), outcome in zip(documents, outcomes):
+            if isinstance(outcome, Exception):
+                failures.append((url, outcome))
+            elif outcome:
+                rewritten += 1
+        return rewritten, failures
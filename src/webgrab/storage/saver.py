@@ -1,12 +1,26 @@
 """High-level resource saving orchestration."""
 
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
-from ..mime.detector import infer_extension
+from ..body import SpilledBody
+from ..errors import FileWriteError, StorageError
+from ..mime.detector import effective_content_type, infer_extension, is_compressible
 from ..models import Resource, SaveConfig, SaveResult
-from ..url.parser import is_same_origin
+from ..url.classifier import UrlClassifier
+from .blob_store import BlobStore, body_digest, file_digest
+from .compression import CODEC_SUFFIXES, check_codec, compress_body
 from .deduplicator import PathDeduplicator
+from .manifest import MANIFEST_NAME, ManifestWriter, manifest_entry
 from .path_resolver import url_to_local_path
+from .rewriter import LinkRewriter, is_rewritable
+from .state import CaptureState
+from .warc import WarcSaver
 from .writer import write_file
 
 
@@ -20,37 +34,104 @@ class ResourceSaver:
             config: Save configuration.
         """
         self.config = config
+        self.classifier = UrlClassifier(config.base_url)
         self.deduplicator = PathDeduplicator()
+        if config.keep_existing:
+            self.deduplicator.seed_from_disk(config.output_dir)
+        self.blob_store = BlobStore(config.blob_store) if config.blob_store else None
+        self._created_dirs: set[Path] = set()
+        # Writes run off the capture loop; wait_for_capacity bounds how many
+        # bodies wait for a worker without blocking the loop
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: deque[Future[None]] = deque()
+        self._max_pending = config.write_workers * 2
+        # Guards save results, url_map and _documents, which worker threads
+        # update while the capture records further resources
+        self._lock = threading.Lock()
+        if config.compress:
+            check_codec(config.compression)
+        self.manifest = (
+            ManifestWriter(Path(config.output_dir) / MANIFEST_NAME)
+            if config.create_manifest
+            else None
+        )
+        self.state = CaptureState.load(config.output_dir) if config.incremental else None
+        # Saved path of every URL, and the documents to rewrite against it
+        self.url_map: dict[str, Path] = {}
+        self._documents: list[tuple[Path, str, str]] = []
 
-    def save_resource(self, resource: Resource) -> Path | None:
-        """Save a single resource to disk.
+    def plan_path(self, resource: Resource) -> Path | None:
+        """Decide where a resource will be saved.
+
+        Reserves the path, so planning the same URL twice yields two
+        distinct paths.
 
         Args:
-            resource: The resource to save.
+            resource: The resource to place.
 
         Returns:
-            Path where resource was saved, or None if skipped.
+            Unique target path, or None if the resource is skipped.
         """
         # Filter external resources if not included
-        if not self.config.include_external and not is_same_origin(
-            resource.url, self.config.base_url
+        if not self.config.include_external and not self.classifier.is_same_origin(
+            resource.url
         ):
             return None
 
+        # A 304 has no body or content type to infer an extension from, so it
+        # goes back to where the previous run saved it
+        previous = self._previous_path(resource)
+        if previous is not None:
+            return self.deduplicator.get_unique_path(previous)
+
         # Get base path from URL
-        local_path = url_to_local_path(resource.url, self.config.output_dir)
+        local_path = url_to_local_path(
+            resource.url, self.config.output_dir, self.config.query_mode
+        )
 
         # Infer extension from content-type if needed
         path_str = str(local_path)
-        path_with_ext = infer_extension(path_str, resource.content_type)
+        path_with_ext = infer_extension(path_str, resource.content_type, resource.body)
+        if self._compresses(resource):
+            path_with_ext += CODEC_SUFFIXES[self.config.compression]
         local_path = Path(path_with_ext)
 
         # Deduplicate if path already used
-        local_path = self.deduplicator.get_unique_path(local_path)
+        return self.deduplicator.get_unique_path(local_path)
+
+    def _previous_path(self, resource: Resource) -> Path | None:
+        """Find where the previous run saved a ``304 Not Modified`` resource.
+
+        Args:
+            resource: The resource to place.
+
+        Returns:
+            Saved path, or None unless the resource is a 304 with state.
+        """
+        if self.state is None or resource.status_code != 304:
+            return None
+        entry = self.state.previous(resource.url)
+        if entry is None or not entry.get("path"):
+            return None
+        return Path(self.config.output_dir) / entry["path"]
+
+    def save_resource(self, resource: Resource) -> Path | None:
+        """Save a single resource to disk.
+
+        Args:
+            resource: The resource to save.
+
+        Returns:
+            Path where resource was saved, or None if skipped.
+        """
+        local_path = self.plan_path(resource)
+        if local_path is None:
+            return None
 
         # Write content
         try:
-            write_file(local_path, resource.body)
+            self._ensure_dir(local_path.parent)
+            self._write(local_path, resource)
             return local_path
         except Exception:
             # Return None to indicate failure (caller will track this)
@@ -59,6 +140,13 @@ class ResourceSaver:
     def save_resources(self, resources: list[Resource]) -> SaveResult:
         """Save all resources to disk.
 
+        Every target path is planned up front, each distinct directory is
+        created once, and the files are then written by a pool of
+        ``write_workers`` threads.
+
+        The manifest stays open for further saves; call ``close`` or use
+        the saver as a context manager to close it.
+
         Args:
             resources: List of resources to save.
 
@@ -67,14 +155,326 @@ class ResourceSaver:
         """
         result = SaveResult()
 
+        plan: list[tuple[Resource, Path]] = []
         for resource in resources:
+            local_path = self.plan_path(resource)
+            if local_path is None:
+                result.skipped_count += 1
+            else:
+                plan.append((resource, local_path))
+
+        # Create each directory once, parents before children
+        dir_errors: dict[Path, Exception] = {}
+        for directory in sorted({path.parent for _, path in plan}):
             try:
-                saved_path = self.save_resource(resource)
-                if saved_path is not None:
-                    result.saved_paths.append(saved_path)
-                else:
-                    result.skipped_count += 1
-            except Exception as e:
-                result.failed_saves.append((resource.url, e))
+                self._ensure_dir(directory)
+            except OSError as e:
+                dir_errors[directory] = e
+        if dir_errors:
+            for resource, path in plan:
+                if path.parent in dir_errors:
+                    result.failed_saves.append((resource.url, dir_errors[path.parent]))
+            plan = [item for item in plan if item[1].parent not in dir_errors]
+
+        def write(item: tuple[Resource, Path]) -> bool | Exception:
+            resource, path = item
+            try:
+                return self._write(path, resource)
+            except (StorageError, OSError) as e:
+                return e
+
+        workers = min(self.config.write_workers, len(plan)) or 1
+        if workers == 1:
+            errors = [write(item) for item in plan]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                errors = list(executor.map(write, plan))
+
+        for (resource, path), outcome in zip(plan, errors):
+            if isinstance(outcome, Exception):
+                result.failed_saves.append((resource.url, outcome))
+            else:
+                self._count_saved(resource, path, outcome, result)
 
+        self._rewrite_links(result)
+        if self.manifest is not None:
+            self.manifest.flush()
+        if self.state is not None:
+            self.state.save()
         return result
+
+    def record_resource(self, resource: Resource, result: SaveResult) -> None:
+        """Save a single resource and record the outcome.
+
+        This is the per-resource step of ``save_resources``, exposed so
+        resources can be saved one at a time as they are captured.
+
+        The target path is planned on the calling thread; the directory,
+        compression and write happen on worker threads, and the outcome is
+        recorded in ``result`` once written. Call ``close`` to wait for them.
+
+        Args:
+            resource: The resource to save.
+            result: Save result to update.
+        """
+        local_path = self.plan_path(resource)
+        if local_path is None:
+            with self._lock:
+                result.skipped_count += 1
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.write_workers, thread_name_prefix="webgrab-save"
+            )
+        while self._pending and self._pending[0].done():
+            self._pending.popleft()
+        self._pending.append(
+            self._executor.submit(self._write_and_record, local_path, resource, result)
+        )
+
+    def _write_and_record(self, path: Path, resource: Resource, result: SaveResult) -> None:
+        """Write a resource and record the outcome, on any thread.
+
+        Args:
+            path: Planned target path.
+            resource: The resource to save.
+            result: Save result to update.
+        """
+        try:
+            self._ensure_dir(path.parent)
+            written = self._write(path, resource)
+        except Exception as e:  # noqa: BLE001 - would otherwise be lost in the worker
+            with self._lock:
+                result.failed_saves.append((resource.url, e))
+        else:
+            with self._lock:
+                self._count_saved(resource, path, written, result)
+
+    async def wait_for_capacity(self) -> None:
+        """Wait until few enough background writes are pending.
+
+        Awaited by async callers after ``record_resource``, so a capture
+        that outpaces the disk is slowed down instead of queueing bodies
+        without limit, and the event loop keeps running while it waits.
+        """
+        while self._pending and (
+            self._pending[0].done() or len(self._pending) > self._max_pending
+        ):
+            await asyncio.wrap_future(self._pending.popleft())
+
+    def close(self, result: SaveResult | None = None) -> None:
+        """Finish saving.
+
+        Waits for background compression and writes to complete, rewrites
+        links if configured, then flushes the manifest and, in incremental
+        mode, saves the state for the next run.
+
+        Args:
+            result: Save result to record link rewriting in.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pending.clear()
+        self._rewrite_links(result if result is not None else SaveResult())
+        if self.manifest is not None:
+            self.manifest.close()
+        if self.state is not None:
+            self.state.save()
+
+    def __enter__(self) -> "ResourceSaver":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def revalidation_headers(self) -> dict[str, dict[str, str]]:
+        """Conditional request headers for resources saved by a previous run.
+
+        Returns:
+            Map of URL to validator headers; empty unless incremental.
+        """
+        return self.state.revalidation_headers() if self.state is not None else {}
+
+    def _count_saved(
+        self, resource: Resource, path: Path, written: bool, result: SaveResult
+    ) -> None:
+        """Record a successful save in a result.
+
+        Args:
+            resource: The saved resource.
+            path: Path holding the resource.
+            written: False if an unchanged file was left untouched.
+            result: Save result to update.
+        """
+        result.saved_paths.append(path)
+        if self.config.rewrite_links:
+            self.url_map[resource.url] = path
+            if written:
+                content_type = effective_content_type(resource.content_type, resource.body)
+                if is_rewritable(content_type):
+                    self._documents.append((path, resource.url, content_type))
+        if self.state is None:
+            return
+        if not written:
+            result.unchanged_count += 1
+        elif self.state.previous(resource.url) is None:
+            result.added_count += 1
+        else:
+            result.changed_count += 1
+
+    def _rewrite_links(self, result: SaveResult) -> None:
+        """Point saved HTML and CSS at the local copies of what they load.
+
+        Args:
+            result: Save result to record rewritten files and failures in.
+        """
+        if not self._documents:
+            return
+        documents, self._documents = self._documents, []
+        rewriter = LinkRewriter(self.url_map, self.config.write_workers)
+        rewritten, failures = rewriter.rewrite_files(documents)
+        result.rewritten_count += rewritten
+        result.failed_saves.extend(failures)
+
+    def _compresses(self, resource: Resource) -> bool:
+        """Check whether a resource is compressed on save.
+
+        Args:
+            resource: The resource to save.
+
+        Returns:
+            True if compression is enabled and the type is text-like.
+        """
+        return self.config.compress and is_compressible(
+            effective_content_type(resource.content_type, resource.body)
+        )
+
+    def _ensure_dir(self, directory: Path) -> None:
+        """Create a directory unless this saver already created it.
+
+        Args:
+            directory: Directory path.
+
+        Raises:
+            OSError: If the directory cannot be created.
+        """
+        if directory not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    def _write(self, path: Path, resource: Resource) -> bool:
+        """Write a resource's body to a path whose directory already exists.
+
+        In incremental mode a file that already holds the same body, or
+        whose URL answered ``304 Not Modified``, is left untouched unless
+        ``overwrite`` is set.
+
+        Args:
+            path: Target path.
+            resource: Resource to write, compressed first if configured.
+
+        Returns:
+            True if the file was written, False if it was left untouched.
+
+        Raises:
+            FileWriteError: If writing fails.
+        """
+        start = time.perf_counter()
+        source_digest = ""
+        if self.state is not None:
+            not_modified = resource.status_code == 304
+            if not not_modified:
+                source_digest = body_digest(resource.body)
+            if not self.config.overwrite and self.state.is_unchanged(
+                resource.url, path, None if not_modified else source_digest
+            ):
+                if isinstance(resource.body, SpilledBody):
+                    resource.body.discard()
+                if self.manifest is not None:
+                    # The manifest is rewritten each run, so list kept files too
+                    self.manifest.write(self._unchanged_entry(path, resource, start))
+                return False
+            if not_modified:
+                raise FileWriteError(str(path), "304 Not Modified without a saved copy")
+
+        body = resource.body
+        encoding = "identity"
+        if self._compresses(resource):
+            body = compress_body(body, self.config.compression, self.config.compression_level)
+            encoding = self.config.compression
+            if isinstance(resource.body, SpilledBody):
+                resource.body.discard()
+        size = len(body)
+
+        if self.blob_store is not None:
+            digest = self.blob_store.store(body, path, create_parents=False).name
+        else:
+            # Hash before writing; a spilled body is moved by write_file
+            digest = source_digest if body is resource.body else ""
+            if self.manifest is not None and not digest:
+                digest = body_digest(body)
+            write_file(
+                path, body, create_parents=False, atomic=self.config.atomic_writes
+            )
+
+        elapsed = time.perf_counter() - start
+        if self.manifest is not None:
+            self.manifest.write(
+                manifest_entry(
+                    resource,
+                    path.relative_to(self.config.output_dir).as_posix(),
+                    digest,
+                    size,
+                    encoding,
+                    elapsed,
+                )
+            )
+        if self.state is not None:
+            self.state.record(resource.url, path, source_digest, resource.headers, encoding)
+        if resource.timing is not None:
+            resource.timing.write_seconds = elapsed
+            resource.timing.written_at = time.time()
+        return True
+
+    def _unchanged_entry(self, path: Path, resource: Resource, start: float) -> dict[str, Any]:
+        """Build the manifest entry of a file an incremental run left untouched.
+
+        Args:
+            path: Saved path of the file.
+            resource: The captured resource.
+            start: ``perf_counter`` time the save started.
+
+        Returns:
+            Manifest entry describing the file on disk.
+        """
+        entry = self.state.previous(resource.url) if self.state is not None else None
+        encoding = entry.get("encoding", "identity") if entry else "identity"
+        if entry and encoding == "identity":
+            digest = entry["sha256"]
+        else:
+            # The state holds the digest of the uncompressed body
+            digest = file_digest(path)
+        return manifest_entry(
+            resource,
+            path.relative_to(self.config.output_dir).as_posix(),
+            digest,
+            path.stat().st_size,
+            encoding,
+            time.perf_counter() - start,
+        )
+
+
+def create_saver(config: SaveConfig) -> ResourceSaver | WarcSaver:
+    """Create the saver selected by ``config.format``.
+
+    Args:
+        config: Save configuration.
+
+    Returns:
+        ResourceSaver for a file tree, or WarcSaver for WARC output.
+    """
+    if config.format == "warc":
+        return WarcSaver(config)
+    return ResourceSaver(config)
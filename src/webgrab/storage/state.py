@@ -0,0 +1,176 @@
+"""Per-output-directory state for incremental re-capture."""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+STATE_NAME = ".webgrab-state.json"
+
+STATE_VERSION = 1
+
+
+class CaptureState:
+    """Validators and content hashes of the resources saved in an output tree.
+
+    Each URL maps to the path it was saved at (relative to the output
+    directory), the SHA-256 of its body as captured, and the ``ETag`` and
+    ``Last-Modified`` headers it was served with. A later run uses these to
+    send conditional requests and to leave unchanged files untouched.
+    Entries from earlier runs are kept until the URL is captured again, so
+    a partial run does not forget what an earlier one saved.
+    """
+
+    def __init__(
+        self, output_dir: Path, entries: dict[str, dict[str, str]] | None = None
+    ) -> None:
+        """Initialize the state.
+
+        Args:
+            output_dir: Output directory the state describes.
+            entries: Entries loaded from a previous run.
+        """
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / STATE_NAME
+        self.entries: dict[str, dict[str, str]] = dict(entries or {})
+        self._previous = frozenset(self.entries)
+        # Entries are recorded from writer threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "CaptureState":
+        """Load the state left by the previous run.
+
+        A missing or unreadable state file yields an empty state, so the
+        run simply saves everything.
+
+        Args:
+            output_dir: Output directory.
+
+        Returns:
+            CaptureState instance.
+        """
+        path = Path(output_dir) / STATE_NAME
+        try:
+            data: Any = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(output_dir)
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return cls(output_dir)
+        resources = data.get("resources")
+        if not isinstance(resources, dict):
+            return cls(output_dir)
+        return cls(output_dir, resources)
+
+    def previous(self, url: str) -> dict[str, str] | None:
+        """Return the entry a previous run saved for a URL.
+
+        Args:
+            url: Resource URL.
+
+        Returns:
+            Entry with ``path``, ``sha256``, ``etag`` and ``last_modified``,
+            or None if the URL is new.
+        """
+        if url not in self._previous:
+            return None
+        return self.entries.get(url)
+
+    def is_unchanged(self, url: str, path: Path, digest: str | None) -> bool:
+        """Check whether a saved file already holds a resource's body.
+
+        Args:
+            url: Resource URL.
+            path: Path the resource would be saved at.
+            digest: SHA-256 of the body, or None for a ``304 Not Modified``
+                response.
+
+        Returns:
+            True if the previous run saved the same body at ``path`` and the
+            file is still there.
+        """
+        entry = self.previous(url)
+        if entry is None or entry.get("path") != self._relative(path):
+            return False
+        if digest is not None and entry.get("sha256") != digest:
+            return False
+        return path.is_file()
+
+    def record(
+        self,
+        url: str,
+        path: Path,
+        digest: str,
+        headers: dict[str, str],
+        encoding: str = "identity",
+    ) -> None:
+        """Record the body saved for a URL.
+
+        Args:
+            url: Resource URL.
+            path: Path the body was saved at.
+            digest: SHA-256 of the body as captured.
+            headers: Response headers, searched for validators.
+            encoding: Compression the file was stored with.
+        """
+        entry = {"path": self._relative(path), "sha256": digest}
+        if encoding != "identity":
+            entry["encoding"] = encoding
+        for name, key in (("etag", "etag"), ("last-modified", "last_modified")):
+            value = _header(headers, name)
+            if value:
+                entry[key] = value
+        with self._lock:
+            self.entries[url] = entry
+
+    def revalidation_headers(self) -> dict[str, dict[str, str]]:
+        """Build conditional request headers for previously saved URLs.
+
+        URLs whose file has since been removed are left out, so they are
+        downloaded in full.
+
+        Returns:
+            Map of URL to ``If-None-Match`` / ``If-Modified-Since`` headers.
+        """
+        conditional: dict[str, dict[str, str]] = {}
+        for url, entry in self.entries.items():
+            headers = {}
+            if entry.get("etag"):
+                headers["if-none-match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["if-modified-since"] = entry["last_modified"]
+            if headers and (self.output_dir / entry.get("path", "")).is_file():
+                conditional[url] = headers
+        return conditional
+
+    def save(self) -> None:
+        """Write the state atomically.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        with self._lock:
+            data = {"version": STATE_VERSION, "resources": dict(sorted(self.entries.items()))}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.output_dir, prefix=".tmp-state-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _relative(self, path: Path) -> str:
+        """Express a saved path relative to the output directory."""
+        return Path(path).relative_to(self.output_dir).as_posix()
+
+
+def _header(headers: dict[str, str], name: str) -> str | None:
+    """Look up a header case-insensitively."""
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
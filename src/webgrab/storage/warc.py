@@ -0,0 +1,515 @@
+"""WARC/1.1 output with per-record gzip and a CDX index."""
+
+import asyncio
+import base64
+import hashlib
+import heapq
+import itertools
+import os
+import tempfile
+import time
+import uuid
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+from typing import BinaryIO, TextIO
+from urllib.parse import urlsplit
+
+from .. import __version__
+from ..body import Body, SpilledBody, body_view, open_body
+from ..errors import FileWriteError
+from ..models import Resource, SaveConfig, SaveResult
+from ..url.classifier import UrlClassifier
+from .blob_store import body_digest
+from .manifest import MANIFEST_NAME, ManifestWriter, manifest_entry
+
+# Headers describing the transfer rather than the stored payload; the body
+# Playwright hands over is already decoded and de-chunked
+TRANSFER_HEADERS = frozenset({"content-encoding", "transfer-encoding", "content-length"})
+
+CDX_HEADER = " CDX N b a m s k r M S V g\n"
+
+# CDX lines sorted in memory at once when the index is finished
+CDX_SORT_LINES = 100_000
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class WarcLocation:
+    """Where a record was written."""
+
+    filename: str
+    offset: int
+    length: int
+
+
+def _sha1_label(digest: bytes) -> str:
+    """Format a SHA-1 digest the way WARC and CDX tools expect."""
+    return "sha1:" + base64.b32encode(digest).decode("ascii")
+
+
+def surt_url_key(url: str) -> str:
+    """Build the SURT-style sort key used by CDX indexes.
+
+    Args:
+        url: Absolute URL.
+
+    Returns:
+        Key such as ``com,example)/path?q=1``.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    host = host.removeprefix("www.")
+    key = ",".join(reversed(host.split("."))) + ")"
+    if parts.port and parts.port not in (80, 443):
+        key = key[:-1] + f":{parts.port})"
+    key += (parts.path or "/").lower()
+    if parts.query:
+        key += "?" + parts.query.lower()
+    return key
+
+
+def http_response_head(resource: Resource) -> bytes:
+    """Rebuild the HTTP status line and headers of a captured response.
+
+    Transfer headers are dropped and ``Content-Length`` is set to the size
+    of the stored body, so the record replays correctly.
+
+    Args:
+        resource: Captured resource.
+
+    Returns:
+        Status line and headers, terminated by a blank line.
+    """
+    try:
+        reason = HTTPStatus(resource.status_code).phrase
+    except ValueError:
+        reason = ""
+    lines = [f"HTTP/1.1 {resource.status_code} {reason}".rstrip()]
+    for name, value in resource.headers.items():
+        if name.lower() in TRANSFER_HEADERS:
+            continue
+        # Playwright joins repeated headers with newlines
+        for line in value.split("\n"):
+            lines.append(f"{name}: {line}")
+    lines.append(f"Content-Length: {resource.size}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8", errors="replace")
+
+
+class WarcWriter:
+    """Appends gzip-per-record WARC/1.1 files, rotating them by size.
+
+    Each record is compressed as its own gzip member, so a record can be
+    read by seeking to its offset and decompressing one member. CDX lines
+    are appended to an unsorted ``.cdx.unsorted`` file as records are
+    written, so an interrupted capture keeps its index; ``close`` sorts it
+    into the ``.cdx`` index in bounded memory.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        prefix: str = "webgrab",
+        max_file_size: int = 1024 * 1024 * 1024,
+        compress_level: int = 6,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            output_dir: Directory for ``.warc.gz`` files and the CDX index.
+            prefix: File name prefix.
+            max_file_size: Size in bytes after which a new file is started.
+            compress_level: zlib compression level for each record.
+        """
+        self.output_dir = Path(output_dir)
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.compress_level = compress_level
+        self.files: list[Path] = []
+        self._file: BinaryIO | None = None
+        self._serial = 0
+        self._started = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        self._cdx_file: TextIO | None = None
+
+    @property
+    def cdx_path(self) -> Path | None:
+        """Path of the CDX index, named after the first WARC file."""
+        if not self.files:
+            return None
+        return self.files[0].with_name(self.files[0].name.replace(".warc.gz", ".cdx"))
+
+    @property
+    def unsorted_cdx_path(self) -> Path | None:
+        """Path CDX lines are appended to until the index is sorted."""
+        cdx_path = self.cdx_path
+        return cdx_path.with_name(cdx_path.name + ".unsorted") if cdx_path else None
+
+    @property
+    def current_path(self) -> Path | None:
+        """Path of the file records are currently appended to."""
+        return self.files[-1] if self._file is not None else None
+
+    def _open_next(self) -> BinaryIO:
+        """Close the current file and start the next one.
+
+        Returns:
+            Handle of the new file.
+        """
+        if self._file is not None:
+            self._file.close()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            name = f"{self.prefix}-{self._started}-{self._serial:05d}.warc.gz"
+            self._serial += 1
+            try:
+                # Never append to or truncate a file from an earlier run
+                self._file = open(self.output_dir / name, "xb")  # noqa: SIM115 - closed by close()
+                break
+            except FileExistsError:
+                continue
+        self.files.append(self.output_dir / name)
+        self._write_warcinfo(name)
+        return self._file
+
+    def _handle(self) -> BinaryIO:
+        """Return the file to append to, rotating if it is full.
+
+        Returns:
+            Open file handle.
+        """
+        if self._file is None or self._file.tell() >= self.max_file_size:
+            return self._open_next()
+        return self._file
+
+    def _write_record(
+        self, headers: list[tuple[str, str]], head: bytes, body: Body | None
+    ) -> WarcLocation:
+        """Compress and append one record.
+
+        Args:
+            headers: WARC headers, without Content-Length.
+            head: Block bytes preceding the body.
+            body: Optional body streamed after ``head``.
+
+        Returns:
+            Location of the record.
+        """
+        f = self._handle()
+        length = len(head) + (len(body) if body is not None else 0)
+        lines = ["WARC/1.1", *(f"{k}: {v}" for k, v in headers), f"Content-Length: {length}"]
+        warc_head = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+        compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, 31)
+        offset = f.tell()
+        f.write(compressor.compress(warc_head))
+        f.write(compressor.compress(head))
+        if body is not None:
+            with open_body(body) as source:
+                while chunk := source.read(CHUNK_SIZE):
+                    f.write(compressor.compress(chunk))
+        f.write(compressor.compress(b"\r\n\r\n"))
+        f.write(compressor.flush())
+        assert self.current_path is not None
+        return WarcLocation(self.current_path.name, offset, f.tell() - offset)
+
+    def _write_warcinfo(self, filename: str) -> None:
+        """Write the warcinfo record that opens every file.
+
+        Args:
+            filename: Name of the file being started.
+        """
+        info = (
+            f"software: webgrab/{__version__}\r\n"
+            "format: WARC File Format 1.1\r\n"
+        ).encode()
+        self._write_record(
+            [
+                ("WARC-Type", "warcinfo"),
+                ("WARC-Record-ID", f"<urn:uuid:{uuid.uuid4()}>"),
+                ("WARC-Date", _warc_date()),
+                ("WARC-Filename", filename),
+                ("Content-Type", "application/warc-fields"),
+            ],
+            info,
+            None,
+        )
+
+    def write_response(self, resource: Resource) -> WarcLocation:
+        """Append a response record for a captured resource.
+
+        Args:
+            resource: Captured resource.
+
+        Returns:
+            Location of the record.
+        """
+        head = http_response_head(resource)
+        payload = hashlib.sha1()
+        block = hashlib.sha1(head)
+        with body_view(resource.body) as view:
+            payload.update(view)
+            block.update(view)
+        payload_digest = _sha1_label(payload.digest())
+        warc_date = _warc_date()
+
+        location = self._write_record(
+            [
+                ("WARC-Type", "response"),
+                ("WARC-Record-ID", f"<urn:uuid:{uuid.uuid4()}>"),
+                ("WARC-Date", warc_date),
+                ("WARC-Target-URI", resource.url),
+                ("Content-Type", "application/http;msgtype=response"),
+                ("WARC-Payload-Digest", payload_digest),
+                ("WARC-Block-Digest", _sha1_label(block.digest())),
+            ],
+            head,
+            resource.body,
+        )
+
+        mime = resource.content_type.split(";")[0].strip() or "-"
+        timestamp = warc_date.replace("-", "").replace(":", "").replace("T", "")[:14]
+        if self._cdx_file is None:
+            assert self.unsorted_cdx_path is not None
+            # Line buffered so the index on disk keeps up with the records
+            self._cdx_file = open(  # noqa: SIM115 - closed by close()
+                self.unsorted_cdx_path, "a", encoding="utf-8", buffering=1
+            )
+        self._cdx_file.write(
+            " ".join(
+                [
+                    surt_url_key(resource.url),
+                    timestamp,
+                    resource.url,
+                    mime.replace(" ", "%20"),
+                    str(resource.status_code),
+                    payload_digest[len("sha1:"):],
+                    resource.headers.get("location", "-") or "-",
+                    "-",
+                    str(location.length),
+                    str(location.offset),
+                    location.filename,
+                ]
+            )
+            + "\n"
+        )
+        return location
+
+    def close(self) -> None:
+        """Close the current file and write the sorted CDX index."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._cdx_file is not None:
+            self._cdx_file.close()
+            self._cdx_file = None
+            assert self.cdx_path is not None and self.unsorted_cdx_path is not None
+            sort_cdx(self.unsorted_cdx_path, self.cdx_path)
+            self.unsorted_cdx_path.unlink()
+
+    def __enter__(self) -> "WarcWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class WarcSaver:
+    """Saves resources as WARC records instead of individual files.
+
+    Drop-in alternative to ``ResourceSaver`` for ``SaveConfig.format ==
+    "warc"``: headers and status codes are kept, and thousands of small
+    files become a few large appends.
+    """
+
+    def __init__(self, config: SaveConfig) -> None:
+        """Initialize the saver.
+
+        Args:
+            config: Save configuration.
+        """
+        self.config = config
+        self.classifier = UrlClassifier(config.base_url)
+        self.writer = WarcWriter(config.output_dir, max_file_size=config.warc_max_size)
+        self.manifest = (
+            ManifestWriter(Path(config.output_dir) / MANIFEST_NAME)
+            if config.create_manifest
+            else None
+        )
+        # Records are appended off the capture loop by a single thread, which
+        # keeps them in capture order and is the only one updating results
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: deque[Future[None]] = deque()
+        self._max_pending = config.write_workers * 2
+
+    def save_resource(self, resource: Resource) -> Path | None:
+        """Append a resource to the current WARC file.
+
+        Args:
+            resource: The resource to save.
+
+        Returns:
+            Path of the WARC file holding the record, or None if skipped.
+
+        Raises:
+            FileWriteError: If writing fails.
+        """
+        if not self.config.include_external and not self.classifier.is_same_origin(
+            resource.url
+        ):
+            return None
+
+        start = time.perf_counter()
+        try:
+            location = self.writer.write_response(resource)
+        except OSError as e:
+            raise FileWriteError(str(self.writer.current_path), str(e), e) from e
+        if self.manifest is not None:
+            self.manifest.write(
+                manifest_entry(
+                    resource,
+                    location.filename,
+                    body_digest(resource.body),
+                    location.length,
+                    "warc",
+                    warc_offset=location.offset,
+                    warc_length=location.length,
+                )
+            )
+        if isinstance(resource.body, SpilledBody):
+            resource.body.discard()
+        if resource.timing is not None:
+            resource.timing.write_seconds = time.perf_counter() - start
+            resource.timing.written_at = time.time()
+        return self.config.output_dir / location.filename
+
+    def save_resources(self, resources: list[Resource]) -> SaveResult:
+        """Save all resources as WARC records.
+
+        Args:
+            resources: List of resources to save.
+
+        Returns:
+            SaveResult with statistics and any failures.
+        """
+        result = SaveResult()
+        for resource in resources:
+            self._record(resource, result)
+        if self.manifest is not None:
+            self.manifest.flush()
+        return result
+
+    def record_resource(self, resource: Resource, result: SaveResult) -> None:
+        """Queue a single resource to be saved and record the outcome.
+
+        The record is appended on a writer thread and the outcome recorded
+        in ``result`` once written; call ``close`` to wait for it.
+
+        Args:
+            resource: The resource to save.
+            result: Save result to update.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="webgrab-warc"
+            )
+        while self._pending and self._pending[0].done():
+            self._pending.popleft()
+        self._pending.append(self._executor.submit(self._record, resource, result))
+
+    def _record(self, resource: Resource, result: SaveResult) -> None:
+        """Save a single resource and record the outcome.
+
+        Args:
+            resource: The resource to save.
+            result: Save result to update.
+        """
+        try:
+            saved_path = self.save_resource(resource)
+            if saved_path is not None:
+                result.saved_paths.append(saved_path)
+            else:
+                result.skipped_count += 1
+        except Exception as e:  # noqa: BLE001 - one failed record must not stop the capture
+            result.failed_saves.append((resource.url, e))
+
+    async def wait_for_capacity(self) -> None:
+        """Wait until few enough records are queued for the writer thread.
+
+        Awaited by async callers after ``record_resource``; see
+        ``ResourceSaver.wait_for_capacity``.
+        """
+        while self._pending and (
+            self._pending[0].done() or len(self._pending) > self._max_pending
+        ):
+            await asyncio.wrap_future(self._pending.popleft())
+
+    def revalidation_headers(self) -> dict[str, dict[str, str]]:
+        """Conditional request headers for previously saved resources.
+
+        Returns:
+            Always empty; WARC output is never incremental.
+        """
+        return {}
+
+    def close(self, result: SaveResult | None = None) -> None:
+        """Finish the current WARC file and write the CDX index.
+
+        Waits for queued records to be written first.
+
+        Args:
+            result: Unused; accepted for parity with ``ResourceSaver``.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pending.clear()
+        self.writer.close()
+        if self.manifest is not None:
+            self.manifest.close()
+
+    def __enter__(self) -> "WarcSaver":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def sort_cdx(source: Path, dest: Path, chunk_lines: int = CDX_SORT_LINES) -> None:
+    """Sort unsorted CDX lines into an index without loading them all.
+
+    Runs of ``chunk_lines`` lines are sorted in memory and spilled to
+    temporary files next to ``dest``, which are then merged.
+
+    Args:
+        source: File of CDX lines in write order.
+        dest: Index to write, header first.
+        chunk_lines: Lines sorted in memory at once.
+    """
+    runs: list[Path] = []
+    try:
+        with open(source, encoding="utf-8") as f:
+            while lines := list(itertools.islice(f, chunk_lines)):
+                lines.sort()
+                fd, name = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-cdx-")
+                runs.append(Path(name))
+                with os.fdopen(fd, "w", encoding="utf-8") as spill:
+                    spill.writelines(lines)
+        with ExitStack() as stack, open(dest, "w", encoding="utf-8") as out:
+            out.write(CDX_HEADER)
+            out.writelines(
+                heapq.merge(*(stack.enter_context(open(run, encoding="utf-8")) for run in runs))
+            )
+    finally:
+        for run in runs:
+            run.unlink(missing_ok=True)
+
+
+def _warc_date() -> str:
+    """Current time in WARC-Date format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
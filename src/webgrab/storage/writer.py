@@ -1,17 +1,26 @@
 """Low-level file I/O operations."""
 
+import os
+import tempfile
 from pathlib import Path
 
+from ..body import Body, SpilledBody, default_file_mode
 from ..errors import FileWriteError
 
 
-def write_file(path: Path, content: bytes, create_parents: bool = True) -> None:
+def write_file(
+    path: Path, content: Body, create_parents: bool = True, atomic: bool = False
+) -> None:
     """Write content to a file.
 
+    Spilled bodies are moved into place rather than rewritten.
+
     Args:
         path: Path to write to.
         content: Binary content to write.
         create_parents: Whether to create parent directories.
+        atomic: Write to a temporary file in the same directory and rename
+            it over ``path``, so readers never see a partial file.
 
     Raises:
         FileWriteError: If writing fails.
@@ -20,11 +29,65 @@ def write_file(path: Path, content: bytes, create_parents: bool = True) -> None:
         if create_parents:
             path.parent.mkdir(parents=True, exist_ok=True)
 
-        path.write_bytes(content)
+        if isinstance(content, SpilledBody):
+            content.persist(path)
+        elif atomic:
+            _write_atomic(path, content)
+        else:
+            _write_unshared(path, content)
     except OSError as e:
         raise FileWriteError(str(path), str(e), e) from e
 
 
+def _write_atomic(path: Path, content: bytes) -> None:
+    """Write bytes to a temporary sibling and rename it over the target.
+
+    The result gets the permissions of a newly created file rather than
+    the owner-only mode of the temporary file.
+
+    Args:
+        path: Path to write to.
+        content: Binary content to write.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp, default_file_mode())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _write_unshared(path: Path, content: bytes) -> None:
+    """Write bytes without modifying other hardlinks to the same file.
+
+    Files materialized from a blob store are hardlinks to shared, read-only
+    blobs; writing through one would corrupt every page sharing the blob,
+    so such a file is unlinked and recreated instead.
+
+    Args:
+        path: Path to write to.
+        content: Binary content to write.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    try:
+        fd = os.open(path, flags, 0o666)
+    except PermissionError:
+        if not path.is_file():
+            raise
+        fd = -1
+    if fd == -1 or os.fstat(fd).st_nlink > 1:
+        if fd != -1:
+            os.close(fd)
+        path.unlink()
+        fd = os.open(path, flags | os.O_EXCL, 0o666)
+    with os.fdopen(fd, "wb") as f:
+        f.truncate()
+        f.write(content)
+
+
 def file_exists(path: Path) -> bool:
     """Check if a file exists.
 
@@ -0,0 +1,137 @@
+"""Cached URL parsing and origin classification.
+
+Every captured URL is looked at by the request filter, the response
+filter, the saver and the path resolver. Parses are memoized in a bounded
+LRU so each distinct URL is parsed once, however many stages see it.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+from urllib.parse import ParseResult, urlparse
+
+# URL prefixes that never name a capturable resource
+SKIP_PREFIXES = (
+    "data:",
+    "blob:",
+    "about:",
+    "javascript:",
+    "chrome:",
+    "chrome-extension:",
+)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Distinct URLs whose parse is kept; sized for a large crawl's working set
+PARSE_CACHE_SIZE = 16384
+
+# Scheme and authority of a hierarchical URL, split the way urlsplit does
+AUTHORITY_PATTERN = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*)://([^/?#]*)")
+
+
+class Origin(NamedTuple):
+    """Normalized origin of a URL."""
+
+    scheme: str
+    host: str
+    port: int | None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_cached(url: str) -> ParseResult:
+    """Parse a URL, reusing the result for URLs parsed recently.
+
+    Args:
+        url: URL to parse.
+
+    Returns:
+        Parsed URL components, shared between callers.
+    """
+    return urlparse(url)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def url_origin(url: str) -> Origin:
+    """Compute the normalized origin of a URL.
+
+    The scheme and host are lowercased and an explicit default port is
+    dropped, so ``https://Example.com:443/`` and ``https://example.com/``
+    share an origin while ``http://example.com/`` does not.
+
+    Args:
+        url: URL to classify.
+
+    Returns:
+        Origin of the URL; the port is None when it is the scheme's default
+        or is not a valid number.
+    """
+    # Only the authority is needed, so skip urlparse's full split
+    match = AUTHORITY_PATTERN.match(url)
+    if match is None:
+        return Origin(url.partition(":")[0].lower(), "", None)
+    scheme = match.group(1).lower()
+    netloc = match.group(2).rpartition("@")[2]
+    if netloc.startswith("["):
+        host, _, port_text = netloc[1:].partition("]")
+        port_text = port_text[1:]
+    else:
+        host, _, port_text = netloc.partition(":")
+    port = int(port_text) if port_text.isascii() and port_text.isdigit() else None
+    if port is not None and (port > 65535 or port == DEFAULT_PORTS.get(scheme)):
+        port = None
+    return Origin(scheme, host.lower(), port)
+
+
+def is_skipped(url: str) -> bool:
+    """Check if a URL is a data:, blob: or similar non-network URL.
+
+    Args:
+        url: URL to check.
+
+    Returns:
+        True if the URL should be skipped.
+    """
+    return url.startswith(SKIP_PREFIXES)
+
+
+class UrlClassifier:
+    """Classifies URLs relative to a fixed base URL.
+
+    The base origin is computed once, so each check costs one cached
+    lookup for the URL being classified.
+    """
+
+    def __init__(self, base_url: str) -> None:
+        """Initialize the classifier.
+
+        Args:
+            base_url: URL whose origin counts as internal.
+        """
+        self.base_url = base_url
+        self.origin = url_origin(base_url)
+
+    def is_same_origin(self, url: str) -> bool:
+        """Check if a URL shares the base URL's origin.
+
+        Args:
+            url: URL to check.
+
+        Returns:
+            True if scheme, host and port all match; data:, blob: and
+            similar URLs never match.
+        """
+        # Keep potentially huge data: URLs out of the origin cache
+        if url.startswith(SKIP_PREFIXES):
+            return False
+        return url_origin(url) == self.origin
+
+    def should_skip(self, url: str) -> bool:
+        """Check if a URL is a data:, blob: or similar non-network URL.
+
+        Args:
+            url: URL to check.
+
+        Returns:
+            True if the URL should be skipped.
+        """
+        return url.startswith(SKIP_PREFIXES)
@@ -0,0 +1,342 @@
+"""Link and subresource extraction from HTML and CSS documents."""
+
+import codecs
+import re
+from collections.abc import Iterable
+from html.parser import HTMLParser
+from pathlib import PurePosixPath
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from .parser import should_skip_url
+
+# Elements whose href points at another page rather than a subresource
+LINK_TAGS = frozenset({"a", "area"})
+
+# Resource type of an element's src attribute, using Playwright's names
+SRC_RESOURCE_TYPES: dict[str, str] = {
+    "img": "image",
+    "input": "image",
+    "script": "script",
+    "video": "media",
+    "audio": "media",
+    "source": "media",
+    "track": "texttrack",
+    "iframe": "document",
+    "frame": "document",
+    "embed": "other",
+}
+
+# Resource type of <link href> by rel keyword; other rels are not fetched
+LINK_REL_TYPES: dict[str, str] = {
+    "stylesheet": "stylesheet",
+    "icon": "image",
+    "apple-touch-icon": "image",
+    "mask-icon": "image",
+    "modulepreload": "script",
+    "manifest": "manifest",
+}
+
+# Resource type of <link rel="preload"> by its ``as`` attribute
+PRELOAD_TYPES: dict[str, str] = {
+    "style": "stylesheet",
+    "script": "script",
+    "font": "font",
+    "image": "image",
+    "fetch": "fetch",
+}
+
+FONT_EXTENSIONS = frozenset({".woff", ".woff2", ".ttf", ".otf", ".eot"})
+
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)'"\s]*))\s*\)""")
+CSS_IMPORT_PATTERN = re.compile(r"""@import\s+(?:"([^"]*)"|'([^']*)')""")
+
+
+class _DocumentParser(HTMLParser):
+    """Base parser tracking the document base URL from ``<base href>``."""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+
+    def resolve(self, url: str) -> str | None:
+        """Resolve a URL against the document base, dropping the fragment.
+
+        Returns None for a malformed reference, which callers skip.
+        """
+        return resolve_reference(self.base_url, url)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        values = {name: value for name, value in attrs if value is not None}
+        if tag == "base" and values.get("href"):
+            # A malformed <base> leaves the document base unchanged
+            base_url = resolve_reference(self.base_url, values["href"])
+            if base_url is not None:
+                self.base_url = base_url
+        else:
+            self.handle_element(tag, values)
+
+    def handle_element(self, tag: str, attrs: dict[str, str]) -> None:
+        """Handle a start tag other than ``<base>``."""
+
+
+class _LinkParser(_DocumentParser):
+    """Collects navigable links."""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(base_url)
+        self.links: list[str] = []
+
+    def handle_element(self, tag: str, attrs: dict[str, str]) -> None:
+        if tag in LINK_TAGS and attrs.get("href"):
+            url = self.resolve(attrs["href"])
+            if url is not None:
+                self.links.append(url)
+
+
+class _SubresourceParser(_DocumentParser):
+    """Collects the subresources a document loads, with their types."""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(base_url)
+        self.resources: list[tuple[str, str]] = []
+        self._in_style = False
+
+    def _add(self, url: str, resource_type: str) -> None:
+        resolved = self.resolve(url) if url.strip() else None
+        if resolved is not None:
+            self.resources.append((resolved, resource_type))
+
+    def handle_element(self, tag: str, attrs: dict[str, str]) -> None:
+        if tag == "link":
+            resource_type = self._link_type(attrs)
+            if resource_type and attrs.get("href"):
+                self._add(attrs["href"], resource_type)
+        elif tag in SRC_RESOURCE_TYPES and attrs.get("src"):
+            if tag != "input" or attrs.get("type", "").lower() == "image":
+                self._add(attrs["src"], SRC_RESOURCE_TYPES[tag])
+        elif tag == "object" and attrs.get("data"):
+            self._add(attrs["data"], "other")
+
+        if tag in ("img", "source") and attrs.get("srcset"):
+            for url in parse_srcset(attrs["srcset"]):
+                self._add(url, "image")
+        if tag == "video" and attrs.get("poster"):
+            self._add(attrs["poster"], "image")
+        if attrs.get("style"):
+            self.resources.extend(extract_css_urls(attrs["style"], self.base_url))
+        if tag == "style":
+            self._in_style = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "style":
+            self._in_style = False
+
+    def handle_data(self, data: str) -> None:
+        if self._in_style:
+            self.resources.extend(extract_css_urls(data, self.base_url))
+
+    @staticmethod
+    def _link_type(attrs: dict[str, str]) -> str | None:
+        rels = attrs.get("rel", "").lower().split()
+        if "preload" in rels:
+            return PRELOAD_TYPES.get(attrs.get("as", "").lower())
+        for rel in rels:
+            if rel in LINK_REL_TYPES:
+                return LINK_REL_TYPES[rel]
+        return None
+
+
+def extract_links(html: str, base_url: str) -> list[str]:
+    """Find the pages an HTML document links to.
+
+    Args:
+        html: Document source.
+        base_url: URL the document was loaded from.
+
+    Returns:
+        Absolute link URLs without fragments, in document order, deduplicated.
+    """
+    parser = _LinkParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return list(dict.fromkeys(parser.links))
+
+
+def extract_subresources(html: str, base_url: str) -> list[tuple[str, str]]:
+    """Find the subresources an HTML document loads.
+
+    Covers ``src``, ``href`` of stylesheet, icon and preload links,
+    ``srcset``, ``poster``, and ``url()`` references in inline styles.
+
+    Args:
+        html: Document source.
+        base_url: URL the document was loaded from.
+
+    Returns:
+        ``(url, resource_type)`` pairs in document order, deduplicated by URL.
+        Resource types use Playwright's names (image, script, stylesheet, ...).
+    """
+    parser = _SubresourceParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return _dedupe(parser.resources)
+
+
+def extract_css_urls(css: str, base_url: str) -> list[tuple[str, str]]:
+    """Find the resources a stylesheet references.
+
+    Args:
+        css: Stylesheet source.
+        base_url: URL the stylesheet was loaded from.
+
+    Returns:
+        ``(url, resource_type)`` pairs, deduplicated by URL. ``@import``
+        targets are stylesheets; ``url()`` targets are fonts or images by
+        extension.
+    """
+    found: list[tuple[str, str]] = []
+    for match in CSS_IMPORT_PATTERN.finditer(css):
+        found.append((_css_target(match), "stylesheet"))
+    for match in CSS_URL_PATTERN.finditer(css):
+        url = _css_target(match)
+        prefix = css[max(0, match.start() - 16) : match.start()]
+        if prefix.rstrip().endswith("@import"):
+            found.append((url, "stylesheet"))
+        elif _is_font(url):
+            found.append((url, "font"))
+        else:
+            found.append((url, "image"))
+    resolved = (
+        (resolve_reference(base_url, url), resource_type)
+        for url, resource_type in found
+        if url and not url.startswith("#")
+    )
+    return _dedupe((url, kind) for url, kind in resolved if url is not None)
+
+
+def resolve_reference(base_url: str, url: str) -> str | None:
+    """Resolve a reference against a base URL, dropping the fragment.
+
+    Args:
+        base_url: URL the reference appears in.
+        url: Reference as written in the document.
+
+    Returns:
+        Absolute URL, or None if the reference is malformed (for example
+        an unclosed IPv6 bracket).
+    """
+    try:
+        return urldefrag(urljoin(base_url, url.strip())).url
+    except ValueError:
+        return None
+
+
+def parse_srcset(srcset: str) -> list[str]:
+    """Split a ``srcset`` attribute into its candidate URLs.
+
+    Args:
+        srcset: Attribute value such as ``"a.png 1x, b.png 2x"``.
+
+    Returns:
+        Candidate URLs without their descriptors.
+    """
+    return [srcset[start:end] for start, end in srcset_url_spans(srcset)]
+
+
+def srcset_url_spans(srcset: str) -> list[tuple[int, int]]:
+    """Locate the URL of each candidate in a ``srcset`` attribute.
+
+    Follows the HTML parsing rules: a URL runs up to whitespace and only
+    trailing commas end it, so commas inside a URL (as in ``data:`` URIs)
+    are kept. Descriptors run up to the next comma outside parentheses.
+
+    Args:
+        srcset: Attribute value.
+
+    Returns:
+        ``(start, end)`` offsets of each candidate URL.
+    """
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    end = len(srcset)
+    while True:
+        while pos < end and (srcset[pos].isspace() or srcset[pos] == ","):
+            pos += 1
+        if pos == end:
+            return spans
+        start = pos
+        while pos < end and not srcset[pos].isspace():
+            pos += 1
+        url_end = pos
+        while srcset[url_end - 1] == ",":
+            url_end -= 1
+        spans.append((start, url_end))
+        if url_end < pos:
+            # Trailing commas end a candidate that has no descriptors
+            continue
+        in_parens = False
+        while pos < end:
+            char = srcset[pos]
+            pos += 1
+            if char == "(":
+                in_parens = True
+            elif char == ")":
+                in_parens = False
+            elif char == "," and not in_parens:
+                break
+
+
+def document_charset(content_type: str) -> str:
+    """Find the charset named by a Content-Type header.
+
+    Args:
+        content_type: Content-Type header value.
+
+    Returns:
+        Python codec name; ``utf-8`` if none is given or it is unknown.
+    """
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            charset = value.strip().strip('"')
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                break
+    return "utf-8"
+
+
+def decode_document(content: bytes, content_type: str) -> str:
+    """Decode a text document using the charset from its Content-Type.
+
+    Args:
+        content: Raw document bytes.
+        content_type: Content-Type header value.
+
+    Returns:
+        Decoded text; undecodable bytes are replaced.
+    """
+    return content.decode(document_charset(content_type), errors="replace")
+
+
+def _css_target(match: re.Match[str]) -> str:
+    """Return whichever alternative of a CSS URL pattern matched."""
+    return next((group for group in match.groups() if group is not None), "").strip()
+
+
+def _is_font(url: str) -> bool:
+    """Check whether a URL names a font file by its extension."""
+    try:
+        path = urlparse(url).path
+    except ValueError:
+        return False
+    return PurePosixPath(path).suffix.lower() in FONT_EXTENSIONS
+
+
+def _dedupe(resources: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Drop repeated and unfetchable URLs, keeping the first occurrence."""
+    seen: dict[str, str] = {}
+    for url, resource_type in resources:
+        if url not in seen and not should_skip_url(url):
+            seen[url] = resource_type
+    return list(seen.items())
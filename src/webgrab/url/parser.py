@@ -3,6 +3,7 @@
 from urllib.parse import ParseResult, urlparse
 
 from ..errors import ConfigurationError
+from .classifier import is_skipped, url_origin
 
 
 def parse_url(url: str) -> ParseResult:
@@ -44,11 +45,10 @@ def is_same_origin(url: str, base_url: str) -> bool:
         base_url: Base URL to compare against.
 
     Returns:
-        True if both URLs have the same origin (scheme + host).
+        True if both URLs have the same origin (scheme, host and port, with
+        default ports normalized).
     """
-    parsed_url = urlparse(url)
-    parsed_base = urlparse(base_url)
-    return parsed_url.netloc == parsed_base.netloc
+    return url_origin(url) == url_origin(base_url)
 
 
 def should_skip_url(url: str) -> bool:
@@ -60,12 +60,4 @@ def should_skip_url(url: str) -> bool:
     Returns:
         True if URL should be skipped.
     """
-    skip_prefixes = (
-        "data:",
-        "blob:",
-        "about:",
-        "javascript:",
-        "chrome:",
-        "chrome-extension:",
-    )
-    return url.startswith(skip_prefixes)
+    return is_skipped(url)
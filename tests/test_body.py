@@ -0,0 +1,142 @@
+"""Tests for spillable resource bodies."""
+
+import asyncio
+import gc
+import stat
+from typing import ClassVar
+
+from webgrab.body import SpilledBody, body_head, body_view, open_body, spill_if_large
+from webgrab.capture.processor import ResourceProcessor
+from webgrab.models import Resource
+from webgrab.storage.writer import write_file
+
+
+class TestSpilledBody:
+    """Tests for SpilledBody."""
+
+    def test_from_bytes_round_trip(self, temp_dir):
+        """Test that spilled content can be read back."""
+        body = SpilledBody.from_bytes(b"payload", temp_dir)
+        assert len(body) == 7
+        assert body.path.parent == temp_dir
+        assert body.read_bytes() == b"payload"
+        with body.open() as f:
+            assert f.read() == b"payload"
+
+    def test_view_without_copy(self, temp_dir):
+        """Test memory-mapped access to the body."""
+        body = SpilledBody.from_bytes(b"\x89PNG....", temp_dir)
+        with body.view() as view:
+            assert bytes(view[:4]) == b"\x89PNG"
+
+    def test_view_empty_body(self, temp_dir):
+        """Test viewing an empty spilled body."""
+        body = SpilledBody.from_bytes(b"", temp_dir)
+        with body.view() as view:
+            assert len(view) == 0
+
+    def test_temp_file_removed_on_collection(self, temp_dir):
+        """Test that an unsaved spill file is deleted with its body."""
+        body = SpilledBody.from_bytes(b"payload", temp_dir)
+        path = body.path
+        del body
+        gc.collect()
+        assert not path.exists()
+
+    def test_persist_moves_file(self, temp_dir):
+        """Test that persisting moves the file and keeps it alive."""
+        body = SpilledBody.from_bytes(b"payload", temp_dir)
+        temp_path = body.path
+        destination = temp_dir / "saved.bin"
+        body.persist(destination)
+        del body
+        gc.collect()
+        assert not temp_path.exists()
+        assert destination.read_bytes() == b"payload"
+
+    def test_persist_uses_default_permissions(self, temp_dir):
+        """Test that a persisted body is not left owner-only like a temp file."""
+        plain = temp_dir / "plain.bin"
+        plain.write_bytes(b"payload")
+        destination = temp_dir / "saved.bin"
+        SpilledBody.from_bytes(b"payload", temp_dir).persist(destination)
+
+        mode = stat.S_IMODE(destination.stat().st_mode)
+        assert mode == stat.S_IMODE(plain.stat().st_mode)
+
+    def test_discard(self, temp_dir):
+        """Test deleting the spill file explicitly."""
+        body = SpilledBody.from_bytes(b"payload", temp_dir)
+        body.discard()
+        assert not body.path.exists()
+
+
+class TestBodyHelpers:
+    """Tests for body helper functions."""
+
+    def test_spill_if_large_below_threshold(self, temp_dir):
+        """Test that small bodies stay in memory."""
+        assert spill_if_large(b"small", 10, temp_dir) == b"small"
+
+    def test_spill_if_large_above_threshold(self, temp_dir):
+        """Test that large bodies are spilled."""
+        body = spill_if_large(b"x" * 11, 10, temp_dir)
+        assert isinstance(body, SpilledBody)
+        assert len(body) == 11
+
+    def test_spill_disabled(self):
+        """Test that a None threshold never spills."""
+        assert spill_if_large(b"x" * 100, None) == b"x" * 100
+
+    def test_open_and_view_in_memory(self):
+        """Test helpers on in-memory bodies."""
+        assert open_body(b"abc").read() == b"abc"
+        with body_view(b"abc") as view:
+            assert bytes(view) == b"abc"
+
+    def test_body_head(self, temp_dir):
+        """Test reading the start of in-memory and spilled bodies."""
+        assert body_head(b"abcdef", 3) == b"abc"
+        assert body_head(SpilledBody.from_bytes(b"abcdef", temp_dir), 4) == b"abcd"
+        assert body_head(b"ab", 10) == b"ab"
+
+    def test_resource_with_spilled_body(self, temp_dir):
+        """Test that resources report size and content for spilled bodies."""
+        resource = Resource(
+            url="https://example.com/video.mp4",
+            content_type="video/mp4",
+            body=SpilledBody.from_bytes(b"0123456789", temp_dir),
+            headers={},
+            status_code=200,
+        )
+        assert resource.size == 10
+        with resource.open_body() as f:
+            assert f.read(4) == b"0123"
+        with resource.view_body() as view:
+            assert bytes(view[-2:]) == b"89"
+
+    def test_write_file_moves_spilled_body(self, temp_dir):
+        """Test that writing a spilled body moves its file into place."""
+        spill_dir = temp_dir / "spill"
+        spill_dir.mkdir()
+        body = SpilledBody.from_bytes(b"payload", spill_dir)
+        path = temp_dir / "out" / "file.bin"
+        write_file(path, body)
+        assert path.read_bytes() == b"payload"
+        assert list(spill_dir.iterdir()) == []
+
+    def test_processor_spills_large_bodies(self, temp_dir):
+        """Test that the processor spills bodies above its threshold."""
+
+        class FakeResponse:
+            url = "https://example.com/big.bin"
+            status = 200
+            headers: ClassVar[dict[str, str]] = {"content-type": "application/octet-stream"}
+
+            async def body(self):
+                return b"x" * 64
+
+        processor = ResourceProcessor(spill_threshold=32, spill_dir=temp_dir)
+        resource = asyncio.run(processor.process_response(FakeResponse()))
+        assert isinstance(resource.body, SpilledBody)
+        assert processor.stats.total_bytes == 64
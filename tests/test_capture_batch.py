@@ -0,0 +1,112 @@
+"""Tests for batch capture orchestration."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from webgrab.capture import batch
+from webgrab.capture.engine import CaptureEngine
+from webgrab.errors import NavigationError
+from webgrab.models import BatchConfig, CaptureStats, Resource
+
+
+class FakePool:
+    """Browser pool stand-in that hands out placeholder contexts."""
+
+    launches = 0
+
+    def __init__(self, config, size):
+        self.size = size
+
+    async def __aenter__(self):
+        FakePool.launches += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield object()
+
+
+class FakeEngine(CaptureEngine):
+    """Capture engine that streams one HTML resource per page without a browser."""
+
+    async def stream_resources(self, on_resource):
+        if "broken" in self.config.url:
+            raise NavigationError(f"Failed to navigate to {self.config.url}")
+        pending = on_resource(
+            Resource(
+                url=self.config.url.rstrip("/") + "/index.html",
+                content_type="text/html",
+                body=b"<html></html>",
+                headers={},
+                status_code=200,
+            )
+        )
+        if pending is not None:
+            await pending
+        return CaptureStats(total_requests=1, successful_captures=1, total_bytes=13)
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """Replace the browser pool and engine with fakes."""
+    FakePool.launches = 0
+    monkeypatch.setattr(batch, "BrowserPool", FakePool)
+    monkeypatch.setattr(batch, "CaptureEngine", FakeEngine)
+
+
+class TestBatchCaptureEngine:
+    """Tests for BatchCaptureEngine."""
+
+    def test_capture_all_shares_one_browser(self, temp_dir, fake_browser):
+        """Test that all pages are captured over a single launch."""
+        config = BatchConfig(
+            urls=["https://example.com/a", "https://example.com/b"],
+            output_dir=temp_dir,
+            concurrency=2,
+        )
+        result = asyncio.run(batch.capture_many(config))
+
+        assert FakePool.launches == 1
+        assert result.page_count == 2
+        assert result.stats.total_requests == 2
+        assert result.stats.total_bytes == 26
+        assert result.save_result.saved_count == 2
+        assert result.page_dirs["https://example.com/a"] == temp_dir / "example.com_a"
+        assert (temp_dir / "example.com_b" / "example.com" / "b" / "index.html").exists()
+
+    def test_capture_all_records_failed_pages(self, temp_dir, fake_browser):
+        """Test that a failing page does not abort the batch."""
+        config = BatchConfig(
+            urls=["https://example.com/ok", "https://example.com/broken"],
+            output_dir=temp_dir,
+        )
+        result = asyncio.run(batch.capture_many(config))
+
+        assert result.page_count == 1
+        assert result.failed_count == 1
+        assert result.failed_pages[0][0] == "https://example.com/broken"
+
+    def test_capture_all_unique_page_dirs(self, temp_dir, fake_browser):
+        """Test that pages mapping to the same name get distinct directories."""
+        config = BatchConfig(
+            urls=["https://example.com/a/", "https://example.com/a"],
+            output_dir=temp_dir,
+        )
+        result = asyncio.run(batch.capture_many(config))
+
+        assert set(result.page_dirs.values()) == {
+            temp_dir / "example.com_a",
+            temp_dir / "example.com_a_1",
+        }
+
+    def test_capture_all_reports_progress(self, temp_dir, fake_browser):
+        """Test that progress is reported per completed page."""
+        messages = []
+        config = BatchConfig(urls=["https://example.com"], output_dir=temp_dir)
+        asyncio.run(batch.capture_many(config, on_status=messages.append))
+        assert "Captured 1/1 pages..." in messages
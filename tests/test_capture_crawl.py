@@ -0,0 +1,196 @@
+"""Tests for same-origin site crawling."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import ClassVar
+
+import pytest
+
+from webgrab.capture import crawl
+from webgrab.capture.crawl import CrawlFrontier
+from webgrab.capture.engine import CaptureEngine
+from webgrab.errors import BrowserError, NavigationError
+from webgrab.models import CaptureStats, CrawlConfig, Resource
+
+SITE = {
+    "https://example.com/": '<a href="/a">A</a><a href="/b#frag">B</a>'
+    '<a href="https://other.com/x">Other</a>',
+    "https://example.com/a": '<a href="/">Home</a><a href="/c">C</a>',
+    "https://example.com/b": '<a href="/broken">Broken</a>',
+    "https://example.com/c": '<a href="/d">D</a>',
+}
+
+
+class FakePool:
+    """Browser pool stand-in that hands out placeholder contexts."""
+
+    launches = 0
+
+    def __init__(self, config, size):
+        self.size = size
+
+    async def __aenter__(self):
+        FakePool.launches += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield object()
+
+
+class FakeEngine(CaptureEngine):
+    """Capture engine serving pages from SITE plus one shared stylesheet."""
+
+    visited: ClassVar[list[str]] = []
+
+    async def stream_resources(self, on_resource):
+        url = self.config.url
+        FakeEngine.visited.append(url)
+        if url not in SITE:
+            raise NavigationError(f"Failed to navigate to {url}")
+        await asyncio.sleep(0)
+        await on_resource(
+            Resource(
+                url=url,
+                content_type="text/html; charset=utf-8",
+                body=SITE[url].encode(),
+                headers={},
+                status_code=200,
+            )
+        )
+        await on_resource(
+            Resource(
+                url="https://example.com/style.css",
+                content_type="text/css",
+                body=b"body{}",
+                headers={},
+                status_code=200,
+            )
+        )
+        return CaptureStats(total_requests=2, successful_captures=2)
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """Replace the browser pool and engine with fakes."""
+    FakePool.launches = 0
+    FakeEngine.visited = []
+    monkeypatch.setattr(crawl, "BrowserPool", FakePool)
+    monkeypatch.setattr(crawl, "CaptureEngine", FakeEngine)
+
+
+class TestCrawlFrontier:
+    """Tests for CrawlFrontier."""
+
+    def test_admit_normalizes_and_dedupes(self):
+        """Test that fragments are stripped and repeats rejected."""
+        frontier = CrawlFrontier("https://example.com/", max_depth=2, max_pages=10)
+
+        assert frontier.admit("https://example.com/a#x", 1) == "https://example.com/a"
+        assert frontier.admit("https://example.com/a", 1) is None
+
+    def test_admit_rejects_out_of_scope_urls(self):
+        """Test that other origins, special schemes and assets are rejected."""
+        frontier = CrawlFrontier("https://example.com/", max_depth=2, max_pages=10)
+
+        assert frontier.admit("https://other.com/", 1) is None
+        assert frontier.admit("mailto:me@example.com", 1) is None
+        assert frontier.admit("https://example.com/logo.png", 1) is None
+        assert frontier.admit("https://example.com/page.html", 1) is not None
+
+    def test_admit_enforces_limits(self):
+        """Test that depth and page limits are respected."""
+        frontier = CrawlFrontier("https://example.com/", max_depth=1, max_pages=2)
+
+        assert frontier.admit("https://example.com/deep", 2) is None
+        assert frontier.admit("https://example.com/a", 1) is not None
+        assert frontier.admit("https://example.com/b", 1) is not None
+        assert frontier.admit("https://example.com/c", 1) is None
+        assert frontier.admitted == 2
+
+
+class TestSiteCrawler:
+    """Tests for SiteCrawler."""
+
+    def test_crawl_follows_same_origin_links(self, temp_dir, fake_browser):
+        """Test that the crawl visits each same-origin page once."""
+        config = CrawlConfig(
+            start_url="https://example.com/", output_dir=temp_dir, max_depth=2
+        )
+        result = asyncio.run(crawl.crawl_site(config))
+
+        assert FakePool.launches == 1
+        assert sorted(result.pages) == sorted(SITE)
+        assert [url for url, _ in result.failed_pages] == ["https://example.com/broken"]
+        assert sorted(FakeEngine.visited) == sorted([*SITE, "https://example.com/broken"])
+        assert result.stats.total_requests == 8
+
+    def test_crawl_saves_shared_assets_once(self, temp_dir, fake_browser):
+        """Test that assets seen on several pages are saved a single time."""
+        config = CrawlConfig(
+            start_url="https://example.com/", output_dir=temp_dir, max_depth=1
+        )
+        result = asyncio.run(crawl.crawl_site(config))
+
+        assert sorted(result.pages) == [
+            "https://example.com/",
+            "https://example.com/a",
+            "https://example.com/b",
+        ]
+        assert result.save_result.saved_count == 4
+        assert result.duplicate_resources == 2
+        assert (temp_dir / "example.com" / "style.css").exists()
+        assert not list(temp_dir.rglob("style_1.css"))
+
+    def test_crawl_survives_malformed_links(
+        self, temp_dir, fake_browser, monkeypatch
+    ):
+        """Test that a malformed href does not fail the page it is on."""
+        monkeypatch.setitem(
+            SITE,
+            "https://example.com/",
+            '<a href="http://[::1/x">Bad</a><a href="/a">A</a>',
+        )
+        config = CrawlConfig(
+            start_url="https://example.com/", output_dir=temp_dir, max_depth=1
+        )
+        result = asyncio.run(crawl.crawl_site(config))
+
+        assert result.failed_pages == []
+        assert sorted(result.pages) == ["https://example.com/", "https://example.com/a"]
+
+    def test_crawl_respects_max_pages(self, temp_dir, fake_browser):
+        """Test that no more than max_pages pages are visited."""
+        config = CrawlConfig(
+            start_url="https://example.com/",
+            output_dir=temp_dir,
+            max_depth=5,
+            max_pages=2,
+            concurrency=1,
+        )
+        result = asyncio.run(crawl.crawl_site(config))
+
+        assert len(FakeEngine.visited) == 2
+        assert result.page_count == 2
+
+    def test_crawl_closes_saver_when_launch_fails(
+        self, temp_dir, fake_browser, monkeypatch
+    ):
+        """Test that the manifest is closed even if the browser never starts."""
+
+        async def fail_launch(pool):
+            raise BrowserError("Failed to launch browser")
+
+        monkeypatch.setattr(FakePool, "__aenter__", fail_launch)
+        config = CrawlConfig(
+            start_url="https://example.com/", output_dir=temp_dir, create_manifest=True
+        )
+        crawler = crawl.SiteCrawler(config)
+        with pytest.raises(BrowserError):
+            asyncio.run(crawler.crawl())
+
+        assert crawler.saver.manifest is not None
+        assert crawler.saver.manifest._file.closed
@@ -0,0 +1,278 @@
+"""Tests for capture engine orchestration."""
+
+import asyncio
+from typing import ClassVar
+
+import pytest
+
+from webgrab.capture import engine as engine_module
+from webgrab.capture.engine import CaptureEngine
+from webgrab.errors import NavigationError
+from webgrab.models import CaptureConfig, SaveConfig
+
+
+class FakeResponse:
+    """Playwright response stand-in."""
+
+    def __init__(
+        self, url, body=b"body", status=200, content_type="text/html", resource_type="document"
+    ):
+        self.url = url
+        self.status = status
+        self.headers = {"content-type": content_type}
+        self.resource_type = resource_type
+        self._body = body
+
+    async def body(self):
+        await asyncio.sleep(0)
+        return self._body
+
+
+class FakeRequest:
+    """Playwright request stand-in."""
+
+    def __init__(self, response, is_main):
+        self.url = response.url
+        self.resource_type = response.resource_type
+        self.headers = {"accept": "*/*"}
+        self._is_main = is_main
+
+    def is_navigation_request(self):
+        return self._is_main
+
+    @property
+    def frame(self):
+        return type("Frame", (), {"parent_frame": None})()
+
+
+class FakeRoute:
+    """Playwright route stand-in recording the decision."""
+
+    def __init__(self, request):
+        self.request = request
+        self.decision = None
+        self.headers = None
+
+    async def continue_(self, headers=None):
+        self.decision = "continue"
+        self.headers = headers
+
+    async def abort(self, error_code=None):
+        self.decision = "abort"
+
+
+class FakeBrowserManager:
+    """Browser manager stand-in that replays scripted responses."""
+
+    responses: ClassVar[list[FakeResponse]] = []
+    fail_navigation = False
+    events: ClassVar[list[str]] = []
+    routes: ClassVar[list[FakeRoute]] = []
+
+    def __init__(self, config, context=None):
+        self.config = config
+        self.route_handler = None
+
+    async def route_requests(self, handler):
+        self.route_handler = handler
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    async def navigate(self, url, on_response=None):
+        for index, response in enumerate(self.responses):
+            if self.route_handler:
+                route = FakeRoute(FakeRequest(response, is_main=index == 0))
+                FakeBrowserManager.routes.append(route)
+                await self.route_handler(route)
+                if route.decision == "abort":
+                    continue
+            on_response(response)
+        # Give the consumer a chance to run while the page is still loading
+        for _ in range(20):
+            await asyncio.sleep(0)
+        FakeBrowserManager.events.append("navigated")
+        if self.fail_navigation:
+            raise NavigationError(f"Failed to navigate to {url}")
+
+    def watch_network(self, settler):
+        FakeBrowserManager.events.append("watching")
+
+    async def wait_for_content(self, wait_time):
+        FakeBrowserManager.events.append("slept")
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """Replace the browser manager with a scripted fake."""
+    FakeBrowserManager.responses = []
+    FakeBrowserManager.fail_navigation = False
+    FakeBrowserManager.events = []
+    FakeBrowserManager.routes = []
+    monkeypatch.setattr(engine_module, "BrowserManager", FakeBrowserManager)
+    return FakeBrowserManager
+
+
+class TestCaptureEngine:
+    """Tests for CaptureEngine."""
+
+    def test_capture_resources_collects_all(self, fake_browser):
+        """Test that list mode returns every accepted resource."""
+        fake_browser.responses = [
+            FakeResponse("https://example.com/"),
+            FakeResponse("https://example.com/missing", status=404),
+        ]
+        engine = CaptureEngine(CaptureConfig(url="https://example.com/"))
+        resources, stats = asyncio.run(engine.capture_resources())
+
+        assert [r.url for r in resources] == ["https://example.com/"]
+        assert stats.total_requests == 2
+        assert stats.skipped_urls == 1
+
+    def test_stream_resources_during_navigation(self, fake_browser):
+        """Test that resources are handed off before navigation completes."""
+        fake_browser.responses = [FakeResponse("https://example.com/")]
+
+        def on_resource(resource):
+            FakeBrowserManager.events.append(resource.url)
+
+        engine = CaptureEngine(CaptureConfig(url="https://example.com/"))
+        asyncio.run(engine.stream_resources(on_resource))
+
+        assert FakeBrowserManager.events == ["https://example.com/", "navigated"]
+
+    def test_capture_to_disk(self, fake_browser, temp_dir):
+        """Test that streamed resources are written to disk."""
+        fake_browser.responses = [
+            FakeResponse("https://example.com/", body=b"<html></html>"),
+            FakeResponse("https://example.com/app.js", content_type="text/javascript"),
+        ]
+        engine = CaptureEngine(CaptureConfig(url="https://example.com/"))
+        save_config = SaveConfig(output_dir=temp_dir, base_url="https://example.com/")
+        stats, result = asyncio.run(engine.capture_to_disk(save_config))
+
+        assert stats.successful_captures == 2
+        assert result.saved_count == 2
+        assert (temp_dir / "example.com" / "index.html").read_bytes() == b"<html></html>"
+
+    def test_navigation_error_propagates(self, fake_browser):
+        """Test that navigation failures are raised to the caller."""
+        fake_browser.fail_navigation = True
+        engine = CaptureEngine(CaptureConfig(url="https://example.com/"))
+        with pytest.raises(NavigationError):
+            asyncio.run(engine.capture_resources())
+
+    def test_external_requests_blocked_before_download(self, fake_browser):
+        """Test that external leaf requests are aborted at request level."""
+        fake_browser.responses = [
+            FakeResponse("https://example.com/"),
+            FakeResponse("https://cdn.example.org/hero.jpg", resource_type="image"),
+            FakeResponse("https://cdn.example.org/lib.js", resource_type="script"),
+        ]
+        engine = CaptureEngine(CaptureConfig(url="https://example.com/"))
+        resources, stats = asyncio.run(engine.capture_resources())
+
+        assert [r.url for r in resources] == ["https://example.com/"]
+        assert stats.blocked_requests == 1
+        # The external script is still loaded but its body is not fetched
+        assert stats.skipped_urls == 1
+
+    def test_include_external_skips_interception(self, fake_browser):
+        """Test that no route is installed when nothing can be blocked."""
+        fake_browser.responses = [
+            FakeResponse("https://example.com/"),
+            FakeResponse("https://cdn.example.org/hero.jpg", resource_type="image"),
+        ]
+        engine = CaptureEngine(
+            CaptureConfig(url="https://example.com/", include_external=True)
+        )
+        resources, stats = asyncio.run(engine.capture_resources())
+
+        assert len(resources) == 2
+        assert stats.blocked_requests == 0
+
+    def test_main_document_never_blocked(self, fake_browser):
+        """Test that the page itself passes even if its type is blocked."""
+        fake_browser.responses = [
+            FakeResponse("https://example.com/"),
+            FakeResponse("https://example.com/frame.html"),
+        ]
+        config = CaptureConfig(
+            url="https://example.com/", blocked_resource_types=["document"]
+        )
+        resources, stats = asyncio.run(CaptureEngine(config).capture_resources())
+
+        assert [r.url for r in resources] == ["https://example.com/"]
+        assert stats.blocked_requests == 1
+
+    def test_adaptive_settle_replaces_fixed_wait(self, fake_browser):
+        """Test that the adaptive strategy settles instead of sleeping."""
+        config = CaptureConfig(
+            url="https://example.com/", wait_strategy="adaptive", idle_ms=10, wait_time=5
+        )
+        asyncio.run(CaptureEngine(config).capture_resources())
+        assert FakeBrowserManager.events == ["watching", "navigated"]
+
+    def test_networkidle_keeps_fixed_wait(self, fake_browser):
+        """Test that the default strategy still sleeps for wait_time."""
+        config = CaptureConfig(url="https://example.com/", wait_time=1)
+        asyncio.run(CaptureEngine(config).capture_resources())
+        assert FakeBrowserManager.events == ["navigated", "slept"]
+
+    def test_revalidation_headers_sent_for_leaf_resources(self, fake_browser):
+        """Test that previously saved images are requested conditionally."""
+        fake_browser.responses = [
+            FakeResponse("https://example.com/"),
+            FakeResponse("https://example.com/app.js", resource_type="script"),
+            FakeResponse(
+                "https://example.com/logo.png", body=b"", status=304, resource_type="image"
+            ),
+        ]
+        engine = CaptureEngine(
+            CaptureConfig(url="https://example.com/", include_external=True)
+        )
+        conditional = {"if-none-match": '"v1"'}
+        engine.revalidation = {
+            "https://example.com/app.js": conditional,
+            "https://example.com/logo.png": conditional,
+        }
+        resources, stats = asyncio.run(engine.capture_resources())
+
+        document, script, image = fake_browser.routes
+        assert document.headers is None
+        assert script.headers is None
+        assert image.headers == {"accept": "*/*", "if-none-match": '"v1"'}
+        assert stats.not_modified == 1
+        by_url = {resource.url: resource for resource in resources}
+        assert by_url["https://example.com/logo.png"].status_code == 304
+        assert by_url["https://example.com/logo.png"].body == b""
+
+    def test_incremental_capture_to_disk(self, fake_browser, temp_dir):
+        """Test that a second incremental capture leaves the revalidated file alone."""
+        save_config = SaveConfig(
+            output_dir=temp_dir, base_url="https://example.com/", incremental=True
+        )
+        image = FakeResponse(
+            "https://example.com/logo.png", body=b"png", resource_type="image"
+        )
+        image.headers["etag"] = '"v1"'
+        fake_browser.responses = [FakeResponse("https://example.com/"), image]
+        engine = CaptureEngine(CaptureConfig(url="https://example.com/"))
+        asyncio.run(engine.capture_to_disk(save_config))
+
+        fake_browser.routes = []
+        fake_browser.responses = [
+            FakeResponse("https://example.com/"),
+            FakeResponse(
+                "https://example.com/logo.png", body=b"", status=304, resource_type="image"
+            ),
+        ]
+        engine = CaptureEngine(CaptureConfig(url="https://example.com/"))
+        _, result = asyncio.run(engine.capture_to_disk(save_config))
+
+        assert fake_browser.routes[1].headers["if-none-match"] == '"v1"'
+        assert result.unchanged_count == 2
+        assert (temp_dir / "example.com" / "logo.png").read_bytes() == b"png"
@@ -1,7 +1,16 @@
 """Tests for capture filters."""
 
 
-from webgrab.capture.filters import CompositeFilter, DefaultFilter
+from webgrab.capture.filters import (
+    CompositeFilter,
+    DefaultFilter,
+    ExternalFilter,
+    HostFilter,
+    ResourceTypeFilter,
+    can_block_requests,
+    create_default_filter,
+)
+from webgrab.models import CaptureConfig
 
 
 class TestDefaultFilter:
@@ -71,3 +80,80 @@ class TestCompositeFilter:
         """Test composite filter with no filters."""
         composite = CompositeFilter([])
         assert composite.should_capture("https://example.com/page", "text/html", 200)
+
+    def test_composite_should_request_ignores_capture_only_filters(self):
+        """Test that request checks only consult request-level filters."""
+        composite = CompositeFilter([DefaultFilter(), ResourceTypeFilter({"media"})])
+        assert composite.should_request("https://example.com/a.mp4", "image")
+        assert not composite.should_request("https://example.com/a.mp4", "media")
+
+
+class TestExternalFilter:
+    """Tests for ExternalFilter."""
+
+    def test_external_capture_rejected(self):
+        """Test that external responses are not captured."""
+        filter = ExternalFilter("https://example.com/")
+        assert filter.should_capture("https://example.com/app.js", "text/javascript", 200)
+        assert not filter.should_capture("https://cdn.example.org/app.js", "text/javascript", 200)
+
+    def test_external_leaf_requests_blocked(self):
+        """Test that only external leaf requests are blocked."""
+        filter = ExternalFilter("https://example.com/")
+        assert not filter.should_request("https://cdn.example.org/a.png", "image")
+        assert not filter.should_request("https://cdn.example.org/a.woff2", "font")
+        assert filter.should_request("https://cdn.example.org/a.js", "script")
+        assert filter.should_request("https://example.com/a.png", "image")
+
+
+class TestHostFilter:
+    """Tests for HostFilter."""
+
+    def test_host_and_subdomains_blocked(self):
+        """Test that a blocked host also blocks its subdomains."""
+        filter = HostFilter({"analytics.example"})
+        assert not filter.should_request("https://analytics.example/t.js", "script")
+        assert not filter.should_request("https://www.analytics.example/t.js", "script")
+        assert filter.should_request("https://notanalytics.example/t.js", "script")
+        assert not filter.should_capture("https://analytics.example/t.js", "text/javascript", 200)
+
+
+class TestCreateDefaultFilter:
+    """Tests for building filters from configuration."""
+
+    def test_include_external_uses_default_filter(self):
+        """Test that no request-level filter is built when nothing is blocked."""
+        config = CaptureConfig(url="https://example.com", include_external=True)
+        resource_filter = create_default_filter(config)
+        assert isinstance(resource_filter, DefaultFilter)
+        assert not can_block_requests(resource_filter)
+
+    def test_external_and_blocklists_combined(self):
+        """Test that configured blocks are combined with the default filter."""
+        config = CaptureConfig(
+            url="https://example.com",
+            blocked_resource_types=["media"],
+            blocked_hosts=["ads.example"],
+        )
+        resource_filter = create_default_filter(config)
+        assert can_block_requests(resource_filter)
+        assert not resource_filter.should_request("https://example.com/v.mp4", "media")
+        assert not resource_filter.should_request("https://ads.example/x.js", "script")
+        assert resource_filter.should_request("https://example.com/app.js", "script")
+
+    def test_rule_files_combined(self, temp_dir):
+        """Test that rule files add a compiled rule filter."""
+        rules = temp_dir / "rules.txt"
+        rules.write_text("||ads.example^\ntype:video/*\nsize:>10\n")
+        config = CaptureConfig(url="https://example.com", rule_files=[rules])
+
+        resource_filter = create_default_filter(config)
+        assert can_block_requests(resource_filter)
+        assert not resource_filter.should_request("https://ads.example/x.js", "script")
+        assert not resource_filter.should_capture("https://example.com/v", "video/mp4", 200)
+        assert not resource_filter.should_keep("https://example.com/big", "text/css", 11)
+        assert resource_filter.should_keep("https://example.com/small", "text/css", 10)
+
+    def test_can_block_requests_composite_without_request_filters(self):
+        """Test that composites of capture-only filters do not intercept."""
+        assert not can_block_requests(CompositeFilter([DefaultFilter()]))
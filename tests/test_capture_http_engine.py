@@ -0,0 +1,163 @@
+"""Tests for browserless HTTP capture."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from webgrab.capture.engine import CaptureEngine, create_engine
+from webgrab.capture.http_engine import HttpCaptureEngine
+from webgrab.errors import NavigationError
+from webgrab.models import CaptureConfig
+
+PAGES = {
+    "https://example.com/": (
+        "text/html",
+        (
+            b'<link rel="stylesheet" href="/site.css"><img src="/logo.png">'
+            b'<script src="https://cdn.example.net/lib.js"></script>'
+            b'<img src="/missing.png">'
+        ),
+    ),
+    "https://example.com/site.css": (
+        "text/css",
+        b"@import 'extra.css'; body { background: url(/logo.png) }",
+    ),
+    "https://example.com/extra.css": ("text/css", b"h1 { color: red }"),
+    "https://example.com/logo.png": ("image/png", b"\x89PNG"),
+    "https://cdn.example.net/lib.js": ("application/javascript", b"var x;"),
+}
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    """Serve PAGES, with a 404 for anything else."""
+    url = str(request.url)
+    if url not in PAGES:
+        return httpx.Response(404, headers={"content-type": "text/plain"})
+    content_type, body = PAGES[url]
+    return httpx.Response(200, headers={"content-type": content_type}, content=body)
+
+
+def capture(config: CaptureConfig):
+    """Capture through a client backed by the in-memory site."""
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            engine = HttpCaptureEngine(config, client=client)
+            return await engine.capture_resources()
+
+    return asyncio.run(run())
+
+
+class TestHttpCaptureEngine:
+    """Tests for HttpCaptureEngine."""
+
+    def test_capture_follows_html_and_css_references(self):
+        """Test that subresources from HTML and CSS are fetched once each."""
+        config = CaptureConfig(url="https://example.com/", engine="http")
+        resources, stats = capture(config)
+
+        urls = sorted(resource.url for resource in resources)
+        assert urls == [
+            "https://example.com/",
+            "https://example.com/extra.css",
+            "https://example.com/logo.png",
+            "https://example.com/site.css",
+        ]
+        assert stats.successful_captures == 4
+        assert stats.skipped_urls == 2
+        assert stats.total_requests == 6
+        assert stats.total_bytes == sum(resource.size for resource in resources)
+
+    def test_capture_records_timings_and_phases(self):
+        """Test per-resource timestamps and the engine's phases."""
+        config = CaptureConfig(url="https://example.com/", engine="http")
+        resources, stats = capture(config)
+
+        metrics = stats.metrics
+        assert set(metrics.phases) == {"navigate", "subresources"}
+        assert sorted(t.url for t in metrics.timings) == sorted(r.url for r in resources)
+        for resource in resources:
+            timing = resource.timing
+            assert timing.size == resource.size
+            assert timing.request_start <= timing.response_at <= timing.body_at
+        assert metrics.latency_histogram.count == len(resources)
+
+    def test_capture_includes_external_when_configured(self):
+        """Test that external resources are kept with include_external."""
+        config = CaptureConfig(
+            url="https://example.com/", engine="http", include_external=True
+        )
+        resources, _ = capture(config)
+
+        assert "https://cdn.example.net/lib.js" in {r.url for r in resources}
+
+    def test_capture_applies_request_filters(self):
+        """Test that blocked resource types are never requested."""
+        config = CaptureConfig(
+            url="https://example.com/",
+            engine="http",
+            blocked_resource_types=["image"],
+        )
+        resources, stats = capture(config)
+
+        assert not [r for r in resources if r.url.endswith(".png")]
+        assert stats.blocked_requests == 2
+
+    def test_capture_survives_malformed_references(self, monkeypatch):
+        """Test that malformed subresource URLs do not abort the capture."""
+        monkeypatch.setitem(
+            PAGES,
+            "https://example.com/bad.html",
+            (
+                "text/html",
+                (
+                    b'<img src="http://[::1/a.png"><img src="http://[::1]x/b.png">'
+                    b'<img src="/logo.png">'
+                ),
+            ),
+        )
+        config = CaptureConfig(
+            url="https://example.com/bad.html", engine="http", include_external=True
+        )
+        resources, stats = capture(config)
+
+        assert sorted(r.url for r in resources) == [
+            "https://example.com/bad.html",
+            "https://example.com/logo.png",
+        ]
+        assert stats.failed_captures == 1
+
+    def test_capture_raises_navigation_error(self):
+        """Test that a failing document request raises NavigationError."""
+
+        def fail(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        async def run():
+            transport = httpx.MockTransport(fail)
+            async with httpx.AsyncClient(transport=transport) as client:
+                engine = HttpCaptureEngine(
+                    CaptureConfig(url="https://example.com/"), client=client
+                )
+                await engine.capture_resources()
+
+        with pytest.raises(NavigationError):
+            asyncio.run(run())
+
+
+class TestCreateEngine:
+    """Tests for create_engine function."""
+
+    def test_create_engine_selects_by_config(self):
+        """Test that the engine setting picks the implementation."""
+        http = create_engine(CaptureConfig(url="https://example.com/", engine="http"))
+        browser = create_engine(CaptureConfig(url="https://example.com/"))
+
+        assert isinstance(http, HttpCaptureEngine)
+        assert isinstance(browser, CaptureEngine)
+
+    def test_invalid_engine_rejected(self):
+        """Test that unknown engines are rejected."""
+        with pytest.raises(ValueError, match="engine"):
+            CaptureConfig(url="https://example.com/", engine="curl")
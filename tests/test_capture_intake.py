@@ -0,0 +1,85 @@
+"""Tests for backpressured response intake."""
+
+import asyncio
+
+import pytest
+
+from webgrab.capture.intake import ResponseIntake
+
+
+async def _drain(queue):
+    """Consume a queue until the end-of-stream sentinel."""
+    items = []
+    while True:
+        item = await queue.get()
+        if item is None:
+            return items
+        items.append(item)
+
+
+class TestResponseIntake:
+    """Tests for ResponseIntake."""
+
+    def test_invalid_overflow(self):
+        """Test that unknown overflow policies are rejected."""
+        with pytest.raises(ValueError, match="overflow must be one of"):
+            ResponseIntake(overflow="block")
+
+    def test_unbounded_keeps_everything(self):
+        """Test that an unbounded intake queues responses immediately."""
+
+        async def run():
+            intake = ResponseIntake()
+            for i in range(5):
+                intake.on_response(i)
+            assert intake.pending_count == 0
+            await intake.close()
+            return await _drain(intake.queue)
+
+        assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+    def test_wait_policy_loses_nothing(self):
+        """Test that a full queue parks responses until the consumer catches up."""
+
+        async def run():
+            intake = ResponseIntake(maxsize=2, overflow="wait")
+            for i in range(6):
+                intake.on_response(i)
+            assert intake.pending_count == 4
+            consumer = asyncio.create_task(_drain(intake.queue))
+            await intake.close()
+            return await consumer, intake.dropped
+
+        items, dropped = asyncio.run(run())
+        assert items == [0, 1, 2, 3, 4, 5]
+        assert dropped == 0
+
+    def test_drop_policy_counts_overflow(self):
+        """Test that a full queue drops and counts responses."""
+
+        async def run():
+            intake = ResponseIntake(maxsize=2, overflow="drop")
+            for i in range(5):
+                intake.on_response(i)
+            consumer = asyncio.create_task(_drain(intake.queue))
+            await intake.close()
+            return await consumer, intake.dropped
+
+        items, dropped = asyncio.run(run())
+        assert items == [0, 1]
+        assert dropped == 3
+
+    def test_late_responses_are_counted(self):
+        """Test that responses after close are counted as late, not dropped."""
+
+        async def run():
+            intake = ResponseIntake()
+            intake.on_response(1)
+            await intake.close()
+            intake.on_response(2)
+            return await _drain(intake.queue), intake.dropped, intake.late
+
+        items, dropped, late = asyncio.run(run())
+        assert items == [1]
+        assert dropped == 0
+        assert late == 1
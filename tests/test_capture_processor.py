@@ -0,0 +1,176 @@
+"""Tests for the streaming resource processor."""
+
+import asyncio
+from typing import ClassVar
+
+import pytest
+
+from webgrab.capture.processor import ResourceProcessor
+
+
+class FakeResponse:
+    """Playwright response stand-in with a controllable body delay."""
+
+    active = 0
+    peak = 0
+
+    def __init__(self, url, delay=0.0, status=200, fail=False):
+        self.url = url
+        self.status = status
+        self.headers = {"content-type": "text/plain"}
+        self.delay = delay
+        self.fail = fail
+
+    async def body(self):
+        FakeResponse.active += 1
+        FakeResponse.peak = max(FakeResponse.peak, FakeResponse.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("body unavailable")
+            return self.url.encode()
+        finally:
+            FakeResponse.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    """Reset the in-flight counters between tests."""
+    FakeResponse.active = 0
+    FakeResponse.peak = 0
+
+
+async def _collect(processor, responses):
+    """Feed responses through the processor and collect resource URLs."""
+    queue = asyncio.Queue()
+    for response in responses:
+        queue.put_nowait(response)
+    queue.put_nowait(None)
+    return [resource.url async for resource in processor.process_responses_stream(queue)]
+
+
+class TestResourceProcessor:
+    """Tests for ResourceProcessor."""
+
+    def test_invalid_concurrency(self):
+        """Test that concurrency must be positive."""
+        with pytest.raises(ValueError, match="concurrency must be positive"):
+            ResourceProcessor(concurrency=0)
+
+    def test_serial_processing_keeps_order(self):
+        """Test the default one-at-a-time mode."""
+        processor = ResourceProcessor()
+        responses = [FakeResponse(f"https://example.com/{i}") for i in range(3)]
+        urls = asyncio.run(_collect(processor, responses))
+        assert urls == [r.url for r in responses]
+        assert FakeResponse.peak == 1
+
+    def test_concurrent_fetch_respects_limit(self):
+        """Test that bodies are fetched in parallel up to the limit."""
+        processor = ResourceProcessor(concurrency=3)
+        responses = [FakeResponse(f"https://example.com/{i}", delay=0.01) for i in range(10)]
+        urls = asyncio.run(_collect(processor, responses))
+        assert sorted(urls) == sorted(r.url for r in responses)
+        assert FakeResponse.peak == 3
+
+    def test_arrival_order(self):
+        """Test that unordered mode yields whichever body finishes first."""
+        processor = ResourceProcessor(concurrency=2)
+        slow = FakeResponse("https://example.com/slow", delay=0.05)
+        fast = FakeResponse("https://example.com/fast", delay=0.0)
+        assert asyncio.run(_collect(processor, [slow, fast])) == [fast.url, slow.url]
+
+    def test_request_order(self):
+        """Test that ordered mode yields in response order."""
+        processor = ResourceProcessor(concurrency=2, ordered=True)
+        slow = FakeResponse("https://example.com/slow", delay=0.05)
+        fast = FakeResponse("https://example.com/fast", delay=0.0)
+        assert asyncio.run(_collect(processor, [slow, fast])) == [slow.url, fast.url]
+
+    def test_concurrent_stats(self):
+        """Test that statistics stay accurate under concurrency."""
+        processor = ResourceProcessor(concurrency=4)
+        responses = [
+            FakeResponse("https://example.com/ok1"),
+            FakeResponse("https://example.com/ok2", delay=0.01),
+            FakeResponse("https://example.com/missing", status=404),
+            FakeResponse("https://example.com/broken", fail=True),
+        ]
+        urls = asyncio.run(_collect(processor, responses))
+
+        stats = processor.stats
+        assert len(urls) == 2
+        assert stats.total_requests == 4
+        assert stats.successful_captures == 2
+        assert stats.skipped_urls == 1
+        assert stats.failed_captures == 1
+        assert stats.total_bytes == len(b"https://example.com/ok1") * 2
+
+    def test_unconsumed_results_hold_slots(self):
+        """Test that a slow consumer bounds the bodies held in memory."""
+        processor = ResourceProcessor(concurrency=2)
+
+        async def run():
+            queue = asyncio.Queue()
+            for i in range(6):
+                queue.put_nowait(FakeResponse(f"https://example.com/{i}"))
+            queue.put_nowait(None)
+            stream = processor.process_responses_stream(queue)
+            await stream.__anext__()
+            for _ in range(20):
+                await asyncio.sleep(0)
+            started = processor.stats.total_requests
+            await stream.aclose()
+            return started
+
+        # The resource held by the consumer keeps its slot
+        assert asyncio.run(run()) <= 2
+
+    def test_body_filter_drops_resource(self):
+        """Test that a body-level filter is applied once the body is fetched."""
+
+        class SizeLimit:
+            def should_capture(self, url, content_type, status_code):
+                return True
+
+            def should_keep(self, url, content_type, size):
+                return size <= len("https://example.com/a")
+
+        processor = ResourceProcessor(SizeLimit())
+        responses = [FakeResponse("https://example.com/a"), FakeResponse("https://example.com/long")]
+
+        assert asyncio.run(_collect(processor, responses)) == ["https://example.com/a"]
+        assert processor.stats.skipped_urls == 1
+
+    def test_records_resource_timing(self):
+        """Test that captured resources carry the browser's request timing."""
+
+        class TimedRequest:
+            timing: ClassVar[dict[str, float]] = {
+                "startTime": 1_700_000_000_000.0,
+                "responseStart": 250.0,
+            }
+
+        response = FakeResponse("https://example.com/a")
+        response.request = TimedRequest()
+        processor = ResourceProcessor()
+
+        async def run():
+            queue = asyncio.Queue()
+            queue.put_nowait(response)
+            queue.put_nowait(FakeResponse("https://example.com/b"))
+            queue.put_nowait(None)
+            return [r async for r in processor.process_responses_stream(queue)]
+
+        timed, untimed = asyncio.run(run())
+        assert timed.timing.request_start == 1_700_000_000.0
+        assert timed.timing.response_at == 1_700_000_000.25
+        assert timed.timing.body_at is not None
+        assert timed.timing.size == len("https://example.com/a")
+        # Without a request timing only the body time is known
+        assert untimed.timing.request_start is None
+        assert untimed.timing.body_at is not None
+        metrics = processor.stats.metrics
+        assert metrics.timings == [timed.timing, untimed.timing]
+        assert metrics.size_histogram.count == 2
+        assert metrics.latency_histogram.count == 1
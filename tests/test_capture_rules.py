@@ -0,0 +1,177 @@
+"""Tests for compiled rule-based filtering."""
+
+import pytest
+
+from webgrab.capture.rules import (
+    DomainTrie,
+    PatternMatcher,
+    RuleFilter,
+    load_rule_filter,
+    parse_rules,
+)
+from webgrab.errors import ConfigurationError
+
+RULES = """\
+! Comment
+# Another comment
+||ads.example.com^
+host:tracker.example
+@@||ok.ads.example.com^
+/banner/*.gif
+|https://cdn.example.net/evil
+adsbygoogle^
+||example.org/ads/
+@@/banner/keep.gif
+type:video/*
+type:image/x-icon
+size:>1K
+example.com##.ad
+||third.example^$third-party
+"""
+
+
+@pytest.fixture
+def rule_filter():
+    """Filter compiled from the sample rules."""
+    return RuleFilter(parse_rules(RULES.splitlines()))
+
+
+class TestParseRules:
+    """Tests for parse_rules function."""
+
+    def test_rules_sorted_by_kind(self):
+        """Test that each rule lands in the right bucket."""
+        rules = parse_rules(RULES.splitlines())
+
+        assert rules.block_hosts == ["ads.example.com", "tracker.example"]
+        assert rules.allow_hosts == ["ok.ads.example.com"]
+        assert rules.block_patterns == [
+            "/banner/*.gif",
+            "|https://cdn.example.net/evil",
+            "adsbygoogle^",
+            "||example.org/ads/",
+        ]
+        assert rules.allow_patterns == ["/banner/keep.gif"]
+        assert rules.block_types == ["video/*", "image/x-icon"]
+        assert rules.max_size == 1024
+        assert rules.ignored == 2
+
+    def test_size_limits_tighten(self):
+        """Test that repeated size rules keep the strictest limit."""
+        rules = parse_rules(["size:>2M", "size:>1M", "size:<10", "size:<100"])
+        assert rules.max_size == 1024 * 1024
+        assert rules.min_size == 100
+
+    @pytest.mark.parametrize("line", ["size:>lots", "size:=5", "type:video", "type:/mp4"])
+    def test_malformed_rule(self, line):
+        """Test that malformed size and type rules are reported with a line."""
+        with pytest.raises(ConfigurationError, match="rules.txt:2"):
+            parse_rules(["||ok.example^", line], "rules.txt")
+
+
+class TestDomainTrie:
+    """Tests for DomainTrie."""
+
+    def test_matches_host_and_subdomains(self):
+        """Test that stored hosts cover their subdomains only."""
+        trie = DomainTrie(["example.com", "ads.other.net"])
+
+        assert trie.matches("example.com")
+        assert trie.matches("cdn.example.com")
+        assert trie.matches("x.ads.other.net")
+        assert not trie.matches("other.net")
+        assert not trie.matches("badexample.com")
+
+
+class TestPatternMatcher:
+    """Tests for PatternMatcher."""
+
+    def test_wildcards_separators_and_anchors(self):
+        """Test the pattern syntax against lowercase URLs."""
+        matcher = PatternMatcher(["/banner/*.gif", "adsbygoogle^", "|https://a.test/x|"])
+
+        assert matcher.matches("https://e.com/img/banner/big.gif")
+        assert not matcher.matches("https://e.com/banner/big.png")
+        assert matcher.matches("https://e.com/adsbygoogle?id=1")
+        assert matcher.matches("https://e.com/adsbygoogle")
+        assert not matcher.matches("https://e.com/adsbygoogle.js")
+        assert matcher.matches("https://a.test/x")
+        assert not matcher.matches("https://a.test/xy")
+
+    def test_host_anchor(self):
+        """Test that ``||`` anchors at a host label boundary."""
+        matcher = PatternMatcher(["||example.org/ads/"])
+
+        assert matcher.matches("https://www.example.org/ads/1")
+        assert matcher.matches("http://example.org/ads/")
+        assert not matcher.matches("https://notexample.org/ads/1")
+        assert not matcher.matches("https://example.org/x/ads/1")
+
+    def test_overlapping_literals(self):
+        """Test that literals sharing suffixes are all found."""
+        patterns = [f"/{word}/" for word in ("he", "she", "his", "hers", "ushers")]
+        matcher = PatternMatcher(patterns + ["/track*pixel"])
+
+        assert matcher.matches("https://e.com/a/ushers/b")
+        assert matcher.matches("https://e.com/hers/")
+        assert matcher.matches("https://e.com/track/1x1pixel.gif")
+        assert not matcher.matches("https://e.com/usher/b")
+
+    def test_large_rule_sets(self):
+        """Test matching against tens of thousands of patterns."""
+        matcher = PatternMatcher(f"/ad-slot-{i}/*.js" for i in range(20000))
+
+        assert len(matcher) == 20000
+        assert matcher.matches("https://e.com/ad-slot-19999/x.js")
+        assert not matcher.matches("https://e.com/ad-slot-20000/x.js")
+
+
+class TestRuleFilter:
+    """Tests for RuleFilter."""
+
+    def test_request_level_rules(self, rule_filter):
+        """Test that host and URL rules block requests."""
+        assert not rule_filter.should_request("https://ads.example.com/a.js", "script")
+        assert not rule_filter.should_request("https://x.tracker.example/p", "image")
+        assert not rule_filter.should_request("https://cdn.example.net/evil.js", "script")
+        assert rule_filter.should_request("https://example.com/app.js", "script")
+
+    def test_exceptions_win(self, rule_filter):
+        """Test that exception rules override block rules."""
+        assert rule_filter.should_request("https://ok.ads.example.com/a.js", "script")
+        assert not rule_filter.should_request("https://e.com/banner/drop.gif", "image")
+        assert rule_filter.should_request("https://e.com/banner/keep.gif", "image")
+        assert rule_filter.should_keep("https://e.com/banner/keep.gif", "image/gif", 10**6)
+
+    def test_content_type_rules(self, rule_filter):
+        """Test exact and major-type content rules."""
+        assert not rule_filter.should_capture("https://e.com/v", "video/mp4", 200)
+        assert not rule_filter.should_capture("https://e.com/f", "image/x-icon; q=1", 200)
+        assert rule_filter.should_capture("https://e.com/i", "image/png", 200)
+
+    def test_size_rules(self, rule_filter):
+        """Test that bodies over the limit are not kept."""
+        assert rule_filter.should_keep("https://e.com/a", "text/css", 1024)
+        assert not rule_filter.should_keep("https://e.com/a", "text/css", 1025)
+
+
+class TestLoadRuleFilter:
+    """Tests for load_rule_filter function."""
+
+    def test_compilation_cached_until_file_changes(self, temp_dir):
+        """Test that unchanged files reuse the compiled filter."""
+        path = temp_dir / "rules.txt"
+        path.write_text("||ads.example^\n")
+
+        first = load_rule_filter([path])
+        assert load_rule_filter([path]) is first
+
+        path.write_text("||ads.example^\n||more.example^\n")
+        second = load_rule_filter([path])
+        assert second is not first
+        assert not second.should_request("https://more.example/", "image")
+
+    def test_missing_file(self, temp_dir):
+        """Test that a missing rule file is a configuration error."""
+        with pytest.raises(ConfigurationError, match="Cannot read rule file"):
+            load_rule_filter([temp_dir / "missing.txt"])
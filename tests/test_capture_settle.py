@@ -0,0 +1,100 @@
+"""Tests for adaptive network settling."""
+
+import asyncio
+import time
+
+import pytest
+
+from webgrab.capture.settle import NetworkSettler
+
+
+class FakeRequest:
+    """Playwright request stand-in."""
+
+    def __init__(self, resource_type="fetch"):
+        self.resource_type = resource_type
+
+
+class TestNetworkSettler:
+    """Tests for NetworkSettler."""
+
+    def test_invalid_idle(self):
+        """Test that the idle window must be positive."""
+        with pytest.raises(ValueError, match="idle_ms must be positive"):
+            NetworkSettler(idle_ms=0)
+
+    def test_settles_after_idle_window(self):
+        """Test that a quiet page settles after the idle window, not the deadline."""
+
+        async def run():
+            settler = NetworkSettler(idle_ms=20)
+            start = time.monotonic()
+            settled = await settler.wait(timeout=5)
+            return settled, time.monotonic() - start
+
+        settled, elapsed = asyncio.run(run())
+        assert settled
+        assert elapsed < 1
+
+    def test_in_flight_request_blocks_settling(self):
+        """Test that an open request holds settling until it finishes."""
+
+        async def run():
+            settler = NetworkSettler(idle_ms=20, long_lived_ms=None)
+            request = FakeRequest()
+            settler.on_request(request)
+            asyncio.get_running_loop().call_later(0.1, settler.on_request_done, request)
+            start = time.monotonic()
+            settled = await settler.wait(timeout=5)
+            return settled, time.monotonic() - start
+
+        settled, elapsed = asyncio.run(run())
+        assert settled
+        assert elapsed >= 0.1
+
+    def test_deadline_when_never_idle(self):
+        """Test that a request that never finishes hits the hard deadline."""
+
+        async def run():
+            settler = NetworkSettler(idle_ms=20, long_lived_ms=None)
+            settler.on_request(FakeRequest())
+            return await settler.wait(timeout=0.1)
+
+        assert asyncio.run(run()) is False
+
+    def test_long_lived_requests_ignored(self):
+        """Test that long-polling requests stop counting after the cutoff."""
+
+        async def run():
+            settler = NetworkSettler(idle_ms=20, long_lived_ms=50)
+            settler.on_request(FakeRequest("xhr"))
+            return await settler.wait(timeout=5)
+
+        assert asyncio.run(run()) is True
+
+    def test_streaming_connections_ignored(self):
+        """Test that websockets never count as in flight."""
+        settler = NetworkSettler()
+        settler.on_request(FakeRequest("websocket"))
+        settler.on_request(FakeRequest("eventsource"))
+        assert settler.active_count() == 0
+
+    def test_active_count(self):
+        """Test counting in-flight requests."""
+        settler = NetworkSettler(long_lived_ms=None)
+        first, second = FakeRequest(), FakeRequest()
+        settler.on_request(first)
+        settler.on_request(second)
+        settler.on_request_done(first)
+        assert settler.active_count() == 1
+
+    def test_attach_subscribes_to_events(self):
+        """Test that attach registers the request lifecycle events."""
+        events = []
+
+        class FakePage:
+            def on(self, event, handler):
+                events.append(event)
+
+        NetworkSettler().attach(FakePage())
+        assert events == ["request", "requestfinished", "requestfailed"]
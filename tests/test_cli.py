@@ -0,0 +1,99 @@
+"""Tests for CLI helpers."""
+
+import pytest
+import typer
+
+from webgrab.cli import _read_url_list, _validate_save_options, _with_default_command
+from webgrab.errors import ConfigurationError
+
+
+class TestReadUrlList:
+    """Tests for reading URL list files."""
+
+    def test_read_url_list_skips_comments_and_blanks(self, temp_dir):
+        """Test that comments and blank lines are ignored."""
+        path = temp_dir / "urls.txt"
+        path.write_text("# pages\nhttps://example.com/a\n\n  example.com/b  \n")
+        assert _read_url_list(path) == [
+            "https://example.com/a",
+            "https://example.com/b",
+        ]
+
+    def test_read_url_list_dedupes(self, temp_dir):
+        """Test that repeated URLs are kept once."""
+        path = temp_dir / "urls.txt"
+        path.write_text("https://example.com\nhttps://example.com\n")
+        assert _read_url_list(path) == ["https://example.com"]
+
+    def test_read_url_list_invalid_line(self, temp_dir):
+        """Test that invalid URLs report their line number."""
+        path = temp_dir / "urls.txt"
+        path.write_text("https://example.com\nftp://example.com\n")
+        with pytest.raises(ConfigurationError, match="urls.txt:2"):
+            _read_url_list(path)
+
+    def test_read_url_list_missing_file(self, temp_dir):
+        """Test that a missing file raises a configuration error."""
+        with pytest.raises(ConfigurationError, match="Cannot read URL list"):
+            _read_url_list(temp_dir / "missing.txt")
+
+
+class TestDefaultCommand:
+    """Tests for routing bare invocations to the capture command."""
+
+    def test_bare_url_routes_to_capture(self):
+        """Test that a bare URL runs the capture command."""
+        assert _with_default_command(["https://example.com"]) == [
+            "capture",
+            "https://example.com",
+        ]
+
+    def test_known_command_unchanged(self):
+        """Test that explicit commands are left alone."""
+        assert _with_default_command(["capture-many", "urls.txt"]) == [
+            "capture-many",
+            "urls.txt",
+        ]
+
+    def test_help_unchanged(self):
+        """Test that top-level help is left alone."""
+        assert _with_default_command(["--help"]) == ["--help"]
+
+
+class TestValidateSaveOptions:
+    """Tests for the option checks shared by the capture commands."""
+
+    @staticmethod
+    def _options(**overrides):
+        options = {
+            "settle": "networkidle",
+            "output_format": "files",
+            "incremental": False,
+            "rewrite_links": False,
+            "compress": None,
+            "query_mode": "ignore",
+        }
+        options.update(overrides)
+        return options
+
+    def test_valid_options_pass(self):
+        """Test that consistent options are accepted."""
+        _validate_save_options(**self._options(incremental=True, compress="gzip"))
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"settle": "load"},
+            {"output_format": "zip"},
+            {"output_format": "warc", "incremental": True},
+            {"output_format": "warc", "rewrite_links": True},
+            {"rewrite_links": True, "compress": "gzip"},
+            {"query_mode": "keep"},
+            {"compress": "brotli"},
+        ],
+    )
+    def test_invalid_options_exit(self, overrides):
+        """Test that each invalid or conflicting option exits with status 1."""
+        with pytest.raises(typer.Exit) as excinfo:
+            _validate_save_options(**self._options(**overrides))
+        assert excinfo.value.exit_code == 1
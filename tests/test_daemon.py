@@ -0,0 +1,286 @@
+"""Tests for the warm-browser capture daemon."""
+
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+from webgrab.capture.browser import BrowserPool
+from webgrab.capture.engine import CaptureEngine
+from webgrab.daemon import server
+from webgrab.daemon.client import capture_via_daemon, ping_daemon, stop_daemon
+from webgrab.daemon.protocol import (
+    decode_message,
+    encode_message,
+    save_result_from_dict,
+    save_result_to_dict,
+    stats_from_dict,
+    stats_to_dict,
+)
+from webgrab.errors import DaemonError, NavigationError, WebGrabError
+from webgrab.models import (
+    CaptureConfig,
+    CaptureStats,
+    Resource,
+    ResourceTiming,
+    SaveConfig,
+    SaveResult,
+)
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="the daemon uses Unix domain sockets"
+)
+
+
+class FakePool:
+    """Browser pool stand-in that counts launches."""
+
+    launches = 0
+    isolated = False
+
+    def __init__(self, config, size, isolated=False):
+        self.size = size
+        FakePool.isolated = isolated
+
+    async def __aenter__(self):
+        FakePool.launches += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield object()
+
+
+class FakeEngine(CaptureEngine):
+    """Capture engine that streams one HTML resource per page without a browser."""
+
+    async def stream_resources(self, on_resource):
+        if "broken" in self.config.url:
+            raise NavigationError(f"Failed to navigate to {self.config.url}")
+        self._update_status("Navigating...")
+        pending = on_resource(
+            Resource(
+                url=self.config.url,
+                content_type="text/html",
+                body=b"<html></html>",
+                headers={},
+                status_code=200,
+            )
+        )
+        if pending is not None:
+            await pending
+        return CaptureStats(total_requests=1, successful_captures=1, total_bytes=13)
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """Replace the browser pool and engine with fakes."""
+    FakePool.launches = 0
+    FakePool.isolated = False
+    monkeypatch.setattr(server, "BrowserPool", FakePool)
+    monkeypatch.setattr(server, "CaptureEngine", FakeEngine)
+
+
+async def _run_with_daemon(socket_path, client):
+    """Start a daemon, run a client coroutine against it, then stop it."""
+    daemon = server.CaptureDaemon(socket_path)
+    serve_task = asyncio.create_task(daemon.serve())
+    while not socket_path.exists():
+        await asyncio.sleep(0.01)
+    try:
+        return await client()
+    finally:
+        await stop_daemon(socket_path)
+        await serve_task
+
+
+class FakeContext:
+    """Browser context stand-in that records whether it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    """Browser stand-in that hands out new contexts."""
+
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, **options):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+class TestIsolatedPool:
+    """Tests for the per-request contexts the daemon serves captures from."""
+
+    def test_each_borrower_gets_a_new_context(self):
+        """Test that contexts are never shared and are closed after use."""
+        pool = BrowserPool(CaptureConfig(url="about:blank"), 1, isolated=True)
+        browser = FakeBrowser()
+        pool.browser = browser
+
+        async def run():
+            borrowed = []
+            for _ in range(2):
+                async with pool.acquire() as context:
+                    assert not context.closed
+                    borrowed.append(context)
+            return borrowed
+
+        first, second = asyncio.run(run())
+        assert first is not second
+        assert browser.contexts == [first, second]
+        assert first.closed and second.closed
+
+    def test_size_bounds_open_contexts(self):
+        """Test that borrowers wait once ``size`` contexts are open."""
+        pool = BrowserPool(CaptureConfig(url="about:blank"), 2, isolated=True)
+        pool.browser = FakeBrowser()
+        peak = 0
+        open_now = 0
+
+        async def borrow():
+            nonlocal peak, open_now
+            async with pool.acquire():
+                open_now += 1
+                peak = max(peak, open_now)
+                await asyncio.sleep(0.01)
+                open_now -= 1
+
+        async def run():
+            await asyncio.gather(*(borrow() for _ in range(5)))
+
+        asyncio.run(run())
+        assert peak == 2
+
+
+class TestProtocol:
+    """Tests for protocol serialization."""
+
+    def test_message_round_trip(self):
+        """Test encoding and decoding a message."""
+        line = encode_message({"command": "ping"})
+        assert line.endswith(b"\n")
+        assert decode_message(line) == {"command": "ping"}
+
+    def test_decode_malformed(self):
+        """Test that malformed lines raise an error."""
+        with pytest.raises(WebGrabError, match="Malformed"):
+            decode_message(b"[1, 2]\n")
+
+    def test_stats_round_trip(self):
+        """Test serializing capture statistics."""
+        stats = CaptureStats(total_requests=3, successful_captures=2, total_bytes=7)
+        stats.metrics.add_phase("navigate", 0.5)
+        stats.metrics.record(ResourceTiming("https://example.com/", size=7, body_at=1.0))
+        assert stats_from_dict(stats_to_dict(stats)) == stats
+
+    def test_save_result_round_trip(self, temp_dir):
+        """Test serializing a save result."""
+        result = SaveResult(
+            saved_paths=[temp_dir / "a.html"],
+            skipped_count=1,
+            failed_saves=[("https://example.com/x", OSError("disk full"))],
+        )
+        restored = save_result_from_dict(save_result_to_dict(result))
+        assert restored.saved_paths == result.saved_paths
+        assert restored.skipped_count == 1
+        assert str(restored.failed_saves[0][1]) == "disk full"
+
+
+class TestCaptureDaemon:
+    """Tests for the daemon and its client."""
+
+    def test_ping_without_daemon(self, temp_dir):
+        """Test that ping reports no daemon when the socket is missing."""
+        assert not asyncio.run(ping_daemon(temp_dir / "missing.sock"))
+
+    def test_capture_via_daemon(self, temp_dir, fake_browser):
+        """Test capturing two pages over one warm browser."""
+        socket_path = temp_dir / "d.sock"
+        statuses = []
+
+        async def client():
+            assert await ping_daemon(socket_path)
+            results = []
+            for name in ("a", "b"):
+                capture_config = CaptureConfig(url=f"https://example.com/{name}.html")
+                save_config = SaveConfig(
+                    output_dir=temp_dir / "out", base_url=capture_config.url
+                )
+                results.append(
+                    await capture_via_daemon(
+                        socket_path, capture_config, save_config, statuses.append
+                    )
+                )
+            return results
+
+        results = asyncio.run(_run_with_daemon(socket_path, client))
+
+        assert FakePool.launches == 1
+        assert FakePool.isolated
+        assert [stats.total_bytes for stats, _ in results] == [13, 13]
+        assert (temp_dir / "out" / "example.com" / "b.html").exists()
+        assert "Navigating..." in statuses
+        assert not socket_path.exists()
+
+    def test_capture_error_keeps_type(self, temp_dir, fake_browser):
+        """Test that navigation errors are re-raised with their type."""
+        socket_path = temp_dir / "d.sock"
+
+        async def client():
+            capture_config = CaptureConfig(url="https://example.com/broken")
+            save_config = SaveConfig(output_dir=temp_dir, base_url=capture_config.url)
+            with pytest.raises(NavigationError, match="broken"):
+                await capture_via_daemon(socket_path, capture_config, save_config)
+
+        asyncio.run(_run_with_daemon(socket_path, client))
+
+    def test_stale_socket_is_replaced(self, temp_dir, fake_browser):
+        """Test that a leftover socket file does not block startup."""
+        socket_path = temp_dir / "d.sock"
+        socket_path.write_text("")
+
+        async def client():
+            # The stale file exists before serve() replaces it
+            while not await ping_daemon(socket_path):
+                await asyncio.sleep(0.01)
+            return True
+
+        assert asyncio.run(_run_with_daemon(socket_path, client))
+
+    def test_request_times_out(self, temp_dir):
+        """Test that a daemon that never replies does not block the client."""
+        socket_path = temp_dir / "hung.sock"
+
+        async def run():
+            released = asyncio.Event()
+
+            async def hang(reader, writer):
+                await reader.readline()
+                await released.wait()
+                writer.close()
+
+            hung = await asyncio.start_unix_server(hang, path=str(socket_path))
+            async with hung:
+                capture_config = CaptureConfig(url="https://example.com/")
+                save_config = SaveConfig(output_dir=temp_dir, base_url=capture_config.url)
+                try:
+                    with pytest.raises(DaemonError, match="did not reply"):
+                        await capture_via_daemon(
+                            socket_path, capture_config, save_config, timeout=0.05
+                        )
+                finally:
+                    released.set()
+
+        asyncio.run(run())
@@ -0,0 +1,131 @@
+"""Tests for capture statistics export."""
+
+import json
+import stat
+
+from webgrab.metrics import (
+    metrics_from_dict,
+    metrics_to_dict,
+    prometheus_text,
+    stats_report,
+    write_prometheus_textfile,
+    write_stats_json,
+)
+from webgrab.models import CaptureStats, ResourceTiming, SaveResult
+
+
+def _stats() -> CaptureStats:
+    """Statistics of a small capture with two timed resources."""
+    stats = CaptureStats(
+        total_requests=3,
+        successful_captures=2,
+        skipped_urls=1,
+        total_bytes=3000,
+        duration_seconds=1.5,
+    )
+    stats.metrics.add_phase("navigate", 0.75)
+    stats.metrics.filter_seconds = 0.01
+    stats.metrics.record(
+        ResourceTiming(
+            "https://example.com/",
+            size=1000,
+            request_start=100.0,
+            response_at=100.1,
+            body_at=100.2,
+            written_at=100.3,
+            write_seconds=0.05,
+        )
+    )
+    stats.metrics.record(ResourceTiming("https://example.com/app.js", size=2000))
+    return stats
+
+
+class TestMetricsSerialization:
+    """Tests for the dict form used by the daemon protocol."""
+
+    def test_round_trip(self):
+        """Test that metrics survive a JSON round trip."""
+        metrics = _stats().metrics
+        data = json.loads(json.dumps(metrics_to_dict(metrics)))
+        assert metrics_from_dict(data) == metrics
+
+
+class TestStatsReport:
+    """Tests for the --stats-json report."""
+
+    def test_report_contents(self):
+        """Test counters, phases, histograms and per-resource entries."""
+        save_result = SaveResult(skipped_count=1)
+        report = stats_report(_stats(), save_result)
+
+        assert report["counters"]["successful_captures"] == 2
+        assert report["save"] == {"saved": 0, "skipped": 1, "failed": 0, "rewritten": 0}
+        assert report["phases"] == {"navigate": 0.75}
+        assert report["resource_seconds"]["write"] == 0.05
+        size = report["histograms"]["size_bytes"]
+        assert size["buckets"][0] == [1024.0, 1]
+        assert size["buckets"][-1] == ["+Inf", 2]
+        assert size["count"] == 2
+        first, second = report["resources"]
+        assert first["latency"] == 100.2 - 100.0
+        assert first["written_at"] == 100.3
+        assert second["request_start"] is None
+
+    def test_report_without_save_result(self):
+        """Test that the save section is optional."""
+        assert "save" not in stats_report(CaptureStats())
+
+    def test_write_stats_json(self, temp_dir):
+        """Test writing the report as valid JSON."""
+        path = temp_dir / "reports" / "stats.json"
+        write_stats_json(path, _stats())
+        report = json.loads(path.read_text())
+        assert report["version"] == 1
+        assert len(report["resources"]) == 2
+
+
+class TestPrometheusText:
+    """Tests for the Prometheus textfile export."""
+
+    def test_families_are_typed(self):
+        """Test that every sample belongs to a declared family."""
+        text = prometheus_text(_stats(), SaveResult())
+        lines = text.splitlines()
+        declared = {line.split()[2] for line in lines if line.startswith("# TYPE")}
+        for line in lines:
+            if line.startswith("#"):
+                continue
+            name = line.split("{")[0].split()[0]
+            assert any(
+                name == family or name.startswith(family + "_") for family in declared
+            )
+        assert text.endswith("\n")
+
+    def test_counters_and_phases(self):
+        """Test counter gauges and labelled phase samples."""
+        text = prometheus_text(_stats())
+        assert "webgrab_capture_successful_captures 2\n" in text
+        assert "webgrab_capture_duration_seconds 1.5\n" in text
+        assert 'webgrab_capture_phase_seconds{phase="navigate"} 0.75\n' in text
+        assert 'webgrab_capture_resource_work_seconds{work="filter"} 0.01\n' in text
+        assert "webgrab_save_saved" not in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        text = prometheus_text(_stats())
+        assert 'webgrab_resource_size_bytes_bucket{le="1024.0"} 1\n' in text
+        assert 'webgrab_resource_size_bytes_bucket{le="4096.0"} 2\n' in text
+        assert 'webgrab_resource_size_bytes_bucket{le="+Inf"} 2\n' in text
+        assert "webgrab_resource_size_bytes_count 2\n" in text
+        assert "webgrab_resource_latency_seconds_count 1\n" in text
+        assert "# TYPE webgrab_resource_latency_seconds histogram\n" in text
+
+    def test_textfile_is_replaced_and_readable(self, temp_dir):
+        """Test the atomic write leaves one world-readable file."""
+        path = temp_dir / "webgrab.prom"
+        path.write_text("stale\n")
+        write_prometheus_textfile(path, _stats())
+
+        assert path.read_text().startswith("# HELP")
+        assert stat.S_IMODE(path.stat().st_mode) == 0o644
+        assert [p.name for p in temp_dir.iterdir()] == ["webgrab.prom"]
@@ -1,7 +1,16 @@
 """Tests for MIME type detection."""
 
 
-from webgrab.mime.detector import get_extension_for_mime, infer_extension
+import pytest
+
+from webgrab.body import SpilledBody
+from webgrab.mime.detector import (
+    effective_content_type,
+    get_extension_for_mime,
+    infer_extension,
+    is_compressible,
+    sniff_content_type,
+)
 
 
 class TestInferExtension:
@@ -84,3 +93,99 @@ class TestGetExtensionForMime:
         """Test that MIME type matching is case-insensitive."""
         assert get_extension_for_mime("TEXT/HTML") == ".html"
         assert get_extension_for_mime("Text/Html") == ".html"
+
+
+class TestIsCompressible:
+    """Tests for is_compressible function."""
+
+    def test_text_like_types_are_compressible(self):
+        """Test that HTML, CSS, JS, JSON and SVG are compressible."""
+        for content_type in (
+            "text/html; charset=utf-8",
+            "text/css",
+            "application/javascript",
+            "application/json",
+            "image/svg+xml",
+            "application/ld+json",
+            "text/x-unknown",
+        ):
+            assert is_compressible(content_type), content_type
+
+    def test_compressed_media_is_not_compressible(self):
+        """Test that already-compressed formats are skipped."""
+        for content_type in ("image/png", "font/woff2", "video/mp4", "application/zip", ""):
+            assert not is_compressible(content_type), content_type
+
+
+class TestSniffContentType:
+    """Tests for magic-byte and text sniffing."""
+
+    @pytest.mark.parametrize(
+        ("head", "expected"),
+        [
+            (b"\x89PNG\r\n\x1a\n\x00\x00", "image/png"),
+            (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+            (b"GIF89a\x01\x00", "image/gif"),
+            (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+            (b"\x00\x00\x00\x1cftypavif", "image/avif"),
+            (b"wOF2\x00\x01\x00\x00", "font/woff2"),
+            (b"wOFF\x00\x01\x00\x00", "font/woff"),
+            (b"\x00\x01\x00\x00\x00\x0e\x00\x80", "font/ttf"),
+            (b"\x00asm\x01\x00\x00\x00", "application/wasm"),
+            (b"PK\x03\x04\x14\x00", "application/zip"),
+            (b"\x1f\x8b\x08\x00", "application/gzip"),
+            (b"%PDF-1.7", "application/pdf"),
+            (b"\x1a\x45\xdf\xa3\x9f", "video/webm"),
+            (b"\x00\x00\x00\x20ftypisom", "video/mp4"),
+            (b"ID3\x04\x00", "audio/mpeg"),
+            (b"\xef\xbb\xbf\n  <!DOCTYPE html><html>", "text/html"),
+            (b"<div class=x>", "text/html"),
+            (b'<?xml version="1.0"?>\n<svg xmlns="">', "image/svg+xml"),
+            (b'<?xml version="1.0"?><feed>', "application/xml"),
+            (b'  {"key": 1}', "application/json"),
+            (b"[1, 2]", "application/json"),
+        ],
+    )
+    def test_detected_types(self, head, expected):
+        """Test each signature in the table."""
+        assert sniff_content_type(head + b"\x00" * 16) == expected
+
+    def test_unknown_content(self):
+        """Test that JavaScript, CSS and plain text are not guessed."""
+        assert sniff_content_type(b"var x = 1;") is None
+        assert sniff_content_type(b"body { color: red }") is None
+        assert sniff_content_type(b"<divider>") is None
+        assert sniff_content_type(b"") is None
+
+    def test_spilled_body_only_head_read(self, temp_dir):
+        """Test sniffing a spilled body."""
+        body = SpilledBody.from_bytes(b"GIF87a" + b"\x00" * 4096, temp_dir)
+        assert sniff_content_type(body) == "image/gif"
+
+
+class TestEffectiveContentType:
+    """Tests for effective_content_type function."""
+
+    def test_generic_header_replaced(self):
+        """Test that missing and generic headers use the sniffed type."""
+        assert effective_content_type("", b"wOF2....") == "font/woff2"
+        assert effective_content_type("application/octet-stream", b"\x00asm") == (
+            "application/wasm"
+        )
+        assert effective_content_type("text/plain; charset=utf-8", b"<html>") == "text/html"
+
+    def test_binary_body_overrides_text_header(self):
+        """Test that an image served as HTML is recognized."""
+        assert effective_content_type("text/html", b"\x89PNG\r\n\x1a\n") == "image/png"
+
+    def test_consistent_header_kept(self):
+        """Test that specific headers are trusted."""
+        assert effective_content_type("text/css", b"body{}") == "text/css"
+        assert effective_content_type("image/jpeg", b"\x89PNG\r\n\x1a\n") == "image/jpeg"
+        assert effective_content_type("text/plain", b"plain words") == "text/plain"
+
+    def test_infer_extension_sniffs_body(self):
+        """Test that extensionless paths get the sniffed extension."""
+        assert infer_extension("/a/logo", "application/octet-stream", b"GIF89a") == "/a/logo.gif"
+        assert infer_extension("/a/logo.bin", "", b"GIF89a") == "/a/logo.bin"
+        assert infer_extension("/a/logo", "application/octet-stream") == "/a/logo"
@@ -3,7 +3,18 @@
 
 import pytest
 
-from webgrab.models import CaptureConfig, CaptureStats, Resource, SaveConfig, SaveResult
+from webgrab.models import (
+    BatchConfig,
+    BatchResult,
+    CaptureConfig,
+    CaptureMetrics,
+    CaptureStats,
+    Histogram,
+    Resource,
+    ResourceTiming,
+    SaveConfig,
+    SaveResult,
+)
 
 
 class TestResource:
@@ -55,6 +66,21 @@ class TestCaptureConfig:
         with pytest.raises(ValueError, match="timeout must be positive"):
             CaptureConfig(url="https://example.com", timeout=0)
 
+    def test_capture_config_validation_zero_body_concurrency(self):
+        """Test validation for zero body fetch concurrency."""
+        with pytest.raises(ValueError, match="body_fetch_concurrency must be positive"):
+            CaptureConfig(url="https://example.com", body_fetch_concurrency=0)
+
+    def test_capture_config_validation_overflow_policy(self):
+        """Test validation for the response overflow policy."""
+        with pytest.raises(ValueError, match="response_overflow"):
+            CaptureConfig(url="https://example.com", response_overflow="block")
+
+    def test_capture_config_validation_wait_strategy(self):
+        """Test validation for the wait strategy."""
+        with pytest.raises(ValueError, match="wait_strategy"):
+            CaptureConfig(url="https://example.com", wait_strategy="sleep")
+
 
 class TestSaveConfig:
     """Tests for SaveConfig model."""
@@ -70,6 +96,56 @@ class TestSaveConfig:
         assert config.base_url == "https://example.com"
         assert config.include_external is True
 
+    def test_save_config_invalid_write_workers(self, temp_dir):
+        """Test that the writer pool needs at least one thread."""
+        with pytest.raises(ValueError, match="write_workers"):
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", write_workers=0)
+
+    def test_save_config_incremental_excludes_keep_existing(self, temp_dir):
+        """Test that incremental saves cannot also keep existing files."""
+        with pytest.raises(ValueError, match="keep_existing"):
+            SaveConfig(
+                output_dir=temp_dir,
+                base_url="https://example.com",
+                incremental=True,
+                keep_existing=True,
+            )
+
+    def test_save_config_invalid_query_mode(self, temp_dir):
+        """Test that unknown query modes are rejected."""
+        with pytest.raises(ValueError, match="query_mode"):
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", query_mode="keep")
+
+    def test_save_config_incremental_requires_files(self, temp_dir):
+        """Test that incremental mode is rejected for WARC output."""
+        with pytest.raises(ValueError, match="incremental"):
+            SaveConfig(
+                output_dir=temp_dir,
+                base_url="https://example.com",
+                format="warc",
+                incremental=True,
+            )
+
+    def test_save_config_rewrite_links_requires_files(self, temp_dir):
+        """Test that link rewriting is rejected for WARC output."""
+        with pytest.raises(ValueError, match="rewrite_links"):
+            SaveConfig(
+                output_dir=temp_dir,
+                base_url="https://example.com",
+                format="warc",
+                rewrite_links=True,
+            )
+
+    def test_save_config_rewrite_links_rejects_compress(self, temp_dir):
+        """Test that link rewriting is rejected for compressed output."""
+        with pytest.raises(ValueError, match="compress"):
+            SaveConfig(
+                output_dir=temp_dir,
+                base_url="https://example.com",
+                compress=True,
+                rewrite_links=True,
+            )
+
 
 class TestCaptureStats:
     """Tests for CaptureStats model."""
@@ -86,6 +162,127 @@ class TestCaptureStats:
         stats = CaptureStats(total_requests=10, successful_captures=8)
         assert stats.success_rate == 80.0
 
+    def test_capture_stats_merge(self):
+        """Test merging counters from another capture."""
+        stats = CaptureStats(total_requests=2, successful_captures=1, total_bytes=10)
+        stats.merge(
+            CaptureStats(
+                total_requests=3,
+                successful_captures=2,
+                failed_captures=1,
+                skipped_urls=1,
+                total_bytes=5,
+                duration_seconds=4.0,
+            )
+        )
+        assert stats.total_requests == 5
+        assert stats.successful_captures == 3
+        assert stats.failed_captures == 1
+        assert stats.skipped_urls == 1
+        assert stats.total_bytes == 15
+        assert stats.duration_seconds == 0.0
+
+    def test_capture_stats_merge_includes_metrics(self):
+        """Test that merging combines timings, phases and histograms."""
+        stats = CaptureStats()
+        stats.metrics.add_phase("navigate", 1.0)
+        other = CaptureStats()
+        other.metrics.add_phase("navigate", 2.0)
+        other.metrics.record(ResourceTiming("https://example.com/", size=10))
+        stats.merge(other)
+        assert stats.metrics.phases == {"navigate": 3.0}
+        assert [t.url for t in stats.metrics.timings] == ["https://example.com/"]
+        assert stats.metrics.size_histogram.count == 1
+
+
+class TestHistogram:
+    """Tests for Histogram model."""
+
+    def test_observe_counts_values_at_or_below_bound(self):
+        """Test that a value equal to a bound falls in that bucket."""
+        histogram = Histogram((1.0, 10.0))
+        for value in (0.5, 1.0, 5.0, 10.0, 11.0):
+            histogram.observe(value)
+        assert histogram.counts == [2, 2, 1]
+        assert histogram.count == 5
+        assert histogram.total == 27.5
+
+    def test_cumulative(self):
+        """Test cumulative buckets ending at infinity."""
+        histogram = Histogram((1.0, 10.0))
+        histogram.observe(0.5)
+        histogram.observe(20.0)
+        assert histogram.cumulative() == [(1.0, 1), (10.0, 1), (float("inf"), 2)]
+
+    def test_merge(self):
+        """Test adding another histogram's observations."""
+        histogram = Histogram((1.0,))
+        histogram.observe(0.5)
+        other = Histogram((1.0,))
+        other.observe(2.0)
+        histogram.merge(other)
+        assert histogram.counts == [1, 1]
+        assert histogram.total == 2.5
+
+    def test_merge_rejects_different_bounds(self):
+        """Test that histograms with different buckets cannot be merged."""
+        with pytest.raises(ValueError, match="different bounds"):
+            Histogram((1.0,)).merge(Histogram((2.0,)))
+
+    def test_bounds_must_increase(self):
+        """Test bound validation."""
+        with pytest.raises(ValueError, match="strictly increasing"):
+            Histogram((2.0, 1.0))
+
+    def test_counts_must_match_bounds(self):
+        """Test count validation."""
+        with pytest.raises(ValueError, match="one entry per bound"):
+            Histogram((1.0,), counts=[1])
+
+
+class TestCaptureMetrics:
+    """Tests for CaptureMetrics model."""
+
+    def test_record_observes_size_and_latency(self):
+        """Test that recording a timing feeds both histograms."""
+        metrics = CaptureMetrics()
+        metrics.record(
+            ResourceTiming("https://example.com/", size=2048, request_start=10.0, body_at=10.2)
+        )
+        metrics.record(ResourceTiming("https://example.com/a", size=100))
+        assert metrics.size_histogram.count == 2
+        # Latency is only known when the request start was observed
+        assert metrics.latency_histogram.count == 1
+        assert metrics.latency_histogram.total == pytest.approx(0.2)
+
+    def test_phase_context_accumulates(self):
+        """Test timing blocks as phases."""
+        metrics = CaptureMetrics()
+        with metrics.phase("settle"):
+            pass
+        with metrics.phase("settle"):
+            pass
+        assert list(metrics.phases) == ["settle"]
+        assert metrics.phases["settle"] >= 0.0
+
+    def test_resource_seconds(self):
+        """Test summing per-resource work."""
+        metrics = CaptureMetrics(filter_seconds=0.5)
+        metrics.record(
+            ResourceTiming("https://example.com/", response_at=1.0, body_at=1.5, write_seconds=0.25)
+        )
+        metrics.record(ResourceTiming("https://example.com/a", write_seconds=0.25))
+        assert metrics.resource_seconds() == {"fetch": 0.5, "filter": 0.5, "write": 0.5}
+
+    def test_timing_latency_needs_both_ends(self):
+        """Test derived durations of a resource timing."""
+        timing = ResourceTiming("https://example.com/", request_start=1.0, response_at=1.5)
+        assert timing.latency is None
+        assert timing.fetch_seconds is None
+        timing.body_at = 2.0
+        assert timing.latency == 1.0
+        assert timing.fetch_seconds == 0.5
+
 
 class TestSaveResult:
     """Tests for SaveResult model."""
@@ -107,3 +304,56 @@ class TestSaveResult:
         assert result.saved_count == 2
         assert result.skipped_count == 3
         assert result.total_failures == 1
+
+    def test_save_result_merge(self, temp_dir):
+        """Test merging another save result."""
+        result = SaveResult(saved_paths=[temp_dir / "a.html"], skipped_count=1)
+        result.merge(
+            SaveResult(
+                saved_paths=[temp_dir / "b.css"],
+                skipped_count=2,
+                failed_saves=[("https://example.com/x", Exception("test"))],
+            )
+        )
+        assert result.saved_count == 2
+        assert result.skipped_count == 3
+        assert result.total_failures == 1
+
+    def test_save_result_merge_incremental_counts(self):
+        """Test that added, changed and unchanged counts are summed."""
+        result = SaveResult(added_count=1, unchanged_count=4)
+        result.merge(SaveResult(added_count=2, changed_count=1, unchanged_count=1))
+        assert (result.added_count, result.changed_count, result.unchanged_count) == (3, 1, 5)
+
+
+class TestBatchConfig:
+    """Tests for BatchConfig model."""
+
+    def test_batch_config_defaults(self, temp_dir):
+        """Test batch config with defaults."""
+        config = BatchConfig(urls=["https://example.com"], output_dir=temp_dir)
+        assert config.concurrency == 4
+        assert config.wait_time == 0
+
+    def test_batch_config_validation_empty_urls(self, temp_dir):
+        """Test validation for an empty URL list."""
+        with pytest.raises(ValueError, match="urls must not be empty"):
+            BatchConfig(urls=[], output_dir=temp_dir)
+
+    def test_batch_config_validation_zero_concurrency(self, temp_dir):
+        """Test validation for zero concurrency."""
+        with pytest.raises(ValueError, match="concurrency must be positive"):
+            BatchConfig(urls=["https://example.com"], output_dir=temp_dir, concurrency=0)
+
+
+class TestBatchResult:
+    """Tests for BatchResult model."""
+
+    def test_batch_result_counts(self, temp_dir):
+        """Test batch result page counts."""
+        result = BatchResult(
+            page_dirs={"https://example.com": temp_dir / "example.com"},
+            failed_pages=[("https://example.org", Exception("test"))],
+        )
+        assert result.page_count == 1
+        assert result.failed_count == 1
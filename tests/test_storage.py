@@ -1,11 +1,33 @@
 """Tests for storage modules."""
 
+import asyncio
+import stat
+import threading
 
+import pytest
 
-from webgrab.models import Resource, SaveConfig
+from webgrab.body import SpilledBody
+from webgrab.errors import ConfigurationError
+from webgrab.models import Resource, ResourceTiming, SaveConfig, SaveResult
+from webgrab.storage import blob_store, compression
+from webgrab.storage.blob_store import BlobStore, body_digest
+from webgrab.storage.compression import compress_body
 from webgrab.storage.deduplicator import PathDeduplicator
-from webgrab.storage.path_resolver import url_to_local_path
-from webgrab.storage.saver import ResourceSaver
+from webgrab.storage.manifest import ManifestWriter, read_manifest
+from webgrab.storage.path_resolver import (
+    query_hash,
+    url_to_directory_name,
+    url_to_local_path,
+)
+from webgrab.storage.rewriter import (
+    CssStreamRewriter,
+    HtmlStreamRewriter,
+    LinkMapper,
+    LinkRewriter,
+)
+from webgrab.storage.saver import ResourceSaver, create_saver
+from webgrab.storage.state import STATE_NAME, CaptureState
+from webgrab.storage.warc import WarcSaver, WarcWriter, sort_cdx, surt_url_key
 from webgrab.storage.writer import file_exists, write_file
 
 
@@ -42,6 +64,49 @@ class TestPathResolver:
         path = url_to_local_path("https://example.com/path%20with%20spaces.html", temp_dir)
         assert path == temp_dir / "example.com" / "path with spaces.html"
 
+    def test_url_to_local_path_ignores_query_by_default(self, temp_dir):
+        """Test that the query string is dropped unless hashing is enabled."""
+        path = url_to_local_path("https://example.com/app.js?v=1", temp_dir)
+        assert path == temp_dir / "example.com" / "app.js"
+
+    def test_url_to_local_path_hash_query(self, temp_dir):
+        """Test that hash mode gives each query its own stable file name."""
+        v1 = url_to_local_path("https://example.com/app.js?v=1", temp_dir, "hash")
+        v2 = url_to_local_path("https://example.com/app.js?v=2", temp_dir, "hash")
+
+        assert v1 == temp_dir / "example.com" / f"app_{query_hash('v=1')}.js"
+        assert v1 != v2
+        assert v1 == url_to_local_path("https://example.com/app.js?v=1", temp_dir, "hash")
+
+    def test_url_to_local_path_hash_without_query(self, temp_dir):
+        """Test that URLs without a query keep their plain name in hash mode."""
+        path = url_to_local_path("https://example.com/", temp_dir, "hash")
+        assert path == temp_dir / "example.com" / "index.html"
+
+    def test_query_hash_normalizes_order_and_encoding(self):
+        """Test that equivalent queries hash the same."""
+        assert query_hash("a=1&b=2") == query_hash("b=2&a=1")
+        assert query_hash("q=a%20b") == query_hash("q=a+b")
+        assert query_hash("a=1") != query_hash("a=2")
+        assert len(query_hash("a=1")) == 8
+
+    def test_url_to_local_path_hash_keeps_long_names_bounded(self, temp_dir):
+        """Test that the hash survives truncation of long file names."""
+        path = url_to_local_path(
+            "https://example.com/" + "a" * 300 + ".js?v=1", temp_dir, "hash"
+        )
+        assert path.name.endswith(f"_{query_hash('v=1')}.js")
+        assert len(path.name) <= 100
+
+    def test_url_to_directory_name_root(self):
+        """Test directory name for a site root."""
+        assert url_to_directory_name("https://example.com/") == "example.com"
+
+    def test_url_to_directory_name_nested(self):
+        """Test directory name flattens the URL path."""
+        name = url_to_directory_name("https://example.com:8080/blog/post/")
+        assert name == "example.com_blog_post"
+
 
 class TestPathDeduplicator:
     """Tests for path deduplication."""
@@ -75,6 +140,53 @@ class TestPathDeduplicator:
         dedup.get_unique_path(path)
         assert dedup.is_used(path)
 
+    def test_deduplicator_skips_literal_suffix_paths(self, temp_dir):
+        """Test that a path already named like a suffix is not handed out twice."""
+        dedup = PathDeduplicator()
+        dedup.get_unique_path(temp_dir / "file_1.html")
+        dedup.get_unique_path(temp_dir / "file.html")
+
+        assert dedup.get_unique_path(temp_dir / "file.html") == temp_dir / "file_2.html"
+        assert dedup.get_unique_path(temp_dir / "file.html") == temp_dir / "file_3.html"
+
+    def test_deduplicator_counters_per_directory(self, temp_dir):
+        """Test that suffixes are counted separately per directory and name."""
+        dedup = PathDeduplicator()
+        for _ in range(3):
+            dedup.get_unique_path(temp_dir / "a" / "index.html")
+        dedup.get_unique_path(temp_dir / "b" / "index.html")
+
+        assert dedup.get_unique_path(temp_dir / "b" / "index.html") == (
+            temp_dir / "b" / "index_1.html"
+        )
+        assert dedup.get_unique_path(temp_dir / "a" / "index.css") == temp_dir / "a" / "index.css"
+
+    def test_deduplicator_many_duplicates(self, temp_dir):
+        """Test that thousands of same-named paths stay distinct."""
+        dedup = PathDeduplicator()
+        paths = [dedup.get_unique_path(temp_dir / "image") for _ in range(5000)]
+
+        assert len(set(paths)) == 5000
+        assert paths[-1] == temp_dir / "image_4999"
+
+    def test_deduplicator_seed_from_disk(self, temp_dir):
+        """Test that files from earlier runs are never handed out again."""
+        (temp_dir / "site" / "css").mkdir(parents=True)
+        (temp_dir / "site" / "index.html").write_text("old")
+        (temp_dir / "site" / "index_1.html").write_text("old")
+        (temp_dir / "site" / "css" / "app.css").write_text("old")
+
+        dedup = PathDeduplicator()
+        assert dedup.seed_from_disk(temp_dir) == 3
+        assert dedup.seed_from_disk(temp_dir / "missing") == 0
+
+        assert dedup.get_unique_path(temp_dir / "site" / "index.html") == (
+            temp_dir / "site" / "index_2.html"
+        )
+        assert dedup.get_unique_path(temp_dir / "site" / "css" / "app.css") == (
+            temp_dir / "site" / "css" / "app_1.css"
+        )
+
 
 class TestWriter:
     """Tests for file writer."""
@@ -111,6 +223,28 @@ class TestWriter:
         assert not file_exists(subdir)
 
 
+class TestAtomicWrite:
+    """Tests for atomic temp-then-rename writes."""
+
+    def test_write_file_atomic(self, temp_dir):
+        """Test that atomic writes leave only the final file behind."""
+        path = temp_dir / "out.txt"
+        path.write_bytes(b"old")
+        write_file(path, b"new", atomic=True)
+
+        assert path.read_bytes() == b"new"
+        assert [p.name for p in temp_dir.iterdir()] == ["out.txt"]
+
+    def test_write_file_atomic_permissions(self, temp_dir):
+        """Test that atomic writes get the same mode as plain writes."""
+        plain = temp_dir / "plain.txt"
+        write_file(plain, b"data")
+        atomic = temp_dir / "atomic.txt"
+        write_file(atomic, b"data", atomic=True)
+
+        assert stat.S_IMODE(atomic.stat().st_mode) == stat.S_IMODE(plain.stat().st_mode)
+
+
 class TestResourceSaver:
     """Tests for resource saver."""
 
@@ -136,6 +270,23 @@ class TestResourceSaver:
         assert saved_path.exists()
         assert saved_path.read_bytes() == sample_html
 
+    def test_save_records_write_timing(self, temp_dir, sample_html):
+        """Test that a saved resource's timing gets its write time."""
+        saver = ResourceSaver(SaveConfig(output_dir=temp_dir, base_url="https://example.com"))
+        timing = ResourceTiming("https://example.com/index.html", body_at=1.0)
+        resource = Resource(
+            url="https://example.com/index.html",
+            content_type="text/html",
+            body=sample_html,
+            headers={},
+            status_code=200,
+            timing=timing,
+        )
+
+        saver.save_resources([resource])
+        assert timing.written_at is not None and timing.written_at > timing.body_at
+        assert timing.write_seconds > 0
+
     def test_save_resource_external_excluded(self, temp_dir, sample_css):
         """Test that external resources are excluded by default."""
         config = SaveConfig(
@@ -244,3 +395,1072 @@ class TestResourceSaver:
         result = saver.save_resources(resources)
         assert result.saved_count == 1
         assert result.skipped_count == 1
+
+    def test_keep_existing_never_overwrites(self, temp_dir, sample_html):
+        """Test that files from an earlier run survive a new save."""
+        existing = temp_dir / "example.com" / "index.html"
+        existing.parent.mkdir()
+        existing.write_bytes(b"earlier run")
+        saver = ResourceSaver(
+            SaveConfig(
+                output_dir=temp_dir, base_url="https://example.com", keep_existing=True
+            )
+        )
+
+        saved_path = saver.save_resource(
+            Resource(
+                url="https://example.com/index.html",
+                content_type="text/html",
+                body=sample_html,
+                headers={},
+                status_code=200,
+            )
+        )
+
+        assert saved_path == temp_dir / "example.com" / "index_1.html"
+        assert existing.read_bytes() == b"earlier run"
+
+    def test_query_hash_mode_saves_variants_separately(self, temp_dir):
+        """Test that query variants get stable paths instead of _1, _2 suffixes."""
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", query_mode="hash")
+        )
+        resources = [
+            Resource(
+                url=f"https://example.com/api?page={page}",
+                content_type="application/json",
+                body=b"[]",
+                headers={},
+                status_code=200,
+            )
+            for page in (2, 1)
+        ]
+
+        result = saver.save_resources(resources)
+
+        assert [path.name for path in result.saved_paths] == [
+            f"api_{query_hash('page=2')}.json",
+            f"api_{query_hash('page=1')}.json",
+        ]
+
+
+class TestBlobStore:
+    """Tests for the content-addressed blob store."""
+
+    def test_put_stores_each_body_once(self, temp_dir):
+        """Test that identical bodies share one read-only blob."""
+        store = BlobStore(temp_dir / "store")
+        first = store.put(b"same bytes")
+        second = store.put(b"same bytes")
+
+        digest = body_digest(b"same bytes")
+        assert first == second == temp_dir / "store" / digest[:2] / digest[2:4] / digest
+        assert first.read_bytes() == b"same bytes"
+        assert store.blobs_written == 1
+        assert store.blobs_reused == 1
+        assert not first.stat().st_mode & 0o222
+
+    def test_concurrent_puts_share_one_blob(self, temp_dir):
+        """Test that threads storing the same body write it once."""
+        store = BlobStore(temp_dir / "store")
+        start = threading.Barrier(8)
+
+        def put():
+            start.wait()
+            return store.put(b"same bytes")
+
+        threads = [threading.Thread(target=put) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert store.blobs_written == 1
+        assert store.blobs_reused == 7
+
+    def test_put_moves_spilled_body(self, temp_dir):
+        """Test that a spilled body is moved into the store."""
+        store = BlobStore(temp_dir / "store")
+        body = SpilledBody.from_bytes(b"spilled", temp_dir)
+        spill_path = body.path
+        blob = store.put(body)
+
+        assert blob.read_bytes() == b"spilled"
+        assert not spill_path.exists()
+
+    def test_store_hardlinks_output(self, temp_dir):
+        """Test that output files are hardlinks to the blob."""
+        store = BlobStore(temp_dir / "store")
+        dest = temp_dir / "out" / "a.css"
+        blob = store.store(b"body{}", dest)
+
+        assert dest.read_bytes() == b"body{}"
+        assert dest.stat().st_ino == blob.stat().st_ino
+
+    def test_link_falls_back_to_copy(self, temp_dir, monkeypatch):
+        """Test that unsupported hardlinks and reflinks fall back to a copy."""
+        import errno
+
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "cross-device link")
+
+        monkeypatch.setattr(blob_store.os, "link", unsupported)
+        monkeypatch.setattr(blob_store, "_reflink", unsupported)
+        store = BlobStore(temp_dir / "store")
+        blob = store.put(b"data")
+
+        assert store.link(blob, temp_dir / "a") == "copy"
+        assert store.link(blob, temp_dir / "b") == "copy"
+        assert (temp_dir / "b").read_bytes() == b"data"
+        assert store._unsupported == {"hardlink", "reflink"}
+
+    def test_write_file_replaces_read_only_link(self, temp_dir):
+        """Test that plain writes never modify a blob through a hardlink."""
+        store = BlobStore(temp_dir / "store")
+        dest = temp_dir / "page.html"
+        blob = store.store(b"old", dest)
+
+        write_file(dest, b"new")
+
+        assert dest.read_bytes() == b"new"
+        assert blob.read_bytes() == b"old"
+
+    def test_saver_uses_blob_store(self, temp_dir):
+        """Test that a saver with blob_store links repeated bodies to one blob."""
+        config = SaveConfig(
+            output_dir=temp_dir / "out",
+            base_url="https://example.com",
+            blob_store=temp_dir / "store",
+        )
+        saver = ResourceSaver(config)
+        resources = [
+            Resource(
+                url=f"https://example.com/app.{version}.js",
+                content_type="application/javascript",
+                body=b"console.log(1)",
+                headers={},
+                status_code=200,
+            )
+            for version in ("abc", "def")
+        ]
+        result = saver.save_resources(resources)
+
+        assert result.saved_count == 2
+        inodes = {path.stat().st_ino for path in result.saved_paths}
+        assert len(inodes) == 1
+        assert saver.blob_store.blobs_written == 1
+
+
+class TestParallelSave:
+    """Tests for planned, thread-pooled saving."""
+
+    @staticmethod
+    def _resources(count, directory="assets"):
+        return [
+            Resource(
+                url=f"https://example.com/{directory}/file{i}.js",
+                content_type="application/javascript",
+                body=f"var x = {i};".encode(),
+                headers={},
+                status_code=200,
+            )
+            for i in range(count)
+        ]
+
+    def test_save_resources_creates_each_directory_once(self, temp_dir, monkeypatch):
+        """Test that shared directories are created a single time."""
+        from pathlib import Path
+
+        (temp_dir / "example.com").mkdir()
+        created = []
+        original_mkdir = Path.mkdir
+
+        def counting_mkdir(self, *args, **kwargs):
+            created.append(self)
+            return original_mkdir(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "mkdir", counting_mkdir)
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", write_workers=4)
+        )
+        result = saver.save_resources(self._resources(50))
+
+        assert result.saved_count == 50
+        assert created == [temp_dir / "example.com" / "assets"]
+
+    def test_save_resources_preserves_order_and_content(self, temp_dir):
+        """Test that pooled writes report paths in input order."""
+        saver = ResourceSaver(
+            SaveConfig(
+                output_dir=temp_dir,
+                base_url="https://example.com",
+                write_workers=8,
+                atomic_writes=True,
+            )
+        )
+        resources = self._resources(20)
+        result = saver.save_resources(resources)
+
+        assert [p.name for p in result.saved_paths] == [f"file{i}.js" for i in range(20)]
+        for resource, path in zip(resources, result.saved_paths):
+            assert path.read_bytes() == resource.body
+
+    def test_save_resources_records_write_failures(self, temp_dir):
+        """Test that a failing write is reported without stopping the others."""
+        blocker = temp_dir / "example.com" / "blocked"
+        blocker.parent.mkdir(parents=True)
+        blocker.write_bytes(b"a file where a directory should be")
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com")
+        )
+        resources = self._resources(2) + self._resources(1, directory="blocked")
+        result = saver.save_resources(resources)
+
+        assert result.saved_count == 2
+        assert [url for url, _ in result.failed_saves] == [
+            "https://example.com/blocked/file0.js"
+        ]
+
+
+def read_warc_record(path, offset, length):
+    """Decompress the single gzip member holding one WARC record."""
+    import zlib
+
+    data = path.read_bytes()[offset : offset + length]
+    decompressor = zlib.decompressobj(31)
+    record = decompressor.decompress(data)
+    assert decompressor.eof and not decompressor.unused_data
+    return record
+
+
+class TestWarcWriter:
+    """Tests for WARC output."""
+
+    @staticmethod
+    def _resource(url="https://example.com/app.js", body=b"var a = 1;"):
+        return Resource(
+            url=url,
+            content_type="application/javascript",
+            body=body,
+            headers={
+                "content-type": "application/javascript",
+                "content-encoding": "gzip",
+                "content-length": "5",
+                "set-cookie": "a=1\nb=2",
+            },
+            status_code=200,
+        )
+
+    def test_write_response_record(self, temp_dir):
+        """Test that a record keeps status and headers and fixes lengths."""
+        with WarcWriter(temp_dir) as writer:
+            location = writer.write_response(self._resource())
+
+        record = read_warc_record(temp_dir / location.filename, location.offset, location.length)
+        warc_head, http_head, body = record.split(b"\r\n\r\n", 2)
+
+        assert warc_head.startswith(b"WARC/1.1\r\nWARC-Type: response")
+        assert b"WARC-Target-URI: https://example.com/app.js" in warc_head
+        assert b"WARC-Payload-Digest: sha1:" in warc_head
+        assert http_head.startswith(b"HTTP/1.1 200 OK\r\n")
+        assert b"content-encoding" not in http_head
+        assert b"Content-Length: 10" in http_head
+        assert b"set-cookie: a=1\r\nset-cookie: b=2" in http_head
+        assert body == b"var a = 1;\r\n\r\n"
+        declared = int(warc_head.split(b"Content-Length: ")[1])
+        assert declared == len(http_head) + 4 + len(b"var a = 1;")
+
+    def test_each_file_starts_with_warcinfo(self, temp_dir):
+        """Test that files open with a warcinfo record at offset zero."""
+        with WarcWriter(temp_dir) as writer:
+            writer.write_response(self._resource())
+            path = writer.files[0]
+
+        import zlib
+
+        first_member = zlib.decompressobj(31).decompress(path.read_bytes())
+        assert b"WARC-Type: warcinfo" in first_member
+
+    def test_rotates_files_by_size(self, temp_dir):
+        """Test that a new file is started once the size limit is reached."""
+        with WarcWriter(temp_dir, max_file_size=1) as writer:
+            first = writer.write_response(self._resource("https://example.com/a"))
+            second = writer.write_response(self._resource("https://example.com/b"))
+
+        assert first.filename != second.filename
+        assert len(list(temp_dir.glob("*.warc.gz"))) == 2
+
+    def test_cdx_index_locates_records(self, temp_dir):
+        """Test that CDX lines point at the records by offset and length."""
+        with WarcWriter(temp_dir) as writer:
+            writer.write_response(self._resource("https://example.com/b.js"))
+            writer.write_response(self._resource("https://example.com/a.js"))
+            cdx_path = writer.cdx_path
+
+        lines = cdx_path.read_text().splitlines()
+        assert lines[0] == " CDX N b a m s k r M S V g"
+        assert [line.split()[0] for line in lines[1:]] == [
+            "com,example)/a.js",
+            "com,example)/b.js",
+        ]
+        fields = lines[1].split()
+        record = read_warc_record(temp_dir / fields[10], int(fields[9]), int(fields[8]))
+        assert b"WARC-Target-URI: https://example.com/a.js" in record
+
+    def test_cdx_lines_stream_before_close(self, temp_dir):
+        """Test that an interrupted capture leaves an index of its records."""
+        writer = WarcWriter(temp_dir)
+        writer.write_response(self._resource("https://example.com/a.js"))
+
+        unsorted = writer.unsorted_cdx_path.read_text().splitlines()
+        assert [line.split()[2] for line in unsorted] == ["https://example.com/a.js"]
+
+        writer.close()
+        assert not writer.unsorted_cdx_path.exists()
+        assert len(writer.cdx_path.read_text().splitlines()) == 2
+
+    def test_sort_cdx_merges_sorted_runs(self, temp_dir):
+        """Test that lines sorted in several runs merge into one order."""
+        source = temp_dir / "index.cdx.unsorted"
+        keys = [f"com,example)/{i:02d} x\n" for i in (7, 3, 9, 1, 4, 8, 2, 6, 5, 0)]
+        source.write_text("".join(keys))
+
+        sort_cdx(source, temp_dir / "index.cdx", chunk_lines=3)
+
+        lines = (temp_dir / "index.cdx").read_text().splitlines(keepends=True)
+        assert lines[0] == " CDX N b a m s k r M S V g\n"
+        assert lines[1:] == sorted(keys)
+        # Temporary runs are removed
+        assert sorted(path.name for path in temp_dir.iterdir()) == [
+            "index.cdx",
+            "index.cdx.unsorted",
+        ]
+
+    def test_surt_url_key(self):
+        """Test SURT key normalization."""
+        assert surt_url_key("https://www.Example.com/Path?Q=1") == "com,example)/path?q=1"
+        assert surt_url_key("http://example.com:8080") == "com,example:8080)/"
+
+
+class TestWarcSaver:
+    """Tests for the WARC saver."""
+
+    def test_create_saver_selects_format(self, temp_dir):
+        """Test that the save format picks the saver."""
+        warc = create_saver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", format="warc")
+        )
+        files = create_saver(SaveConfig(output_dir=temp_dir, base_url="https://example.com"))
+
+        assert isinstance(warc, WarcSaver)
+        assert isinstance(files, ResourceSaver)
+
+    def test_save_resources_skips_external(self, temp_dir):
+        """Test that external resources are skipped unless included."""
+        saver = WarcSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", format="warc")
+        )
+        result = saver.save_resources(
+            [
+                TestWarcWriter._resource("https://example.com/a.js"),
+                TestWarcWriter._resource("https://cdn.example.org/b.js"),
+            ]
+        )
+        saver.close()
+
+        assert result.saved_count == 1
+        assert result.skipped_count == 1
+        assert result.saved_paths[0].name.endswith(".warc.gz")
+        assert len(list(temp_dir.glob("*.cdx"))) == 1
+
+    def test_save_records_write_timing(self, temp_dir):
+        """Test that appending a record sets the resource's write time."""
+        saver = WarcSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", format="warc")
+        )
+        resource = TestWarcWriter._resource("https://example.com/a.js")
+        timed = Resource(
+            resource.url,
+            resource.content_type,
+            resource.body,
+            resource.headers,
+            resource.status_code,
+            timing=ResourceTiming(resource.url),
+        )
+        saver.save_resources([timed])
+        saver.close()
+
+        assert timed.timing.written_at is not None
+
+    def test_record_resource_writes_in_order_off_thread(self, temp_dir, monkeypatch):
+        """Test that recorded resources are appended by a writer thread, in order."""
+        threads = []
+        save = WarcSaver.save_resource
+
+        def tracking_save(self, resource):
+            threads.append(threading.current_thread().name)
+            return save(self, resource)
+
+        monkeypatch.setattr(WarcSaver, "save_resource", tracking_save)
+        saver = WarcSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", format="warc")
+        )
+        result = SaveResult()
+
+        async def record():
+            for name in ("a", "b", "c"):
+                saver.record_resource(
+                    TestWarcWriter._resource(f"https://example.com/{name}.js"), result
+                )
+                await saver.wait_for_capacity()
+
+        asyncio.run(record())
+        saver.close()
+
+        assert result.saved_count == 3
+        assert all(name.startswith("webgrab-warc") for name in threads)
+        (cdx,) = temp_dir.glob("*.cdx")
+        rows = [line.split() for line in cdx.read_text().splitlines()[1:]]
+        urls = [row[2] for row in sorted(rows, key=lambda row: int(row[9]))]
+        assert urls == [f"https://example.com/{name}.js" for name in ("a", "b", "c")]
+
+
+class TestCompression:
+    """Tests for compressed saving."""
+
+    @staticmethod
+    def _resources():
+        return [
+            Resource(
+                url="https://example.com/app.js",
+                content_type="application/javascript",
+                body=b"console.log('hello');" * 50,
+                headers={},
+                status_code=200,
+            ),
+            Resource(
+                url="https://example.com/logo.png",
+                content_type="image/png",
+                body=b"\x89PNG\r\n",
+                headers={},
+                status_code=200,
+            ),
+        ]
+
+    def test_compress_body_is_deterministic(self):
+        """Test that gzip output does not depend on the time."""
+        assert compress_body(b"same" * 100, "gzip") == compress_body(b"same" * 100, "gzip")
+
+    def test_save_resources_compresses_text_only(self, temp_dir):
+        """Test that text bodies gain a .gz suffix and media is untouched."""
+        import gzip
+
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", compress=True)
+        )
+        result = saver.save_resources(self._resources())
+
+        js_path, png_path = result.saved_paths
+        assert js_path.name == "app.js.gz"
+        assert gzip.decompress(js_path.read_bytes()) == self._resources()[0].body
+        assert png_path.name == "logo.png"
+        assert png_path.read_bytes() == b"\x89PNG\r\n"
+
+    def test_record_resource_compresses_in_background(self, temp_dir):
+        """Test that streamed saves are complete once the saver is closed."""
+        import gzip
+
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", compress=True)
+        )
+        result = SaveResult()
+        for resource in self._resources():
+            saver.record_resource(resource, result)
+        saver.close()
+
+        assert sorted(p.name for p in result.saved_paths) == ["app.js.gz", "logo.png"]
+        js_path = temp_dir / "example.com" / "app.js.gz"
+        assert gzip.decompress(js_path.read_bytes()).startswith(b"console.log")
+
+    def test_record_resource_writes_uncompressed_in_background(self, temp_dir, monkeypatch):
+        """Test that record_resource writes every resource on a worker thread."""
+        threads = []
+        write = ResourceSaver._write
+
+        def tracking_write(self, path, resource):
+            threads.append(threading.current_thread().name)
+            return write(self, path, resource)
+
+        monkeypatch.setattr(ResourceSaver, "_write", tracking_write)
+        saver = ResourceSaver(SaveConfig(output_dir=temp_dir, base_url="https://example.com"))
+        result = SaveResult()
+        for resource in self._resources():
+            saver.record_resource(resource, result)
+        saver.close()
+
+        assert sorted(p.name for p in result.saved_paths) == ["app.js", "logo.png"]
+        assert all(name.startswith("webgrab-save") for name in threads)
+
+    def test_wait_for_capacity_does_not_block_the_loop(self, temp_dir, monkeypatch):
+        """Test that a saturated write pool is awaited, not blocked on."""
+        release = threading.Event()
+        write = ResourceSaver._write
+
+        def slow_write(self, path, resource):
+            release.wait(5)
+            return write(self, path, resource)
+
+        monkeypatch.setattr(ResourceSaver, "_write", slow_write)
+        saver = ResourceSaver(
+            SaveConfig(
+                output_dir=temp_dir,
+                base_url="https://example.com",
+                compress=True,
+                write_workers=1,
+            )
+        )
+        result = SaveResult()
+
+        async def record():
+            for index in range(4):
+                resource = Resource(
+                    url=f"https://example.com/{index}.js",
+                    content_type="application/javascript",
+                    body=b"var a;",
+                    headers={},
+                    status_code=200,
+                )
+                saver.record_resource(resource, result)
+            waiting = asyncio.create_task(saver.wait_for_capacity())
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+            release.set()
+            await waiting
+
+        asyncio.run(record())
+        saver.close()
+
+        assert result.saved_count == 4
+
+    def test_missing_zstd_is_a_configuration_error(self, temp_dir, monkeypatch):
+        """Test that zstd without its package fails up front."""
+        monkeypatch.setattr(compression, "zstandard", None)
+
+        with pytest.raises(ConfigurationError, match="zstandard"):
+            ResourceSaver(
+                SaveConfig(
+                    output_dir=temp_dir,
+                    base_url="https://example.com",
+                    compress=True,
+                    compression="zstd",
+                )
+            )
+
+
+class TestManifest:
+    """Tests for the streaming JSONL manifest."""
+
+    @staticmethod
+    def _resource(url="https://example.com/app.js", body=b"var a = 1;"):
+        return Resource(
+            url=url,
+            content_type="application/javascript",
+            body=body,
+            headers={"etag": '"abc"'},
+            status_code=200,
+        )
+
+    def test_manifest_writer_appends_lines(self, temp_dir):
+        """Test that entries are written one JSON object per line."""
+        writer = ManifestWriter(temp_dir / "manifest.jsonl")
+        writer.write({"url": "a"})
+        writer.write({"url": "b"})
+        writer.close()
+
+        assert (temp_dir / "manifest.jsonl").read_text().splitlines() == [
+            '{"url":"a"}',
+            '{"url":"b"}',
+        ]
+        assert writer.count == 2
+
+    def test_saver_records_hash_matching_file(self, temp_dir):
+        """Test that each entry's hash and size describe the stored file."""
+        import hashlib
+
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", create_manifest=True)
+        )
+        result = SaveResult()
+        saver.record_resource(self._resource(), result)
+        saver.close()
+
+        (entry,) = read_manifest(temp_dir / "manifest.jsonl")
+        stored = (temp_dir / entry["path"]).read_bytes()
+        assert entry["url"] == "https://example.com/app.js"
+        assert entry["path"] == "example.com/app.js"
+        assert entry["status"] == 200
+        assert entry["headers"] == {"etag": '"abc"'}
+        assert entry["encoding"] == "identity"
+        assert entry["sha256"] == hashlib.sha256(stored).hexdigest()
+        assert entry["stored_size"] == entry["size"] == len(stored)
+
+    def test_saver_closes_manifest_on_exit(self, temp_dir):
+        """Test that leaving a saver's with block closes its manifest."""
+        config = SaveConfig(
+            output_dir=temp_dir, base_url="https://example.com", create_manifest=True
+        )
+        with pytest.raises(RuntimeError), ResourceSaver(config) as saver:
+            saver.save_resources([self._resource()])
+            raise RuntimeError("capture failed")
+
+        assert saver.manifest is not None
+        assert saver.manifest._file.closed
+        assert len(read_manifest(temp_dir / "manifest.jsonl")) == 1
+
+    def test_manifest_records_compression(self, temp_dir):
+        """Test that compressed files are marked with their encoding."""
+        config = SaveConfig(
+            output_dir=temp_dir,
+            base_url="https://example.com",
+            compress=True,
+            create_manifest=True,
+        )
+        with ResourceSaver(config) as saver:
+            saver.save_resources([self._resource(body=b"var a = 1;" * 100)])
+
+        (entry,) = read_manifest(temp_dir / "manifest.jsonl")
+        assert entry["encoding"] == "gzip"
+        assert entry["path"] == "example.com/app.js.gz"
+        assert entry["stored_size"] < entry["size"] == 1000
+
+    def test_warc_manifest_records_offsets(self, temp_dir):
+        """Test that WARC manifests point at the record holding each resource."""
+        config = SaveConfig(
+            output_dir=temp_dir,
+            base_url="https://example.com",
+            format="warc",
+            create_manifest=True,
+        )
+        with WarcSaver(config) as saver:
+            saver.save_resources([self._resource()])
+
+        (entry,) = read_manifest(temp_dir / "manifest.jsonl")
+        record = read_warc_record(
+            temp_dir / entry["path"], entry["warc_offset"], entry["warc_length"]
+        )
+        assert b"WARC-Target-URI: https://example.com/app.js" in record
+
+
+class TestContentSniffing:
+    """Tests for saving resources whose Content-Type is missing or wrong."""
+
+    def test_extension_from_sniffed_body(self, temp_dir):
+        """Test that mislabeled bodies get the extension of what they hold."""
+        saver = ResourceSaver(SaveConfig(output_dir=temp_dir, base_url="https://example.com"))
+        result = saver.save_resources(
+            [
+                Resource(
+                    url="https://example.com/logo",
+                    content_type="application/octet-stream",
+                    body=b"\x89PNG\r\n\x1a\n\x00",
+                    headers={},
+                    status_code=200,
+                ),
+                Resource(
+                    url="https://example.com/font",
+                    content_type="",
+                    body=b"wOF2\x00\x01",
+                    headers={},
+                    status_code=200,
+                ),
+            ]
+        )
+
+        names = sorted(path.name for path in result.saved_paths)
+        assert names == ["font.woff2", "logo.png"]
+
+    def test_binary_body_not_compressed(self, temp_dir):
+        """Test that an image served as text is not compressed."""
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", compress=True)
+        )
+        result = saver.save_resources(
+            [
+                Resource(
+                    url="https://example.com/pixel",
+                    content_type="text/html",
+                    body=b"GIF89a\x01\x00",
+                    headers={},
+                    status_code=200,
+                )
+            ]
+        )
+
+        assert [path.name for path in result.saved_paths] == ["pixel.gif"]
+
+
+class TestIncrementalSave:
+    """Tests for incremental re-capture."""
+
+    @staticmethod
+    def _resource(url="https://example.com/logo.png", body=b"png-1", status=200):
+        return Resource(
+            url=url,
+            content_type="image/png",
+            body=body,
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"},
+            status_code=status,
+        )
+
+    @staticmethod
+    def _run(temp_dir, resources, **kwargs):
+        saver = ResourceSaver(
+            SaveConfig(
+                output_dir=temp_dir,
+                base_url="https://example.com",
+                incremental=True,
+                **kwargs,
+            )
+        )
+        result = SaveResult()
+        for resource in resources:
+            saver.record_resource(resource, result)
+        saver.close()
+        return result
+
+    def test_first_run_adds_everything(self, temp_dir):
+        """Test that a run without state counts every resource as added."""
+        result = self._run(temp_dir, [self._resource()])
+
+        assert result.added_count == 1
+        assert result.saved_count == 1
+        entry = CaptureState.load(temp_dir).previous("https://example.com/logo.png")
+        assert entry["path"] == "example.com/logo.png"
+        assert entry["etag"] == '"v1"'
+
+    def test_unchanged_file_left_untouched(self, temp_dir):
+        """Test that a body with the same hash is not rewritten."""
+        self._run(temp_dir, [self._resource()])
+        path = temp_dir / "example.com" / "logo.png"
+        mtime = path.stat().st_mtime_ns
+        inode = path.stat().st_ino
+
+        result = self._run(temp_dir, [self._resource()])
+
+        assert result.unchanged_count == 1
+        assert result.saved_paths == [path]
+        assert path.stat().st_mtime_ns == mtime
+        assert path.stat().st_ino == inode
+
+    def test_changed_and_added_counts(self, temp_dir):
+        """Test that new bodies and new URLs are written and counted."""
+        self._run(temp_dir, [self._resource()])
+        result = self._run(
+            temp_dir,
+            [
+                self._resource(body=b"png-2"),
+                self._resource(url="https://example.com/new.png"),
+            ],
+        )
+
+        assert (result.added_count, result.changed_count, result.unchanged_count) == (1, 1, 0)
+        assert (temp_dir / "example.com" / "logo.png").read_bytes() == b"png-2"
+
+    def test_not_modified_keeps_previous_copy(self, temp_dir):
+        """Test that a 304 response counts as unchanged and keeps the file."""
+        self._run(temp_dir, [self._resource()])
+        result = self._run(temp_dir, [self._resource(body=b"", status=304)])
+
+        assert result.unchanged_count == 1
+        assert (temp_dir / "example.com" / "logo.png").read_bytes() == b"png-1"
+
+    def test_not_modified_reuses_saved_path(self, temp_dir):
+        """Test that a 304 finds a file whose extension came from its content type."""
+        url = "https://example.com/img/logo"
+        self._run(temp_dir, [self._resource(url=url)])
+        path = temp_dir / "example.com" / "img" / "logo.png"
+        assert path.read_bytes() == b"png-1"
+
+        not_modified = Resource(url=url, content_type="", body=b"", headers={}, status_code=304)
+        result = self._run(temp_dir, [not_modified])
+
+        assert result.total_failures == 0
+        assert result.unchanged_count == 1
+        assert result.saved_paths == [path]
+        assert CaptureState.load(temp_dir).previous(url)["path"] == "example.com/img/logo.png"
+
+    def test_manifest_lists_unchanged_files(self, temp_dir):
+        """Test that each run's manifest describes kept files as well as written ones."""
+        import hashlib
+
+        resources = [
+            self._resource(),
+            Resource(
+                url="https://example.com/app.js",
+                content_type="application/javascript",
+                body=b"var a = 1;" * 20,
+                headers={},
+                status_code=200,
+            ),
+        ]
+        self._run(temp_dir, resources, create_manifest=True, compress=True)
+        self._run(
+            temp_dir,
+            [self._resource(body=b"", status=304), resources[1]],
+            create_manifest=True,
+            compress=True,
+        )
+
+        entries = {entry["url"]: entry for entry in read_manifest(temp_dir / "manifest.jsonl")}
+        assert set(entries) == {"https://example.com/logo.png", "https://example.com/app.js"}
+        for entry in entries.values():
+            stored = (temp_dir / entry["path"]).read_bytes()
+            assert entry["sha256"] == hashlib.sha256(stored).hexdigest()
+            assert entry["stored_size"] == len(stored)
+        assert entries["https://example.com/app.js"]["encoding"] == "gzip"
+        assert entries["https://example.com/logo.png"]["encoding"] == "identity"
+
+    def test_not_modified_without_copy_fails(self, temp_dir):
+        """Test that a 304 for a URL with no saved file is never written empty."""
+        result = self._run(temp_dir, [self._resource(body=b"", status=304)])
+
+        assert result.total_failures == 1
+        assert not (temp_dir / "example.com" / "logo.png").exists()
+
+    def test_deleted_file_is_rewritten(self, temp_dir):
+        """Test that a file removed since the last run is saved again."""
+        self._run(temp_dir, [self._resource()])
+        (temp_dir / "example.com" / "logo.png").unlink()
+
+        result = self._run(temp_dir, [self._resource()])
+
+        assert result.changed_count == 1
+        assert (temp_dir / "example.com" / "logo.png").read_bytes() == b"png-1"
+
+    def test_overwrite_rewrites_unchanged(self, temp_dir):
+        """Test that overwrite forces unchanged files to be written."""
+        self._run(temp_dir, [self._resource()])
+        result = self._run(temp_dir, [self._resource()], overwrite=True)
+
+        assert result.unchanged_count == 0
+        assert result.changed_count == 1
+
+    def test_revalidation_headers(self, temp_dir):
+        """Test that validators are offered only for files still on disk."""
+        self._run(
+            temp_dir,
+            [self._resource(), self._resource(url="https://example.com/gone.png")],
+        )
+        (temp_dir / "example.com" / "gone.png").unlink()
+
+        headers = CaptureState.load(temp_dir).revalidation_headers()
+
+        assert headers == {
+            "https://example.com/logo.png": {
+                "if-none-match": '"v1"',
+                "if-modified-since": "Mon, 05 Oct 2026 10:00:00 GMT",
+            }
+        }
+
+    def test_corrupt_state_starts_fresh(self, temp_dir):
+        """Test that an unreadable state file is treated as no state."""
+        (temp_dir / STATE_NAME).write_text("{not json")
+        result = self._run(temp_dir, [self._resource()])
+
+        assert result.added_count == 1
+        assert CaptureState.load(temp_dir).entries
+
+
+class TestLinkRewriter:
+    """Tests for rewriting saved documents to link to local copies."""
+
+    HTML = (
+        '<!doctype html><html><head><base href="/site/">'
+        '<link rel="stylesheet" href="css/app.css?v=1">'
+        "<style>body { background: url('img/bg.png') }</style>"
+        '<script src="js/app.js"></script>'
+        '<script>var s = "<img src=img/logo.png>";</script>'
+        "</head><body>"
+        '<!-- <img src="img/logo.png"> <a href="/missing"> -->'
+        '<a href="about.html#team">About</a> <a href="/missing">Gone</a>'
+        '<img src="img/logo.png" srcset="img/logo.png 1x, img/logo@2x.png 2x" alt="a &amp; b">'
+        '<div style="background-image: url(img/bg.png)"></div>'
+        '<img src="data:image/png;base64,AAAA"><a href="#top">Top</a>'
+        "</body></html>"
+    )
+
+    @staticmethod
+    def _url_map(root):
+        site = root / "example.com" / "site"
+        return {
+            "https://example.com/site/css/app.css?v=1": site / "css" / "app.css",
+            "https://example.com/site/js/app.js": site / "js" / "app.js",
+            "https://example.com/site/img/bg.png": site / "img" / "bg.png",
+            "https://example.com/site/img/logo.png": site / "img" / "logo.png",
+            "https://example.com/site/about.html": site / "about.html",
+        }
+
+    def _rewrite_html(self, temp_dir, chunk_size=None):
+        mapper = LinkMapper(
+            self._url_map(temp_dir),
+            "https://example.com/site/index.html",
+            temp_dir / "example.com" / "site" / "index.html",
+        )
+        stream = HtmlStreamRewriter(mapper)
+        size = chunk_size or len(self.HTML)
+        out = "".join(
+            stream.feed(self.HTML[i : i + size]) for i in range(0, len(self.HTML), size)
+        )
+        return out + stream.close()
+
+    def test_html_references_rewritten(self, temp_dir):
+        """Test that every kind of reference points at the saved file."""
+        html = self._rewrite_html(temp_dir)
+
+        assert "<base" not in html
+        assert 'href="css/app.css"' in html
+        assert "url('img/bg.png')" in html
+        assert '<script src="js/app.js">' in html
+        assert 'href="about.html#team"' in html
+        assert 'srcset="img/logo.png 1x, https://example.com/site/img/logo@2x.png 2x"' in html
+        assert 'style="background-image: url(img/bg.png)"' in html
+        assert 'alt="a &amp; b"' in html
+
+    def test_html_unsaved_and_special_references(self, temp_dir):
+        """Test that unsaved links become absolute and others are kept."""
+        html = self._rewrite_html(temp_dir)
+
+        assert 'href="https://example.com/missing"' in html
+        assert 'src="data:image/png;base64,AAAA"' in html
+        assert 'href="#top"' in html
+        # Script text and comments are copied verbatim
+        assert 'var s = "<img src=img/logo.png>";' in html
+        assert '<!-- <img src="img/logo.png"> <a href="/missing"> -->' in html
+
+    def test_html_chunk_boundaries(self, temp_dir):
+        """Test that every chunk size gives the same output as one pass."""
+        expected = self._rewrite_html(temp_dir)
+        for chunk_size in range(1, len(self.HTML)):
+            assert self._rewrite_html(temp_dir, chunk_size) == expected, chunk_size
+
+    def test_srcset_keeps_commas_inside_urls(self, temp_dir):
+        """Test that data: URIs in srcset survive and separators are kept."""
+        mapper = LinkMapper({}, "https://example.com/", temp_dir / "index.html")
+
+        srcset = "data:image/png;base64,AAA, a.png 2x,b.png (x, y) 3x"
+
+        assert mapper.map_srcset(srcset) == (
+            "data:image/png;base64,AAA, https://example.com/a.png 2x,"
+            "https://example.com/b.png (x, y) 3x"
+        )
+
+    def test_malformed_references_left_unchanged(self, temp_dir):
+        """Test that a malformed URL or <base> only skips that reference."""
+        mapper = LinkMapper({}, "https://example.com/", temp_dir / "index.html")
+        stream = HtmlStreamRewriter(mapper)
+        html = stream.feed(
+            '<base href="http://[::1/"><img src="http://[::1/a.png"><a href="/b">B</a>'
+        )
+
+        assert html + stream.close() == (
+            '<base href="http://[::1/"><img src="http://[::1/a.png">'
+            '<a href="https://example.com/b">B</a>'
+        )
+
+    def test_css_chunk_boundaries(self, temp_dir):
+        """Test that stylesheet tokens split across chunks are rewritten."""
+        css = '@import "base.css"; .a { background: url( "img/a.png" ) } .b { src: url(f.woff) }'
+        url_map = {
+            "https://example.com/css/base.css": temp_dir / "css" / "base.css",
+            "https://example.com/css/img/a.png": temp_dir / "css" / "img" / "a.png",
+            "https://example.com/css/f.woff": temp_dir / "fonts" / "f.woff",
+        }
+        outputs = set()
+        for size in (1, 5, len(css)):
+            stream = CssStreamRewriter(
+                LinkMapper(url_map, "https://example.com/css/app.css", temp_dir / "css" / "app.css")
+            )
+            out = "".join(stream.feed(css[i : i + size]) for i in range(0, len(css), size))
+            outputs.add(out + stream.close())
+
+        assert outputs == {
+            (
+                '@import "base.css"; .a { background: url( "img/a.png" ) } '
+                ".b { src: url(../fonts/f.woff) }"
+            )
+        }
+
+    def test_rewrite_file_replaces_instead_of_writing_through(self, temp_dir):
+        """Test that a hardlinked file is replaced, leaving the blob intact."""
+        import os
+
+        blob = temp_dir / "blob"
+        blob.write_text('<img src="/logo.png">')
+        page = temp_dir / "example.com" / "index.html"
+        page.parent.mkdir()
+        os.link(blob, page)
+        url_map = {"https://example.com/logo.png": temp_dir / "example.com" / "logo.png"}
+
+        rewriter = LinkRewriter(url_map)
+        assert rewriter.rewrite_file(page, "https://example.com/", "text/html")
+
+        assert page.read_text() == '<img src="logo.png">'
+        assert blob.read_text() == '<img src="/logo.png">'
+
+    def test_rewrite_file_without_links_left_untouched(self, temp_dir):
+        """Test that a document with nothing to change is not rewritten."""
+        page = temp_dir / "index.html"
+        page.write_text("<p>plain</p>")
+        inode = page.stat().st_ino
+
+        assert not LinkRewriter({}).rewrite_file(page, "https://example.com/", "text/html")
+        assert page.stat().st_ino == inode
+
+    def test_rewrite_file_keeps_charset(self, temp_dir):
+        """Test that documents are rewritten in their own encoding."""
+        page = temp_dir / "index.html"
+        page.write_bytes('<p>café</p><img src="/a.png">'.encode("latin-1"))
+
+        LinkRewriter({"https://example.com/a.png": temp_dir / "a.png"}).rewrite_file(
+            page, "https://example.com/index.html", "text/html; charset=ISO-8859-1"
+        )
+
+        assert page.read_bytes() == '<p>café</p><img src="a.png">'.encode("latin-1")
+
+    def test_saver_rewrites_after_saving(self, temp_dir):
+        """Test that the saver rewrites documents once every path is known."""
+        saver = ResourceSaver(
+            SaveConfig(output_dir=temp_dir, base_url="https://example.com", rewrite_links=True)
+        )
+        result = saver.save_resources(
+            [
+                Resource(
+                    url="https://example.com/",
+                    content_type="text/html",
+                    body=b'<link rel="stylesheet" href="/css/app.css"><img src="/logo">',
+                    headers={},
+                    status_code=200,
+                ),
+                Resource(
+                    url="https://example.com/css/app.css",
+                    content_type="text/css",
+                    body=b"body { background: url(/logo) }",
+                    headers={},
+                    status_code=200,
+                ),
+                Resource(
+                    url="https://example.com/logo",
+                    content_type="image/png",
+                    body=b"png",
+                    headers={},
+                    status_code=200,
+                ),
+            ]
+        )
+
+        assert result.rewritten_count == 2
+        site = temp_dir / "example.com"
+        assert (site / "index.html").read_text() == (
+            '<link rel="stylesheet" href="css/app.css"><img src="logo.png">'
+        )
+        assert (site / "css" / "app.css").read_text() == "body { background: url(../logo.png) }"
@@ -0,0 +1,61 @@
+"""Tests for cached URL classification."""
+
+from webgrab.url.classifier import (
+    Origin,
+    UrlClassifier,
+    is_skipped,
+    parse_cached,
+    url_origin,
+)
+
+
+class TestUrlOrigin:
+    """Tests for url_origin function."""
+
+    def test_normalizes_case_and_default_port(self):
+        """Test that case and explicit default ports are normalized."""
+        assert url_origin("HTTPS://Example.COM:443/a") == Origin("https", "example.com", None)
+        assert url_origin("http://example.com:80/") == Origin("http", "example.com", None)
+
+    def test_keeps_non_default_port(self):
+        """Test that a non-default port is part of the origin."""
+        assert url_origin("http://example.com:443/") == Origin("http", "example.com", 443)
+
+    def test_ignores_userinfo(self):
+        """Test that credentials do not change the origin."""
+        assert url_origin("https://user:pw@example.com/") == url_origin("https://example.com/")
+
+    def test_invalid_port(self):
+        """Test that an unparsable port does not raise."""
+        assert url_origin("https://example.com:99999/") == Origin("https", "example.com", None)
+
+
+class TestParseCached:
+    """Tests for parse_cached function."""
+
+    def test_reuses_parse(self):
+        """Test that repeated parses of a URL return the same object."""
+        url = "https://example.com/cached?q=1"
+        assert parse_cached(url) is parse_cached(url)
+        assert parse_cached(url).query == "q=1"
+
+
+class TestUrlClassifier:
+    """Tests for UrlClassifier."""
+
+    def test_same_origin(self):
+        """Test origin checks against the base URL."""
+        classifier = UrlClassifier("https://example.com/start")
+
+        assert classifier.is_same_origin("https://example.com:443/other")
+        assert not classifier.is_same_origin("http://example.com/other")
+        assert not classifier.is_same_origin("https://cdn.example.com/app.js")
+
+    def test_should_skip(self):
+        """Test that non-network URLs are skipped."""
+        classifier = UrlClassifier("https://example.com")
+
+        assert classifier.should_skip("data:text/plain,hi")
+        assert classifier.should_skip("javascript:void(0)")
+        assert not classifier.should_skip("https://example.com/")
+        assert is_skipped("blob:https://example.com/1")
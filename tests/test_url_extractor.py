@@ -0,0 +1,152 @@
+"""Tests for link extraction from HTML documents."""
+
+from webgrab.url.extractor import (
+    decode_document,
+    extract_css_urls,
+    extract_links,
+    extract_subresources,
+)
+
+
+class TestExtractLinks:
+    """Tests for extract_links function."""
+
+    def test_extract_links_resolves_relative_urls(self):
+        """Test that relative hrefs are resolved against the page URL."""
+        html = '<a href="about">About</a><a href="/docs/">Docs</a>'
+        links = extract_links(html, "https://example.com/blog/post")
+
+        assert links == ["https://example.com/blog/about", "https://example.com/docs/"]
+
+    def test_extract_links_strips_fragments_and_dedupes(self):
+        """Test that fragments are removed and duplicates collapsed."""
+        html = '<a href="/a#top">A</a><a href="/a">A again</a><a href="#x">Self</a>'
+        links = extract_links(html, "https://example.com/")
+
+        assert links == ["https://example.com/a", "https://example.com/"]
+
+    def test_extract_links_honours_base_href(self):
+        """Test that <base href> changes how links resolve."""
+        html = '<base href="https://example.com/sub/"><a href="page">P</a>'
+        links = extract_links(html, "https://example.com/")
+
+        assert links == ["https://example.com/sub/page"]
+
+    def test_extract_links_ignores_subresources(self):
+        """Test that only navigable links are returned."""
+        html = (
+            '<link href="/style.css" rel="stylesheet"><img src="/a.png">'
+            '<area href="/map"><a>No href</a>'
+        )
+        links = extract_links(html, "https://example.com/")
+
+        assert links == ["https://example.com/map"]
+
+    def test_extract_links_skips_malformed_references(self):
+        """Test that a malformed href or <base> does not stop extraction."""
+        html = (
+            '<base href="http://[::1/">'
+            '<a href="http://[::1/broken">Broken</a><a href="/ok">OK</a>'
+        )
+        links = extract_links(html, "https://example.com/")
+
+        assert links == ["https://example.com/ok"]
+
+
+class TestDecodeDocument:
+    """Tests for decode_document function."""
+
+    def test_decode_document_uses_charset(self):
+        """Test that the Content-Type charset is used for decoding."""
+        text = decode_document("café".encode("latin-1"), "text/html; charset=ISO-8859-1")
+
+        assert text == "café"
+
+    def test_decode_document_falls_back_to_utf8(self):
+        """Test that unknown charsets fall back to UTF-8."""
+        text = decode_document("café".encode(), "text/html; charset=bogus")
+
+        assert text == "café"
+
+
+class TestExtractSubresources:
+    """Tests for extract_subresources function."""
+
+    def test_extract_subresources_finds_typed_references(self):
+        """Test that src, href, srcset and poster references are typed."""
+        html = (
+            '<link rel="stylesheet" href="/main.css">'
+            '<link rel="preload" as="font" href="/f.woff2">'
+            '<link rel="canonical" href="/page">'
+            '<script src="app.js"></script>'
+            '<img src="/a.png" srcset="/a-2x.png 2x, /a-3x.png 3x">'
+            '<video poster="/p.jpg"><source src="/v.mp4"></video>'
+        )
+        found = dict(extract_subresources(html, "https://example.com/"))
+
+        assert found == {
+            "https://example.com/main.css": "stylesheet",
+            "https://example.com/f.woff2": "font",
+            "https://example.com/app.js": "script",
+            "https://example.com/a.png": "image",
+            "https://example.com/a-2x.png": "image",
+            "https://example.com/a-3x.png": "image",
+            "https://example.com/p.jpg": "image",
+            "https://example.com/v.mp4": "media",
+        }
+
+    def test_extract_subresources_srcset_with_data_uri(self):
+        """Test that commas inside a srcset URL do not split the candidate."""
+        html = '<img srcset="data:image/png;base64,AAA, /a.png 2x,/b.png">'
+        found = extract_subresources(html, "https://example.com/")
+
+        assert found == [
+            ("https://example.com/a.png", "image"),
+            ("https://example.com/b.png", "image"),
+        ]
+
+    def test_extract_subresources_reads_inline_styles(self):
+        """Test that url() in style elements and attributes is found."""
+        html = (
+            "<style>body { background: url('/bg.png') }</style>"
+            '<div style="background-image: url(/tile.gif)"></div>'
+            '<img src="data:image/png;base64,AAAA">'
+        )
+        found = extract_subresources(html, "https://example.com/")
+
+        assert found == [
+            ("https://example.com/bg.png", "image"),
+            ("https://example.com/tile.gif", "image"),
+        ]
+
+    def test_extract_subresources_skips_malformed_references(self):
+        """Test that a malformed URL is skipped rather than raising."""
+        html = (
+            '<img src="http://[::1/a.png"><script src="/app.js"></script>'
+            "<style>@font-face { src: url(http://[::1/f.woff2) }</style>"
+        )
+        found = extract_subresources(html, "https://example.com/")
+
+        assert found == [("https://example.com/app.js", "script")]
+
+
+class TestExtractCssUrls:
+    """Tests for extract_css_urls function."""
+
+    def test_extract_css_urls_handles_imports_and_fonts(self):
+        """Test that @import targets are stylesheets and fonts are typed."""
+        css = (
+            '@import "reset.css";\n'
+            "@import url(theme.css);\n"
+            "@font-face { src: url('../fonts/a.woff2') format('woff2'); }\n"
+            'h1 { background: url("img/h.png#frag"); }\n'
+            "p { background: url(data:image/gif;base64,R0lG); }"
+        )
+        found = extract_css_urls(css, "https://example.com/css/site.css")
+
+        assert found == [
+            ("https://example.com/css/reset.css", "stylesheet"),
+            ("https://example.com/css/theme.css", "stylesheet"),
+            ("https://example.com/fonts/a.woff2", "font"),
+            ("https://example.com/css/img/h.png", "image"),
+        ]
@@ -69,6 +69,18 @@ class TestIsSameOrigin:
             "https://example.com:8080/page1", "https://example.com:8080/page2"
         )
 
+    def test_different_origin_scheme(self):
+        """Test that the scheme is part of the origin."""
+        assert not is_same_origin("http://example.com/page", "https://example.com/")
+
+    def test_same_origin_default_port(self):
+        """Test that an explicit default port matches an implicit one."""
+        assert is_same_origin("https://Example.com:443/page", "https://example.com/")
+
+    def test_different_origin_port(self):
+        """Test that a non-default port is a different origin."""
+        assert not is_same_origin("https://example.com:8443/page", "https://example.com/")
+
 
 class TestShouldSkipUrl:
     """Tests for should_skip_url function."""